@@ -2,8 +2,69 @@
 
 This is a convenience for importing all testing classes and functions in one line.
 To import fixtures, use the geneweaver.testing.fixtures module.
+
+The tests are listed in a static manifest, and each module of tests is only imported
+when one of its tests is first used, so importing the package is cheap. A star import
+uses every name in ``__all__``, so it imports the structure, pyproject, import and
+style tests. The typing, complexity, coverage and wheel tests are slower, and are left
+out of ``__all__``: import them by name, or let the pytest plugin run them.
 """
 
-# ruff: noqa: F403
-from .package import *
-from .style import *
+from geneweaver.testing.lazy import attach
+
+__all__, __getattr__, __dir__ = attach(
+    __name__,
+    {
+        ".package.can_import": [
+            "test_can_import_absolute",
+            "test_can_import_relative",
+            "test_can_import_geneweaver",
+            "test_submodule_available_from_namespace_package",
+        ],
+        ".package.generic.pyproject": [
+            "test_has_pyproject_toml",
+            "test_has_tool_poetry_section",
+            "test_pyproject_has_package_name",
+            "test_pyproject_has_version",
+            "test_pyproject_has_description",
+            "test_pyproject_has_authors",
+            "test_pyproject_has_license",
+            "test_pyproject_has_readme",
+            "test_poetry_has_packages_definition",
+            "test_poetry_has_homepage",
+            "test_poetry_has_repository",
+            "test_poetry_packages_defined_in_src_dir",
+            "test_pyproject_has_ruff",
+            "test_pyproject_ruff_has_required_rules",
+            "test_pyproject_ruff_does_not_have_other_specifications",
+            "test_ruff_per_files_ignores",
+        ],
+        ".package.generic.structure": [
+            "test_has_src_directory",
+            "test_has_tests_directory",
+            "test_has_contributing_file",
+            "test_has_readme_file",
+            "test_has_license_file",
+        ],
+        ".package.import_time": ["test_import_time_within_budget"],
+        ".package.pyproject": ["test_poetry_packages_in_geneweaver_namespace"],
+        ".package.structure": [
+            "test_has_geneweaver_directory",
+            "test_geneweaver_dir_is_namespace_package",
+            "test_has_package_directory",
+        ],
+        ".style.black": ["test_black_src_dir", "test_black_tests_dir"],
+        ".style.ruff": ["test_ruff_src_dir", "test_ruff_tests_dir"],
+    },
+    unexported={
+        ".complexity": ["test_cyclomatic_complexity", "test_maintainability_index"],
+        ".coverage": ["test_coverage_threshold"],
+        ".package.wheel": [
+            "test_wheel_is_namespace_package",
+            "test_wheel_contains_source_files",
+            "test_wheel_has_no_unexpected_files",
+            "test_wheel_size_within_budget",
+        ],
+        ".typing": ["test_mypy_src_dir", "test_mypy_tests_dir"],
+    },
+)
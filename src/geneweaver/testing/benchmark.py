@@ -0,0 +1,291 @@
+"""Time hot code paths with calibrated, low-noise benchmark runs.
+
+A :class:`Benchmark` calls a function in rounds. A warmup and a single timed call are
+used to pick how many calls each round makes, so every round lasts long enough for
+the timer to be accurate, and rounds are run until enough time has been spent. The
+garbage collector is disabled while a round is timed, and the process is pinned to the
+CPU it is running on where the platform allows it, so parallel workers stay spread
+across their CPUs.
+
+Results are compared against a stored :class:`Baseline`: a run is a regression when
+its median is slower than the baseline by more than a threshold, and its interquartile
+range no longer overlaps the baseline's, so ordinary noise does not fail a test.
+"""
+
+import gc
+import math
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+__all__ = [
+    "DEFAULT_THRESHOLD",
+    "BenchmarkStats",
+    "Baseline",
+    "Benchmark",
+    "is_slower",
+]
+
+DEFAULT_THRESHOLD = 0.2
+
+Result = TypeVar("Result")
+
+
+def _format_ns(value: float) -> str:
+    """Format a duration in the most readable unit."""
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if value >= scale:
+            return f"{value / scale:.3g} {unit}"
+    return f"{value:.3g} ns"
+
+
+@dataclass(frozen=True)
+class BenchmarkStats:
+    """The time per call of each timed round."""
+
+    samples_ns: Tuple[float, ...]
+    iterations: int
+
+    @property
+    def median(self) -> float:
+        """The median time per call, in nanoseconds."""
+        return statistics.median(self.samples_ns)
+
+    @property
+    def quartiles(self) -> Tuple[float, float]:
+        """The lower and upper quartiles of the time per call."""
+        if len(self.samples_ns) < 2:
+            return self.samples_ns[0], self.samples_ns[0]
+        lower, _, upper = statistics.quantiles(self.samples_ns, n=4)
+        return lower, upper
+
+    @property
+    def iqr(self) -> float:
+        """The interquartile range of the time per call."""
+        lower, upper = self.quartiles
+        return upper - lower
+
+    @property
+    def min(self) -> float:  # noqa: A003
+        """The fastest time per call."""
+        return min(self.samples_ns)
+
+    def summary(self) -> str:
+        """Describe the median, spread and fastest time per call."""
+        return (
+            f"median {_format_ns(self.median)}, IQR {_format_ns(self.iqr)}, "
+            f"min {_format_ns(self.min)} "
+            f"({len(self.samples_ns)} rounds of {self.iterations})"
+        )
+
+
+@dataclass(frozen=True)
+class Baseline:
+    """The stored summary of an earlier run, compact enough to keep per test."""
+
+    median: float
+    q1: float
+    q3: float
+    min: float  # noqa: A003
+
+    @classmethod
+    def from_stats(cls: Type["Baseline"], stats: BenchmarkStats) -> "Baseline":
+        """Summarise the statistics of a run."""
+        q1, q3 = stats.quartiles
+        return cls(stats.median, q1, q3, stats.min)
+
+    def to_json(self) -> List[float]:
+        """Convert the baseline to a compact list, to be stored."""
+        return [round(value, 1) for value in (self.median, self.q1, self.q3, self.min)]
+
+    @classmethod
+    def from_json(cls: Type["Baseline"], data: List[float]) -> "Baseline":
+        """Rebuild a baseline from :meth:`to_json` data."""
+        return cls(*data)
+
+    @classmethod
+    def median_of(cls: Type["Baseline"], baselines: Sequence["Baseline"]) -> "Baseline":
+        """Combine recent baselines into one, taking the median of each statistic.
+
+        :param baselines: The baselines of recent runs, there must be at least one.
+        """
+        return cls(
+            *(
+                statistics.median(values)
+                for values in zip(*((b.median, b.q1, b.q3, b.min) for b in baselines))
+            )
+        )
+
+
+def is_slower(stats: BenchmarkStats, baseline: Baseline, threshold: float) -> bool:
+    """Return True if a run is significantly slower than the baseline.
+
+    :param stats: The current run.
+    :param baseline: The run to compare against.
+    :param threshold: The allowed slowdown of the median, as a fraction.
+    """
+    lower, _ = stats.quartiles
+    return stats.median > baseline.median * (1 + threshold) and lower > baseline.q3
+
+
+def _current_cpu() -> Optional[int]:
+    """Get the CPU the process is running on, or None if it can not be read."""
+    try:
+        with open("/proc/self/stat") as stat:
+            # The command name may hold spaces, so count fields after its ")".
+            fields = stat.read().rsplit(")", 1)[1].split()
+        return int(fields[36])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+@contextmanager
+def _pinned_to_one_cpu() -> Iterator[None]:
+    """Keep the process on its current CPU, so it is not migrated between rounds.
+
+    The process stays on the CPU it is already on, rather than a fixed one, so
+    pytest-xdist workers timing benchmarks at the same time do not share a CPU.
+    """
+    if not hasattr(os, "sched_getaffinity"):  # pragma: no cover - not on macOS
+        yield
+        return
+    cpus = os.sched_getaffinity(0)
+    current = _current_cpu()
+    if current not in cpus:
+        yield
+        return
+    os.sched_setaffinity(0, {current})
+    try:
+        yield
+    finally:
+        os.sched_setaffinity(0, cpus)
+
+
+class Benchmark:
+    """Times a function, see the module documentation for how."""
+
+    def __init__(
+        self,
+        name: str,
+        baseline: Optional[Baseline] = None,
+        threshold: float = DEFAULT_THRESHOLD,
+        min_time: float = 0.2,
+        max_time: float = 2.0,
+        min_rounds: int = 5,
+        max_rounds: int = 1000,
+        warmup_time: float = 0.05,
+        round_time: float = 0.001,
+        timer: Callable[[], int] = time.perf_counter_ns,
+    ) -> None:
+        """Configure the benchmark.
+
+        :param name: The name to report and store the results under.
+        :param baseline: An earlier run to compare against, if there is one.
+        :param threshold: The allowed slowdown against the baseline, as a fraction.
+        :param min_time: Run rounds for at least this many seconds.
+        :param max_time: Stop after this many seconds, even with fewer rounds.
+        :param min_rounds: The fewest rounds to time.
+        :param max_rounds: The most rounds to time.
+        :param warmup_time: Call the function for this many seconds before timing.
+        :param round_time: The shortest time, in seconds, a round should take.
+        :param timer: The nanosecond clock to time rounds with.
+        """
+        self.name = name
+        self.baseline = baseline
+        self.threshold = threshold
+        self.min_time = min_time
+        self.max_time = max_time
+        self.min_rounds = min_rounds
+        self.max_rounds = max_rounds
+        self.warmup_time = warmup_time
+        self.round_time = round_time
+        self.timer = timer
+        self.stats: Optional[BenchmarkStats] = None
+
+    def _time_round(
+        self, iterations: int, function: Callable[[], Any]
+    ) -> Tuple[int, Any]:
+        """Call the function a number of times with the garbage collector disabled.
+
+        :return: The total time in nanoseconds, and the last result.
+        """
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            started = self.timer()
+            for _ in range(iterations):
+                result = function()
+            return self.timer() - started, result
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def _calibrate(self, function: Callable[[], Any]) -> int:
+        """Warm up, then pick how many calls a round makes."""
+        deadline = time.perf_counter() + self.warmup_time
+        elapsed, _ = self._time_round(1, function)
+        while time.perf_counter() < deadline:
+            elapsed, _ = self._time_round(1, function)
+        resolution_ns = time.get_clock_info("perf_counter").resolution * 1e9
+        round_ns = max(self.round_time * 1e9, resolution_ns * 1000)
+        return max(1, math.ceil(round_ns / max(elapsed, 1)))
+
+    def __call__(
+        self, function: Callable[..., Result], *args: Any, **kwargs: Any  # noqa: ANN401
+    ) -> Result:
+        """Time a function, failing if it is slower than the baseline.
+
+        :param function: The function to time.
+        :param args: Positional arguments to call the function with.
+        :param kwargs: Keyword arguments to call the function with.
+        :return: The result of the last call of the function.
+        """
+
+        def call() -> Result:
+            return function(*args, **kwargs)
+
+        samples: List[float] = []
+        with _pinned_to_one_cpu():
+            iterations = self._calibrate(call)
+            gc.collect()
+            started = time.perf_counter()
+            while len(samples) < self.max_rounds:
+                elapsed = time.perf_counter() - started
+                if samples and (
+                    elapsed >= self.max_time
+                    or (len(samples) >= self.min_rounds and elapsed >= self.min_time)
+                ):
+                    break
+                total_ns, result = self._time_round(iterations, call)
+                samples.append(total_ns / iterations)
+
+        self.stats = BenchmarkStats(tuple(samples), iterations)
+        regression = self.regression()
+        assert regression is None, regression
+        return result
+
+    def regression(self) -> Optional[str]:
+        """Describe how the run is slower than the baseline, if it is."""
+        if self.stats is None or self.baseline is None:
+            return None
+        if not is_slower(self.stats, self.baseline, self.threshold):
+            return None
+        return (
+            f"{self.name} is {self.stats.median / self.baseline.median - 1:.0%} slower "
+            f"than its baseline median of {_format_ns(self.baseline.median)}: "
+            f"{self.stats.summary()}. If the slowdown is expected, reset the baseline "
+            "with pytest --cache-clear."
+        )
@@ -0,0 +1,86 @@
+"""Find the files that changed relative to a git base ref, for incremental runs.
+
+Incremental mode is enabled by setting the ``GENEWEAVER_TESTING_CHANGED_SINCE``
+environment variable to a git ref (e.g. ``origin/main``). Prebuilt tests declare the
+project paths they read with :func:`depends_on`, and are skipped when none of those
+paths changed since the merge base with that ref.
+"""
+
+import pathlib
+import subprocess
+from typing import Callable, Collection, FrozenSet, List, Optional, Tuple, TypeVar
+
+__all__ = [
+    "CHANGED_SINCE_ENV",
+    "ChangeDetectionError",
+    "depends_on",
+    "declared_inputs",
+    "find_changed_files",
+    "inputs_changed",
+]
+
+CHANGED_SINCE_ENV = "GENEWEAVER_TESTING_CHANGED_SINCE"
+
+_INPUTS_ATTRIBUTE = "__geneweaver_inputs__"
+
+TestFunction = TypeVar("TestFunction", bound=Callable)
+
+
+class ChangeDetectionError(RuntimeError):
+    """Raised when the changed files could not be read from git."""
+
+
+def depends_on(*paths: str) -> Callable[[TestFunction], TestFunction]:
+    """Declare the project paths a prebuilt test reads.
+
+    :param paths: Files or directories, relative to the project root.
+    """
+
+    def decorator(function: TestFunction) -> TestFunction:
+        setattr(function, _INPUTS_ATTRIBUTE, tuple(paths))
+        return function
+
+    return decorator
+
+
+def declared_inputs(function: Optional[Callable]) -> Optional[Tuple[str, ...]]:
+    """Get the paths declared with :func:`depends_on`, if any."""
+    return getattr(function, _INPUTS_ATTRIBUTE, None)
+
+
+def _git(project_root: pathlib.Path, git_dir: pathlib.Path, *args: str) -> List[str]:
+    """Run a git command against the project and return its output lines."""
+    completed = subprocess.run(
+        ["git", f"--git-dir={git_dir}", f"--work-tree={project_root}", *args],
+        capture_output=True,
+        text=True,
+        cwd=project_root,
+    )
+    if completed.returncode != 0:
+        raise ChangeDetectionError(completed.stderr.strip())
+    return [line for line in completed.stdout.splitlines() if line]
+
+
+def find_changed_files(
+    project_root: pathlib.Path, git_dir: pathlib.Path, base_ref: str
+) -> FrozenSet[str]:
+    """Find the files changed since the merge base of a ref and HEAD.
+
+    Committed, uncommitted and untracked (but not ignored) files are all included.
+
+    :return: The changed paths, relative to the project root.
+    """
+    merge_base = _git(project_root, git_dir, "merge-base", base_ref, "HEAD")[0]
+    return frozenset(
+        _git(project_root, git_dir, "diff", "--name-only", merge_base)
+        + _git(project_root, git_dir, "ls-files", "--others", "--exclude-standard")
+    )
+
+
+def inputs_changed(inputs: Collection[str], changed: Collection[str]) -> bool:
+    """Return True if any changed path is, or is inside, one of the inputs."""
+    return any(
+        path == declared or path.startswith(f"{declared.rstrip('/')}/")
+        for declared in inputs
+        for path in changed
+    )
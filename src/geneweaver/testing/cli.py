@@ -0,0 +1,132 @@
+"""The ``geneweaver-testing`` command line interface.
+
+Usage::
+
+    geneweaver-testing scan ~/code/geneweaver --format junit --output report.xml
+    geneweaver-testing watch ~/code/geneweaver/geneweaver-core
+"""
+
+import argparse
+import pathlib
+import sys
+from typing import List, Optional
+
+from geneweaver.testing.scan import CHECK_NAMES, find_projects, scan, to_json, to_junit
+
+__all__ = ["main"]
+
+FORMATTERS = {"json": to_json, "junit": to_junit}
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for every subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="geneweaver-testing",
+        description="Run the geneweaver.testing checks outside of pytest.",
+    )
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    scan_parser = subcommands.add_parser(
+        "scan", help="Check every project found under some directories."
+    )
+    scan_parser.add_argument(
+        "directories",
+        nargs="+",
+        type=pathlib.Path,
+        help="Directories to search for projects (with a pyproject.toml).",
+    )
+    scan_parser.add_argument(
+        "--check",
+        action="append",
+        choices=CHECK_NAMES,
+        dest="checks",
+        help="Only run these checks, may be repeated (default: all checks).",
+    )
+    scan_parser.add_argument(
+        "--format", choices=sorted(FORMATTERS), default="json", help="Report format."
+    )
+    scan_parser.add_argument(
+        "--output", type=pathlib.Path, help="Write the report here, not to stdout."
+    )
+    scan_parser.add_argument(
+        "--workers", type=int, help="Number of projects to check at once."
+    )
+
+    watch_parser = subcommands.add_parser(
+        "watch", help="Check a project again whenever its files change."
+    )
+    watch_parser.add_argument(
+        "directory",
+        nargs="?",
+        default=pathlib.Path(),
+        type=pathlib.Path,
+        help="The root directory of the project (default: the current directory).",
+    )
+    watch_parser.add_argument(
+        "--check",
+        action="append",
+        choices=CHECK_NAMES,
+        dest="checks",
+        help="Only run these checks, may be repeated (default: all checks).",
+    )
+    watch_parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Poll for changes instead of using inotify, e.g. on network drives.",
+    )
+    watch_parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.25,
+        help="Seconds between polls for changes (default: 0.25).",
+    )
+    return parser
+
+
+def _scan(args: argparse.Namespace) -> int:
+    """Run the scan subcommand."""
+    projects = find_projects(args.directories)
+    if not projects:
+        print("No projects found.", file=sys.stderr)
+        return 2
+
+    results = scan(projects, args.checks or CHECK_NAMES, args.workers)
+    report = FORMATTERS[args.format](results)
+    if args.output:
+        args.output.write_text(report)
+    else:
+        print(report)
+    return 0 if all(result.passed for result in results) else 1
+
+
+def _watch(args: argparse.Namespace) -> int:
+    """Run the watch subcommand, until interrupted."""
+    from geneweaver.testing.watch import watch
+
+    root = args.directory.resolve()
+    if not (root / "pyproject.toml").is_file():
+        print(f"No pyproject.toml found in {root}.", file=sys.stderr)
+        return 2
+    try:
+        watch(root, args.checks or CHECK_NAMES, args.poll, args.interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the command line interface.
+
+    :param argv: The command line arguments, defaults to ``sys.argv[1:]``.
+    :return: The exit code, 0 if every check passed.
+    """
+    args = _build_parser().parse_args(argv)
+    if args.command == "scan":
+        return _scan(args)
+    if args.command == "watch":
+        return _watch(args)
+    return 2  # pragma: no cover - argparse rejects unknown subcommands
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""Test that the code in the src directory is not too complex to maintain.
+
+The thresholds are configured in pyproject.toml::
+
+    [tool.geneweaver.testing]
+    max-complexity = 20       # the highest cyclomatic complexity of a function
+    min-maintainability = 10  # the lowest maintainability index of a file
+
+The most complex functions are recorded as a test property, and so are included in
+JUnit XML reports.
+"""
+
+from typing import TYPE_CHECKING, Callable
+
+from geneweaver.testing.changes import depends_on
+from geneweaver.testing.metrics import (
+    DEFAULT_MAX_COMPLEXITY,
+    DEFAULT_MIN_MAINTAINABILITY,
+)
+from geneweaver.testing.pyproject import PyProject
+
+if TYPE_CHECKING:
+    from geneweaver.testing.metrics import ComplexityReport
+
+__all__ = ["test_cyclomatic_complexity", "test_maintainability_index"]
+
+HOTTEST_FUNCTIONS = 10
+
+
+@depends_on("src", "pyproject.toml")
+def test_cyclomatic_complexity(
+    complexity_report: "ComplexityReport",
+    pyproject: PyProject,
+    record_property: Callable[[str, object], None],
+) -> None:
+    """Test that no function in the src directory is too complex."""
+    max_complexity = pyproject.testing_settings.get(
+        "max-complexity", DEFAULT_MAX_COMPLEXITY
+    )
+    record_property(
+        "hottest_functions",
+        "\n".join(str(function) for function in complexity_report.hottest()),
+    )
+    too_complex = complexity_report.too_complex(max_complexity)
+    assert not too_complex, (
+        f"Functions in the src directory are more complex than {max_complexity} \n"
+        + "".join(f"{function}\n" for function in too_complex)
+        + "Split them into smaller functions, or raise max-complexity in "
+        "[tool.geneweaver.testing]."
+    )
+
+
+@depends_on("src", "pyproject.toml")
+def test_maintainability_index(
+    complexity_report: "ComplexityReport", pyproject: PyProject
+) -> None:
+    """Test that every file in the src directory is maintainable."""
+    min_maintainability = pyproject.testing_settings.get(
+        "min-maintainability", DEFAULT_MIN_MAINTAINABILITY
+    )
+    failures = [
+        f"{metrics.path}: {metrics.error}\n" for metrics in complexity_report.errors
+    ] + [
+        f"{metrics.path} - {metrics.maintainability}\n"
+        for metrics in complexity_report.unmaintainable(min_maintainability)
+    ]
+    assert not failures, (
+        f"Files in the src directory have a maintainability index below "
+        f"{min_maintainability} \n"
+        + "".join(failures)
+        + "Split them into smaller modules, or lower min-maintainability in "
+        "[tool.geneweaver.testing]."
+    )
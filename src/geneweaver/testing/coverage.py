@@ -0,0 +1,47 @@
+"""Test that the test suite covers enough of the src directory.
+
+Coverage is measured when pytest is run with ``--gw-coverage``, and the threshold is
+configured in pyproject.toml::
+
+    [tool.geneweaver.testing]
+    coverage-fail-under = 80  # the lowest percentage of statements covered
+
+Without the setting, coverage.py's own ``fail_under`` setting is used. The test runs
+after every other test in the session, so it checks the coverage of the whole run.
+"""
+
+from typing import TYPE_CHECKING, Callable
+
+import pytest
+from geneweaver.testing.pyproject import PyProject
+
+if TYPE_CHECKING:
+    from geneweaver.testing.linecoverage import CoverageSession
+
+__all__ = ["test_coverage_threshold"]
+
+
+def test_coverage_threshold(
+    coverage_session: "CoverageSession",
+    pyproject: PyProject,
+    record_property: Callable[[str, object], None],
+) -> None:
+    """Test that the session covered at least the configured share of statements."""
+    if coverage_session.worker is not None:
+        pytest.skip(
+            "Each pytest-xdist worker only sees its own tests, check the combined "
+            "data with 'coverage report --fail-under'."
+        )
+    threshold = pyproject.testing_settings.get("coverage-fail-under")
+    if threshold is None:
+        import coverage
+
+        threshold = coverage.Coverage().get_option("report:fail_under") or 0
+    percent = coverage_session.total()
+    record_property("coverage", f"{percent:.1f}%")
+    assert percent >= float(str(threshold)), (
+        f"The tests covered {percent:.1f}% of statements, under the threshold of "
+        f"{threshold}% set with coverage-fail-under in [tool.geneweaver.testing]. "
+        f"Run 'coverage report --show-missing --data-file={coverage_session.data_file}'"
+        " to see the lines that never ran."
+    )
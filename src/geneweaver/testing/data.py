@@ -0,0 +1,422 @@
+"""Seeded generators of synthetic GeneWeaver data, for testing at scale.
+
+Every generator is deterministic for a seed, so a failing test can be reproduced, and
+streams its records lazily, so a million genes never have to be held in memory at
+once. Generated data follows the shape of the GeneWeaver database: genes belong to a
+species and have Ensembl, Entrez and symbol identifiers, genesets hold scored genes of
+one species, homology clusters group genes across species, and genes are annotated
+with ontology terms.
+
+A gene's species and identifiers are derived from its id, so the generators agree
+with each other: the genes in a geneset or homology cluster exist in :func:`genes`.
+
+For the hot sizes, the ``*_columns`` generators yield the same kinds of data as numpy
+arrays in batches, and :func:`cached_columns` writes them once to ``.npy`` files that
+are memory-mapped on later use. numpy is only imported by these functions. They use
+numpy's random generator, so their values differ from the streamed records of the
+same seed, though they are just as deterministic.
+"""
+
+import os
+import pathlib
+import random
+import shutil
+import tempfile
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterator,
+    NamedTuple,
+    Tuple,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+__all__ = [
+    "Species",
+    "SPECIES",
+    "EVIDENCE_CODES",
+    "Gene",
+    "Geneset",
+    "HomologyMember",
+    "Annotation",
+    "species_of",
+    "make_gene",
+    "genes",
+    "genesets",
+    "homology",
+    "annotations",
+    "gene_columns",
+    "geneset_columns",
+    "homology_columns",
+    "annotation_columns",
+    "COLUMN_GENERATORS",
+    "cached_columns",
+    "COLUMNS_SCHEMA",
+]
+
+DEFAULT_GENES_PER_SPECIES = 20_000
+DEFAULT_TERMS = 40_000
+DEFAULT_MIN_GENESET_SIZE = 10
+DEFAULT_MAX_GENESET_SIZE = 5_000
+DEFAULT_BATCH_SIZE = 65_536
+
+# Part of the name of every cached dataset. Increase it whenever a column generator
+# changes the values it makes, so datasets cached by earlier versions are not used.
+COLUMNS_SCHEMA = 1
+
+
+class Species(NamedTuple):
+    """A species in GeneWeaver, with the prefix of its Ensembl gene ids."""
+
+    id: int  # noqa: A003
+    name: str
+    ensembl_prefix: str
+
+
+SPECIES = (
+    Species(1, "Mus musculus", "ENSMUSG"),
+    Species(2, "Homo sapiens", "ENSG"),
+    Species(3, "Rattus norvegicus", "ENSRNOG"),
+    Species(4, "Danio rerio", "ENSDARG"),
+    Species(5, "Drosophila melanogaster", "FBgn"),
+    Species(6, "Macaca mulatta", "ENSMMUG"),
+    Species(7, "Caenorhabditis elegans", "WBGene"),
+    Species(8, "Saccharomyces cerevisiae", "SGD:S"),
+)
+
+EVIDENCE_CODES = ("EXP", "IDA", "IPI", "IMP", "IGI", "IEP", "ISS", "TAS", "IEA")
+
+_SYMBOL_LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+class Gene(NamedTuple):
+    """A gene and its identifiers."""
+
+    gene_id: int
+    species_id: int
+    symbol: str
+    ensembl_id: str
+    entrez_id: int
+
+
+class Geneset(NamedTuple):
+    """A geneset of one species, with a score for each of its genes."""
+
+    geneset_id: int
+    name: str
+    species_id: int
+    genes: Tuple[Tuple[int, float], ...]
+
+
+class HomologyMember(NamedTuple):
+    """A gene in a homology cluster."""
+
+    homology_id: int
+    gene_id: int
+    species_id: int
+
+
+class Annotation(NamedTuple):
+    """An ontology term annotated to a gene."""
+
+    gene_id: int
+    term: str
+    evidence: str
+
+
+def _random(kind: str, seed: int) -> random.Random:
+    """Create the random generator for one kind of data, deterministic for a seed."""
+    return random.Random(f"geneweaver-testing:{kind}:{seed}")
+
+
+def species_of(gene_id: int) -> Species:
+    """Get the species a gene id belongs to, gene ids cycle through the species."""
+    return SPECIES[(gene_id - 1) % len(SPECIES)]
+
+
+def _gene_id(index: int, species: Species) -> int:
+    """Get the id of the nth gene of a species."""
+    return index * len(SPECIES) + species.id
+
+
+def make_gene(gene_id: int) -> Gene:
+    """Build a gene from its id, its species and identifiers follow from the id."""
+    species = species_of(gene_id)
+    index = (gene_id - 1) // len(SPECIES)
+    letters = ""
+    value = index
+    for _ in range(3):
+        value, letter = divmod(value, len(_SYMBOL_LETTERS))
+        letters += _SYMBOL_LETTERS[letter]
+    return Gene(
+        gene_id,
+        species.id,
+        f"{letters}{value + 1}",
+        f"{species.ensembl_prefix}{index + 1:011d}",
+        100_000 + gene_id,
+    )
+
+
+def genes(count: int) -> Iterator[Gene]:
+    """Stream genes, cycling through the species.
+
+    :param count: The number of genes.
+    """
+    return map(make_gene, range(1, count + 1))
+
+
+def genesets(
+    seed: int,
+    count: int,
+    genes_per_species: int = DEFAULT_GENES_PER_SPECIES,
+    min_size: int = DEFAULT_MIN_GENESET_SIZE,
+    max_size: int = DEFAULT_MAX_GENESET_SIZE,
+) -> Iterator[Geneset]:
+    """Stream genesets, their sizes log-uniformly spread so most are small.
+
+    :param seed: The seed of the random generator.
+    :param count: The number of genesets.
+    :param genes_per_species: The number of genes of each species to pick from.
+    :param min_size: The fewest genes in a geneset.
+    :param max_size: The most genes in a geneset.
+    """
+    rng = _random("genesets", seed)
+    max_size = min(max_size, genes_per_species)
+    for geneset_id in range(1, count + 1):
+        species = rng.choice(SPECIES)
+        size = int(min_size * (max_size / min_size) ** rng.random())
+        indexes = sorted(rng.sample(range(genes_per_species), size))
+        yield Geneset(
+            geneset_id,
+            f"Synthetic geneset {geneset_id}",
+            species.id,
+            tuple(
+                (_gene_id(index, species), round(rng.random(), 6)) for index in indexes
+            ),
+        )
+
+
+def homology(
+    seed: int, count: int, genes_per_species: int = DEFAULT_GENES_PER_SPECIES
+) -> Iterator[HomologyMember]:
+    """Stream the members of homology clusters, each spanning two or more species.
+
+    :param seed: The seed of the random generator.
+    :param count: The number of clusters.
+    :param genes_per_species: The number of genes of each species to pick from.
+    """
+    rng = _random("homology", seed)
+    for homology_id in range(1, count + 1):
+        index = rng.randrange(genes_per_species)
+        for species in rng.sample(SPECIES, rng.randint(2, len(SPECIES))):
+            yield HomologyMember(homology_id, _gene_id(index, species), species.id)
+
+
+def annotations(
+    seed: int,
+    count: int,
+    genes_per_species: int = DEFAULT_GENES_PER_SPECIES,
+    terms: int = DEFAULT_TERMS,
+) -> Iterator[Annotation]:
+    """Stream Gene Ontology annotations, a few terms annotated far more than most.
+
+    :param seed: The seed of the random generator.
+    :param count: The number of annotations.
+    :param genes_per_species: The number of genes of each species to pick from.
+    :param terms: The number of distinct terms.
+    """
+    rng = _random("annotations", seed)
+    gene_count = genes_per_species * len(SPECIES)
+    for _ in range(count):
+        term = min(int(rng.paretovariate(1.0)), terms)
+        yield Annotation(
+            rng.randrange(1, gene_count + 1),
+            f"GO:{term:07d}",
+            rng.choice(EVIDENCE_CODES),
+        )
+
+
+Columns = Dict[str, "np.ndarray"]
+
+
+def _numpy_random(kind: str, seed: int, batch: int) -> "np.random.Generator":
+    """Create the numpy random generator for a batch of one kind of data."""
+    import numpy as np
+
+    return np.random.default_rng([seed, batch, *kind.encode()])
+
+
+def _batches(size: int, batch_size: int) -> Iterator[Tuple[int, int, int]]:
+    """Split rows into batches of their number, start and stop."""
+    for number, start in enumerate(range(0, size, batch_size)):
+        yield number, start, min(start + batch_size, size)
+
+
+def gene_columns(
+    seed: int, size: int, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[Columns]:
+    """Yield genes as batches of ``gene_id``, ``species_id`` and ``entrez_id`` arrays.
+
+    The seed is unused, genes follow from their ids, but is accepted so every column
+    generator is called the same way.
+    """
+    import numpy as np
+
+    for _, start, stop in _batches(size, batch_size):
+        gene_id = np.arange(start + 1, stop + 1, dtype=np.int64)
+        yield {
+            "gene_id": gene_id,
+            "species_id": ((gene_id - 1) % len(SPECIES) + 1).astype(np.int16),
+            "entrez_id": gene_id + 100_000,
+        }
+
+
+def geneset_columns(
+    seed: int,
+    size: int,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    genes_per_species: int = DEFAULT_GENES_PER_SPECIES,
+    geneset_size: int = 1000,
+) -> Iterator[Columns]:
+    """Yield geneset membership rows as ``geneset_id``, ``gene_id`` and ``score``.
+
+    :param size: The total number of rows, across genesets of ``geneset_size`` genes.
+    """
+    import numpy as np
+
+    for number, start, stop in _batches(size, batch_size):
+        rng = _numpy_random("genesets", seed, number)
+        rows = np.arange(start, stop, dtype=np.int64)
+        geneset_id = rows // geneset_size + 1
+        species_id = (geneset_id * 7919) % len(SPECIES) + 1
+        index = rng.integers(0, genes_per_species, stop - start, dtype=np.int64)
+        yield {
+            "geneset_id": geneset_id,
+            "gene_id": index * len(SPECIES) + species_id,
+            "score": rng.random(stop - start, dtype=np.float32),
+        }
+
+
+def homology_columns(
+    seed: int,
+    size: int,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    genes_per_species: int = DEFAULT_GENES_PER_SPECIES,
+) -> Iterator[Columns]:
+    """Yield homology rows as ``homology_id``, ``gene_id`` and ``species_id``.
+
+    Each cluster has one gene of every species.
+    """
+    import numpy as np
+
+    species_count = len(SPECIES)
+    for _, start, stop in _batches(size, batch_size):
+        rows = np.arange(start, stop, dtype=np.int64)
+        homology_id = rows // species_count + 1
+        species_id = rows % species_count + 1
+        # A cluster's genes share an index, scattered by a multiplicative hash.
+        index = (homology_id * 2654435761 + seed) % genes_per_species
+        yield {
+            "homology_id": homology_id,
+            "gene_id": index * species_count + species_id,
+            "species_id": species_id.astype(np.int16),
+        }
+
+
+def annotation_columns(
+    seed: int,
+    size: int,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    genes_per_species: int = DEFAULT_GENES_PER_SPECIES,
+    terms: int = DEFAULT_TERMS,
+) -> Iterator[Columns]:
+    """Yield annotations as ``gene_id``, ``term_id`` and ``evidence_id`` arrays.
+
+    ``term_id`` is the number of a ``GO:`` term, and ``evidence_id`` indexes
+    :data:`EVIDENCE_CODES`.
+    """
+    import numpy as np
+
+    gene_count = genes_per_species * len(SPECIES)
+    for number, start, stop in _batches(size, batch_size):
+        rng = _numpy_random("annotations", seed, number)
+        rows = stop - start
+        yield {
+            "gene_id": rng.integers(1, gene_count + 1, rows, dtype=np.int64),
+            "term_id": np.minimum(rng.pareto(1.0, rows) + 1, terms).astype(np.int32),
+            "evidence_id": rng.integers(0, len(EVIDENCE_CODES), rows, dtype=np.int8),
+        }
+
+
+COLUMN_GENERATORS: Dict[str, Callable[..., Iterator[Columns]]] = {
+    "genes": gene_columns,
+    "genesets": geneset_columns,
+    "homology": homology_columns,
+    "annotations": annotation_columns,
+}
+
+
+def cached_columns(
+    directory: pathlib.Path,
+    kind: str,
+    seed: int,
+    size: int,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Columns:
+    """Get a generated dataset as read-only, memory-mapped arrays.
+
+    The dataset is generated a batch at a time straight into ``.npy`` files in a
+    directory named after its kind, seed and size, so later calls, and other
+    processes, map the same files rather than generating the data again. Pages are
+    shared between processes and only loaded as they are read. The name also holds
+    :data:`COLUMNS_SCHEMA` and the numpy version, as numpy does not promise the same
+    random values across versions.
+
+    :param directory: The directory to keep datasets in.
+    :param kind: The kind of data, one of :data:`COLUMN_GENERATORS`.
+    :param seed: The seed of the random generator.
+    :param size: The number of rows.
+    :param batch_size: The number of rows generated at once. Random values are drawn
+    per batch, so datasets of a different batch size are kept separately.
+    """
+    import numpy as np
+
+    name = f"{kind}-seed{seed}-{size}-schema{COLUMNS_SCHEMA}-numpy{np.__version__}"
+    if batch_size != DEFAULT_BATCH_SIZE:
+        name += f"-batch{batch_size}"
+    target = directory / name
+    if not target.is_dir():
+        directory.mkdir(parents=True, exist_ok=True)
+        staging = pathlib.Path(
+            tempfile.mkdtemp(prefix=f".{target.name}-", dir=directory)
+        )
+        try:
+            arrays: Dict[str, "np.memmap"] = {}
+            offset = 0
+            for batch in COLUMN_GENERATORS[kind](seed, size, batch_size=batch_size):
+                for column, values in batch.items():
+                    if column not in arrays:
+                        arrays[column] = np.lib.format.open_memmap(
+                            staging / f"{column}.npy",
+                            mode="w+",
+                            dtype=values.dtype,
+                            shape=(size,),
+                        )
+                    arrays[column][offset : offset + len(values)] = values
+                offset += len(values)
+            for array in arrays.values():
+                array.flush()
+            arrays.clear()
+            os.replace(staging, target)
+        except OSError:
+            # Another process finished the same dataset first.
+            if not target.is_dir():
+                raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+    return {
+        path.stem: np.load(path, mmap_mode="r") for path in sorted(target.glob("*.npy"))
+    }
@@ -0,0 +1,383 @@
+"""Throwaway PostgreSQL databases, cloned from a template built once per session.
+
+Building the GeneWeaver schema is what makes database tests slow, so it is built once
+into a template database, and every pytest-xdist worker gets its own copy made with
+``CREATE DATABASE ... TEMPLATE``, which copies files rather than replaying the schema.
+Database names end with a suffix unique to the test session, so sessions sharing a
+server never replace or drop each other's databases.
+Each test then runs inside a transaction and a savepoint that are rolled back
+afterwards, on a connection taken from a pool, so tests do not see each other's
+changes and no test pays for a new connection.
+
+By default a :class:`LocalPostgres` server is started with ``initdb`` and ``pg_ctl``
+in a temporary directory, tuned for speed rather than durability and listening only
+on a unix socket. Set ``GENEWEAVER_TESTING_POSTGRES`` to the connection string of a
+running server to use that instead. psycopg 3 is required, and is only imported by
+these functions.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import subprocess
+import tempfile
+import uuid
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
+
+from geneweaver.testing.style.cache import exclusive_lock
+
+if TYPE_CHECKING:
+    import psycopg
+
+__all__ = [
+    "POSTGRES_URL_ENV",
+    "DatabaseError",
+    "PostgresServer",
+    "LocalPostgres",
+    "find_postgres_binary",
+    "create_template",
+    "clone_database",
+    "drop_database",
+    "ConnectionPool",
+    "rollback_after",
+    "SharedServer",
+]
+
+POSTGRES_URL_ENV = "GENEWEAVER_TESTING_POSTGRES"
+
+ADMIN_DATABASE = "postgres"
+TEST_SAVEPOINT = "geneweaver_test"
+
+# Durability is not needed for a database that is thrown away.
+FAST_SETTINGS = {
+    "fsync": "off",
+    "synchronous_commit": "off",
+    "full_page_writes": "off",
+    "listen_addresses": "",
+}
+
+_SEARCH_DIRECTORIES = (
+    "/usr/lib/postgresql/*/bin",
+    "/usr/local/pgsql/bin",
+    "/opt/homebrew/opt/postgresql*/bin",
+    "/usr/local/opt/postgresql*/bin",
+)
+
+
+class DatabaseError(RuntimeError):
+    """Raised when a test database could not be started or prepared."""
+
+
+def find_postgres_binary(name: str) -> Optional[str]:
+    """Find a PostgreSQL server program, which is often not on the PATH.
+
+    :param name: The program, e.g. ``initdb`` or ``pg_ctl``.
+    :return: The path to the program, or None if PostgreSQL is not installed.
+    """
+    found = shutil.which(name)
+    if found:
+        return found
+    pg_config = shutil.which("pg_config")
+    if pg_config:
+        bindir = subprocess.run(
+            [pg_config, "--bindir"], capture_output=True, text=True
+        ).stdout.strip()
+        candidate = pathlib.Path(bindir, name)
+        if candidate.is_file():
+            return str(candidate)
+    for pattern in _SEARCH_DIRECTORIES:
+        for directory in sorted(glob.glob(pattern), reverse=True):
+            candidate = pathlib.Path(directory, name)
+            if candidate.is_file():
+                return str(candidate)
+    return None
+
+
+class PostgresServer:
+    """A PostgreSQL server to create test databases on."""
+
+    def __init__(self, conninfo: str) -> None:
+        """Use a running server.
+
+        :param conninfo: A libpq connection string or URL for the server.
+        """
+        self.base_conninfo = conninfo
+
+    def conninfo(self, dbname: str) -> str:
+        """Get the connection string for a database on the server."""
+        from psycopg.conninfo import make_conninfo
+
+        return make_conninfo(self.base_conninfo, dbname=dbname)
+
+    def connect(self, dbname: str = ADMIN_DATABASE) -> "psycopg.Connection":
+        """Connect to a database on the server, outside of any transaction."""
+        import psycopg
+
+        return psycopg.connect(self.conninfo(dbname), autocommit=True)
+
+
+class LocalPostgres(PostgresServer):
+    """A throwaway server, run from a temporary data directory."""
+
+    def __init__(self, directory: pathlib.Path, port: int = 5432) -> None:
+        """Configure the server, it is not started until :meth:`start` is called.
+
+        :param directory: The directory to keep the server's data in.
+        :param port: The port, which only names the unix socket.
+        """
+        self.directory = directory
+        self.data = directory / "data"
+        # Unix socket paths are limited to about 100 characters, so the socket is
+        # kept in a short directory named after the data directory.
+        digest = hashlib.sha256(str(directory).encode()).hexdigest()[:12]
+        self.socket_dir = pathlib.Path(tempfile.gettempdir(), f"gw-pg-{digest}")
+        self.port = port
+        super().__init__(f"host={self.socket_dir} port={port} user=postgres")
+
+    def _run(self, program: str, *args: str) -> None:
+        binary = find_postgres_binary(program)
+        if binary is None:
+            raise DatabaseError(
+                f"{program} was not found, install PostgreSQL or set {POSTGRES_URL_ENV}"
+            )
+        completed = subprocess.run([binary, *args], capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise DatabaseError(
+                f"{program} failed: {completed.stderr.strip() or completed.stdout}"
+            )
+
+    def start(self) -> None:
+        """Create the data directory and start the server."""
+        if hasattr(os, "geteuid") and os.geteuid() == 0:
+            raise DatabaseError(
+                f"PostgreSQL refuses to run as root, set {POSTGRES_URL_ENV} to use a "
+                "running server instead"
+            )
+        if not self.data.is_dir():
+            self._run(
+                "initdb",
+                "--pgdata",
+                str(self.data),
+                "--username=postgres",
+                "--auth=trust",
+                "--encoding=UTF8",
+                "--no-sync",
+            )
+        self.socket_dir.mkdir(exist_ok=True)
+        options = " ".join(
+            [
+                f"-k {self.socket_dir}",
+                f"-p {self.port}",
+                *(f"-c {name}={value!r}" for name, value in FAST_SETTINGS.items()),
+            ]
+        )
+        self._run(
+            "pg_ctl",
+            "start",
+            "--pgdata",
+            str(self.data),
+            "--wait",
+            "--log",
+            str(self.directory / "postgres.log"),
+            "-o",
+            options,
+        )
+
+    def stop(self) -> None:
+        """Stop the server, without waiting for clients to disconnect."""
+        self._run("pg_ctl", "stop", "--pgdata", str(self.data), "--mode=immediate")
+        shutil.rmtree(self.socket_dir, ignore_errors=True)
+
+
+def _identifier(name: str) -> Any:  # noqa: ANN401
+    """Quote a database name."""
+    from psycopg import sql
+
+    return sql.Identifier(name)
+
+
+def drop_database(server: PostgresServer, name: str) -> None:
+    """Drop a database if it exists, disconnecting any clients."""
+    from psycopg import sql
+
+    with server.connect() as connection:
+        connection.execute(
+            sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(_identifier(name))
+        )
+
+
+def create_template(
+    server: PostgresServer,
+    name: str,
+    setup: Callable[["psycopg.Connection"], None],
+) -> None:
+    """Build a template database, replacing any earlier one of the same name.
+
+    :param server: The server to create the database on.
+    :param name: The name of the template database.
+    :param setup: Creates the schema and seed data, given a connection to the
+    template. Its changes are committed when it returns.
+    """
+    import psycopg
+    from psycopg import sql
+
+    drop_database(server, name)
+    with server.connect() as connection:
+        connection.execute(sql.SQL("CREATE DATABASE {}").format(_identifier(name)))
+    # Cloning requires that nothing is connected to the template.
+    with psycopg.connect(server.conninfo(name)) as connection:
+        setup(connection)
+        connection.commit()
+
+
+def clone_database(server: PostgresServer, template: str, name: str) -> None:
+    """Create a database as a copy of a template, replacing any earlier one."""
+    from psycopg import sql
+
+    drop_database(server, name)
+    with server.connect() as connection:
+        connection.execute(
+            sql.SQL("CREATE DATABASE {} TEMPLATE {}").format(
+                _identifier(name), _identifier(template)
+            )
+        )
+
+
+class ConnectionPool:
+    """Keeps connections to one database open, to be reused between tests."""
+
+    def __init__(self, conninfo: str) -> None:
+        """Create an empty pool.
+
+        :param conninfo: The connection string of the database.
+        """
+        self.conninfo = conninfo
+        self._idle: List["psycopg.Connection"] = []
+
+    def getconn(self) -> "psycopg.Connection":
+        """Take a connection from the pool, connecting if none is idle."""
+        import psycopg
+
+        while self._idle:
+            connection = self._idle.pop()
+            if not connection.closed:
+                return connection
+        return psycopg.connect(self.conninfo, autocommit=True)
+
+    def putconn(self, connection: "psycopg.Connection") -> None:
+        """Return a connection to the pool, unless it was closed."""
+        if not connection.closed:
+            self._idle.append(connection)
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        while self._idle:
+            self._idle.pop().close()
+
+
+@contextmanager
+def rollback_after(connection: "psycopg.Connection") -> Iterator[None]:
+    """Run a block in a transaction and savepoint, then roll back all its changes.
+
+    The block can use ``connection.transaction()``, which becomes a nested savepoint,
+    and can roll back to the test savepoint to recover from an error. If the rollback
+    fails, the connection is closed instead, which also discards the transaction,
+    and the block's own error is raised rather than the rollback's.
+    """
+    connection.execute("BEGIN")
+    connection.execute(f"SAVEPOINT {TEST_SAVEPOINT}")
+    try:
+        yield
+    finally:
+        try:
+            connection.execute("ROLLBACK")
+        except Exception:  # noqa: BLE001
+            # A closed connection is not returned to the pool by putconn.
+            connection.close()
+
+
+class SharedServer:
+    """Shares one server and template between pytest-xdist workers.
+
+    The workers coordinate through a lock and a state file in a directory they all
+    use: the first worker starts a local server and picks the session's database
+    name suffix, the template is built once, and the last worker to finish drops the
+    templates and stops the local server.
+    """
+
+    def __init__(
+        self, directory: pathlib.Path, server: Optional[PostgresServer] = None
+    ) -> None:
+        """Use a directory shared by the workers.
+
+        :param directory: The directory to keep the state, and a local server, in.
+        :param server: A running server to use, instead of starting a local server.
+        """
+        self.directory = directory
+        self.server = server or LocalPostgres(directory / "postgres")
+        self._lock = directory / "postgres.lock"
+        self._state = directory / "postgres.json"
+        self.session = ""
+
+    def _read(self) -> Dict[str, Any]:
+        if self._state.exists():
+            return json.loads(self._state.read_text())
+        return {"users": 0, "templates": [], "session": ""}
+
+    def _write(self, state: Dict[str, Any]) -> None:
+        self._state.write_text(json.dumps(state))
+
+    def acquire(self) -> None:
+        """Start the local server if no other worker is using it."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with exclusive_lock(self._lock):
+            state = self._read()
+            if state["users"] == 0:
+                if isinstance(self.server, LocalPostgres):
+                    self.server.start()
+                state["templates"] = []
+                state["session"] = uuid.uuid4().hex[:12]
+            state["users"] += 1
+            self.session = state["session"]
+            self._write(state)
+
+    def unique_name(self, prefix: str) -> str:
+        """Name a database so that no other test session uses the same name.
+
+        :param prefix: The start of the name, e.g. ``geneweaver_template``.
+        """
+        return f"{prefix}_{self.session}"
+
+    def template(
+        self, name: str, setup: Callable[["psycopg.Connection"], None]
+    ) -> None:
+        """Build a template, unless another worker already built it."""
+        with exclusive_lock(self._lock):
+            state = self._read()
+            if name not in state["templates"]:
+                create_template(self.server, name, setup)
+                state["templates"].append(name)
+                self._write(state)
+
+    def clone(self, template: str, name: str) -> None:
+        """Copy the template, one worker at a time."""
+        with exclusive_lock(self._lock):
+            clone_database(self.server, template, name)
+
+    def release(self) -> None:
+        """Stop the local server if no other worker is still using it."""
+        with exclusive_lock(self._lock):
+            state = self._read()
+            state["users"] -= 1
+            if state["users"] <= 0:
+                if isinstance(self.server, LocalPostgres):
+                    self.server.stop()
+                else:
+                    for template in state["templates"]:
+                        drop_database(self.server, template)
+                state = {"users": 0, "templates": [], "session": ""}
+            self._write(state)
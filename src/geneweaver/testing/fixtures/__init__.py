@@ -1,4 +1,48 @@
-"""Fixtures for testing, required for prebuilt tests, can be reused in other tests."""
+"""Fixtures for testing, required for prebuilt tests, can be reused in other tests.
 
-# ruff: noqa: F403
-from .package import *
+The fixtures are listed in a static manifest, and each module of fixtures is only
+imported when one of its fixtures is first used.
+"""
+
+from geneweaver.testing.lazy import attach
+
+__all__, __getattr__, __dir__ = attach(
+    __name__,
+    {
+        ".benchmark": ["gw_benchmark"],
+        ".changes": ["changed_files", "skip_unchanged_inputs"],
+        ".complexity": ["complexity_report"],
+        ".coverage": ["coverage_session"],
+        ".data": ["data_seed", "data_cache_dir", "synthetic_data"],
+        ".database": [
+            "database_schema",
+            "database_setup",
+            "postgres_server",
+            "database_template",
+            "database_name",
+            "database_pool",
+            "database_connection",
+        ],
+        ".imports": ["import_report", "import_time", "import_time_baseline"],
+        ".load": ["load_tester"],
+        ".memory": ["memory_budget"],
+        ".package": [
+            "project_root",
+            "pyproject_toml_path",
+            "git_dir",
+            "project_index",
+            "pyproject_toml_contents",
+            "pyproject",
+            "pyproject_rule_failures",
+            "package_name_from_pyproject",
+            "package_submodule_name",
+            "is_tool_package",
+            "project_layout",
+            "structure_rule_failures",
+        ],
+        ".queries": ["query_counter"],
+        ".style": ["style_report"],
+        ".typing": ["mypy_report"],
+        ".wheel": ["wheel_path", "wheel_contents"],
+    },
+)
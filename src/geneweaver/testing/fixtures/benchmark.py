@@ -0,0 +1,101 @@
+"""Fixtures for benchmarking code, with baselines kept in the pytest cache.
+
+The fixture and its marker are named ``gw_benchmark``, so they do not clash with
+pytest-benchmark's ``benchmark`` fixture and marker when both are installed.
+"""
+
+import inspect
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pytest
+from geneweaver.testing.benchmark import Baseline, Benchmark, BenchmarkStats
+from geneweaver.testing.pyproject import PyProject
+from geneweaver.testing.style.cache import exclusive_lock
+
+__all__ = ["gw_benchmark"]
+
+BENCHMARK_CACHE_KEY = "geneweaver/benchmark-history"
+BENCHMARK_HISTORY = 5
+BENCHMARK_SETTING_PREFIX = "benchmark-"
+BENCHMARK_MARKER = "gw_benchmark"
+
+BENCHMARK_RESULTS = pytest.StashKey[List[Tuple[str, BenchmarkStats]]]()
+
+
+def benchmark_options(
+    pyproject: PyProject, marker: Optional[pytest.Mark]
+) -> Dict[str, Any]:
+    """Get the benchmark options for a test.
+
+    Defaults are set in the ``[tool.geneweaver.testing]`` table of pyproject.toml,
+    e.g. ``benchmark-threshold = 0.1``, and a test can override them with
+    ``@pytest.mark.gw_benchmark(threshold=0.1)``.
+
+    :raises ValueError: If an option is not one of :class:`Benchmark`'s.
+    """
+    options = {
+        key[len(BENCHMARK_SETTING_PREFIX) :].replace("-", "_"): value
+        for key, value in pyproject.testing_settings.items()
+        if key.startswith(BENCHMARK_SETTING_PREFIX)
+    }
+    if marker is not None:
+        options.update(marker.kwargs)
+    known = set(inspect.signature(Benchmark).parameters) - {"name", "baseline"}
+    unknown = sorted(set(options) - known)
+    if unknown:
+        raise ValueError(
+            f"Unknown benchmark options {', '.join(unknown)}, the options are: "
+            f"{', '.join(sorted(known))}."
+        )
+    return options
+
+
+@pytest.fixture()
+def gw_benchmark(
+    request: pytest.FixtureRequest, pyproject: PyProject
+) -> Iterator[Benchmark]:
+    """Time a function, failing the test if it got slower than its stored baseline.
+
+    Call the fixture with the function and its arguments::
+
+        def test_parse(gw_benchmark):
+            assert gw_benchmark(parse, "BRCA1") == ...
+
+    The baseline of each test is the median of its last few runs that were not
+    regressions, so neither one fast outlier nor a slowdown moves it. The runs are
+    kept in the pytest cache and reset with ``pytest --cache-clear``.
+    """
+    store = getattr(request.config, "cache", None)
+    nodeid = request.node.nodeid
+    stored = (store.get(BENCHMARK_CACHE_KEY, None) or {}).get(nodeid) if store else None
+    try:
+        options = benchmark_options(
+            pyproject, request.node.get_closest_marker(BENCHMARK_MARKER)
+        )
+    except ValueError as error:
+        pytest.fail(str(error), pytrace=False)
+    bench = Benchmark(
+        nodeid,
+        baseline=(
+            Baseline.median_of([Baseline.from_json(run) for run in stored])
+            if stored
+            else None
+        ),
+        **options,
+    )
+    yield bench
+
+    stats = bench.stats
+    if stats is None:
+        return
+    request.node.user_properties.append(("benchmark", stats.summary()))
+    request.config.stash.setdefault(BENCHMARK_RESULTS, []).append((nodeid, stats))
+    if store is None or bench.regression() is not None:
+        return
+    with exclusive_lock(store.mkdir("geneweaver") / "benchmarks.lock"):
+        history = store.get(BENCHMARK_CACHE_KEY, None) or {}
+        previous = history.get(nodeid) or []
+        history[nodeid] = [*previous, Baseline.from_stats(stats).to_json()][
+            -BENCHMARK_HISTORY:
+        ]
+        store.set(BENCHMARK_CACHE_KEY, history)
@@ -0,0 +1,55 @@
+"""Fixtures for running the prebuilt tests only against changed files."""
+
+import os
+import pathlib
+import warnings
+from typing import FrozenSet, Optional
+
+import pytest
+from geneweaver.testing.changes import (
+    CHANGED_SINCE_ENV,
+    ChangeDetectionError,
+    declared_inputs,
+    find_changed_files,
+    inputs_changed,
+)
+
+__all__ = ["changed_files", "skip_unchanged_inputs"]
+
+
+@pytest.fixture(scope="session")
+def changed_files(
+    request: pytest.FixtureRequest, project_root: pathlib.Path, git_dir: pathlib.Path
+) -> Optional[FrozenSet[str]]:
+    """Get the files changed relative to the configured base ref.
+
+    The ref is set with the ``--gw-changed-since`` option of the pytest plugin, or the
+    ``GENEWEAVER_TESTING_CHANGED_SINCE`` environment variable.
+
+    :return: The changed paths relative to the project root, or None when
+    incremental mode is not enabled and the whole project should be checked.
+    """
+    base_ref = request.config.getoption("gw_changed_since", None) or os.environ.get(
+        CHANGED_SINCE_ENV
+    )
+    if not base_ref:
+        return None
+    try:
+        return find_changed_files(project_root, git_dir, base_ref)
+    except ChangeDetectionError as error:
+        warnings.warn(  # noqa: B028
+            f"{CHANGED_SINCE_ENV}={base_ref} ignored, checking the whole project: "
+            f"{error}"
+        )
+        return None
+
+
+@pytest.fixture(autouse=True)
+def skip_unchanged_inputs(request: pytest.FixtureRequest) -> None:  # noqa: PT004
+    """Skip prebuilt tests whose declared inputs did not change."""
+    inputs = declared_inputs(getattr(request, "function", None))
+    if inputs is None:
+        return
+    changed = request.getfixturevalue("changed_files")
+    if changed is not None and not inputs_changed(inputs, changed):
+        pytest.skip(f"{', '.join(inputs)} unchanged since {CHANGED_SINCE_ENV} ref")
@@ -0,0 +1,53 @@
+"""Fixtures relating to code complexity checks."""
+
+from typing import TYPE_CHECKING
+
+import pytest
+from geneweaver.testing.index import ProjectIndex
+from geneweaver.testing.style.cache import exclusive_lock
+
+if TYPE_CHECKING:
+    from geneweaver.testing.metrics import ComplexityReport
+
+__all__ = ["complexity_report"]
+
+COMPLEXITY_CACHE_KEY = "geneweaver/complexity"
+COMPLEXITY_DIRECTORY = "src"
+
+
+@pytest.fixture(scope="session")
+def complexity_report(
+    request: pytest.FixtureRequest, project_index: ProjectIndex
+) -> "ComplexityReport":
+    """Measure the complexity of every file in src once, shared by all tests.
+
+    Metrics are cached in the pytest cache by file content hash, so only files that
+    changed since the last run are measured again, across a pool of worker processes.
+    """
+    from geneweaver.testing.metrics import measure_files, radon_version
+
+    files = project_index.files(COMPLEXITY_DIRECTORY, suffixes=(".py",))
+    paths = {indexed.path: indexed.absolute for indexed in files}
+    store = getattr(request.config, "cache", None)
+    if store is None:
+        return measure_files(paths)
+
+    with exclusive_lock(store.mkdir("geneweaver") / "complexity.lock"):
+        digests = {indexed.path: indexed.digest for indexed in files}
+        cached = store.get(COMPLEXITY_CACHE_KEY, None) or {}
+        entries = (
+            cached.get("entries", {}) if cached.get("radon") == radon_version() else {}
+        )
+        report = measure_files(paths, digests, entries)
+        # Only keep the entries for the current files, so the cache cannot grow.
+        current = {f"{relative}:{digest}" for relative, digest in digests.items()}
+        store.set(
+            COMPLEXITY_CACHE_KEY,
+            {
+                "radon": radon_version(),
+                "entries": {
+                    key: value for key, value in entries.items() if key in current
+                },
+            },
+        )
+        return report
@@ -0,0 +1,22 @@
+"""Fixtures relating to the coverage measured with --gw-coverage."""
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from geneweaver.testing.linecoverage import CoverageSession
+
+__all__ = ["coverage_session"]
+
+# The name the coverage plugin is registered under, see geneweaver.testing.plugin.
+COVERAGE_PLUGIN = "geneweaver-testing-coverage"
+
+
+@pytest.fixture(scope="session")
+def coverage_session(request: pytest.FixtureRequest) -> "CoverageSession":
+    """Get the coverage being measured, skipping if it is not enabled."""
+    session = request.config.pluginmanager.get_plugin(COVERAGE_PLUGIN)
+    if session is None:
+        pytest.skip("Coverage is not measured, run pytest with --gw-coverage.")
+    return session
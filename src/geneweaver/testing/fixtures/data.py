@@ -0,0 +1,112 @@
+"""Fixtures providing synthetic GeneWeaver datasets for scale testing."""
+
+import pathlib
+from typing import TYPE_CHECKING, Dict, Iterator, Tuple
+
+import pytest
+from geneweaver.testing.data import (
+    Annotation,
+    Gene,
+    Geneset,
+    HomologyMember,
+    annotations,
+    cached_columns,
+    genes,
+    genesets,
+    homology,
+)
+from geneweaver.testing.pyproject import PyProject
+
+if TYPE_CHECKING:
+    import numpy as np
+
+__all__ = ["data_seed", "data_cache_dir", "synthetic_data"]
+
+DEFAULT_DATA_SEED = 0
+
+
+class SyntheticData:
+    """Generates datasets from one seed, see :mod:`geneweaver.testing.data`."""
+
+    def __init__(self, seed: int, directory: pathlib.Path) -> None:
+        """Create the dataset factory.
+
+        :param seed: The seed of every generator.
+        :param directory: The directory to keep memory-mapped datasets in.
+        """
+        self.seed = seed
+        self.directory = directory
+        self._columns: Dict[Tuple[str, int], Dict[str, "np.ndarray"]] = {}
+
+    def genes(self, count: int) -> Iterator[Gene]:
+        """Stream genes."""
+        return genes(count)
+
+    def genesets(self, count: int, **options: int) -> Iterator[Geneset]:
+        """Stream genesets, see :func:`geneweaver.testing.data.genesets`."""
+        return genesets(self.seed, count, **options)
+
+    def homology(self, count: int, **options: int) -> Iterator[HomologyMember]:
+        """Stream homology cluster members."""
+        return homology(self.seed, count, **options)
+
+    def annotations(self, count: int, **options: int) -> Iterator[Annotation]:
+        """Stream ontology annotations."""
+        return annotations(self.seed, count, **options)
+
+    def columns(self, kind: str, size: int) -> Dict[str, "np.ndarray"]:
+        """Get a dataset as read-only, memory-mapped numpy arrays.
+
+        The dataset is generated once per seed and size and kept between sessions,
+        and every test in the session is handed the same arrays. Tests are skipped
+        if numpy is not installed.
+
+        :param kind: One of ``genes``, ``genesets``, ``homology`` or ``annotations``.
+        :param size: The number of rows.
+        """
+        pytest.importorskip("numpy")
+        key = (kind, size)
+        if key not in self._columns:
+            self._columns[key] = cached_columns(self.directory, kind, self.seed, size)
+        return self._columns[key]
+
+
+@pytest.fixture(scope="session")
+def data_seed(pyproject: PyProject) -> int:
+    """Get the seed of the synthetic data generators.
+
+    Set it with ``data-seed`` in the ``[tool.geneweaver.testing]`` table of
+    pyproject.toml.
+    """
+    return int(pyproject.testing_settings.get("data-seed", DEFAULT_DATA_SEED))
+
+
+@pytest.fixture(scope="session")
+def data_cache_dir(
+    request: pytest.FixtureRequest, tmp_path_factory: pytest.TempPathFactory
+) -> pathlib.Path:
+    """Get the directory generated datasets are kept in.
+
+    Datasets are kept in the pytest cache, so they survive between sessions and are
+    removed by ``pytest --cache-clear``.
+    """
+    store = getattr(request.config, "cache", None)
+    if store is None:
+        return tmp_path_factory.mktemp("geneweaver-data")
+    return pathlib.Path(store.mkdir("geneweaver-data"))
+
+
+@pytest.fixture(scope="session")
+def synthetic_data(data_seed: int, data_cache_dir: pathlib.Path) -> SyntheticData:
+    """Generate seeded, deterministic GeneWeaver datasets.
+
+    Stream records, or get large datasets as memory-mapped numpy columns::
+
+        def test_load(synthetic_data):
+            load_genesets(synthetic_data.genesets(1000))
+
+        def test_join(synthetic_data):
+            columns = synthetic_data.columns("annotations", 1_000_000)
+            assert columns["gene_id"].shape == (1_000_000,)
+    """
+    return SyntheticData(data_seed, data_cache_dir)
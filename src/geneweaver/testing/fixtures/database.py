@@ -0,0 +1,159 @@
+"""Fixtures providing PostgreSQL databases cloned from a session-wide template."""
+
+import os
+import pathlib
+from typing import TYPE_CHECKING, Callable, Iterator, List
+
+import pytest
+from geneweaver.testing.pyproject import PyProject
+
+if TYPE_CHECKING:
+    import psycopg
+    from geneweaver.testing.database import ConnectionPool, SharedServer
+
+__all__ = [
+    "database_schema",
+    "database_setup",
+    "postgres_server",
+    "database_template",
+    "database_name",
+    "database_pool",
+    "database_connection",
+]
+
+TEMPLATE_DATABASE = "geneweaver_template"
+TEST_DATABASE = "geneweaver_test"
+
+
+@pytest.fixture(scope="session")
+def database_schema(
+    project_root: pathlib.Path, pyproject: PyProject
+) -> List[pathlib.Path]:
+    """Get the SQL files that build the test database, in the order to run them.
+
+    They are listed with ``database-schema`` in the ``[tool.geneweaver.testing]``
+    table of pyproject.toml, relative to the project root.
+    """
+    return [
+        project_root / path
+        for path in pyproject.testing_settings.get("database-schema", [])
+    ]
+
+
+@pytest.fixture(scope="session")
+def database_setup(
+    database_schema: List[pathlib.Path],
+) -> Callable[["psycopg.Connection"], None]:
+    """Get the function that builds the schema and seed data in the template.
+
+    By default it runs the :func:`database_schema` files. Override this fixture to
+    build the database another way, such as by running migrations.
+    """
+
+    def setup(connection: "psycopg.Connection") -> None:
+        for path in database_schema:
+            connection.execute(path.read_text(encoding="utf-8"))
+
+    return setup
+
+
+@pytest.fixture(scope="session")
+def postgres_server(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Iterator["SharedServer"]:
+    """Get the PostgreSQL server to create test databases on.
+
+    The server named by ``GENEWEAVER_TESTING_POSTGRES`` is used if it is set,
+    otherwise a throwaway local server is started. Either way it is shared by
+    pytest-xdist workers. Tests are skipped if psycopg is not installed, or no
+    server can be started.
+    """
+    pytest.importorskip("psycopg")
+    from geneweaver.testing.database import (
+        POSTGRES_URL_ENV,
+        DatabaseError,
+        PostgresServer,
+        SharedServer,
+    )
+
+    # Every pytest-xdist worker has its own base temp directory in a shared parent.
+    basetemp = tmp_path_factory.getbasetemp()
+    directory = basetemp.parent if "PYTEST_XDIST_WORKER" in os.environ else basetemp
+    url = os.environ.get(POSTGRES_URL_ENV)
+    shared = SharedServer(
+        directory / "geneweaver-postgres", PostgresServer(url) if url else None
+    )
+    try:
+        shared.acquire()
+    except DatabaseError as error:
+        pytest.skip(str(error))
+    try:
+        yield shared
+    finally:
+        shared.release()
+
+
+@pytest.fixture(scope="session")
+def database_template(
+    postgres_server: "SharedServer",
+    database_setup: Callable[["psycopg.Connection"], None],
+) -> str:
+    """Build the template database once, shared by every worker.
+
+    :return: The name of the template database, unique to this test session.
+    """
+    name = postgres_server.unique_name(TEMPLATE_DATABASE)
+    postgres_server.template(name, database_setup)
+    return name
+
+
+@pytest.fixture(scope="session")
+def database_name(
+    postgres_server: "SharedServer", database_template: str
+) -> Iterator[str]:
+    """Copy the template into a database for this worker.
+
+    :return: The name of the worker's database, unique to this test session.
+    """
+    from geneweaver.testing.database import drop_database
+
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    name = postgres_server.unique_name(f"{TEST_DATABASE}_{worker}")
+    postgres_server.clone(database_template, name)
+    yield name
+    drop_database(postgres_server.server, name)
+
+
+@pytest.fixture(scope="session")
+def database_pool(
+    postgres_server: "SharedServer", database_name: str
+) -> Iterator["ConnectionPool"]:
+    """Get the pool of connections to this worker's database."""
+    from geneweaver.testing.database import ConnectionPool
+
+    pool = ConnectionPool(postgres_server.server.conninfo(database_name))
+    yield pool
+    pool.close()
+
+
+@pytest.fixture()
+def database_connection(
+    database_pool: "ConnectionPool",
+) -> Iterator["psycopg.Connection"]:
+    """Get a connection to the test database, all of whose changes are rolled back.
+
+    The test runs inside a transaction and savepoint, on a pooled connection, with
+    the schema and seed data of the template database::
+
+        def test_add_geneset(database_connection):
+            add_geneset(database_connection, GENESET)
+            assert count_genesets(database_connection) == SEEDED + 1
+    """
+    from geneweaver.testing.database import rollback_after
+
+    connection = database_pool.getconn()
+    try:
+        with rollback_after(connection):
+            yield connection
+    finally:
+        database_pool.putconn(connection)
@@ -0,0 +1,127 @@
+"""Fixtures relating to importing the package."""
+
+import pathlib
+import statistics
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+import pytest
+from geneweaver.testing.imports import (
+    DEFAULT_IMPORT_TIME_MIN_REGRESSION_MS,
+    DEFAULT_IMPORT_TIME_REGRESSION,
+    DEFAULT_IMPORT_TIME_RUNS,
+    ImportResult,
+    ImportTimeMeasurement,
+    measure_import_time,
+    package_import_checks,
+    package_module,
+    run_import_checks,
+)
+from geneweaver.testing.pyproject import PyProject
+
+__all__ = ["import_report", "import_time", "import_time_baseline"]
+
+IMPORT_TIME_CACHE_KEY = "geneweaver/import-time"
+IMPORT_TIME_HISTORY = 5
+
+
+@pytest.fixture(scope="session")
+def import_report(
+    project_root: pathlib.Path,
+    package_submodule_name: Optional[str],
+    is_tool_package: bool,
+) -> Mapping[str, ImportResult]:
+    """Check that the package imports, each check in a fresh interpreter.
+
+    The checks are run once, in parallel, and shared by all import tests.
+
+    :return: The result of each check, keyed by check name.
+    """
+    return MappingProxyType(
+        run_import_checks(
+            package_import_checks(package_submodule_name, is_tool_package),
+            cwd=str(project_root),
+        )
+    )
+
+
+@pytest.fixture(scope="session")
+def import_time(
+    project_root: pathlib.Path,
+    pyproject: PyProject,
+    package_submodule_name: Optional[str],
+    is_tool_package: bool,
+) -> ImportTimeMeasurement:
+    """Time importing the package over several cold interpreter runs.
+
+    The number of runs is set with ``import-time-runs`` in the
+    ``[tool.geneweaver.testing]`` table of pyproject.toml.
+    """
+    return measure_import_time(
+        package_module(package_submodule_name, is_tool_package),
+        runs=int(
+            pyproject.testing_settings.get("import-time-runs", DEFAULT_IMPORT_TIME_RUNS)
+        ),
+        cwd=str(project_root),
+    )
+
+
+@pytest.fixture(scope="session")
+def import_time_baseline(
+    request: pytest.FixtureRequest,
+    pyproject: PyProject,
+    import_time: ImportTimeMeasurement,
+) -> Optional[float]:
+    """Get the baseline import time of the package from the pytest cache.
+
+    The baseline is the median of the last few measurements that were within the
+    allowed regression, so neither one fast outlier nor a slowdown moves it. The
+    current measurement is recorded after the baseline is read. Clear it with
+    ``pytest --cache-clear``.
+
+    :return: The baseline in microseconds, or None if there is no baseline yet.
+    """
+    store = getattr(request.config, "cache", None)
+    if store is None:
+        return None
+    settings = pyproject.testing_settings
+    return update_import_time_baseline(
+        store,
+        import_time,
+        settings.get("import-time-regression", DEFAULT_IMPORT_TIME_REGRESSION),
+        settings.get(
+            "import-time-regression-min-ms", DEFAULT_IMPORT_TIME_MIN_REGRESSION_MS
+        ),
+    )
+
+
+def update_import_time_baseline(
+    store: pytest.Cache,
+    import_time: ImportTimeMeasurement,
+    regression: float,
+    min_regression_ms: float = DEFAULT_IMPORT_TIME_MIN_REGRESSION_MS,
+) -> Optional[float]:
+    """Read the import time baseline, then record a new measurement.
+
+    The measurement is only recorded if it is not a regression against the
+    baseline, so a slowdown does not become the new normal.
+
+    :param store: The pytest ``config.cache`` object the history is kept in.
+    :param import_time: The current measurement.
+    :param regression: The allowed slowdown, as a fraction of the baseline.
+    :param min_regression_ms: The smallest slowdown, in milliseconds, to report.
+    :return: The baseline in microseconds, or None if there is no baseline yet.
+    """
+    history = store.get(IMPORT_TIME_CACHE_KEY, None) or {}
+    previous = history.get(import_time.module) or []
+    baseline = statistics.median(previous) if previous else None
+
+    if import_time.runs_us and (
+        baseline is None
+        or not import_time.regressed(baseline, regression, min_regression_ms)
+    ):
+        history[import_time.module] = [*previous, import_time.median_us][
+            -IMPORT_TIME_HISTORY:
+        ]
+        store.set(IMPORT_TIME_CACHE_KEY, history)
+    return baseline
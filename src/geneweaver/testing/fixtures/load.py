@@ -0,0 +1,92 @@
+"""Fixtures for load testing ASGI applications against latency budgets."""
+
+from typing import Any, Dict, Optional, Sequence
+
+import pytest
+from geneweaver.testing.load import (
+    ASGIApp,
+    LoadReport,
+    Request,
+    load_failures,
+    load_test,
+)
+
+__all__ = ["load_tester"]
+
+BUDGETS = ("p50", "p95", "p99", "min_rps", "max_error_rate")
+
+
+class LoadTester:
+    """Load tests applications against budgets, see :func:`load_tester`."""
+
+    def __init__(self, node: pytest.Item, defaults: Dict[str, Any]) -> None:
+        """Create the load tester for a test.
+
+        :param node: The test, its load reports are recorded in its properties.
+        :param defaults: The budgets and options from the test's ``load`` marker.
+        """
+        self.node = node
+        self.defaults = defaults
+
+    def __call__(
+        self,
+        app: ASGIApp,
+        requests: Sequence[Request],
+        p50: Optional[float] = None,
+        p95: Optional[float] = None,
+        p99: Optional[float] = None,
+        min_rps: Optional[float] = None,
+        **options: Any,  # noqa: ANN401
+    ) -> LoadReport:
+        """Send requests to an application, failing if it is slower than the budgets.
+
+        Latencies are in seconds, and the budgets and options default to those set
+        by the test's ``load`` marker. No request may fail unless ``max_error_rate``
+        is set.
+
+        :param app: The ASGI application, such as a FastAPI app.
+        :param requests: The mix of requests to send.
+        :param p50: The highest median latency allowed.
+        :param p95: The highest 95th percentile latency allowed.
+        :param p99: The highest 99th percentile latency allowed.
+        :param min_rps: The fewest requests per second allowed.
+        :param options: ``max_error_rate``, and the options of
+        :func:`geneweaver.testing.load.run_load`, such as ``concurrency``.
+        """
+        given = {"p50": p50, "p95": p95, "p99": p99, "min_rps": min_rps}
+        settings = {**self.defaults, **options}
+        budgets = {
+            name: given[name] if given.get(name) is not None else settings.get(name)
+            for name in BUDGETS
+        }
+        if budgets["max_error_rate"] is None:
+            budgets["max_error_rate"] = 0.0
+        run_options = {
+            name: value for name, value in settings.items() if name not in BUDGETS
+        }
+        report = load_test(app, requests, **run_options)
+        self.node.user_properties.append(("load", report.summary()))
+        failures = load_failures(report, **budgets)
+        assert not failures, "; ".join(failures) + "\n" + report.summary()
+        return report
+
+
+@pytest.fixture()
+def load_tester(request: pytest.FixtureRequest) -> LoadTester:
+    """Assert that an ASGI application keeps up with a mix of requests.
+
+    The application is called in process, from concurrent asyncio workers::
+
+        from geneweaver.testing.load import Request
+
+        @pytest.mark.load(concurrency=20, total=2000)
+        def test_geneset_latency(load_tester):
+            requests = [Request("GET", "/api/genesets/1", weight=9)]
+            requests.append(Request("GET", "/api/genes"))
+            load_tester(app, requests, p99=0.05)
+
+    A failing test reports the requests per second, and the latency percentiles of
+    each kind of request.
+    """
+    marker = request.node.get_closest_marker("load")
+    return LoadTester(request.node, dict(marker.kwargs) if marker else {})
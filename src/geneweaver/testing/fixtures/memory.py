@@ -0,0 +1,104 @@
+"""Fixtures for asserting memory budgets and finding leaks."""
+
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Union
+
+import pytest
+from geneweaver.testing.memory import (
+    LeakReport,
+    MemoryReport,
+    MemoryTracker,
+    budget_failures,
+    find_leak,
+)
+
+__all__ = ["memory_budget"]
+
+Size = Union[int, str]
+
+
+class MemoryBudget:
+    """Checks blocks of a test against memory budgets, see :func:`memory_budget`."""
+
+    def __init__(self, node: pytest.Item, defaults: Dict[str, Any]) -> None:
+        """Create the budget checker for a test.
+
+        :param node: The test, its memory reports are recorded in its properties.
+        :param defaults: The budgets and options from the test's ``memory`` marker.
+        """
+        self.node = node
+        self.defaults = defaults
+
+    @contextmanager
+    def __call__(
+        self,
+        peak: Optional[Size] = None,
+        net: Optional[Size] = None,
+        rss_peak: Optional[Size] = None,
+        rss: Optional[bool] = None,
+    ) -> Iterator[MemoryReport]:
+        """Trace a block, failing if it allocates more than the budgets.
+
+        Budgets are given in bytes or as sizes such as ``"50 MB"``, and default to
+        the budgets set by the test's ``memory`` marker.
+
+        :param peak: The most memory the block may allocate at once.
+        :param net: The most memory the block may still hold when it finishes.
+        :param rss_peak: The most the resident set size may grow.
+        :param rss: Sample the resident set size, on by default with ``rss_peak``.
+        """
+        budgets = {
+            "peak": self.defaults.get("peak") if peak is None else peak,
+            "net": self.defaults.get("net") if net is None else net,
+            "rss_peak": self.defaults.get("rss_peak") if rss_peak is None else rss_peak,
+        }
+        if rss is None:
+            rss = bool(self.defaults.get("rss")) or budgets["rss_peak"] is not None
+        tracker = MemoryTracker(rss=rss)
+        with tracker as report:
+            yield report
+        self.node.user_properties.append(("memory", report.summary()))
+        failures = budget_failures(report, **budgets)
+        assert not failures, "; ".join(failures) + "\n" + report.summary()
+
+    def assert_no_leak(
+        self,
+        function: Callable[[], Any],
+        runs: int = 10,
+        warmup: int = 2,
+        tolerance: Size = 0,
+    ) -> LeakReport:
+        """Call a function repeatedly, failing if the memory it retains trends upwards.
+
+        :param function: The function to call.
+        :param runs: The number of calls to record.
+        :param warmup: The number of calls to make first, so caches are filled.
+        :param tolerance: The total growth along the trend that is not reported as a
+        leak.
+        """
+        report = find_leak(function, runs=runs, warmup=warmup, tolerance=tolerance)
+        assert not report.leaking, f"{function!r} leaks memory, {report.summary()}"
+        return report
+
+
+@pytest.fixture()
+def memory_budget(request: pytest.FixtureRequest) -> MemoryBudget:
+    """Assert that blocks of a test stay within memory budgets.
+
+    Call the fixture with budgets to trace a block::
+
+        def test_parse(memory_budget):
+            with memory_budget(peak="50 MB") as report:
+                parse_genes(PATH)
+
+        @pytest.mark.memory(peak="50 MB", net="1 MB")
+        def test_parse_all(memory_budget):
+            with memory_budget():
+                parse_genes(PATH)
+            memory_budget.assert_no_leak(lambda: parse_genes(PATH))
+
+    A failing block reports its peak and net allocation, and the lines of code that
+    allocated the most.
+    """
+    marker = request.node.get_closest_marker("memory")
+    return MemoryBudget(request.node, dict(marker.kwargs) if marker else {})
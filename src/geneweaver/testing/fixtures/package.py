@@ -1,27 +1,34 @@
 """Fixtures relating to the package and its structure."""
 
 import pathlib
-from typing import Optional
+from types import MappingProxyType
+from typing import Mapping, Optional
 
 import pytest
-import tomli
-from _pytest.fixtures import FixtureRequest
+from geneweaver.testing.index import ProjectIndex
+from geneweaver.testing.pyproject import PyProject
+from geneweaver.testing.rules import STRUCTURE_RULES, ProjectLayout, evaluate
 
 __all__ = [
     "project_root",
     "pyproject_toml_path",
     "git_dir",
+    "project_index",
     "pyproject_toml_contents",
+    "pyproject",
+    "pyproject_rule_failures",
     "package_name_from_pyproject",
     "package_submodule_name",
     "is_tool_package",
+    "project_layout",
+    "structure_rule_failures",
 ]
 
 
 @pytest.fixture(scope="session")
-def project_root(request: FixtureRequest) -> pathlib.Path:
+def project_root(request: pytest.FixtureRequest) -> pathlib.Path:
     """Return the root directory of the project."""
-    return pathlib.Path(request.config.rootdir)
+    return request.config.rootpath
 
 
 @pytest.fixture(scope="session")
@@ -36,6 +43,15 @@ def git_dir(project_root: pathlib.Path) -> pathlib.Path:
     return project_root / ".git"
 
 
+@pytest.fixture(scope="session")
+def project_index(project_root: pathlib.Path) -> ProjectIndex:
+    """Index the project's files in one walk, shared by every check that reads them.
+
+    Paths matched by the project's .gitignore are not indexed.
+    """
+    return ProjectIndex.build(project_root)
+
+
 @pytest.fixture(scope="session")
 def pyproject_toml_contents(pyproject_toml_path: pathlib.Path) -> Optional[dict]:
     """Read the contents of the pyproject.toml file."""
@@ -46,38 +62,67 @@ def pyproject_toml_contents(pyproject_toml_path: pathlib.Path) -> Optional[dict]
     )
 
 
+@pytest.fixture(scope="session")
+def pyproject(pyproject_toml_contents: Optional[dict]) -> PyProject:
+    """Model the pyproject.toml file, parsed and validated once per session."""
+    return PyProject(pyproject_toml_contents)
+
+
+@pytest.fixture(scope="session")
+def pyproject_rule_failures(pyproject: PyProject) -> Mapping[str, str]:
+    """Evaluate every pyproject.toml rule in one pass, shared by all tests.
+
+    :return: The failure message of each failing rule, keyed by rule id.
+    """
+    return MappingProxyType(evaluate(pyproject))
+
+
 def read_pyproject_toml(pyproject_toml_path: pathlib.Path) -> dict:
     """Open and read the contents of a pyproject.toml file.
 
     :return: A dictionary containing the contents of the pyproject.toml file.
     """
+    import tomli
+
     with open(pyproject_toml_path, "rb") as pyproject_file:
         return tomli.load(pyproject_file)
 
 
 @pytest.fixture(scope="session")
-def package_name_from_pyproject(
-    pyproject_toml_contents: Optional[dict],
-) -> Optional[str]:
+def package_name_from_pyproject(pyproject: PyProject) -> Optional[str]:
     """Get the package name from the pyproject.toml file."""
-    return (
-        pyproject_toml_contents["tool"]["poetry"]["name"]
-        if pyproject_toml_contents
-        else None
-    )
+    return pyproject.package_name
 
 
 @pytest.fixture(scope="session")
-def package_submodule_name(package_name_from_pyproject: Optional[str]) -> Optional[str]:
+def package_submodule_name(pyproject: PyProject) -> Optional[str]:
     """Get the package name from the pyproject.toml file."""
-    return (
-        "_".join(package_name_from_pyproject.split("-")[1:])
-        if package_name_from_pyproject
-        else None
-    )
+    return pyproject.package_submodule_name
 
 
 @pytest.fixture(scope="session")
-def is_tool_package(project_root: Optional[str]) -> bool:
+def is_tool_package(project_index: ProjectIndex) -> bool:
     """Return True if the package is a tool package."""
-    return (project_root / "src" / "geneweaver" / "tools").is_dir()
+    return project_index.is_dir(f"{ProjectLayout.NAMESPACE_DIR}/tools")
+
+
+@pytest.fixture(scope="session")
+def project_layout(
+    project_root: pathlib.Path,
+    project_index: ProjectIndex,
+    package_submodule_name: Optional[str],
+    is_tool_package: bool,
+) -> ProjectLayout:
+    """Describe the layout of the project, as read by the structure rules."""
+    return ProjectLayout(
+        project_root, package_submodule_name, is_tool_package, project_index
+    )
+
+
+@pytest.fixture(scope="session")
+def structure_rule_failures(project_layout: ProjectLayout) -> Mapping[str, str]:
+    """Evaluate every project structure rule in one pass, shared by all tests.
+
+    :return: The failure message of each failing rule, keyed by rule id.
+    """
+    return MappingProxyType(evaluate(project_layout, STRUCTURE_RULES))
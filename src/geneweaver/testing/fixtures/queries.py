@@ -0,0 +1,81 @@
+"""Fixtures for asserting query budgets and finding N+1 query patterns."""
+
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+import pytest
+from geneweaver.testing.queries import (
+    DEFAULT_MAX_REPEATS,
+    QueryRecorder,
+    QueryReport,
+    query_failures,
+)
+
+__all__ = ["query_counter"]
+
+
+class QueryCounter:
+    """Checks blocks of a test against query budgets, see :func:`query_counter`."""
+
+    def __init__(self, node: pytest.Item, defaults: Dict[str, Any]) -> None:
+        """Create the query counter for a test.
+
+        :param node: The test, its query reports are recorded in its properties.
+        :param defaults: The budgets from the test's ``queries`` marker.
+        """
+        self.node = node
+        self.defaults = defaults
+        self.recorder = QueryRecorder()
+
+    def wrap(self, connection: object) -> Any:  # noqa: ANN401
+        """Wrap a DB-API connection, such as from sqlite3, to count its queries."""
+        return self.recorder.wrap(connection)
+
+    @contextmanager
+    def __call__(
+        self,
+        max_queries: Optional[int] = None,
+        max_repeats: Optional[int] = None,
+    ) -> Iterator[QueryReport]:
+        """Count the queries of a block, failing if it runs more than the budgets.
+
+        The budgets default to those set by the test's ``queries`` marker.
+
+        :param max_queries: The most statements the block may execute.
+        :param max_repeats: The most times the block may execute the same statement
+        with different values, :data:`DEFAULT_MAX_REPEATS` unless set.
+        """
+        if max_queries is None:
+            max_queries = self.defaults.get("max_queries")
+        if max_repeats is None:
+            max_repeats = self.defaults.get("max_repeats", DEFAULT_MAX_REPEATS)
+        with self.recorder as report:
+            yield report
+        self.node.user_properties.append(("queries", report.summary()))
+        failures = query_failures(report, max_queries, max_repeats)
+        assert not failures, "; ".join(failures) + "\n" + report.summary()
+
+
+@pytest.fixture()
+def query_counter(request: pytest.FixtureRequest) -> QueryCounter:
+    """Assert that blocks of a test stay within query budgets.
+
+    psycopg cursors are counted automatically, other DB-API connections are counted
+    once wrapped::
+
+        def test_list_genesets(database_connection, query_counter):
+            with query_counter(max_queries=3) as report:
+                list_genesets(database_connection, user_id=1)
+
+        @pytest.mark.queries(max_queries=10, max_repeats=2)
+        def test_sqlite(query_counter):
+            connection = query_counter.wrap(sqlite3.connect(":memory:"))
+            with query_counter():
+                load_genes(connection)
+
+    A block also fails if it runs the same statement with different values more than
+    ``max_repeats`` times, the pattern of a query made once per row of another
+    query. Pass ``max_repeats=None`` to the marker to allow it.
+    """
+    marker = request.node.get_closest_marker("queries")
+    return QueryCounter(request.node, dict(marker.kwargs) if marker else {})
@@ -0,0 +1,47 @@
+"""Fixtures relating to code style checks."""
+
+import pathlib
+from typing import TYPE_CHECKING, FrozenSet, Optional
+
+import pytest
+from geneweaver.testing.index import ProjectIndex
+from geneweaver.testing.style.cache import StyleCache, exclusive_lock
+
+if TYPE_CHECKING:
+    from geneweaver.testing.style.engine import StyleReport
+
+__all__ = ["style_report"]
+
+
+@pytest.fixture(scope="session")
+def style_report(
+    request: pytest.FixtureRequest,
+    project_root: pathlib.Path,
+    project_index: ProjectIndex,
+    changed_files: Optional[FrozenSet[str]],
+) -> "StyleReport":
+    """Run black and ruff once over the project, shared by all style tests.
+
+    Results are cached in the pytest cache, so files that have not changed since the
+    last run are not checked again. In incremental mode only the changed files are
+    checked, unless pyproject.toml (and so the tool configuration) changed.
+
+    Files are checked across a pool of worker processes. Under pytest-xdist, workers
+    take turns through a lock in the pytest cache so no file is checked twice.
+    """
+    from geneweaver.testing.style.engine import run_style_checks
+
+    only = (
+        None
+        if changed_files is None or "pyproject.toml" in changed_files
+        else changed_files
+    )
+    store = getattr(request.config, "cache", None)
+    if store is None:
+        return run_style_checks(project_root, only=only, index=project_index)
+
+    with exclusive_lock(store.mkdir("geneweaver") / "style.lock"):
+        cache = StyleCache.from_pytest_config(request.config, project_root)
+        return run_style_checks(
+            project_root, cache=cache, only=only, index=project_index
+        )
@@ -0,0 +1,49 @@
+"""Fixtures relating to type checking."""
+
+import pathlib
+from typing import TYPE_CHECKING
+
+import pytest
+from geneweaver.testing.index import ProjectIndex
+from geneweaver.testing.style.cache import exclusive_lock
+
+if TYPE_CHECKING:
+    from geneweaver.testing.typecheck import TypeCheckReport
+
+__all__ = ["mypy_report"]
+
+MYPY_CACHE_KEY = "geneweaver/mypy"
+
+
+@pytest.fixture(scope="session")
+def mypy_report(
+    request: pytest.FixtureRequest,
+    project_root: pathlib.Path,
+    project_index: ProjectIndex,
+) -> "TypeCheckReport":
+    """Type check the project with mypy once, shared by all typing tests.
+
+    mypy's incremental cache is kept in the pytest cache, and the report is reused
+    without running mypy at all when no checked file changed since the last run.
+    Under pytest-xdist, workers take turns through a lock so mypy runs once.
+    """
+    from geneweaver.testing.typecheck import (
+        TYPING_DIRECTORIES,
+        TypeCheckReport,
+        run_mypy,
+        tree_digest,
+    )
+
+    store = getattr(request.config, "cache", None)
+    if store is None:
+        return run_mypy(project_root)
+
+    directory = store.mkdir("geneweaver")
+    with exclusive_lock(directory / "mypy.lock"):
+        digest = tree_digest(project_root, TYPING_DIRECTORIES, project_index)
+        cached = store.get(MYPY_CACHE_KEY, None) or {}
+        if cached.get("digest") == digest:
+            return TypeCheckReport.from_json(cached["messages"])
+        report = run_mypy(project_root, cache_dir=directory / "mypy")
+        store.set(MYPY_CACHE_KEY, {"digest": digest, "messages": report.to_json()})
+        return report
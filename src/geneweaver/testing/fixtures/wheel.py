@@ -0,0 +1,54 @@
+"""Fixtures relating to the built wheel of the package."""
+
+import pathlib
+
+import pytest
+from geneweaver.testing.index import ProjectIndex
+from geneweaver.testing.pyproject import PyProject
+from geneweaver.testing.wheel import (
+    BackendUnavailableError,
+    WheelBuildError,
+    WheelContents,
+    cached_wheel,
+    read_wheel,
+)
+
+__all__ = ["wheel_path", "wheel_contents"]
+
+WHEEL_CACHE_DIRECTORY = "geneweaver-wheel"
+
+
+@pytest.fixture(scope="session")
+def wheel_path(
+    request: pytest.FixtureRequest,
+    tmp_path_factory: pytest.TempPathFactory,
+    project_root: pathlib.Path,
+    project_index: ProjectIndex,
+    pyproject: PyProject,
+) -> pathlib.Path:
+    """Build the package's wheel once, with the backend from ``[build-system]``.
+
+    The wheel is kept in the pytest cache and only built again when pyproject.toml,
+    the other files at the project root or the src directory change. Tests are
+    skipped if pyproject.toml names no build backend, or it is not installed.
+    """
+    store = getattr(request.config, "cache", None)
+    cache_dir = (
+        store.mkdir(WHEEL_CACHE_DIRECTORY)
+        if store is not None
+        else tmp_path_factory.mktemp(WHEEL_CACHE_DIRECTORY)
+    )
+    try:
+        return cached_wheel(
+            project_root, pyproject.build_system, cache_dir, project_index
+        )
+    except BackendUnavailableError as error:
+        pytest.skip(str(error))
+    except WheelBuildError as error:
+        pytest.fail(str(error), pytrace=False)
+
+
+@pytest.fixture(scope="session")
+def wheel_contents(wheel_path: pathlib.Path) -> WheelContents:
+    """List the files in the package's wheel, without extracting it."""
+    return read_wheel(wheel_path)
@@ -0,0 +1,274 @@
+"""Engine that checks a package imports, each check in a fresh interpreter.
+
+Importing a module inside the test process only proves something the first time, after
+that it is served from ``sys.modules``. Each :class:`ImportCheck` is instead run in its
+own python subprocess, several at once, with ``-X importtime`` enabled so the time
+spent importing each module is reported alongside the result.
+"""
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+__all__ = [
+    "ABSOLUTE",
+    "RELATIVE",
+    "NAMESPACE",
+    "GENEWEAVER",
+    "ImportCheck",
+    "ImportTiming",
+    "ImportResult",
+    "ImportTimeMeasurement",
+    "parse_importtime",
+    "package_import_checks",
+    "run_import_check",
+    "run_import_checks",
+    "package_module",
+    "measure_import_time",
+]
+
+ABSOLUTE = "absolute"
+RELATIVE = "relative"
+NAMESPACE = "namespace"
+GENEWEAVER = "geneweaver"
+
+MAX_WORKERS = 4
+
+DEFAULT_IMPORT_TIME_RUNS = 5
+DEFAULT_IMPORT_TIME_REGRESSION = 0.2
+DEFAULT_IMPORT_TIME_MIN_REGRESSION_MS = 10.0
+
+_MARKER = "geneweaver-testing: imports start"
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)\s*$")
+
+
+@dataclass(frozen=True)
+class ImportCheck:
+    """Python statements that should import cleanly in a fresh interpreter."""
+
+    name: str
+    statements: str
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    """The time spent importing one module, as reported by ``-X importtime``."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class ImportResult:
+    """The outcome of running an import check."""
+
+    check: str
+    error: Optional[str] = None
+    timings: List[ImportTiming] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        """Return True if the statements ran without error."""
+        return self.error is None
+
+    @property
+    def total_us(self) -> int:
+        """The total time, in microseconds, spent importing modules."""
+        return sum(timing.self_us for timing in self.timings)
+
+    def slowest(self, count: int = 5) -> List[ImportTiming]:
+        """Get the modules that took longest to import, including their imports."""
+        return sorted(
+            self.timings, key=lambda timing: timing.cumulative_us, reverse=True
+        )[:count]
+
+    def summary(self, count: int = 5) -> str:
+        """Describe the total import time and the slowest modules."""
+        lines = [f"{self.check}: imported in {self.total_us / 1000:.1f} ms"]
+        lines.extend(
+            f"  {timing.cumulative_us / 1000:8.1f} ms  {timing.module}"
+            for timing in self.slowest(count)
+        )
+        return "\n".join(lines)
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """Parse the ``-X importtime`` lines written to stderr.
+
+    Only modules imported after the check's statements started are included, so
+    interpreter start-up imports are not counted.
+    """
+    lines = output.splitlines()
+    if _MARKER in lines:
+        lines = lines[lines.index(_MARKER) + 1 :]
+    timings = []
+    for line in lines:
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            timings.append(
+                ImportTiming(module, int(self_us), int(cumulative_us), len(indent) // 2)
+            )
+    return timings
+
+
+@dataclass
+class ImportTimeMeasurement:
+    """The time taken to import a module over several cold interpreter runs."""
+
+    module: str
+    runs_us: List[int] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def median_us(self) -> float:
+        """The median import time in microseconds, robust to a slow outlier run."""
+        return statistics.median(self.runs_us) if self.runs_us else 0.0
+
+    def regressed(
+        self,
+        baseline_us: float,
+        regression: float = DEFAULT_IMPORT_TIME_REGRESSION,
+        min_regression_ms: float = DEFAULT_IMPORT_TIME_MIN_REGRESSION_MS,
+    ) -> bool:
+        """Check if the median is a slowdown against a baseline.
+
+        Both the relative and the absolute slowdown must be exceeded, so the few
+        milliseconds of jitter in a fast import are not reported as a regression.
+
+        :param baseline_us: The baseline import time in microseconds.
+        :param regression: The allowed slowdown, as a fraction of the baseline.
+        :param min_regression_ms: The smallest slowdown, in milliseconds, to report.
+        :return: True if the median is slower by more than both thresholds.
+        """
+        slowdown_us = self.median_us - baseline_us
+        return (
+            slowdown_us > baseline_us * regression
+            and slowdown_us > min_regression_ms * 1000
+        )
+
+
+def package_module(package_submodule_name: Optional[str], is_tool_package: bool) -> str:
+    """Get the full module name of a geneweaver package."""
+    root_module = "geneweaver.tools" if is_tool_package else "geneweaver"
+    return f"{root_module}.{package_submodule_name}"
+
+
+def package_import_checks(
+    package_submodule_name: Optional[str], is_tool_package: bool
+) -> List[ImportCheck]:
+    """Build the checks that a geneweaver package can be imported.
+
+    :param package_submodule_name: The name of the package in the namespace.
+    :param is_tool_package: True if the package is in ``geneweaver.tools``.
+    """
+    root_module = "geneweaver.tools" if is_tool_package else "geneweaver"
+    module = package_module(package_submodule_name, is_tool_package)
+    return [
+        ImportCheck(ABSOLUTE, f"import importlib\nimportlib.import_module({module!r})"),
+        ImportCheck(
+            RELATIVE,
+            "import importlib\n"
+            f"importlib.import_module('.{package_submodule_name}', {root_module!r})",
+        ),
+        ImportCheck(
+            NAMESPACE,
+            f"import importlib\nimport {module}\n"
+            f"namespace = importlib.import_module({root_module!r})\n"
+            f"assert getattr(namespace, {package_submodule_name!r}, None) is not None",
+        ),
+        ImportCheck(GENEWEAVER, "import geneweaver"),
+    ]
+
+
+def _python_path(pythonpath: Optional[Sequence[str]]) -> str:
+    """Build the PYTHONPATH for the subprocess, defaulting to the current sys.path."""
+    return os.pathsep.join(
+        path for path in (sys.path if pythonpath is None else pythonpath) if path
+    )
+
+
+def run_import_check(
+    check: ImportCheck,
+    cwd: Optional[str] = None,
+    pythonpath: Optional[Sequence[str]] = None,
+) -> ImportResult:
+    """Run an import check in a fresh python interpreter.
+
+    :param check: The check to run.
+    :param cwd: The directory to run the interpreter in.
+    :param pythonpath: The import path of the interpreter, defaults to the import path
+    of the current process so the same modules are found.
+    """
+    script = (
+        f"import sys\nsys.stderr.write({_MARKER + chr(10)!r})\nsys.stderr.flush()\n"
+        f"{check.statements}\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+        env={**os.environ, "PYTHONPATH": _python_path(pythonpath)},
+    )
+    error = None
+    if completed.returncode != 0:
+        error = (
+            "\n".join(
+                line
+                for line in completed.stderr.splitlines()
+                if line != _MARKER and not line.startswith("import time:")
+            )
+            or f"python exited with status {completed.returncode}"
+        )
+    return ImportResult(check.name, error, parse_importtime(completed.stderr))
+
+
+def run_import_checks(
+    checks: Sequence[ImportCheck],
+    cwd: Optional[str] = None,
+    pythonpath: Optional[Sequence[str]] = None,
+    workers: int = MAX_WORKERS,
+) -> Dict[str, ImportResult]:
+    """Run import checks in parallel, each in its own interpreter.
+
+    :return: The result of each check, keyed by check name.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(checks)))) as pool:
+        results = pool.map(
+            lambda check: run_import_check(check, cwd, pythonpath), checks
+        )
+        return {result.check: result for result in results}
+
+
+def measure_import_time(
+    module: str,
+    runs: int = 5,
+    cwd: Optional[str] = None,
+    pythonpath: Optional[Sequence[str]] = None,
+) -> ImportTimeMeasurement:
+    """Time importing a module in several fresh interpreters.
+
+    The runs are made one after another, rather than in parallel, so they do not
+    compete for CPU time and skew each other's timings.
+
+    :param module: The full name of the module to import.
+    :param runs: The number of interpreters to time the import in.
+    :return: The import time of each run, or the error if the import failed.
+    """
+    check = ImportCheck(module, f"import {module}")
+    measurement = ImportTimeMeasurement(module)
+    for _ in range(runs):
+        result = run_import_check(check, cwd, pythonpath)
+        if not result.passed:
+            measurement.error = result.error
+            break
+        measurement.runs_us.append(result.total_us)
+    return measurement
@@ -0,0 +1,170 @@
+"""An index of a project's files, built with one walk of the project directory.
+
+The structure rules, the style and complexity checks and the wheel cache all look at
+the same files. On network file systems, such as many CI workspaces, every ``stat``
+is slow, so a :class:`ProjectIndex` walks the project once with :func:`os.scandir`,
+and every check asks the index instead of the file system::
+
+    index = ProjectIndex.build(pathlib.Path("some-repo"))
+    index.is_dir("src/geneweaver")
+    [file.path for file in index.files("src", suffixes=(".py",))]
+
+Paths matched by a .gitignore, at the root or in any indexed directory, hidden
+directories such as ``.git`` and ``__pycache__`` directories are not indexed. The
+patterns of a nested .gitignore apply to the paths under its directory, but unlike
+git, a negated pattern can not re-include a path ignored by a parent's .gitignore.
+Symbolic links to directories are not followed, so a link loop can not trap the walk.
+A file's content hash is only computed the first time it is asked for.
+"""
+
+import hashlib
+import os
+import pathlib
+import warnings
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Set, Tuple, Type
+
+if TYPE_CHECKING:
+    from pathspec import PathSpec
+
+__all__ = ["IndexedFile", "ProjectIndex", "read_gitignore"]
+
+_SKIPPED_DIRECTORIES = frozenset({"__pycache__"})
+
+# The .gitignore patterns in effect in a directory, with the directory each file's
+# patterns are relative to.
+_IgnoreSpecs = Tuple[Tuple[str, "PathSpec"], ...]
+
+
+@dataclass
+class IndexedFile:
+    """A file in the project, as it was when the index was built."""
+
+    path: str
+    absolute: pathlib.Path
+    size: int
+    mtime_ns: int
+    _digest: Optional[str] = field(default=None, repr=False, compare=False)
+
+    @property
+    def digest(self) -> str:
+        """The SHA-256 hash of the file's contents, read the first time it is used."""
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.absolute.read_bytes()).hexdigest()
+        return self._digest
+
+
+def read_gitignore(root: pathlib.Path) -> Optional["PathSpec"]:
+    """Read the patterns of the .gitignore in a directory, if it has one."""
+    try:
+        lines = (root / ".gitignore").read_text().splitlines()
+    except OSError:
+        return None
+    import pathspec
+
+    with warnings.catch_warnings():
+        # Newer pathspec releases deprecate the pattern style black also uses.
+        warnings.simplefilter("ignore", DeprecationWarning)
+        return pathspec.PathSpec.from_lines("gitwildmatch", lines)
+
+
+def _is_ignored(specs: _IgnoreSpecs, relative: str) -> bool:
+    """Return True if any .gitignore in effect matches a path."""
+    return any(spec.match_file(relative[len(prefix) :]) for prefix, spec in specs)
+
+
+class ProjectIndex:
+    """The directories and files of a project, keyed by posix path from the root."""
+
+    def __init__(
+        self,
+        root: pathlib.Path,
+        files: Dict[str, IndexedFile],
+        directories: Set[str],
+    ) -> None:
+        """Create an index, see :meth:`build` to index a project.
+
+        :param root: The root directory of the project.
+        :param files: The project's files, keyed by relative path.
+        :param directories: The relative paths of the project's directories.
+        """
+        self.root = root
+        self._files = files
+        self._directories = directories
+
+    @classmethod
+    def build(
+        cls: Type["ProjectIndex"], root: pathlib.Path, gitignore: bool = True
+    ) -> "ProjectIndex":
+        """Index a project in one walk of its directory tree.
+
+        :param root: The root directory of the project.
+        :param gitignore: Skip the paths matched by the project's .gitignore files.
+        """
+        files: Dict[str, IndexedFile] = {}
+        directories: Set[str] = set()
+        pending: List[Tuple[pathlib.Path, str, _IgnoreSpecs]] = [(root, "", ())]
+        while pending:
+            directory, prefix, specs = pending.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            if gitignore and any(entry.name == ".gitignore" for entry in entries):
+                spec = read_gitignore(directory)
+                if spec is not None:
+                    specs = (*specs, (prefix, spec))
+            for entry in entries:
+                relative = f"{prefix}{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    if not (
+                        entry.name.startswith(".")
+                        or entry.name in _SKIPPED_DIRECTORIES
+                        or _is_ignored(specs, f"{relative}/")
+                    ):
+                        directories.add(relative)
+                        pending.append(
+                            (pathlib.Path(entry.path), f"{relative}/", specs)
+                        )
+                elif entry.is_file() and not _is_ignored(specs, relative):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        # Removed since the directory was listed, or a broken link.
+                        continue
+                    files[relative] = IndexedFile(
+                        relative,
+                        pathlib.Path(entry.path),
+                        stat.st_size,
+                        stat.st_mtime_ns,
+                    )
+        return cls(root, files, directories)
+
+    def is_dir(self, path: str) -> bool:
+        """Return True if the path, relative to the root, is an indexed directory."""
+        return path in self._directories
+
+    def is_file(self, path: str) -> bool:
+        """Return True if the path, relative to the root, is an indexed file."""
+        return path in self._files
+
+    def get(self, path: str) -> Optional[IndexedFile]:
+        """Get an indexed file by its path relative to the root."""
+        return self._files.get(path)
+
+    def files(
+        self, directory: str = "", suffixes: Optional[Sequence[str]] = None
+    ) -> List[IndexedFile]:
+        """Get the files under a directory, sorted by path.
+
+        :param directory: The directory, relative to the root, the whole project by
+        default.
+        :param suffixes: Only get files with these suffixes, such as ``(".py",)``.
+        """
+        prefix = f"{directory.rstrip('/')}/" if directory else ""
+        return [
+            self._files[path]
+            for path in sorted(self._files)
+            if path.startswith(prefix)
+            and (suffixes is None or path.endswith(tuple(suffixes)))
+        ]
@@ -0,0 +1,59 @@
+"""Lazily import the members of a package from a static manifest.
+
+A package lists, for each of its submodules, the names it provides. The package's
+``__all__`` is built from the manifest, and a submodule is only imported when one of
+its names is first looked up, through the package's module-level ``__getattr__``::
+
+    __all__, __getattr__, __dir__ = attach(__name__, {".style": ["style_report"]})
+
+A star import looks up every name in ``__all__``, so it imports every submodule in the
+manifest. Names that are costly to import, and should not come with a star import,
+are listed in a separate ``unexported`` manifest: they can still be imported by name.
+"""
+
+import importlib
+from typing import Any, Callable, List, Mapping, Optional, Sequence, Tuple
+
+__all__ = ["attach"]
+
+
+def attach(
+    package: str,
+    manifest: Mapping[str, Sequence[str]],
+    unexported: Optional[Mapping[str, Sequence[str]]] = None,
+) -> Tuple[List[str], Callable[[str], Any], Callable[[], List[str]]]:
+    """Build the lazy ``__all__``, ``__getattr__`` and ``__dir__`` of a package.
+
+    :param package: The name of the package, i.e. its ``__name__``.
+    :param manifest: The names provided by each submodule, keyed by the submodule's
+    name relative to the package.
+    :param unexported: More names provided by submodules, in the same form, that are
+    left out of ``__all__`` so a star import does not import them.
+    :return: The package's ``__all__``, ``__getattr__`` and ``__dir__``.
+    """
+    exported = [name for names in manifest.values() for name in names]
+    sources = {
+        name: submodule
+        for submodules in (manifest, unexported or {})
+        for submodule, names in submodules.items()
+        for name in names
+    }
+    names = list(sources)
+
+    def __getattr__(name: str) -> Any:  # noqa: ANN401, N807
+        """Import the submodule that provides a name when it is first used."""
+        submodule = sources.get(name)
+        if submodule is not None:
+            return getattr(importlib.import_module(submodule, package), name)
+        try:
+            return importlib.import_module(f".{name}", package)
+        except ModuleNotFoundError as error:
+            if error.name != f"{package}.{name}":
+                raise
+        raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+    def __dir__() -> List[str]:  # noqa: N807
+        """List the names the package provides."""
+        return list(names)
+
+    return exported, __getattr__, __dir__
@@ -0,0 +1,312 @@
+"""Measure line coverage cheaply, and write it as a coverage.py data file.
+
+On Python 3.12 and later, :class:`MonitoringCollector` uses :mod:`sys.monitoring`
+(PEP 669): every line reports its first execution and then disables its own event,
+so measured code runs at nearly full speed once each line has run. Older
+interpreters fall back to :class:`TracerCollector`, coverage.py's own tracer, which
+is what pytest-cov uses.
+
+Either way :class:`CoverageSession` writes the lines to a coverage.py data file, so
+``coverage report``, ``coverage html`` and ``coverage combine`` work as usual. Only
+line coverage is measured, not branch coverage. File names are recorded with symbolic
+links resolved, so a file reached through a link is only counted once.
+"""
+
+import io
+import os
+import pathlib
+import sys
+from types import CodeType
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Union,
+)
+
+import pytest
+
+__all__ = [
+    "SYS_MONITORING",
+    "MonitoringCollector",
+    "TracerCollector",
+    "CoverageSession",
+    "coverage_sources",
+    "source_files",
+]
+
+# PEP 669, new in Python 3.12.
+_monitoring: Any = getattr(sys, "monitoring", None)
+SYS_MONITORING = _monitoring is not None
+
+TOOL_NAME = "geneweaver-testing"
+DEFAULT_DATA_FILE = ".coverage"
+
+Collector = Union["MonitoringCollector", "TracerCollector"]
+
+
+def _normalize(filename: Union[str, "os.PathLike[str]"]) -> str:
+    """Get the one name a file is recorded under, with symbolic links resolved."""
+    return os.path.realpath(filename)
+
+
+def _merge(lines: Mapping[str, Set[int]]) -> Dict[str, Set[int]]:
+    """Combine the lines recorded under different names for the same file."""
+    merged: Dict[str, Set[int]] = {}
+    for filename, found in lines.items():
+        merged.setdefault(_normalize(filename), set()).update(found)
+    return merged
+
+
+def source_files(sources: Sequence[pathlib.Path]) -> Iterator[pathlib.Path]:
+    """Find the python files in source directories, skipping hidden directories."""
+    for source in sources:
+        if source.is_file():
+            yield source
+            continue
+        for directory, subdirectories, files in os.walk(source):
+            subdirectories[:] = sorted(
+                name
+                for name in subdirectories
+                if not name.startswith(".") and name != "__pycache__"
+            )
+            for name in sorted(files):
+                if name.endswith(".py"):
+                    yield pathlib.Path(directory, name)
+
+
+class MonitoringCollector:
+    """Records the lines executed in source files, with :mod:`sys.monitoring`."""
+
+    def __init__(self, sources: Sequence[pathlib.Path]) -> None:
+        """Configure the collector.
+
+        :param sources: The files and directories to measure.
+        """
+        self.sources = [os.path.join(_normalize(path), "") for path in sources]
+        self.files = [_normalize(path) for path in sources if path.is_file()]
+        # The lines executed in each file, or None for files that are not measured.
+        self._lines: Dict[str, Optional[Set[int]]] = {}
+
+    def _measured(self, filename: str) -> bool:
+        path = _normalize(filename)
+        return path in self.files or any(path.startswith(s) for s in self.sources)
+
+    def _line(self, code: CodeType, line_number: int) -> object:
+        filename = code.co_filename
+        try:
+            lines = self._lines[filename]
+        except KeyError:
+            lines = set() if self._measured(filename) else None
+            self._lines[filename] = lines
+        if lines is not None:
+            lines.add(line_number)
+        # A line is only reported once, it costs nothing when it runs again.
+        return _monitoring.DISABLE
+
+    def start(self) -> None:
+        """Start recording lines, in every thread.
+
+        :raises RuntimeError: If another tool, such as coverage.py, is measuring.
+        """
+        monitoring = _monitoring
+        try:
+            monitoring.use_tool_id(monitoring.COVERAGE_ID, TOOL_NAME)
+        except ValueError as error:
+            owner = monitoring.get_tool(monitoring.COVERAGE_ID)
+            raise RuntimeError(f"Coverage is already measured by {owner}") from error
+        monitoring.register_callback(
+            monitoring.COVERAGE_ID, monitoring.events.LINE, self._line
+        )
+        monitoring.set_events(monitoring.COVERAGE_ID, monitoring.events.LINE)
+        # Lines disabled by an earlier collector must report again.
+        monitoring.restart_events()
+
+    def stop(self) -> None:
+        """Stop recording lines."""
+        monitoring = _monitoring
+        monitoring.set_events(monitoring.COVERAGE_ID, 0)
+        monitoring.register_callback(
+            monitoring.COVERAGE_ID, monitoring.events.LINE, None
+        )
+        monitoring.free_tool_id(monitoring.COVERAGE_ID)
+
+    def lines(self) -> Dict[str, Set[int]]:
+        """Get the lines executed so far in each measured file."""
+        return _merge(
+            {filename: lines for filename, lines in list(self._lines.items()) if lines}
+        )
+
+
+class TracerCollector:
+    """Records the lines executed in source files, with coverage.py's tracer."""
+
+    def __init__(self, sources: Sequence[pathlib.Path]) -> None:
+        """Configure the collector.
+
+        :param sources: The files and directories to measure.
+        """
+        import coverage
+
+        self.coverage = coverage.Coverage(
+            data_file=None, source=[str(path) for path in sources], branch=False
+        )
+
+    def start(self) -> None:
+        """Start recording lines."""
+        self.coverage.start()
+
+    def stop(self) -> None:
+        """Stop recording lines."""
+        self.coverage.stop()
+
+    def lines(self) -> Dict[str, Set[int]]:
+        """Get the lines executed so far in each measured file."""
+        data = self.coverage.get_data()
+        executed = {
+            filename: data.lines(filename) for filename in data.measured_files()
+        }
+        return _merge(
+            {filename: set(lines) for filename, lines in executed.items() if lines}
+        )
+
+
+class CoverageSession:
+    """Pytest plugin that measures the coverage of a test session.
+
+    It is registered by the geneweaver-testing pytest plugin when coverage is enabled
+    with ``--gw-coverage``, and writes the data file when the session finishes.
+    Under pytest-xdist every worker writes its own data file, and the controller
+    combines them.
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[pathlib.Path],
+        data_file: pathlib.Path,
+        worker: Optional[str] = None,
+    ) -> None:
+        """Configure the session's measurement, it is started by :meth:`start`.
+
+        :param sources: The files and directories to measure.
+        :param data_file: The coverage.py data file to write.
+        :param worker: The pytest-xdist worker, whose data file has it as a suffix.
+        """
+        self.sources = list(sources)
+        self.data_file = data_file
+        self.worker = worker
+        self.collector: Collector = (
+            MonitoringCollector(self.sources)
+            if SYS_MONITORING
+            else TracerCollector(self.sources)
+        )
+        self.percent: Optional[float] = None
+        self._running = False
+
+    @property
+    def method(self) -> str:
+        """How lines are being measured."""
+        return "sys.monitoring" if SYS_MONITORING else "coverage.py tracer"
+
+    def start(self) -> None:
+        """Start measuring."""
+        self.collector.start()
+        self._running = True
+
+    def stop(self) -> None:
+        """Stop measuring."""
+        if self._running:
+            self.collector.stop()
+            self._running = False
+
+    def save(self) -> pathlib.Path:
+        """Write the lines executed so far to the data file.
+
+        Source files that never ran are included with no lines, so they count as
+        uncovered.
+
+        :return: The path of the data file written.
+        """
+        from coverage import CoverageData
+
+        lines = self.collector.lines()
+        for path in source_files(self.sources):
+            lines.setdefault(_normalize(path), set())
+        data = CoverageData(
+            basename=str(self.data_file),
+            suffix=f"gw.{self.worker}" if self.worker else None,
+        )
+        data.erase()
+        data.add_lines({filename: sorted(found) for filename, found in lines.items()})
+        data.write()
+        return pathlib.Path(data.data_filename())
+
+    def total(self, data_file: Optional[pathlib.Path] = None) -> float:
+        """Get the percentage of statements covered, as coverage.py reports it."""
+        import coverage
+
+        report = coverage.Coverage(data_file=str(data_file or self.save()))
+        report.load()
+        return float(report.report(file=io.StringIO(), ignore_errors=True))
+
+    def combine(self) -> None:
+        """Combine the data files written by pytest-xdist workers."""
+        import coverage
+
+        combined = coverage.Coverage(data_file=str(self.data_file))
+        pattern = f"{self.data_file.name}.gw.*"
+        combined.combine([str(path) for path in self.data_file.parent.glob(pattern)])
+        combined.save()
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        """Stop measuring, and write the data file."""
+        if self.worker is None and _has_workers(session.config):
+            self.combine()
+            self.percent = self.total(self.data_file)
+            return
+        self.stop()
+        path = self.save()
+        if self.worker is None:
+            self.percent = self.total(path)
+
+    def pytest_terminal_summary(
+        self, terminalreporter: pytest.TerminalReporter
+    ) -> None:
+        """Report the total coverage, and where the data was written."""
+        if self.percent is None:
+            return
+        terminalreporter.write_sep("-", "geneweaver coverage")
+        terminalreporter.write_line(
+            f"{self.percent:.1f}% of statements covered ({self.method}), data written "
+            f"to {self.data_file}"
+        )
+
+
+def _has_workers(config: pytest.Config) -> bool:
+    """Return True if tests run in pytest-xdist workers rather than in process."""
+    return getattr(config.option, "dist", "no") != "no" and not hasattr(
+        config, "workerinput"
+    )
+
+
+def coverage_sources(
+    root: pathlib.Path, settings: Mapping[str, Any]
+) -> List[pathlib.Path]:
+    """Get the paths to measure, from the ``coverage-source`` setting.
+
+    By default the src directory is measured, or the whole project without one.
+
+    :param root: The project root, which the paths are relative to.
+    :param settings: The ``[tool.geneweaver.testing]`` table of pyproject.toml.
+    """
+    configured = settings.get("coverage-source")
+    if configured:
+        names = [configured] if isinstance(configured, str) else configured
+        return [root / name for name in names]
+    return [root / "src"] if (root / "src").is_dir() else [root]
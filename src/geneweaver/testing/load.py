@@ -0,0 +1,434 @@
+"""Measure the throughput and latency of an ASGI application, in process.
+
+:func:`run_load` calls the application directly with ASGI events, from a number of
+concurrent asyncio workers, so no server or network socket is needed and only the
+application's own time is measured. Each worker repeatedly picks a request from the
+mix, at random in proportion to the requests' weights, until the total number of
+requests has been sent or the duration has passed.
+
+The resulting :class:`LoadReport` has the requests per second and the latency
+percentiles, overall and for each kind of request::
+
+    report = load_test(
+        app,
+        [Request("GET", "/api/genesets/1", weight=9), Request("GET", "/api/genes")],
+        concurrency=20,
+        total=2000,
+    )
+    assert report.p99 < 0.05
+"""
+
+import asyncio
+import json
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
+from urllib.parse import urlsplit
+
+__all__ = [
+    "ASGIApp",
+    "Request",
+    "Response",
+    "LoadReport",
+    "call_asgi",
+    "run_load",
+    "load_test",
+    "load_failures",
+]
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+DEFAULT_CONCURRENCY = 10
+DEFAULT_TOTAL = 1000
+
+
+@dataclass(frozen=True)
+class Request:
+    """A kind of request to send, and how often to send it relative to the others."""
+
+    method: str
+    path: str
+    headers: Tuple[Tuple[str, str], ...] = ()
+    body: bytes = b""
+    weight: float = 1.0
+    name: Optional[str] = None
+
+    @classmethod
+    def json(
+        cls: Type["Request"],
+        method: str,
+        path: str,
+        data: object,
+        weight: float = 1.0,
+        name: Optional[str] = None,
+    ) -> "Request":
+        """Create a request with a JSON body."""
+        return cls(
+            method,
+            path,
+            (("content-type", "application/json"),),
+            json.dumps(data).encode(),
+            weight,
+            name,
+        )
+
+    @property
+    def label(self) -> str:
+        """The name the request is reported under."""
+        return self.name or f"{self.method} {self.path}"
+
+
+@dataclass(frozen=True)
+class Response:
+    """The response of the application to a request."""
+
+    status: int
+    headers: Tuple[Tuple[bytes, bytes], ...]
+    body: bytes
+
+
+def _scope(request: Request) -> Scope:
+    """Build the ASGI scope of a request."""
+    url = urlsplit(request.path)
+    headers = [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in request.headers
+    ]
+    if request.body:
+        headers.append((b"content-length", str(len(request.body)).encode()))
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": request.method.upper(),
+        "scheme": "http",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), *headers],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+
+async def call_asgi(app: ASGIApp, request: Request) -> Response:
+    """Send a request to an ASGI application, and collect its response."""
+    received = False
+    status = 0
+    headers: Tuple[Tuple[bytes, bytes], ...] = ()
+    body: List[bytes] = []
+    finished = asyncio.Event()
+
+    async def receive() -> Message:
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": request.body, "more_body": False}
+        # Once the request has been read, the client waits for the response.
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        nonlocal status, headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            headers = tuple(message.get("headers", ()))
+        elif message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    try:
+        await app(_scope(request), receive, send)
+    finally:
+        finished.set()
+    return Response(status, headers, b"".join(body))
+
+
+class _Lifespan:
+    """Runs an application's startup and shutdown handlers, if it has any."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.events: "asyncio.Queue[Message]" = asyncio.Queue()
+        self.replies: "asyncio.Queue[Message]" = asyncio.Queue()
+        self.task: Optional["asyncio.Task[None]"] = None
+
+    async def _run(self) -> None:
+        try:
+            await self.app({"type": "lifespan"}, self.events.get, self.replies.put)
+        except Exception:  # noqa: BLE001
+            # Applications without lifespan support may raise on the scope.
+            pass
+        await self.replies.put({"type": "lifespan.unsupported"})
+
+    async def _send(self, event: str) -> None:
+        await self.events.put({"type": f"lifespan.{event}"})
+        reply = await self.replies.get()
+        if reply["type"].endswith(".failed"):
+            raise RuntimeError(f"Application {event} failed: {reply.get('message')}")
+
+    async def startup(self) -> None:
+        self.task = asyncio.ensure_future(self._run())
+        await self._send("startup")
+
+    async def shutdown(self) -> None:
+        if self.task is not None and not self.task.done():
+            await self._send("shutdown")
+        if self.task is not None:
+            await self.task
+
+
+@dataclass
+class LoadReport:
+    """The latency of every request sent, in seconds, and the responses' statuses."""
+
+    duration: float = 0.0
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+    statuses: Dict[str, "Counter[int]"] = field(default_factory=dict)
+    errors: Dict[str, List[str]] = field(default_factory=dict)
+
+    def _latencies(self, name: Optional[str] = None) -> List[float]:
+        if name is not None:
+            return self.latencies.get(name, [])
+        return [latency for values in self.latencies.values() for latency in values]
+
+    def count(self, name: Optional[str] = None) -> int:
+        """Get the number of requests sent, in total or of one kind."""
+        return len(self._latencies(name))
+
+    @property
+    def requests_per_second(self) -> float:
+        """The number of requests completed per second, over all kinds."""
+        return self.count() / self.duration if self.duration else 0.0
+
+    def percentile(self, percent: float, name: Optional[str] = None) -> float:
+        """Get a latency percentile, by the nearest rank method.
+
+        :param percent: The percentile, from 0 to 100.
+        :param name: The kind of request, by default all requests.
+        """
+        latencies = sorted(self._latencies(name))
+        if not latencies:
+            return 0.0
+        rank = max(1, math.ceil(percent / 100 * len(latencies)))
+        return latencies[rank - 1]
+
+    @property
+    def p50(self) -> float:
+        """The median latency of all requests."""
+        return self.percentile(50)
+
+    @property
+    def p95(self) -> float:
+        """The 95th percentile latency of all requests."""
+        return self.percentile(95)
+
+    @property
+    def p99(self) -> float:
+        """The 99th percentile latency of all requests."""
+        return self.percentile(99)
+
+    def error_rate(self, name: Optional[str] = None) -> float:
+        """Get the fraction of requests that raised or had a 5xx status."""
+        count = self.count(name)
+        names = [name] if name is not None else list(self.latencies)
+        failed = sum(
+            len(self.errors.get(kind, ()))
+            + sum(
+                n for status, n in self.statuses.get(kind, {}).items() if status >= 500
+            )
+            for kind in names
+        )
+        return failed / count if count else 0.0
+
+    def summary(self) -> str:
+        """Describe the throughput and latency, overall and per kind of request."""
+        lines = [
+            f"{self.count()} requests in {self.duration:.2f}s, "
+            f"{self.requests_per_second:.1f} req/s, errors {self.error_rate():.1%}"
+        ]
+        for name in [None, *sorted(self.latencies)]:
+            p50, p95, p99 = (self.percentile(p, name) * 1000 for p in (50, 95, 99))
+            lines.append(
+                f"  {name or 'all':<30} n={self.count(name):<6} p50 {p50:.2f}ms  "
+                f"p95 {p95:.2f}ms  p99 {p99:.2f}ms"
+            )
+        for name, messages in sorted(self.errors.items()):
+            lines.append(f"  {name}: {len(messages)} errors, e.g. {messages[0]}")
+        return "\n".join(lines)
+
+
+class _Generator:
+    """Sends a mix of requests from concurrent workers, recording the responses."""
+
+    def __init__(
+        self, app: ASGIApp, requests: Sequence[Request], concurrency: int, seed: int
+    ) -> None:
+        self.app = app
+        self.requests = requests
+        self.weights = [request.weight for request in requests]
+        self.concurrency = concurrency
+        self.rng = random.Random(seed)
+        self.sent = 0
+
+    async def _send(self, report: Optional[LoadReport]) -> None:
+        (request,) = self.rng.choices(self.requests, self.weights)
+        started = time.perf_counter()
+        error = None
+        try:
+            response = await call_asgi(self.app, request)
+        except Exception as raised:  # noqa: BLE001
+            error = f"{type(raised).__name__}: {raised}"
+        latency = time.perf_counter() - started
+        if report is None:
+            return
+        name = request.label
+        report.latencies.setdefault(name, []).append(latency)
+        statuses = report.statuses.setdefault(name, Counter())
+        if error is None:
+            statuses[response.status] += 1
+        else:
+            report.errors.setdefault(name, []).append(error)
+
+    async def _worker(
+        self,
+        report: Optional[LoadReport],
+        limit: Optional[int],
+        deadline: Optional[float],
+    ) -> None:
+        while (limit is None or self.sent < limit) and (
+            deadline is None or time.perf_counter() < deadline
+        ):
+            self.sent += 1
+            await self._send(report)
+
+    async def run(
+        self,
+        report: Optional[LoadReport],
+        limit: Optional[int],
+        seconds: Optional[float] = None,
+    ) -> None:
+        """Send requests until the limit or the time is reached.
+
+        :param report: Where to record the responses, None to discard them.
+        :param limit: The number of requests to send.
+        :param seconds: The time to send requests for.
+        """
+        self.sent = 0
+        deadline = None if seconds is None else time.perf_counter() + seconds
+        await asyncio.gather(
+            *(self._worker(report, limit, deadline) for _ in range(self.concurrency))
+        )
+
+
+async def run_load(
+    app: ASGIApp,
+    requests: Sequence[Request],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    total: Optional[int] = None,
+    duration: Optional[float] = None,
+    warmup: int = 0,
+    seed: int = 0,
+    lifespan: bool = True,
+) -> LoadReport:
+    """Send requests to an application from concurrent workers.
+
+    :param app: The ASGI application.
+    :param requests: The mix of requests to send.
+    :param concurrency: The number of requests in flight at once.
+    :param total: The number of requests to send, :data:`DEFAULT_TOTAL` unless a
+    duration is given.
+    :param duration: The time to keep sending requests for, in seconds.
+    :param warmup: The number of requests to send first, which are not reported.
+    :param seed: The seed of the random choice of requests.
+    :param lifespan: Run the application's startup and shutdown handlers.
+    """
+    if not requests:
+        raise ValueError("No requests to send")
+    if total is None and duration is None:
+        total = DEFAULT_TOTAL
+    generator = _Generator(app, requests, concurrency, seed)
+    report = LoadReport()
+    handler = _Lifespan(app) if lifespan else None
+    if handler is not None:
+        await handler.startup()
+    try:
+        if warmup:
+            await generator.run(None, warmup)
+        started = time.perf_counter()
+        await generator.run(report, total, duration)
+        report.duration = time.perf_counter() - started
+    finally:
+        if handler is not None:
+            await handler.shutdown()
+    return report
+
+
+def load_test(
+    app: ASGIApp, requests: Sequence[Request], **options: Any  # noqa: ANN401
+) -> LoadReport:
+    """Send requests to an application, from outside of an event loop.
+
+    :param app: The ASGI application.
+    :param requests: The mix of requests to send.
+    :param options: The options of :func:`run_load`.
+    """
+    return asyncio.run(run_load(app, requests, **options))
+
+
+def load_failures(
+    report: LoadReport,
+    p50: Optional[float] = None,
+    p95: Optional[float] = None,
+    p99: Optional[float] = None,
+    min_rps: Optional[float] = None,
+    max_error_rate: Optional[float] = 0.0,
+) -> List[str]:
+    """Compare a report against latency and throughput budgets.
+
+    :param report: The results of a load test.
+    :param p50: The highest median latency allowed, in seconds.
+    :param p95: The highest 95th percentile latency allowed, in seconds.
+    :param p99: The highest 99th percentile latency allowed, in seconds.
+    :param min_rps: The fewest requests per second allowed.
+    :param max_error_rate: The highest fraction of requests allowed to fail.
+    :return: A description of each budget that was exceeded.
+    """
+    failures = []
+    for name, budget in (("p50", p50), ("p95", p95), ("p99", p99)):
+        latency = getattr(report, name)
+        if budget is not None and latency > budget:
+            failures.append(
+                f"{name} latency of {latency * 1000:.2f}ms is over the budget of "
+                f"{budget * 1000:.2f}ms"
+            )
+    if min_rps is not None and report.requests_per_second < min_rps:
+        failures.append(
+            f"{report.requests_per_second:.1f} requests per second is under the "
+            f"minimum of {min_rps:.1f}"
+        )
+    if max_error_rate is not None and report.error_rate() > max_error_rate:
+        failures.append(
+            f"error rate of {report.error_rate():.1%} is over {max_error_rate:.1%}"
+        )
+    return failures
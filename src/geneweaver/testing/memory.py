@@ -0,0 +1,331 @@
+"""Measure the memory a block of code allocates, and find leaks.
+
+A :class:`MemoryTracker` traces python allocations with :mod:`tracemalloc` while a
+block runs, and reports the peak and net allocation and the lines that allocated the
+most. It can also sample the resident set size of the process from a background
+thread, to catch memory allocated outside of python, such as by C extensions.
+
+:func:`find_leak` calls a function repeatedly and reports a leak when the memory
+retained after each call trends upwards.
+"""
+
+import gc
+import os
+import re
+import threading
+import tracemalloc
+from array import array
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import Any, Callable, List, Optional, Type, Union
+
+__all__ = [
+    "AllocationSite",
+    "MemoryReport",
+    "MemoryTracker",
+    "LeakReport",
+    "parse_size",
+    "format_size",
+    "current_rss",
+    "budget_failures",
+    "find_leak",
+]
+
+TRACEBACK_FRAMES = 1
+DEFAULT_TOP_SITES = 10
+DEFAULT_RSS_INTERVAL = 0.01
+
+# Allocations made by the tracer itself are not reported as allocation sites.
+_OWN_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+]
+
+_SIZE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmg]?i?b?)\s*$", re.IGNORECASE)
+_UNITS = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3}
+
+
+def parse_size(size: Union[int, float, str]) -> int:
+    """Convert a size such as ``"50 MB"`` to bytes, units are powers of 1024.
+
+    :raises ValueError: If the size can not be parsed.
+    """
+    if isinstance(size, (int, float)):
+        return int(size)
+    match = _SIZE.match(size)
+    if match is None:
+        raise ValueError(f"Invalid size: {size!r}, expected e.g. '50 MB'")
+    number, unit = match.groups()
+    return int(float(number) * _UNITS[unit[:1].lower()])
+
+
+def format_size(size: float) -> str:
+    """Format a number of bytes in the most readable unit."""
+    for unit, scale in (("GiB", 1024**3), ("MiB", 1024**2), ("KiB", 1024)):
+        if abs(size) >= scale:
+            return f"{size / scale:.1f} {unit}"
+    return f"{size:.0f} B"
+
+
+def current_rss() -> Optional[int]:
+    """Get the resident set size of the process in bytes, where the OS reports it."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return int(psutil.Process().memory_info().rss)
+
+
+@dataclass(frozen=True)
+class AllocationSite:
+    """A line of code, and the memory allocated there that was still held."""
+
+    location: str
+    size: int
+    count: int
+
+    def __str__(self) -> str:
+        """Format the site the way tracemalloc statistics are printed."""
+        return f"{self.location}: {format_size(self.size)} in {self.count} blocks"
+
+
+@dataclass
+class MemoryReport:
+    """The memory allocated while a block of code ran."""
+
+    peak: int = 0
+    net: int = 0
+    top: List[AllocationSite] = field(default_factory=list)
+    rss_peak: Optional[int] = None
+    rss_net: Optional[int] = None
+
+    def summary(self) -> str:
+        """Describe the allocations and the lines that allocated the most."""
+        lines = [f"peak {format_size(self.peak)}, net {format_size(self.net)}"]
+        if self.rss_peak is not None and self.rss_net is not None:
+            lines[0] += (
+                f", RSS peak +{format_size(self.rss_peak)}, "
+                f"net {format_size(self.rss_net)}"
+            )
+        lines.extend(f"  {site}" for site in self.top)
+        return "\n".join(lines)
+
+
+class _RssSampler(threading.Thread):
+    """Records the highest resident set size seen until stopped."""
+
+    def __init__(self, interval: float) -> None:
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.start_rss = current_rss()
+        self.max_rss = self.start_rss
+        self._stopped = threading.Event()
+
+    def _sample(self) -> None:
+        rss = current_rss()
+        if rss is not None and (self.max_rss is None or rss > self.max_rss):
+            self.max_rss = rss
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self._sample()
+
+    def stop(self) -> Optional[int]:
+        """Stop sampling, and get the final resident set size."""
+        self._stopped.set()
+        self.join()
+        self._sample()
+        return current_rss()
+
+
+class MemoryTracker:
+    """Traces the memory allocated within a ``with`` block.
+
+    The report is available as :attr:`report` once the block exits.
+    """
+
+    def __init__(
+        self,
+        rss: bool = False,
+        top: int = DEFAULT_TOP_SITES,
+        rss_interval: float = DEFAULT_RSS_INTERVAL,
+    ) -> None:
+        """Configure the tracker.
+
+        :param rss: Also sample the resident set size of the process.
+        :param top: The number of allocation sites to report.
+        :param rss_interval: The time, in seconds, between resident set size samples.
+        """
+        self.rss = rss
+        self.top = top
+        self.rss_interval = rss_interval
+        self.report = MemoryReport()
+        self._started_tracing = False
+        self._start_current = 0
+        self._start_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._sampler: Optional[_RssSampler] = None
+
+    def __enter__(self) -> MemoryReport:
+        """Start tracing allocations."""
+        gc.collect()
+        if self.rss:
+            self._sampler = _RssSampler(self.rss_interval)
+            self._sampler.start()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEBACK_FRAMES)
+            self._started_tracing = True
+        self._start_snapshot = tracemalloc.take_snapshot()
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        self._start_current, _ = tracemalloc.get_traced_memory()
+        return self.report
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Stop tracing, and fill in the report."""
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        if self._started_tracing:
+            tracemalloc.stop()
+        # The sampler is stopped after tracing, so its own allocations are not seen.
+        if self._sampler is not None:
+            end_rss = self._sampler.stop()
+            start_rss = self._sampler.start_rss
+            if start_rss is not None and end_rss is not None:
+                self.report.rss_peak = (self._sampler.max_rss or end_rss) - start_rss
+                self.report.rss_net = end_rss - start_rss
+
+        self.report.peak = max(0, peak - self._start_current)
+        self.report.net = current - self._start_current
+        if self._start_snapshot is not None:
+            snapshot = snapshot.filter_traces(_OWN_FILTERS)
+            self.report.top = [
+                AllocationSite(str(stat.traceback[0]), stat.size_diff, stat.count_diff)
+                for stat in snapshot.compare_to(self._start_snapshot, "lineno")
+                if stat.size_diff > 0
+            ][: self.top]
+
+
+def budget_failures(
+    report: MemoryReport,
+    peak: Optional[Union[int, str]] = None,
+    net: Optional[Union[int, str]] = None,
+    rss_peak: Optional[Union[int, str]] = None,
+) -> List[str]:
+    """Compare a report against memory budgets, each given in bytes or e.g. "50 MB".
+
+    :param report: The memory allocated by a block of code.
+    :param peak: The most memory the block may have allocated at once.
+    :param net: The most memory the block may still hold once it finished.
+    :param rss_peak: The most the resident set size may have grown, the report must
+    have sampled it.
+    :return: A description of each budget that was exceeded.
+    """
+    failures = []
+    for name, used, budget in (
+        ("peak allocation", report.peak, peak),
+        ("net allocation", report.net, net),
+        ("peak RSS growth", report.rss_peak, rss_peak),
+    ):
+        if budget is None:
+            continue
+        if used is None:
+            failures.append(f"{name} was not measured")
+        elif used > parse_size(budget):
+            failures.append(
+                f"{name} of {format_size(used)} is over the budget of "
+                f"{format_size(parse_size(budget))}"
+            )
+    return failures
+
+
+@dataclass
+class LeakReport:
+    """The memory retained after each call of a function."""
+
+    retained: List[int] = field(default_factory=list)
+    tolerance: int = 0
+
+    @property
+    def growth(self) -> List[int]:
+        """The change in retained memory from one call to the next."""
+        return [
+            after - before for before, after in zip(self.retained, self.retained[1:])
+        ]
+
+    @property
+    def slope(self) -> float:
+        """The least-squares trend of the retained memory, in bytes per call."""
+        calls = len(self.retained)
+        if calls < 2:
+            return 0.0
+        mean_call = (calls - 1) / 2
+        mean_retained = sum(self.retained) / calls
+        covariance = sum(
+            (call - mean_call) * (retained - mean_retained)
+            for call, retained in enumerate(self.retained)
+        )
+        variance = sum((call - mean_call) ** 2 for call in range(calls))
+        return covariance / variance
+
+    @property
+    def leaking(self) -> bool:
+        """Return True if the retained memory trends upwards over the calls.
+
+        The trend is fitted over every call, so a leak is still found when some calls
+        release memory, such as a list that grows in steps. The growth along the
+        trend must be larger than the tolerance, so a warming cache or jitter in a
+        function that does not leak can be ignored.
+        """
+        slope = self.slope
+        return slope > 0 and slope * (len(self.retained) - 1) > self.tolerance
+
+    def summary(self) -> str:
+        """Describe how the retained memory changed."""
+        return (
+            f"retained memory grew by {format_size(sum(self.growth))} over "
+            f"{len(self.growth)} calls: "
+            + ", ".join(f"+{format_size(step)}" for step in self.growth)
+        )
+
+
+def find_leak(
+    function: Callable[[], Any],
+    runs: int = 10,
+    warmup: int = 2,
+    tolerance: Union[int, str] = 0,
+) -> LeakReport:
+    """Call a function repeatedly, recording the memory retained after each call.
+
+    :param function: The function to call.
+    :param runs: The number of calls to record.
+    :param warmup: The number of calls to make first, so caches are filled.
+    :param tolerance: The total growth along the trend that is not reported as a
+    leak.
+    """
+    for _ in range(warmup):
+        function()
+    # The measurements go into an array made before tracing, so recording them does
+    # not allocate memory that would be counted as retained.
+    retained = array("q", [0]) * runs
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(TRACEBACK_FRAMES)
+    try:
+        for run in range(runs):
+            function()
+            gc.collect()
+            retained[run] = tracemalloc.get_traced_memory()[0]
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    return LeakReport(retained.tolist(), parse_size(tolerance))
@@ -0,0 +1,223 @@
+"""Engine that measures code complexity with radon, in parallel and cached.
+
+Each file is parsed once with :mod:`ast`, and the tree is shared by radon's cyclomatic
+complexity, Halstead and maintainability index calculations, with the raw line counts
+taken from the same source. Files are measured across a pool of worker processes, and
+results can be cached by file content hash so unchanged files are not measured again.
+The prebuilt complexity tests read their verdicts from the resulting
+:class:`ComplexityReport`.
+"""
+
+import ast
+import os
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from importlib.metadata import PackageNotFoundError, version
+from typing import Dict, List, MutableMapping, Optional, Tuple, Type
+
+__all__ = [
+    "DEFAULT_MAX_COMPLEXITY",
+    "DEFAULT_MIN_MAINTAINABILITY",
+    "FunctionComplexity",
+    "FileMetrics",
+    "ComplexityReport",
+    "radon_version",
+    "measure_source",
+    "measure_files",
+]
+
+DEFAULT_MAX_COMPLEXITY = 20
+DEFAULT_MIN_MAINTAINABILITY = 10.0
+
+MIN_FILES_PER_WORKER = 8
+
+
+@dataclass(frozen=True)
+class FunctionComplexity:
+    """The cyclomatic complexity of a function or method."""
+
+    path: str
+    name: str
+    lineno: int
+    complexity: int
+
+    def __str__(self) -> str:
+        """Format the function the way radon prints it."""
+        return f"{self.path}:{self.lineno} {self.name} - {self.complexity}"
+
+
+@dataclass
+class FileMetrics:
+    """The complexity, maintainability and raw metrics of a file."""
+
+    path: str
+    maintainability: float = 100.0
+    loc: int = 0
+    lloc: int = 0
+    sloc: int = 0
+    comments: int = 0
+    functions: List[FunctionComplexity] = field(default_factory=list)
+    error: Optional[str] = None
+
+    def to_json(self) -> dict:
+        """Convert the metrics to JSON compatible data, to be cached."""
+        return asdict(self)
+
+    @classmethod
+    def from_json(cls: Type["FileMetrics"], data: dict) -> "FileMetrics":
+        """Rebuild the metrics from :meth:`to_json` data."""
+        functions = [FunctionComplexity(**function) for function in data["functions"]]
+        return cls(**{**data, "functions": functions})
+
+
+@dataclass
+class ComplexityReport:
+    """The radon metrics for every measured file of a project."""
+
+    files: List[FileMetrics] = field(default_factory=list)
+
+    @property
+    def functions(self) -> List[FunctionComplexity]:
+        """Get every measured function, most complex first."""
+        return sorted(
+            (function for metrics in self.files for function in metrics.functions),
+            key=lambda function: (-function.complexity, function.path, function.lineno),
+        )
+
+    def hottest(self, count: int = 10) -> List[FunctionComplexity]:
+        """Get the most complex functions."""
+        return self.functions[:count]
+
+    def too_complex(self, max_complexity: int) -> List[FunctionComplexity]:
+        """Get the functions more complex than the threshold."""
+        return [
+            function
+            for function in self.functions
+            if function.complexity > max_complexity
+        ]
+
+    def unmaintainable(self, min_maintainability: float) -> List[FileMetrics]:
+        """Get the files with a maintainability index below the threshold."""
+        return [
+            metrics
+            for metrics in self.files
+            if metrics.error is None and metrics.maintainability < min_maintainability
+        ]
+
+    @property
+    def errors(self) -> List[FileMetrics]:
+        """Get the files that could not be measured."""
+        return [metrics for metrics in self.files if metrics.error is not None]
+
+
+def radon_version() -> str:
+    """Get the installed version of radon, results are cached per version."""
+    try:
+        return version("radon")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def measure_source(source: str, path: str) -> FileMetrics:
+    """Measure the source of a file, parsing it only once.
+
+    :param source: The python source code.
+    :param path: The path to report the metrics against.
+    """
+    from radon.complexity import cc_visit_ast
+    from radon.metrics import h_visit_ast, mi_compute
+    from radon.raw import analyze
+    from radon.visitors import Class, ComplexityVisitor
+
+    try:
+        tree = ast.parse(source)
+        raw = analyze(source)
+    except (SyntaxError, ValueError) as error:
+        return FileMetrics(path, error=str(error))
+
+    # Methods are listed both on their own and within their class.
+    functions = [
+        FunctionComplexity(path, block.fullname, block.lineno, block.complexity)
+        for block in cc_visit_ast(tree)
+        if not isinstance(block, Class)
+    ]
+
+    comments = raw.comments + raw.multi
+    maintainability = mi_compute(
+        h_visit_ast(tree).total.volume,
+        ComplexityVisitor.from_ast(tree).total_complexity,
+        raw.lloc,
+        comments / raw.sloc * 100 if raw.sloc else 0,
+    )
+    return FileMetrics(
+        path,
+        maintainability=round(maintainability, 2),
+        loc=raw.loc,
+        lloc=raw.lloc,
+        sloc=raw.sloc,
+        comments=raw.comments,
+        functions=functions,
+    )
+
+
+def _cache_key(relative: str, digests: Dict[str, str]) -> str:
+    """Build the cache key for a file's metrics."""
+    return f"{relative}:{digests[relative]}"
+
+
+def _measure_file(item: Tuple[pathlib.Path, str]) -> FileMetrics:
+    """Measure a file, run inside a worker process.
+
+    A file that cannot be read or decoded is reported like one that cannot be parsed.
+    """
+    path, relative = item
+    try:
+        source = path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError) as error:
+        return FileMetrics(relative, error=str(error))
+    return measure_source(source, relative)
+
+
+def measure_files(
+    paths: Dict[str, pathlib.Path],
+    digests: Optional[Dict[str, str]] = None,
+    cache: Optional[MutableMapping[str, dict]] = None,
+    workers: Optional[int] = None,
+) -> ComplexityReport:
+    """Measure files in parallel, reusing cached results for unchanged files.
+
+    :param paths: The files to measure, keyed by the path to report them as.
+    :param digests: The content hash of each file, required to use the cache.
+    :param cache: Cached :meth:`FileMetrics.to_json` data keyed by path and content
+    hash, it is updated with the newly measured files.
+    :param workers: The maximum number of worker processes, defaults to the number of
+    CPUs. Small sets of files are measured in the current process.
+    """
+    results: Dict[str, FileMetrics] = {}
+    misses = []
+    for relative, path in paths.items():
+        cached = (
+            cache.get(_cache_key(relative, digests))
+            if cache is not None and digests is not None
+            else None
+        )
+        if cached is not None:
+            results[relative] = FileMetrics.from_json(cached)
+        else:
+            misses.append((path, relative))
+
+    workers = min(workers or os.cpu_count() or 1, len(misses) // MIN_FILES_PER_WORKER)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            measured = list(
+                executor.map(_measure_file, misses, chunksize=MIN_FILES_PER_WORKER)
+            )
+    else:
+        measured = [_measure_file(miss) for miss in misses]
+
+    for metrics in measured:
+        results[metrics.path] = metrics
+        if cache is not None and digests is not None:
+            cache[_cache_key(metrics.path, digests)] = metrics.to_json()
+    return ComplexityReport([results[relative] for relative in sorted(results)])
@@ -3,5 +3,6 @@
 # ruff: noqa: F403
 from .can_import import *
 from .generic import *
+from .import_time import *
 from .pyproject import *
 from .structure import *
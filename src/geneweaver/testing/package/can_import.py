@@ -1,7 +1,20 @@
-"""Tests that verify that the package can be imported as expected."""
+"""Tests that verify that the package can be imported as expected.
 
-import importlib
-from typing import Optional
+Each import is checked in a fresh interpreter, so modules already imported by the test
+session cannot hide a broken import. The time spent importing is recorded as a test
+property, and so is included in JUnit XML reports.
+"""
+
+from typing import Callable, Mapping
+
+from geneweaver.testing.changes import depends_on
+from geneweaver.testing.imports import (
+    ABSOLUTE,
+    GENEWEAVER,
+    NAMESPACE,
+    RELATIVE,
+    ImportResult,
+)
 
 __all__ = [
     "test_can_import_absolute",
@@ -18,47 +31,38 @@ ERROR_MESSAGE = (
 )
 
 
+def _assert_imports(result: ImportResult) -> None:
+    """Fail with the traceback from the interpreter if the import check failed."""
+    assert result.passed, f"{ERROR_MESSAGE}\n\n{result.error}"
+
+
+@depends_on("src", "pyproject.toml")
 def test_can_import_absolute(
-    package_submodule_name: Optional[str], is_tool_package: bool
+    import_report: Mapping[str, ImportResult],
+    record_property: Callable[[str, object], None],
 ) -> None:
     """Test that we can import the package from the top level namespace."""
-    root_module = "geneweaver.tools" if is_tool_package else "geneweaver"
-    module = importlib.import_module(f"{root_module}.{package_submodule_name}")
-    assert module is not None, ERROR_MESSAGE
+    result = import_report[ABSOLUTE]
+    record_property("import_time_ms", round(result.total_us / 1000, 1))
+    record_property("import_time_summary", result.summary())
+    _assert_imports(result)
 
 
-def test_can_import_relative(
-    package_submodule_name: Optional[str], is_tool_package: bool
-) -> None:
+@depends_on("src", "pyproject.toml")
+def test_can_import_relative(import_report: Mapping[str, ImportResult]) -> None:
     """Test that we can import the package relative to the geneweaver namespace."""
-    root_module = "geneweaver.tools" if is_tool_package else "geneweaver"
-    module = importlib.import_module(f".{package_submodule_name}", root_module)
-    assert module is not None, ERROR_MESSAGE
+    _assert_imports(import_report[RELATIVE])
 
 
-def test_can_import_geneweaver() -> None:
+@depends_on("src", "pyproject.toml")
+def test_can_import_geneweaver(import_report: Mapping[str, ImportResult]) -> None:
     """Test that we can import geneweaver top level namespace package."""
-    # Note: See https://mypy.readthedocs.io/en/stable/running_mypy.html#missing-imports
-    # MyPY Error: Skipping analyzing "geneweaver": module is installed,
-    # but missing library stubs or py.typed marker
-    import geneweaver  # type: ignore
-
-    assert geneweaver is not None, ERROR_MESSAGE
+    _assert_imports(import_report[GENEWEAVER])
 
 
+@depends_on("src", "pyproject.toml")
 def test_submodule_available_from_namespace_package(
-    package_submodule_name: Optional[str], is_tool_package: bool
+    import_report: Mapping[str, ImportResult]
 ) -> None:
     """Test that the package is available from the geneweaver namespace."""
-    if is_tool_package:
-        import geneweaver.tools
-
-        assert hasattr(geneweaver.tools, package_submodule_name), ERROR_MESSAGE
-        assert (
-            getattr(geneweaver.tools, package_submodule_name) is not None
-        ), ERROR_MESSAGE
-    else:
-        import geneweaver
-
-        assert hasattr(geneweaver, package_submodule_name), ERROR_MESSAGE
-        assert getattr(geneweaver, package_submodule_name) is not None, ERROR_MESSAGE
+    _assert_imports(import_report[NAMESPACE])
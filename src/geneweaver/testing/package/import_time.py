@@ -0,0 +1,78 @@
+"""Test that importing the package stays within its import-time budget.
+
+The budget is configured in pyproject.toml::
+
+    [tool.geneweaver.testing]
+    import-time-budget-ms = 300   # fail if the median import takes longer
+    import-time-regression = 0.2  # fail on a 20% slowdown against the baseline
+    import-time-regression-min-ms = 10  # ... and only if it is over 10 ms
+    import-time-runs = 5          # number of cold interpreters to time
+
+The median of several cold interpreter runs is compared, and the recent medians are
+kept in the pytest cache as the baseline for the regression check. A slowdown must
+exceed both the relative and the absolute threshold, so the jitter of a fast import
+does not fail the test.
+"""
+
+from typing import Optional
+
+import pytest
+from geneweaver.testing.changes import depends_on
+from geneweaver.testing.imports import (
+    DEFAULT_IMPORT_TIME_MIN_REGRESSION_MS,
+    DEFAULT_IMPORT_TIME_REGRESSION,
+    ImportTimeMeasurement,
+)
+from geneweaver.testing.pyproject import PyProject
+
+__all__ = ["test_import_time_within_budget"]
+
+BUDGET_ERROR_MESSAGE = (
+    "Importing {module} took {median:.1f} ms (median of {runs} runs), over the budget "
+    "of {budget:.1f} ms set with import-time-budget-ms in pyproject.toml. Look for "
+    "heavy modules imported when the package is imported, and import them lazily."
+)
+
+REGRESSION_ERROR_MESSAGE = (
+    "Importing {module} took {median:.1f} ms (median of {runs} runs), {slowdown:.0%} "
+    "slower than the baseline of {baseline:.1f} ms. Look for heavy modules newly "
+    "imported when the package is imported. If the slowdown is expected, reset the "
+    "baseline with pytest --cache-clear."
+)
+
+
+@depends_on("src", "pyproject.toml")
+def test_import_time_within_budget(
+    pyproject: PyProject,
+    import_time: ImportTimeMeasurement,
+    import_time_baseline: Optional[float],
+) -> None:
+    """Test that the package imports within its budget and has not slowed down."""
+    if import_time.error is not None:
+        pytest.skip("The package is not importable, see the can_import tests.")
+
+    settings = pyproject.testing_settings
+    median_ms = import_time.median_us / 1000
+    details = {
+        "module": import_time.module,
+        "median": median_ms,
+        "runs": len(import_time.runs_us),
+    }
+
+    budget = settings.get("import-time-budget-ms")
+    if budget is not None:
+        assert median_ms <= budget, BUDGET_ERROR_MESSAGE.format(
+            budget=budget, **details
+        )
+
+    regression = settings.get("import-time-regression", DEFAULT_IMPORT_TIME_REGRESSION)
+    min_regression_ms = settings.get(
+        "import-time-regression-min-ms", DEFAULT_IMPORT_TIME_MIN_REGRESSION_MS
+    )
+    if import_time_baseline:
+        slowdown = import_time.median_us / import_time_baseline - 1
+        assert not import_time.regressed(
+            import_time_baseline, regression, min_regression_ms
+        ), REGRESSION_ERROR_MESSAGE.format(
+            slowdown=slowdown, baseline=import_time_baseline / 1000, **details
+        )
@@ -0,0 +1,84 @@
+"""Test the package's built wheel, not just its source tree.
+
+The wheel is built once per change to the sources, see the ``wheel_path`` fixture.
+Its size budget is configured in pyproject.toml::
+
+    [tool.geneweaver.testing]
+    wheel-size-budget-kb = 512
+"""
+
+import pathlib
+
+from geneweaver.testing.changes import depends_on
+from geneweaver.testing.index import ProjectIndex
+from geneweaver.testing.pyproject import PyProject
+from geneweaver.testing.wheel import (
+    DEFAULT_WHEEL_SIZE_BUDGET_KB,
+    NAMESPACE_INIT,
+    WheelContents,
+    missing_source_files,
+    unexpected_entries,
+)
+
+__all__ = [
+    "test_wheel_is_namespace_package",
+    "test_wheel_contains_source_files",
+    "test_wheel_has_no_unexpected_files",
+    "test_wheel_size_within_budget",
+]
+
+SIZE_ERROR_MESSAGE = (
+    "The wheel is {size:.1f} KB, over the budget of {budget:.1f} KB set with "
+    "wheel-size-budget-kb in pyproject.toml. The largest files are:\n{largest}"
+)
+
+
+@depends_on("src", "pyproject.toml")
+def test_wheel_is_namespace_package(wheel_contents: WheelContents) -> None:
+    """Test that the wheel does not make geneweaver a regular package."""
+    assert NAMESPACE_INIT not in wheel_contents.names, (
+        f"The wheel contains {NAMESPACE_INIT}, which would replace the geneweaver "
+        "namespace package when installed, hiding every other geneweaver package."
+    )
+
+
+@depends_on("src", "pyproject.toml")
+def test_wheel_contains_source_files(
+    wheel_contents: WheelContents,
+    project_root: pathlib.Path,
+    project_index: ProjectIndex,
+) -> None:
+    """Test that every python file under src/geneweaver is in the wheel."""
+    missing = missing_source_files(wheel_contents, project_root, project_index)
+    assert not missing, (
+        "The wheel is missing these files, check the packages and include settings "
+        "in [tool.poetry]: " + ", ".join(missing)
+    )
+
+
+@depends_on("src", "pyproject.toml")
+def test_wheel_has_no_unexpected_files(wheel_contents: WheelContents) -> None:
+    """Test that the wheel only has files in the geneweaver namespace."""
+    unexpected = unexpected_entries(wheel_contents)
+    assert not unexpected, (
+        "The wheel has files outside the geneweaver namespace, or in a tests "
+        "directory: " + ", ".join(unexpected)
+    )
+
+
+@depends_on("src", "pyproject.toml")
+def test_wheel_size_within_budget(
+    wheel_contents: WheelContents, pyproject: PyProject
+) -> None:
+    """Test that the wheel is within its size budget."""
+    budget = pyproject.testing_settings.get(
+        "wheel-size-budget-kb", DEFAULT_WHEEL_SIZE_BUDGET_KB
+    )
+    size = wheel_contents.size / 1024
+    largest = "\n".join(
+        f"  {entry.name}: {entry.compressed_size / 1024:.1f} KB"
+        for entry in wheel_contents.largest()
+    )
+    assert size <= budget, SIZE_ERROR_MESSAGE.format(
+        size=size, budget=budget, largest=largest
+    )
@@ -0,0 +1,455 @@
+"""The geneweaver-testing pytest plugin, registered through the pytest11 entry point.
+
+Installing the package is enough to run the prebuilt tests in a GeneWeaver project,
+one with a ``src/geneweaver`` directory, no star-imports needed. Other projects opt in
+with the ``geneweaver_prebuilt`` ini setting. The plugin registers the fixtures from
+:mod:`geneweaver.testing.fixtures`, and adds the prebuilt tests to the session exactly
+once, grouped by category::
+
+    pytest tests --gw-disable=style
+
+The ``typing``, ``complexity`` and ``wheel`` categories run mypy, radon and a wheel
+build, so they only run when turned on with the ``geneweaver_enable`` ini setting or
+``--gw-enable``. The plugin's fixtures are only registered where the prebuilt tests
+run, and only the tests and fixtures of enabled categories are imported.
+Prebuilt tests that are still star-imported into test modules are de-duplicated, so
+they are not run more than once. Disable the plugin entirely with
+``-p no:geneweaver_testing``.
+"""
+
+import importlib
+import os
+import pathlib
+import sys
+import types
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Type
+
+import pytest
+
+__all__ = [
+    "CATEGORIES",
+    "CATEGORY_FIXTURE_MODULES",
+    "FIXTURE_MODULES",
+    "LAST_CATEGORIES",
+    "OPT_IN_CATEGORIES",
+    "PrebuiltTests",
+    "enabled_categories",
+    "prebuilt_enabled",
+    "prebuilt_tests",
+    "pytest_addoption",
+    "pytest_configure",
+    "pytest_load_initial_conftests",
+    "pytest_collection_modifyitems",
+    "pytest_terminal_summary",
+]
+
+CATEGORIES: Dict[str, Tuple[str, ...]] = {
+    "structure": (
+        "geneweaver.testing.package.generic.structure",
+        "geneweaver.testing.package.structure",
+    ),
+    "pyproject": (
+        "geneweaver.testing.package.generic.pyproject",
+        "geneweaver.testing.package.pyproject",
+    ),
+    "imports": (
+        "geneweaver.testing.package.can_import",
+        "geneweaver.testing.package.import_time",
+    ),
+    "style": (
+        "geneweaver.testing.style.black",
+        "geneweaver.testing.style.ruff",
+    ),
+    "typing": ("geneweaver.testing.typing",),
+    "complexity": ("geneweaver.testing.complexity",),
+    "coverage": ("geneweaver.testing.coverage",),
+    "wheel": ("geneweaver.testing.package.wheel",),
+}
+
+# Categories that are slow, such as building the wheel, and only run when enabled.
+OPT_IN_CATEGORIES = ("typing", "complexity", "wheel")
+
+# Categories that check the whole session, and so run after every other test.
+LAST_CATEGORIES = ("coverage",)
+
+# Fixtures for a project's own tests, registered wherever the prebuilt tests run.
+FIXTURE_MODULES = (
+    "geneweaver.testing.fixtures.benchmark",
+    "geneweaver.testing.fixtures.data",
+    "geneweaver.testing.fixtures.database",
+    "geneweaver.testing.fixtures.load",
+    "geneweaver.testing.fixtures.memory",
+    "geneweaver.testing.fixtures.package",
+    "geneweaver.testing.fixtures.queries",
+)
+
+# Fixtures used by the prebuilt tests, registered only for enabled categories.
+CATEGORY_FIXTURE_MODULES: Dict[str, Tuple[str, ...]] = {
+    "structure": ("geneweaver.testing.fixtures.changes",),
+    "pyproject": ("geneweaver.testing.fixtures.changes",),
+    "imports": (
+        "geneweaver.testing.fixtures.changes",
+        "geneweaver.testing.fixtures.imports",
+    ),
+    "style": (
+        "geneweaver.testing.fixtures.changes",
+        "geneweaver.testing.fixtures.style",
+    ),
+    "typing": ("geneweaver.testing.fixtures.typing",),
+    "complexity": ("geneweaver.testing.fixtures.complexity",),
+    "coverage": ("geneweaver.testing.fixtures.coverage",),
+    "wheel": (
+        "geneweaver.testing.fixtures.changes",
+        "geneweaver.testing.fixtures.wheel",
+    ),
+}
+
+ALL = "all"
+NODE_PREFIX = "geneweaver-testing"
+PROFILER = "geneweaver-testing-profiler"
+DURATION_RECORDER = "geneweaver-testing-durations"
+SHARDER = "geneweaver-testing-sharder"
+COVERAGE = "geneweaver-testing-coverage"  # Also in fixtures.coverage.
+
+
+def prebuilt_tests(category: str) -> Dict[str, types.FunctionType]:
+    """Get the prebuilt test functions of a category, keyed by name."""
+    tests: Dict[str, types.FunctionType] = {}
+    for module_name in CATEGORIES[category]:
+        module = importlib.import_module(module_name)
+        tests.update((name, getattr(module, name)) for name in module.__all__)
+    return tests
+
+
+def _imported_prebuilt_tests() -> Dict[object, str]:
+    """Get the category of every prebuilt test whose module is already imported.
+
+    Star-imported tests have been imported by their test module, and generated tests
+    by their collector, so no other module of tests needs to be imported.
+    """
+    categories: Dict[object, str] = {}
+    for category, module_names in CATEGORIES.items():
+        for module_name in module_names:
+            module = sys.modules.get(module_name)
+            if module is not None:
+                categories.update(
+                    (getattr(module, name), category) for name in module.__all__
+                )
+    return categories
+
+
+def _expand(categories: Iterable[str]) -> Set[str]:
+    """Expand the ``all`` keyword to every category."""
+    expanded: Set[str] = set()
+    for category in categories:
+        expanded.update(CATEGORIES if category == ALL else (category,))
+    return expanded
+
+
+def enabled_categories(config: pytest.Config) -> List[str]:
+    """Get the categories of prebuilt tests to run, in their defined order.
+
+    The :data:`OPT_IN_CATEGORIES` are off unless enabled. The ini settings
+    ``geneweaver_disable`` and ``geneweaver_enable`` are applied first, then the
+    ``--gw-disable`` and ``--gw-enable`` options, so an option overrides the ini file.
+    """
+    disabled = set(OPT_IN_CATEGORIES) | _expand(config.getini("geneweaver_disable"))
+    disabled -= _expand(config.getini("geneweaver_enable"))
+    disabled |= _expand(config.getoption("gw_disable"))
+    disabled -= _expand(config.getoption("gw_enable"))
+    return [category for category in CATEGORIES if category not in disabled]
+
+
+def prebuilt_enabled(config: pytest.Config) -> bool:
+    """Return True if the prebuilt tests are run in this project.
+
+    The ``geneweaver_prebuilt`` ini setting turns them on or off, and by default they
+    only run in GeneWeaver projects, which have a ``src/geneweaver`` directory.
+    """
+    setting = config.getini("geneweaver_prebuilt")
+    if isinstance(setting, bool):
+        return setting
+    return (config.rootpath / "src" / "geneweaver").is_dir()
+
+
+def _collects_directory(config: pytest.Config) -> bool:
+    """Return True if pytest was asked to collect a whole directory.
+
+    Runs of individual test files or test ids do not get the prebuilt tests.
+    """
+    invocation_dir = pathlib.Path(config.invocation_params.dir)
+    return any((invocation_dir / arg.split("::")[0]).is_dir() for arg in config.args)
+
+
+class PrebuiltTests(pytest.Module):
+    """Collects the prebuilt tests of one category, without importing a test file."""
+
+    category: str
+
+    @classmethod
+    def from_category(
+        cls: Type["PrebuiltTests"], session: pytest.Session, category: str
+    ) -> "PrebuiltTests":
+        """Create the collector for a category of prebuilt tests."""
+        collector = cls.from_parent(
+            session,
+            path=session.config.rootpath / "pyproject.toml",
+            name=category,
+            nodeid=f"{NODE_PREFIX}/{category}",
+        )
+        collector.category = category
+        return collector
+
+    def _getobj(self) -> types.ModuleType:
+        """Build a module holding just this category's tests."""
+        module = types.ModuleType(f"{NODE_PREFIX}.{self.category}")
+        module.__dict__.update(prebuilt_tests(self.category))
+        return module
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the geneweaver-testing options and ini settings."""
+    choices = [*CATEGORIES, ALL]
+    group = parser.getgroup("geneweaver-testing", "GeneWeaver prebuilt tests")
+    group.addoption(
+        "--gw-disable",
+        action="append",
+        default=[],
+        choices=choices,
+        metavar="CATEGORY",
+        help=f"Do not run a category of prebuilt tests, one of: {', '.join(choices)}.",
+    )
+    group.addoption(
+        "--gw-enable",
+        action="append",
+        default=[],
+        choices=choices,
+        metavar="CATEGORY",
+        help="Run a category of prebuilt tests, even if it is off by default or the "
+        "ini file disables it.",
+    )
+    group.addoption(
+        "--gw-changed-since",
+        metavar="REF",
+        help="Only run prebuilt tests whose inputs changed since the merge base with "
+        "a git ref (default: $GENEWEAVER_TESTING_CHANGED_SINCE).",
+    )
+    group.addoption(
+        "--gw-shard",
+        metavar="INDEX/COUNT",
+        help="Only run one of COUNT shards of the tests, split by their recorded "
+        "durations, e.g. 1/4.",
+    )
+    group.addoption(
+        "--gw-record-durations",
+        action="store_true",
+        default=False,
+        help="Record test durations in the pytest cache for --gw-shard, without "
+        "sharding this run.",
+    )
+    group.addoption(
+        "--gw-profile",
+        metavar="DIR",
+        help="Record the duration of every test and fixture, and write JSON, "
+        "collapsed stack and cProfile reports to a directory.",
+    )
+    group.addoption(
+        "--gw-profile-top",
+        type=int,
+        default=5,
+        metavar="N",
+        help="With --gw-profile, profile the N slowest tests with cProfile, by the "
+        "durations recorded in earlier sessions (default: 5).",
+    )
+    group.addoption(
+        "--gw-coverage",
+        action="store_true",
+        default=False,
+        help="Measure line coverage, with sys.monitoring on Python 3.12 and later, "
+        "and write a coverage.py data file.",
+    )
+    group.addoption(
+        "--gw-coverage-file",
+        metavar="PATH",
+        help="With --gw-coverage, the data file to write (default: $COVERAGE_FILE "
+        "or .coverage).",
+    )
+    parser.addini(
+        "geneweaver_disable",
+        type="args",
+        default=[],
+        help="Categories of prebuilt tests not to run.",
+    )
+    parser.addini(
+        "geneweaver_enable",
+        type="args",
+        default=[],
+        help="Categories of prebuilt tests to run that are off by default: "
+        f"{', '.join(OPT_IN_CATEGORIES)}.",
+    )
+    parser.addini(
+        "geneweaver_prebuilt",
+        type="bool",
+        default=None,
+        help="Add the prebuilt tests to the session (default: true in projects with "
+        "a src/geneweaver directory).",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Register the prebuilt test fixtures and markers."""
+    config.addinivalue_line(
+        "markers",
+        "gw_benchmark(**options): override the gw_benchmark fixture's options for a "
+        "test, e.g. threshold=0.1 or min_rounds=20.",
+    )
+    config.addinivalue_line(
+        "markers",
+        "memory(peak=None, net=None, rss_peak=None, rss=False): the default budgets "
+        "of the memory_budget fixture for a test, e.g. peak='50 MB'.",
+    )
+    config.addinivalue_line(
+        "markers",
+        "queries(max_queries=None, max_repeats=5): the default budgets of the "
+        "query_counter fixture for a test, max_repeats=None allows N+1 queries.",
+    )
+    config.addinivalue_line(
+        "markers",
+        "load(**options): the default budgets and options of the load_tester "
+        "fixture for a test, e.g. p99=0.05 or concurrency=20.",
+    )
+    module_names: List[str] = []
+    if prebuilt_enabled(config):
+        module_names.extend(FIXTURE_MODULES)
+        for category in enabled_categories(config):
+            module_names.extend(CATEGORY_FIXTURE_MODULES[category])
+    for module_name in module_names:
+        if not config.pluginmanager.has_plugin(module_name):
+            config.pluginmanager.register(
+                importlib.import_module(module_name), module_name
+            )
+
+    from geneweaver.testing.sharding import DurationRecorder, Sharder, parse_shard
+
+    shard = config.getoption("gw_shard", None)
+    profile_dir = config.getoption("gw_profile", None)
+    recording = shard or profile_dir or config.getoption("gw_record_durations", False)
+    if recording and not config.pluginmanager.has_plugin(DURATION_RECORDER):
+        config.pluginmanager.register(DurationRecorder(config), DURATION_RECORDER)
+    if shard and not config.pluginmanager.has_plugin(SHARDER):
+        try:
+            index, count = parse_shard(shard)
+        except ValueError as error:
+            raise pytest.UsageError(str(error)) from error
+        config.pluginmanager.register(Sharder(index, count), SHARDER)
+
+    if profile_dir and not config.pluginmanager.has_plugin(PROFILER):
+        from geneweaver.testing.profiling import Profiler
+
+        config.pluginmanager.register(
+            Profiler(
+                pathlib.Path(config.invocation_params.dir, profile_dir),
+                config.getoption("gw_profile_top"),
+            ),
+            PROFILER,
+        )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_load_initial_conftests(
+    early_config: pytest.Config, parser: pytest.Parser, args: List[str]
+) -> Iterator[None]:
+    """Start measuring coverage before the conftest files import the project.
+
+    This is the earliest hook a plugin gets, as in pytest-cov, so modules imported
+    by conftest.py files or their plugins are measured from their first line.
+    """
+    if getattr(early_config.known_args_namespace, "gw_coverage", False):
+        _start_coverage(early_config)
+    yield
+
+
+def _start_coverage(config: pytest.Config) -> None:
+    """Register the coverage plugin, and start measuring unless tests run elsewhere."""
+    if config.pluginmanager.has_plugin(COVERAGE):
+        return
+    from geneweaver.testing.linecoverage import (
+        DEFAULT_DATA_FILE,
+        CoverageSession,
+        coverage_sources,
+    )
+    from geneweaver.testing.pyproject import PyProject
+
+    options = config.known_args_namespace
+    root = config.rootpath
+    data_file = getattr(options, "gw_coverage_file", None) or os.environ.get(
+        "COVERAGE_FILE", DEFAULT_DATA_FILE
+    )
+    session = CoverageSession(
+        coverage_sources(
+            root, PyProject.from_path(root / "pyproject.toml").testing_settings
+        ),
+        pathlib.Path(config.invocation_params.dir, data_file),
+        os.environ.get("PYTEST_XDIST_WORKER"),
+    )
+    # The pytest-xdist controller runs no tests, it only combines the data files.
+    # pytest-xdist only sets --dist from -n later, so both are checked.
+    distributed = getattr(options, "dist", "no") != "no" or getattr(
+        options, "numprocesses", None
+    )
+    if not distributed or session.worker is not None:
+        try:
+            session.start()
+        except RuntimeError as error:
+            raise pytest.UsageError(f"--gw-coverage: {error}") from error
+    config.pluginmanager.register(session, COVERAGE)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(
+    session: pytest.Session, config: pytest.Config, items: List[pytest.Item]
+) -> None:
+    """Add the enabled prebuilt tests, and drop star-imported copies of them."""
+    enabled = enabled_categories(config)
+    generate = prebuilt_enabled(config) and _collects_directory(config)
+
+    generated: List[pytest.Item] = []
+    last: List[pytest.Item] = []
+    if generate:
+        for category in enabled:
+            (last if category in LAST_CATEGORIES else generated).extend(
+                session.genitems(PrebuiltTests.from_category(session, category))
+            )
+    categories = _imported_prebuilt_tests()
+
+    seen: Set[Tuple[object, Optional[str]]] = set()
+    kept, deselected = [], []
+    for item in items:
+        function = getattr(item, "function", None)
+        item_category = categories.get(function)
+        if item_category is None:
+            kept.append(item)
+            continue
+        callspec = getattr(item, "callspec", None)
+        key = (function, callspec.id if callspec else None)
+        if generate or item_category not in enabled or key in seen:
+            deselected.append(item)
+        else:
+            seen.add(key)
+            kept.append(item)
+
+    items[:] = generated + kept + last
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+
+
+def pytest_terminal_summary(terminalreporter: pytest.TerminalReporter) -> None:
+    """Report the timings of the tests that used the gw_benchmark fixture."""
+    from geneweaver.testing.fixtures.benchmark import BENCHMARK_RESULTS
+
+    results = terminalreporter.config.stash.get(BENCHMARK_RESULTS, [])
+    if not results:
+        return
+    terminalreporter.write_sep("-", "geneweaver benchmarks")
+    for nodeid, stats in results:
+        terminalreporter.write_line(f"{nodeid}: {stats.summary()}")
@@ -0,0 +1,340 @@
+"""Profile where a test session spends its time, per test and per fixture.
+
+The :class:`Profiler` plugin is registered by the geneweaver-testing pytest plugin
+when profiling is enabled with ``--gw-profile=DIR``. It records the setup, call and
+teardown duration of every test and the setup duration of every fixture, and runs
+the calls of the slowest tests under :mod:`cProfile`. The slowest tests are chosen
+from the durations recorded in the pytest cache by earlier sessions, so the other
+tests run, and are timed, without the profiler's overhead.
+
+At the end of the session it writes to the directory:
+
+* ``profile.json``, the durations of every test and fixture.
+* ``profile.collapsed``, the same durations as collapsed stacks, one
+  ``frame;frame;frame microseconds`` line per stack, with the slowest tests
+  expanded into their python calls. Flame graph tools such as ``flamegraph.pl``,
+  speedscope and inferno read this format.
+* A ``.prof`` file per profiled test, for ``pstats`` or snakeviz.
+"""
+
+import cProfile
+import heapq
+import json
+import os
+import pathlib
+import pstats
+import re
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Set, Tuple
+
+import pytest
+from geneweaver.testing.sharding import DURATIONS_CACHE_KEY
+
+__all__ = [
+    "DEFAULT_PROFILED_ITEMS",
+    "ItemTiming",
+    "FixtureTiming",
+    "ProfileReport",
+    "collapse_stats",
+    "slowest_nodeids",
+    "Profiler",
+]
+
+DEFAULT_PROFILED_ITEMS = 5
+
+# Python calls that took less than this many microseconds are not expanded.
+MIN_STACK_US = 1
+MAX_STACK_DEPTH = 64
+
+Function = Tuple[str, int, str]
+
+
+@dataclass
+class ItemTiming:
+    """How long each phase of a test took, in seconds."""
+
+    nodeid: str
+    setup: float = 0.0
+    call: float = 0.0
+    teardown: float = 0.0
+
+    @property
+    def total(self) -> float:
+        """The time taken by all phases of the test."""
+        return self.setup + self.call + self.teardown
+
+
+@dataclass
+class FixtureTiming:
+    """How long the setups of a fixture took in total, in seconds.
+
+    Only time spent in the fixture itself is counted, not in the fixtures it
+    requested while running.
+    """
+
+    name: str
+    scope: str
+    setups: int = 0
+    total: float = 0.0
+
+
+@dataclass
+class ProfileReport:
+    """The durations recorded by the profiler."""
+
+    items: Dict[str, ItemTiming] = field(default_factory=dict)
+    fixtures: Dict[str, FixtureTiming] = field(default_factory=dict)
+    # The setup time of each fixture, under the test and fixtures that requested it.
+    fixture_stacks: List[Tuple[Tuple[str, ...], float]] = field(default_factory=list)
+    profiles: Dict[str, pstats.Stats] = field(default_factory=dict)
+
+    def slowest_items(self, count: int = 10) -> List[ItemTiming]:
+        """Get the slowest tests, including their setup and teardown."""
+        return heapq.nlargest(count, self.items.values(), key=lambda item: item.total)
+
+    def slowest_fixtures(self, count: int = 10) -> List[FixtureTiming]:
+        """Get the fixtures that took the longest to set up, over all setups."""
+        return heapq.nlargest(
+            count, self.fixtures.values(), key=lambda fixture: fixture.total
+        )
+
+    def to_json(self) -> Dict[str, Any]:
+        """Convert the durations to JSON compatible data, slowest first."""
+        return {
+            "items": [
+                {**asdict(item), "total": item.total}
+                for item in self.slowest_items(len(self.items))
+            ],
+            "fixtures": [
+                asdict(fixture) for fixture in self.slowest_fixtures(len(self.fixtures))
+            ],
+            "profiled": sorted(self.profiles),
+        }
+
+    def collapsed_stacks(self) -> Iterator[str]:
+        """Describe the session as collapsed stacks, in microseconds."""
+        fixture_time: Dict[str, float] = defaultdict(float)
+        for stack, seconds in self.fixture_stacks:
+            fixture_time[stack[0]] += seconds
+            yield _stack_line(stack[:1] + ("setup",) + stack[1:], seconds)
+
+        for item in self.items.values():
+            setup = item.setup - fixture_time.get(item.nodeid, 0.0)
+            yield _stack_line((item.nodeid, "setup"), setup)
+            stats = self.profiles.get(item.nodeid)
+            if stats is None:
+                yield _stack_line((item.nodeid, "call"), item.call)
+            else:
+                for frames, seconds in collapse_stats(stats):
+                    yield _stack_line((item.nodeid, "call", *frames), seconds)
+            yield _stack_line((item.nodeid, "teardown"), item.teardown)
+
+
+def _stack_line(frames: Tuple[str, ...], seconds: float) -> str:
+    """Format a collapsed stack line, frames must not contain the separator."""
+    stack = ";".join(frame.replace(";", ":") for frame in frames)
+    return f"{stack} {max(0, round(seconds * 1e6))}"
+
+
+def _frame_name(function: Function) -> str:
+    """Name a python function the way it is shown in a flame graph."""
+    filename, lineno, name = function
+    if filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def collapse_stats(stats: pstats.Stats) -> Iterator[Tuple[Tuple[str, ...], float]]:
+    """Rebuild approximate call stacks from a profile, with the seconds spent in each.
+
+    A profile only records time per caller and callee pair, so a function's time is
+    split between the paths that reach it in proportion to the time each caller
+    spent in it. Recursive calls are folded into the first call, and paths that
+    took under :data:`MIN_STACK_US` are not expanded.
+    """
+    entries: Dict[Function, Tuple[Any, ...]] = stats.stats  # type: ignore[attr-defined]
+    callees: Dict[Function, Dict[Function, float]] = defaultdict(dict)
+    for function, (*_, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees[caller][function] = edge[3]
+
+    def walk(
+        function: Function, path: Tuple[str, ...], seconds: float
+    ) -> Iterator[Tuple[Tuple[str, ...], float]]:
+        _, _, own, cumulative, _ = entries[function]
+        share = seconds / cumulative if cumulative else 0.0
+        path = (*path, _frame_name(function))
+        yield path, own * share
+        if len(path) >= MAX_STACK_DEPTH:
+            return
+        for callee, edge_seconds in callees[function].items():
+            callee_seconds = edge_seconds * share
+            if callee_seconds * 1e6 >= MIN_STACK_US and callee in entries:
+                if _frame_name(callee) not in path:
+                    yield from walk(callee, path, callee_seconds)
+
+    for function, (*_, cumulative, callers) in entries.items():
+        if not callers:
+            yield from walk(function, (), cumulative)
+
+
+def slowest_nodeids(
+    nodeids: List[str], durations: Mapping[str, float], count: int
+) -> Set[str]:
+    """Choose the tests to profile, by their recorded durations.
+
+    :param nodeids: The collected tests.
+    :param durations: The recorded duration of each test, in seconds.
+    :param count: The number of tests to choose.
+    :return: The slowest tests that have a recorded duration.
+    """
+    recorded = [nodeid for nodeid in nodeids if nodeid in durations]
+    return set(heapq.nlargest(count, recorded, key=durations.__getitem__))
+
+
+def _profile_name(nodeid: str) -> str:
+    """Turn a test id into a file name."""
+    return re.sub(r"[^\w.-]+", "_", nodeid).strip("_") + ".prof"
+
+
+class Profiler:
+    """Pytest plugin that records durations, see the module documentation."""
+
+    def __init__(
+        self, output: pathlib.Path, profiled_items: int = DEFAULT_PROFILED_ITEMS
+    ) -> None:
+        """Configure the profiler.
+
+        :param output: The directory to write the reports to.
+        :param profiled_items: The number of slowest tests to keep profiles of.
+        """
+        self.output = output
+        self.profiled_items = profiled_items
+        self.report = ProfileReport()
+        self.profile_error: Optional[str] = None
+        self._profiled: Set[str] = set()
+        self._fixture_stack: List[Tuple[str, float]] = []
+        self._item: Optional[pytest.Item] = None
+
+    def _timing(self, nodeid: str) -> ItemTiming:
+        return self.report.items.setdefault(nodeid, ItemTiming(nodeid))
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(
+        self, config: pytest.Config, items: List[pytest.Item]
+    ) -> None:
+        """Choose the tests to profile from the durations recorded before."""
+        store = getattr(config, "cache", None)
+        durations = (store.get(DURATIONS_CACHE_KEY, None) or {}) if store else {}
+        self._profiled = slowest_nodeids(
+            [item.nodeid for item in items], durations, self.profiled_items
+        )
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: pytest.Item) -> Iterator[None]:
+        """Track the test running, so fixtures are attributed to it."""
+        self._item = item
+        yield
+        self._item = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef: pytest.FixtureDef) -> Iterator[None]:
+        """Time a fixture's setup, excluding fixtures it requested while running."""
+        nodeid = self._item.nodeid if self._item is not None else "<session>"
+        self._fixture_stack.append((fixturedef.argname, 0.0))
+        started = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - started
+        name, children = self._fixture_stack.pop()
+        own = elapsed - children
+        if self._fixture_stack:
+            parent, parent_children = self._fixture_stack[-1]
+            self._fixture_stack[-1] = (parent, parent_children + elapsed)
+
+        timing = self.report.fixtures.setdefault(
+            name, FixtureTiming(name, fixturedef.scope)
+        )
+        timing.setups += 1
+        timing.total += own
+        stack = (nodeid, *(frame for frame, _ in self._fixture_stack), name)
+        self.report.fixture_stacks.append((stack, own))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item: pytest.Item) -> Iterator[None]:
+        """Profile the call of a test if it is one of the slowest."""
+        if item.nodeid not in self._profiled:
+            yield
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as error:
+            # Python 3.12+ allows only one profiler at a time, e.g. under a debugger.
+            self.profile_error = str(error)
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
+        # A rerun test keeps the profile of its last run.
+        self.report.profiles[item.nodeid] = pstats.Stats(profile)
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        """Record the duration of a phase of a test."""
+        setattr(self._timing(report.nodeid), report.when, report.duration)
+
+    def write(self) -> List[pathlib.Path]:
+        """Write the reports to the output directory.
+
+        :return: The paths written.
+        """
+        self.output.mkdir(parents=True, exist_ok=True)
+        # Under pytest-xdist every worker writes its own reports.
+        suffix = os.environ.get("PYTEST_XDIST_WORKER", "")
+        suffix = f"-{suffix}" if suffix else ""
+        report_path = self.output / f"profile{suffix}.json"
+        report_path.write_text(json.dumps(self.report.to_json(), indent=2))
+        stacks_path = self.output / f"profile{suffix}.collapsed"
+        stacks_path.write_text(
+            "".join(f"{line}\n" for line in self.report.collapsed_stacks())
+        )
+        paths = [report_path, stacks_path]
+        for nodeid, stats in self.report.profiles.items():
+            path = self.output / _profile_name(nodeid)
+            stats.dump_stats(path)
+            paths.append(path)
+        return paths
+
+    def pytest_terminal_summary(
+        self, terminalreporter: pytest.TerminalReporter
+    ) -> None:
+        """Write the reports, and list the slowest tests and fixtures."""
+        paths = self.write()
+        terminalreporter.write_sep("-", "geneweaver profile")
+        terminalreporter.write_line("slowest tests (setup / call / teardown):")
+        for item in self.report.slowest_items():
+            profiled = " [profiled]" if item.nodeid in self.report.profiles else ""
+            terminalreporter.write_line(
+                f"  {item.total:8.3f}s  {item.nodeid} "
+                f"({item.setup:.3f} / {item.call:.3f} / {item.teardown:.3f})"
+                f"{profiled}"
+            )
+        terminalreporter.write_line("slowest fixtures (total setup time):")
+        for fixture in self.report.slowest_fixtures():
+            terminalreporter.write_line(
+                f"  {fixture.total:8.3f}s  {fixture.name} "
+                f"[{fixture.scope}, {fixture.setups} setups]"
+            )
+        if self.profile_error is not None:
+            terminalreporter.write_line(
+                f"tests were not profiled, another profiler is active: "
+                f"{self.profile_error}"
+            )
+        elif self.profiled_items and not self._profiled:
+            terminalreporter.write_line(
+                "no durations were recorded yet, run again to profile the slowest tests"
+            )
+        terminalreporter.write_line(f"reports written to {paths[0].parent}")
@@ -0,0 +1,150 @@
+"""A parsed, validated and read-only model of a project's pyproject.toml file.
+
+The model is built once per session by the ``pyproject`` fixture. Every section the
+prebuilt tests look at is resolved up front, and all nested tables and arrays are
+frozen, so tests cannot change what later tests see.
+"""
+
+import pathlib
+from types import MappingProxyType
+from typing import Any, FrozenSet, Mapping, Optional, Tuple, Type
+
+__all__ = ["POETRY_KEYS", "PyProject", "freeze", "submodule_name"]
+
+POETRY_KEYS = (
+    "name",
+    "version",
+    "description",
+    "authors",
+    "license",
+    "readme",
+    "packages",
+    "homepage",
+    "repository",
+)
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+def freeze(value: Any) -> Any:  # noqa: ANN401
+    """Recursively convert tables to read-only mappings and arrays to tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def submodule_name(package_name: Optional[str]) -> Optional[str]:
+    """Get the geneweaver submodule name from a package name.
+
+    For example, ``geneweaver-api-client`` is the ``geneweaver.api_client`` module.
+    """
+    return "_".join(package_name.split("-")[1:]) if package_name else None
+
+
+def _table(parent: Mapping[str, Any], key: str) -> Optional[Mapping[str, Any]]:
+    """Get a sub-table, or None if it is missing or not a table."""
+    value = parent.get(key)
+    return value if isinstance(value, Mapping) else None
+
+
+class PyProject:
+    """A read-only view of pyproject.toml with its sections pre-computed.
+
+    Missing sections are exposed as empty mappings, so lookups never raise, and the
+    ``has_*`` attributes record whether each section was actually present. Settings
+    for the prebuilt tests are read from the ``[tool.geneweaver.testing]`` table.
+    """
+
+    __slots__ = (
+        "exists",
+        "contents",
+        "tool",
+        "poetry",
+        "build_system",
+        "ruff",
+        "ruff_select",
+        "ruff_per_file_ignores",
+        "has_poetry",
+        "has_build_system",
+        "has_ruff",
+        "has_ruff_select",
+        "missing_poetry_keys",
+        "package_name",
+        "package_submodule_name",
+        "testing_settings",
+    )
+
+    exists: bool
+    contents: Mapping[str, Any]
+    tool: Mapping[str, Any]
+    poetry: Mapping[str, Any]
+    build_system: Mapping[str, Any]
+    ruff: Mapping[str, Any]
+    ruff_select: Tuple[str, ...]
+    ruff_per_file_ignores: Optional[Mapping[str, Tuple[str, ...]]]
+    has_poetry: bool
+    has_build_system: bool
+    has_ruff: bool
+    has_ruff_select: bool
+    missing_poetry_keys: FrozenSet[str]
+    package_name: Optional[str]
+    package_submodule_name: Optional[str]
+    testing_settings: Mapping[str, Any]
+
+    def __init__(self, contents: Optional[Mapping[str, Any]]) -> None:
+        """Build the model from the parsed contents of a pyproject.toml file.
+
+        :param contents: The parsed file, or None if there is no pyproject.toml.
+        """
+        frozen = freeze(contents) if contents is not None else _EMPTY
+        tool = _table(frozen, "tool") or _EMPTY
+        poetry = _table(tool, "poetry")
+        build_system = _table(frozen, "build-system")
+        ruff = _table(tool, "ruff")
+        select = (ruff or _EMPTY).get("select")
+        package_name = (poetry or _EMPTY).get("name")
+        geneweaver = _table(tool, "geneweaver") or _EMPTY
+
+        values = {
+            "exists": contents is not None,
+            "contents": frozen,
+            "tool": tool,
+            "poetry": poetry or _EMPTY,
+            "build_system": build_system or _EMPTY,
+            "ruff": ruff or _EMPTY,
+            "ruff_select": tuple(select or ()),
+            "ruff_per_file_ignores": (ruff or _EMPTY).get("per-file-ignores"),
+            "has_poetry": poetry is not None,
+            "has_build_system": build_system is not None,
+            "has_ruff": ruff is not None,
+            "has_ruff_select": select is not None,
+            "missing_poetry_keys": frozenset(
+                key for key in POETRY_KEYS if key not in (poetry or _EMPTY)
+            ),
+            "package_name": package_name,
+            "package_submodule_name": submodule_name(package_name),
+            "testing_settings": _table(geneweaver, "testing") or _EMPTY,
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def from_path(cls: Type["PyProject"], path: pathlib.Path) -> "PyProject":
+        """Read and model a pyproject.toml file, which may not exist."""
+        from geneweaver.testing.fixtures.package import read_pyproject_toml
+
+        return cls(read_pyproject_toml(path) if path.is_file() else None)
+
+    def __setattr__(self, name: str, value: Any) -> None:  # noqa: ANN401
+        """Prevent the model from being changed after it is built."""
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name: str) -> None:
+        """Prevent the model from being changed after it is built."""
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __repr__(self) -> str:
+        """Show the modelled file contents."""
+        return f"{type(self).__name__}({dict(self.contents)!r})"
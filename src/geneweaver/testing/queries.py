@@ -0,0 +1,336 @@
+"""Count the SQL statements a block of code runs, and find N+1 query patterns.
+
+A :class:`QueryRecorder` records every statement executed while a ``with`` block
+runs, with how long it took. Statements are executed through either:
+
+* connections wrapped with :meth:`QueryRecorder.wrap`, which works with any DB-API
+  driver, including :mod:`sqlite3`, or
+* cursor classes whose ``execute`` methods are patched while the block runs, by
+  default :class:`psycopg.Cursor` when psycopg is imported.
+
+Each statement is normalized by replacing literals and parameters with ``?``, so the
+same query run with different values, the usual sign of a query in a loop, is
+reported as one repeated statement.
+"""
+
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import wraps
+from types import TracebackType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
+
+__all__ = [
+    "DEFAULT_MAX_REPEATS",
+    "Query",
+    "QueryReport",
+    "QueryRecorder",
+    "normalize_statement",
+    "query_failures",
+]
+
+# A statement run more often than this in one block is reported as a likely N+1.
+DEFAULT_MAX_REPEATS = 5
+SUMMARY_STATEMENTS = 10
+
+_PATCHED_METHODS = ("execute", "executemany")
+_MISSING = object()
+
+_NORMALIZE = [
+    (re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL), " "),
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"%\(\w+\)s|%s|\$\d+|(?<!:):\w+"), "?"),
+    (re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?(?!\w)", re.IGNORECASE), "?"),
+    (re.compile(r"\?(?:\s*,\s*\?)+"), "?"),
+    (re.compile(r"\(\s*\?\s*\)(?:\s*,\s*\(\s*\?\s*\))+"), "(?)"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def normalize_statement(statement: str) -> str:
+    """Replace the literals and parameters in a statement with ``?``.
+
+    Comments are removed, whitespace is collapsed, and lists of values such as
+    ``IN (1, 2, 3)`` or the rows of a ``VALUES`` clause are collapsed to one value.
+    """
+    for pattern, replacement in _NORMALIZE:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip().rstrip(";").rstrip()
+
+
+def _statement_text(statement: Any, context: Any = None) -> str:  # noqa: ANN401
+    """Get the text of a statement, which drivers also accept as bytes or objects."""
+    if isinstance(statement, str):
+        return statement
+    if isinstance(statement, bytes):
+        return statement.decode("utf-8", errors="replace")
+    as_string = getattr(statement, "as_string", None)
+    if as_string is not None:
+        try:
+            return str(as_string(context))
+        except Exception:  # noqa: BLE001
+            pass
+    return str(statement)
+
+
+@dataclass(frozen=True)
+class Query:
+    """A statement that was executed, and how long it took in seconds."""
+
+    statement: str
+    normalized: str
+    duration: float
+    many: bool = False
+
+
+@dataclass
+class QueryReport:
+    """The statements executed while a block of code ran."""
+
+    queries: List[Query] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        """The number of statements executed."""
+        return len(self.queries)
+
+    @property
+    def total_time(self) -> float:
+        """The time spent executing statements, in seconds."""
+        return sum(query.duration for query in self.queries)
+
+    def repeated(self, minimum: int = 2) -> Dict[str, int]:
+        """Get the normalized statements executed at least a number of times.
+
+        :param minimum: The fewest executions to report a statement.
+        :return: The number of executions of each statement, most executed first.
+        """
+        counts = Counter(query.normalized for query in self.queries)
+        return {
+            statement: count
+            for statement, count in counts.most_common()
+            if count >= minimum
+        }
+
+    def summary(self) -> str:
+        """Describe the statements, most repeated first."""
+        lines = [f"{self.count} queries in {self.total_time * 1000:.1f}ms"]
+        counts = Counter(query.normalized for query in self.queries)
+        lines.extend(
+            f"  {count} x {statement}"
+            for statement, count in counts.most_common(SUMMARY_STATEMENTS)
+        )
+        return "\n".join(lines)
+
+
+def query_failures(
+    report: QueryReport,
+    max_queries: Optional[int] = None,
+    max_repeats: Optional[int] = DEFAULT_MAX_REPEATS,
+) -> List[str]:
+    """Compare a report against query budgets.
+
+    :param report: The statements executed by a block of code.
+    :param max_queries: The most statements the block may execute.
+    :param max_repeats: The most times the block may execute the same normalized
+    statement, None to allow any number.
+    :return: A description of each budget that was exceeded.
+    """
+    failures = []
+    if max_queries is not None and report.count > max_queries:
+        failures.append(f"{report.count} queries is over the budget of {max_queries}")
+    if max_repeats is not None:
+        failures.extend(
+            f"{statement!r} ran {count} times, a likely N+1 query"
+            for statement, count in report.repeated(max_repeats + 1).items()
+        )
+    return failures
+
+
+class _Tracked:
+    """Wraps a DB-API cursor or connection, recording the statements it executes."""
+
+    def __init__(self, target: object, recorder: "QueryRecorder") -> None:
+        self._target = target
+        self._recorder = recorder
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        return getattr(self._target, name)
+
+    def __enter__(self) -> "_Tracked":
+        self._target.__enter__()  # type: ignore[attr-defined]
+        return self
+
+    def __exit__(self, *exc_info: object) -> Optional[bool]:
+        return self._target.__exit__(*exc_info)  # type: ignore[attr-defined]
+
+    def _result(self, result: object) -> object:
+        return self if result is self._target else result
+
+    def _run(
+        self, method: str, statement: object, args: Sequence[object], kwargs: Dict
+    ) -> object:
+        return self._result(
+            self._recorder.call(
+                getattr(self._target, method),
+                self._target,
+                statement,
+                method == "executemany",
+                args,
+                kwargs,
+            )
+        )
+
+    def execute(self, statement: object, *args: object, **kwargs: object) -> object:
+        return self._run("execute", statement, args, kwargs)
+
+    def executemany(self, statement: object, *args: object, **kwargs: object) -> object:
+        return self._run("executemany", statement, args, kwargs)
+
+
+class _TrackedCursor(_Tracked):
+    """A DB-API cursor that records the statements it executes."""
+
+    def __iter__(self) -> Iterator[object]:
+        return iter(self._target)  # type: ignore[call-overload]
+
+
+class _TrackedConnection(_Tracked):
+    """A DB-API connection whose cursors record the statements they execute."""
+
+    def cursor(self, *args: object, **kwargs: object) -> _TrackedCursor:
+        cursor = self._target.cursor(*args, **kwargs)  # type: ignore[attr-defined]
+        return _TrackedCursor(cursor, self._recorder)
+
+    def _result(self, result: object) -> object:
+        # Shortcuts such as sqlite3's Connection.execute return a new cursor.
+        return _TrackedCursor(result, self._recorder)
+
+
+def _default_cursor_classes() -> List[type]:
+    """Get the cursor classes of drivers that are imported and can be patched."""
+    psycopg = sys.modules.get("psycopg")
+    if psycopg is None:
+        return []
+    return [
+        cursor
+        for cursor in (getattr(psycopg, "Cursor", None),)
+        if isinstance(cursor, type)
+    ]
+
+
+class QueryRecorder:
+    """Records the statements executed within a ``with`` block.
+
+    The report is also available as :attr:`report` once the block exits. A recorder
+    can be entered again, starting a new report, and statements executed by a wrapped
+    connection outside of the block are not recorded.
+    """
+
+    def __init__(self, cursor_classes: Optional[Sequence[type]] = None) -> None:
+        """Configure the recorder.
+
+        :param cursor_classes: Cursor classes to patch while the block runs, by
+        default psycopg's, if it is imported.
+        """
+        self.cursor_classes = cursor_classes
+        self.report = QueryReport()
+        self._active = False
+        self._patched: List[Tuple[type, str, object]] = []
+        # Drivers may execute statements by calling their own patched methods, only
+        # the outermost call is recorded.
+        self._local = threading.local()
+
+    def wrap(self, connection: object) -> Any:  # noqa: ANN401
+        """Wrap a DB-API connection, so the statements it executes are recorded."""
+        return _TrackedConnection(connection, self)
+
+    def call(
+        self,
+        method: Callable[..., Any],
+        context: object,
+        statement: object,
+        many: bool,
+        args: Iterable[object],
+        kwargs: Dict[str, Any],
+    ) -> Any:  # noqa: ANN401
+        """Execute a statement, recording it if the block is running.
+
+        :param method: The driver's execute method.
+        :param context: The cursor or connection, to render composed statements.
+        :param statement: The statement to execute.
+        :param many: Whether the statement is executed for many sets of parameters.
+        :param args: The other arguments of the method.
+        :param kwargs: The keyword arguments of the method.
+        :return: What the method returned.
+        """
+        if not self._active or getattr(self._local, "executing", False):
+            return method(statement, *args, **kwargs)
+        self._local.executing = True
+        started = time.perf_counter()
+        try:
+            return method(statement, *args, **kwargs)
+        finally:
+            duration = time.perf_counter() - started
+            self._local.executing = False
+            text = _statement_text(statement, context)
+            self.report.queries.append(
+                Query(text, normalize_statement(text), duration, many)
+            )
+
+    def _patch(self, cls: type, name: str) -> None:
+        original = cls.__dict__.get(name, _MISSING)
+        method = getattr(cls, name)
+        recorder = self
+        many = name == "executemany"
+
+        @wraps(method)
+        def execute(
+            cursor: object, statement: object, *args: object, **kwargs: object
+        ) -> Any:  # noqa: ANN401
+            return recorder.call(
+                method.__get__(cursor), cursor, statement, many, args, kwargs
+            )
+
+        setattr(cls, name, execute)
+        self._patched.append((cls, name, original))
+
+    def __enter__(self) -> QueryReport:
+        """Start recording, patching the cursor classes."""
+        self.report = QueryReport()
+        classes = self.cursor_classes
+        for cls in _default_cursor_classes() if classes is None else classes:
+            for name in _PATCHED_METHODS:
+                if hasattr(cls, name):
+                    self._patch(cls, name)
+        self._active = True
+        return self.report
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Stop recording, restoring the cursor classes."""
+        self._active = False
+        while self._patched:
+            cls, name, original = self._patched.pop()
+            if original is _MISSING:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, original)
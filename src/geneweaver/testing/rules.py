@@ -0,0 +1,577 @@
+"""Declarative project policy rules, evaluated in a single pass.
+
+Each :class:`Rule` is a named check that returns a failure message, or None when the
+rule passes. :data:`PYPROJECT_RULES` check the :class:`PyProject` model and
+:data:`STRUCTURE_RULES` check a :class:`ProjectLayout`. :func:`evaluate` runs every
+rule once and collects the failures. The prebuilt tests read their verdicts from that
+result, and the same evaluator can be used directly to check many projects quickly::
+
+    from geneweaver.testing.rules import evaluate_path
+
+    failures = evaluate_path(pathlib.Path("some-repo/pyproject.toml"))
+"""
+
+import pathlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple, Type
+
+from geneweaver.testing.index import ProjectIndex
+from geneweaver.testing.pyproject import PyProject
+
+__all__ = [
+    "POETRY_ERROR_MESSAGE",
+    "REQUIRED_RUFF_RULES",
+    "RUFF_ERROR_MSG",
+    "PER_FILES_IGNORES_MSG",
+    "IGNORING_ALLOWED_WARN",
+    "Rule",
+    "PYPROJECT_RULES",
+    "ProjectLayout",
+    "STRUCTURE_RULES",
+    "evaluate",
+    "evaluate_path",
+    "assert_rule_passes",
+]
+
+POETRY_ERROR_MESSAGE = (
+    "see https://python-poetry.org/docs/ for information on getting started with "
+    "Python Poetry"
+)
+
+REQUIRED_RUFF_RULES = {
+    "F": "PyFlakes",
+    "E": "PyCodeStyle Errors",
+    "W": "PyCodeStyle Warnings",
+    "A": "Builtins",
+    "C90": "McCabe Complexity",
+    "N": "PEP8 Naming",
+    "B": "Bandit (security)",
+    "ANN": "Flake8 Annotations",
+    "D": "PyDocStyle",
+    "I": "Isort",
+    "ERA": "Eradicate (dead code)",
+    "PD": "Pandas Specific Linting",
+    "NPY": "NumPy Speficic Linting",
+    "PT": "PyTest Style",
+}
+
+RUFF_ERROR_MSG = (
+    "\n\npyproject.toml `ruff` section should look like: \n"
+    "[tool.ruff]\n"
+    f"select = {list(REQUIRED_RUFF_RULES.keys())}"
+)
+
+PER_FILES_IGNORES_MSG = (
+    "pyproject.toml [tool.ruff.per-file-ignores] is only allowed to specify "
+    "`tests/*`, `src/*`, and/or one controller "
+    "(e.g. `src/geneweaver/api/controller/*`)."
+    "\nIt should look like: \n\n"
+    "[tool.ruff.per-file-ignores]\n"
+    '"tests/*" = ["ANN201", "ANN101"]\n'
+    '"src/*" = ["ANN101"]\n\n'
+    "You can optionally ignore argument type annotations (`ANN001`) in `tests/*`, but "
+    "it is not recommended.\n\n"
+    "NOTE: API controller definitions have an additional per-file-ignore for"
+    '["B008", "ANN201"]. \n'
+    "You can define one controller per-file-ignore that adds "
+    "some combination of those code.\nFor example:\n\n"
+    '"src/geneweaver/aon/controller/*" = ["B008", "ANN201"]'
+)
+
+IGNORING_ALLOWED_WARN = (
+    "\n\nGeneweaver allows ignoring argument and return type annotations in "
+    "tests.\nMost tests return nothing, and so it is not necessary to specify "
+    "`-> None` for every test.\n"
+    "It is recommended not to ignore argument type annotations, but is allowed "
+    "at the discretion of the developer.\n\n"
+    "To ignore return type annotations in test, add the following to you "
+    "pyproject.toml file:\n\n"
+    '[tool.ruff.per-file-ignores]\n"tests/*" = ["ANN201", "ANN101"]\n'
+    "To ignore return and argument type annotations in test, add the following "
+    "to you pyproject.toml file:\n\n"
+    '[tool.ruff.per-file-ignores]\n"tests/*" = ["ANN001", "ANN201"]\n'
+)
+
+_NO_RUFF_SECTION = (
+    "pyproject.toml file does not have a [tool.ruff] section\n"
+    "see https://beta.ruff.rs/docs/configuration/ for more information."
+) + RUFF_ERROR_MSG
+
+_NO_RUFF_SELECT = (
+    "pyproject.toml [ruff.tool] section missing 'select' key."
+) + RUFF_ERROR_MSG
+
+Check = Callable[[Any], Optional[str]]
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A single project policy.
+
+    :param id: A unique, stable identifier for the rule.
+    :param description: What the rule requires.
+    :param check: Called with the subject of the rule table (e.g. the
+    :class:`PyProject`), returns a failure message, or None if the rule passes.
+    """
+
+    id: str  # noqa: A003
+    description: str
+    check: Check
+
+
+def _pyproject_exists(pyproject: PyProject) -> Optional[str]:
+    if pyproject.exists:
+        return None
+    return (
+        "pyproject.toml file not found, "
+        "you may need to create one at the root of your git repository. "
+        f"{POETRY_ERROR_MESSAGE}"
+    )
+
+
+def _tool_poetry(pyproject: PyProject) -> Optional[str]:
+    if pyproject.has_poetry:
+        return None
+    return (
+        "pyproject.toml file does not have a [tool.poetry] section, "
+        f"{POETRY_ERROR_MESSAGE}"
+    )
+
+
+def _poetry_value(
+    key: str,
+    missing: str,
+    empty: Optional[str] = None,
+    expected: Optional[Tuple[str, str]] = None,
+) -> Check:
+    """Build a check that a [tool.poetry] key is set, non-empty and/or a value.
+
+    :param key: The [tool.poetry] key to check.
+    :param missing: The message when the key is missing.
+    :param empty: The message when the value is empty, if it must not be.
+    :param expected: The required value and the message when it is different.
+    """
+
+    def check(pyproject: PyProject) -> Optional[str]:
+        if key in pyproject.missing_poetry_keys:
+            return missing
+        value = pyproject.poetry[key]
+        if empty is not None and not value:
+            return empty
+        if expected is not None and value != expected[0]:
+            return expected[1]
+        return None
+
+    return check
+
+
+def _packages_from_src(pyproject: PyProject) -> Optional[str]:
+    error_msg = (
+        "all packages must be defined in the `src` directory, see "
+        "https://python-poetry.org/docs/pyproject/#packages for more information."
+    )
+    for package in pyproject.poetry.get("packages", ()):
+        if "from" not in package:
+            return (
+                "pyproject.toml file does not have a `from` definition for a package. "
+                f"{error_msg}"
+            )
+        if package["from"] != "src":
+            return error_msg
+    return None
+
+
+def _packages_in_geneweaver_namespace(pyproject: PyProject) -> Optional[str]:
+    for package in pyproject.poetry.get("packages", ()):
+        if "include" not in package:
+            return (
+                "pyproject.toml file does not have an `include` definition for a "
+                "package."
+            )
+        if package["include"].split("/")[0] != "geneweaver":
+            return (
+                "all Geneweaver packages must be located in the `geneweaver` "
+                "namespace package. See https://peps.python.org/pep-0420/ for more "
+                "information."
+            )
+    return None
+
+
+def _ruff_section(pyproject: PyProject) -> Optional[str]:
+    if pyproject.has_ruff:
+        return None
+    return (
+        "pyproject.toml file does not have a [ruff] section see"
+        "https://beta.ruff.rs/docs/configuration/ for more information."
+    )
+
+
+def _ruff_select(pyproject: PyProject) -> Optional[str]:
+    if not pyproject.has_ruff:
+        return _NO_RUFF_SECTION
+    if not pyproject.has_ruff_select:
+        return _NO_RUFF_SELECT
+    return None
+
+
+def _ruff_required_rule(code: str) -> Check:
+    def check(pyproject: PyProject) -> Optional[str]:
+        problem = _ruff_select(pyproject)
+        if problem is None and code not in pyproject.ruff_select:
+            problem = (
+                f"pyproject.toml [tool.ruff] select = section missing rule `{code}`."
+            ) + RUFF_ERROR_MSG
+        return problem
+
+    return check
+
+
+def _ruff_no_other_specifications(pyproject: PyProject) -> Optional[str]:
+    problem = _ruff_select(pyproject)
+    if problem is not None:
+        return problem
+    if len(pyproject.ruff_select) != len(REQUIRED_RUFF_RULES):
+        return (
+            "pyproject.toml [tool.ruff] select = section has other specifications."
+        ) + RUFF_ERROR_MSG
+    # You can optionally ignore argument and return type annotations in tests.
+    ruff_section_length = 2 if pyproject.ruff_per_file_ignores else 1
+    if len(pyproject.ruff) != ruff_section_length:
+        return (
+            "pyproject.toml [tool.ruff] section has non-standard specifications."
+        ) + RUFF_ERROR_MSG
+    return None
+
+
+def _tests_per_file_ignore_allowed(per_files_ignores: Mapping) -> bool:
+    ignores = per_files_ignores.get("tests/*")
+    return (
+        ignores is not None
+        and len(ignores) in (1, 2, 3)
+        and all(ignore in ("ANN101", "ANN201", "ANN001") for ignore in ignores)
+    )
+
+
+def _src_per_file_ignore_allowed(per_files_ignores: Mapping) -> bool:
+    ignores = per_files_ignores.get("src/*")
+    return ignores is not None and tuple(ignores) == ("ANN101",)
+
+
+def _controller_per_file_ignore_allowed(per_files_ignores: Mapping) -> bool:
+    controller_key = next((k for k in per_files_ignores if "controller" in k), None)
+    return controller_key is not None and set(per_files_ignores[controller_key]) <= {
+        "B008",
+        "ANN201",
+    }
+
+
+def _ruff_per_file_ignores(pyproject: PyProject) -> Optional[str]:
+    if not pyproject.has_ruff:
+        return RUFF_ERROR_MSG
+    per_files_ignores = pyproject.ruff_per_file_ignores
+    if not per_files_ignores:
+        return None
+
+    if len(per_files_ignores) == 3:
+        allowed = (
+            _tests_per_file_ignore_allowed(per_files_ignores)
+            and _src_per_file_ignore_allowed(per_files_ignores)
+            and _controller_per_file_ignore_allowed(per_files_ignores)
+        )
+    elif len(per_files_ignores) == 2:
+        allowed = _tests_per_file_ignore_allowed(
+            per_files_ignores
+        ) and _src_per_file_ignore_allowed(per_files_ignores)
+    elif len(per_files_ignores) == 1 and "src/*" in per_files_ignores:
+        allowed = _src_per_file_ignore_allowed(per_files_ignores)
+    elif len(per_files_ignores) == 1 and "tests/*" in per_files_ignores:
+        allowed = _tests_per_file_ignore_allowed(per_files_ignores)
+    else:
+        allowed = False
+    return None if allowed else PER_FILES_IGNORES_MSG
+
+
+PYPROJECT_RULES: Tuple[Rule, ...] = (
+    Rule("pyproject-toml", "pyproject.toml exists", _pyproject_exists),
+    Rule("tool-poetry", "has a [tool.poetry] section", _tool_poetry),
+    Rule(
+        "poetry-name",
+        "[tool.poetry] sets the package name",
+        _poetry_value(
+            "name",
+            "You need to define the package name as `name = ` "
+            "in the [tool.poetry] section of the pyproject.toml file",
+        ),
+    ),
+    Rule(
+        "poetry-version",
+        "[tool.poetry] sets a version",
+        _poetry_value(
+            "version",
+            "pyproject.toml file does not have a version in the [tool.poetry] section",
+        ),
+    ),
+    Rule(
+        "poetry-description",
+        "[tool.poetry] sets a description",
+        _poetry_value(
+            "description",
+            "pyproject.toml file does not have a description "
+            "set in the [tool.poetry] section",
+            empty="pyproject.toml file does not have a value for "
+            "description in the [tool.poetry] section",
+        ),
+    ),
+    Rule(
+        "poetry-authors",
+        "[tool.poetry] lists authors",
+        _poetry_value(
+            "authors",
+            "pyproject.toml file does not have an authors section",
+            empty="pyproject.toml file does not have any authors listed",
+        ),
+    ),
+    Rule(
+        "poetry-license",
+        "[tool.poetry] license is Apache-2.0",
+        _poetry_value(
+            "license",
+            "pyproject.toml file does not have a license section",
+            empty="pyproject.toml file does not have a value for the license",
+            expected=(
+                "Apache-2.0",
+                "license in pyproject.toml file must be set to Apache-2.0",
+            ),
+        ),
+    ),
+    Rule(
+        "poetry-readme",
+        "[tool.poetry] readme is README.md",
+        _poetry_value(
+            "readme",
+            "pyproject.toml file does not have a readme section",
+            expected=(
+                "README.md",
+                'readme in pyproject.toml file must be "README.md"',
+            ),
+        ),
+    ),
+    Rule(
+        "poetry-packages",
+        "[tool.poetry] lists packages",
+        _poetry_value(
+            "packages",
+            "pyproject.toml file does not have a packages section",
+            empty="pyproject.toml file does not have any packages listed",
+        ),
+    ),
+    Rule(
+        "poetry-homepage",
+        "[tool.poetry] sets a homepage",
+        _poetry_value(
+            "homepage",
+            "pyproject.toml file does not have a homepage section",
+            empty="pyproject.toml file does not have a value for the homepage",
+        ),
+    ),
+    Rule(
+        "poetry-repository",
+        "[tool.poetry] sets a repository",
+        _poetry_value(
+            "repository",
+            "pyproject.toml file does not have a repository section",
+            empty="pyproject.toml file does not have a value for the repository",
+        ),
+    ),
+    Rule(
+        "poetry-packages-from-src",
+        "packages are defined from the src directory",
+        _packages_from_src,
+    ),
+    Rule(
+        "poetry-packages-in-geneweaver-namespace",
+        "packages are in the geneweaver namespace package",
+        _packages_in_geneweaver_namespace,
+    ),
+    Rule("ruff-section", "has a [tool.ruff] section", _ruff_section),
+    *(
+        Rule(
+            f"ruff-select-{code}",
+            f"ruff selects {name} ({code})",
+            _ruff_required_rule(code),
+        )
+        for code, name in REQUIRED_RUFF_RULES.items()
+    ),
+    Rule(
+        "ruff-no-other-specifications",
+        "[tool.ruff] only selects the required rules",
+        _ruff_no_other_specifications,
+    ),
+    Rule(
+        "ruff-per-file-ignores",
+        "[tool.ruff.per-file-ignores] only ignores allowed codes",
+        _ruff_per_file_ignores,
+    ),
+)
+
+
+@dataclass(frozen=True)
+class ProjectLayout:
+    """The parts of a project's layout that the structure rules look at.
+
+    Paths are looked up in the project's :class:`ProjectIndex` when it has one, and
+    otherwise on the file system.
+    """
+
+    root: pathlib.Path
+    package_submodule_name: Optional[str]
+    is_tool_package: bool
+    index: Optional[ProjectIndex] = field(default=None, compare=False, repr=False)
+
+    NAMESPACE_DIR = "src/geneweaver"
+
+    @property
+    def namespace_dir(self) -> pathlib.Path:
+        """The geneweaver namespace package directory."""
+        return self.root / self.NAMESPACE_DIR
+
+    def is_dir(self, path: str) -> bool:
+        """Return True if the path, relative to the root, is a directory."""
+        if self.index is not None:
+            return self.index.is_dir(path)
+        return (self.root / path).is_dir()
+
+    def is_file(self, path: str) -> bool:
+        """Return True if the path, relative to the root, is a file."""
+        if self.index is not None:
+            return self.index.is_file(path)
+        return (self.root / path).is_file()
+
+    @classmethod
+    def from_root(
+        cls: Type["ProjectLayout"],
+        root: pathlib.Path,
+        pyproject: PyProject,
+        index: Optional[ProjectIndex] = None,
+    ) -> "ProjectLayout":
+        """Describe the layout of a project from its root directory.
+
+        :param root: The root directory of the project.
+        :param pyproject: The project's pyproject.toml.
+        :param index: The project's files, indexed from the root if not given.
+        """
+        index = index if index is not None else ProjectIndex.build(root)
+        return cls(
+            root,
+            pyproject.package_submodule_name,
+            index.is_dir(f"{cls.NAMESPACE_DIR}/tools"),
+            index,
+        )
+
+
+def _directory(name: str) -> Check:
+    def check(layout: ProjectLayout) -> Optional[str]:
+        if layout.is_dir(name):
+            return None
+        return f'"{name}" directory expected at root of git repository'
+
+    return check
+
+
+def _file(name: str) -> Check:
+    def check(layout: ProjectLayout) -> Optional[str]:
+        if layout.is_file(name):
+            return None
+        return (
+            f"{name} file not found, "
+            "you may need to create one at the root of your git repository"
+        )
+
+    return check
+
+
+def _geneweaver_directory(layout: ProjectLayout) -> Optional[str]:
+    if layout.is_dir(layout.NAMESPACE_DIR):
+        return None
+    return '"geneweaver" namespace expected in "src" directory'
+
+
+def _geneweaver_namespace_package(layout: ProjectLayout) -> Optional[str]:
+    if not layout.is_file(f"{layout.NAMESPACE_DIR}/__init__.py"):
+        return None
+    return (
+        '"geneweaver" namespace is not a namespace package, '
+        "it should not have an __init__.py file"
+    )
+
+
+def _package_directory(layout: ProjectLayout) -> Optional[str]:
+    root_path = layout.NAMESPACE_DIR
+    if layout.is_tool_package:
+        root_path = f"{root_path}/tools"
+    name = layout.package_submodule_name
+    if name and layout.is_dir(f"{root_path}/{name}"):
+        return None
+    return f'"{name}" package directory expected in "geneweaver" namespace'
+
+
+STRUCTURE_RULES: Tuple[Rule, ...] = (
+    Rule("src-directory", "has a src directory", _directory("src")),
+    Rule("tests-directory", "has a tests directory", _directory("tests")),
+    Rule("contributing-file", "has a CONTRIBUTING.md", _file("CONTRIBUTING.md")),
+    Rule("readme-file", "has a README.md", _file("README.md")),
+    Rule("license-file", "has a LICENSE", _file("LICENSE")),
+    Rule(
+        "geneweaver-directory",
+        "has the geneweaver namespace in src",
+        _geneweaver_directory,
+    ),
+    Rule(
+        "geneweaver-namespace-package",
+        "geneweaver is a namespace package",
+        _geneweaver_namespace_package,
+    ),
+    Rule(
+        "package-directory",
+        "has the package directory in the geneweaver namespace",
+        _package_directory,
+    ),
+)
+
+
+def evaluate(
+    subject: Any, rules: Iterable[Rule] = PYPROJECT_RULES  # noqa: ANN401
+) -> Dict[str, str]:
+    """Evaluate every rule against a subject in one pass.
+
+    :param subject: What the rules check, a :class:`PyProject` for
+    :data:`PYPROJECT_RULES` or a :class:`ProjectLayout` for :data:`STRUCTURE_RULES`.
+    :param rules: The rules to evaluate.
+    :return: The failure message of each failing rule, keyed by rule id.
+    """
+    failures = {}
+    for rule in rules:
+        message = rule.check(subject)
+        if message is not None:
+            failures[rule.id] = message
+    return failures
+
+
+def evaluate_path(
+    pyproject_toml_path: pathlib.Path, rules: Iterable[Rule] = PYPROJECT_RULES
+) -> Dict[str, str]:
+    """Read a pyproject.toml file and evaluate every rule against it.
+
+    :return: The failure message of each failing rule, keyed by rule id.
+    """
+    return evaluate(PyProject.from_path(pyproject_toml_path), rules)
+
+
+def assert_rule_passes(failures: Mapping[str, str], rule: str) -> None:
+    """Fail with the rule's message if the rule failed during evaluation.
+
+    :param failures: The result of :func:`evaluate`.
+    :param rule: The id of the rule.
+    :raises AssertionError: If the rule failed.
+    """
+    assert rule not in failures, failures[rule]
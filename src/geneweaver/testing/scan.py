@@ -0,0 +1,283 @@
+"""Check many projects at once, without a pytest session per project.
+
+Projects are found by looking for pyproject.toml files, and each project is checked
+in its own worker process. The structure and pyproject checks evaluate the same rule
+tables as the prebuilt tests in :mod:`geneweaver.testing.package`, and the style
+checks use the same engine as :mod:`geneweaver.testing.style`, so a scan reports the
+same failures that running the prebuilt tests in each project would.
+"""
+
+import json
+import os
+import pathlib
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Sequence
+from xml.etree import ElementTree
+
+from geneweaver.testing.imports import package_import_checks, run_import_checks
+from geneweaver.testing.pyproject import PyProject
+from geneweaver.testing.rules import (
+    PYPROJECT_RULES,
+    STRUCTURE_RULES,
+    ProjectLayout,
+    evaluate,
+)
+
+if TYPE_CHECKING:
+    from geneweaver.testing.style.engine import StyleReport
+
+__all__ = [
+    "CHECK_NAMES",
+    "CheckResult",
+    "ProjectResult",
+    "find_projects",
+    "check_structure",
+    "check_pyproject",
+    "check_imports",
+    "style_results",
+    "PYPROJECT_ERRORS",
+    "pyproject_parse_failure",
+    "scan_project",
+    "scan",
+    "to_json",
+    "to_junit",
+]
+
+STRUCTURE = "structure"
+PYPROJECT = "pyproject"
+IMPORT = "import"
+STYLE = "style"
+
+CHECK_NAMES = (STRUCTURE, PYPROJECT, IMPORT, STYLE)
+
+# Reading pyproject.toml fails with an OSError, and parsing it with a ValueError,
+# which tomli's TOMLDecodeError and UnicodeDecodeError both are.
+PYPROJECT_ERRORS = (OSError, ValueError)
+
+SKIPPED_DIRECTORIES = frozenset(
+    {".git", ".hg", ".tox", ".nox", ".venv", "venv", "node_modules", "__pycache__"}
+)
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    """The outcome of one check against a project."""
+
+    check: str
+    id: str  # noqa: A003
+    message: Optional[str] = None
+
+    @property
+    def passed(self) -> bool:
+        """Return True if the check passed."""
+        return self.message is None
+
+
+@dataclass
+class ProjectResult:
+    """All of the check results for a single project."""
+
+    root: str
+    results: List[CheckResult] = field(default_factory=list)
+    duration: float = 0.0
+
+    @property
+    def failures(self) -> List[CheckResult]:
+        """Get the checks that failed."""
+        return [result for result in self.results if not result.passed]
+
+    @property
+    def passed(self) -> bool:
+        """Return True if every check passed."""
+        return not self.failures
+
+
+def find_projects(directories: Iterable[pathlib.Path]) -> List[pathlib.Path]:
+    """Find the projects under some directories.
+
+    A project is a directory with a pyproject.toml file. The search does not descend
+    into a project once it is found, or into hidden and virtualenv directories.
+    """
+    projects = []
+    for directory in directories:
+        for root, dirnames, filenames in os.walk(directory):
+            if "pyproject.toml" in filenames:
+                projects.append(pathlib.Path(root))
+                dirnames.clear()
+                continue
+            dirnames[:] = sorted(
+                name
+                for name in dirnames
+                if name not in SKIPPED_DIRECTORIES and not name.startswith(".")
+            )
+    return sorted(set(projects))
+
+
+def _rule_results(
+    check: str, failures: Dict[str, str], rule_ids: Iterable[str]
+) -> Iterator[CheckResult]:
+    """Convert the failures of a rule table evaluation to check results."""
+    for rule_id in rule_ids:
+        yield CheckResult(check, rule_id, failures.get(rule_id))
+
+
+def check_structure(layout: ProjectLayout) -> List[CheckResult]:
+    """Check a project's layout against the structure rules."""
+    return list(
+        _rule_results(
+            STRUCTURE,
+            evaluate(layout, STRUCTURE_RULES),
+            (rule.id for rule in STRUCTURE_RULES),
+        )
+    )
+
+
+def check_pyproject(pyproject: PyProject) -> List[CheckResult]:
+    """Check a project's pyproject.toml against the pyproject rules."""
+    return list(
+        _rule_results(
+            PYPROJECT,
+            evaluate(pyproject, PYPROJECT_RULES),
+            (rule.id for rule in PYPROJECT_RULES),
+        )
+    )
+
+
+def pyproject_parse_failure(error: Exception) -> CheckResult:
+    """Report a pyproject.toml that could not be read or parsed."""
+    return CheckResult(PYPROJECT, "parse", f"pyproject.toml could not be read: {error}")
+
+
+def style_results(report: "StyleReport") -> List[CheckResult]:
+    """Convert a style report to a result for each tool and directory."""
+    from geneweaver.testing.style.engine import CHECKS, STYLE_DIRECTORIES
+
+    return [
+        CheckResult(
+            STYLE, f"{tool}-{directory}", report.output(tool, directory) or None
+        )
+        for tool in CHECKS
+        for directory in STYLE_DIRECTORIES
+    ]
+
+
+def check_imports(layout: ProjectLayout) -> Optional[str]:
+    """Import the project's package from its src directory in fresh interpreters.
+
+    The same checks as the prebuilt :mod:`geneweaver.testing.package.can_import`
+    tests are run.
+
+    :return: The errors if the package could not be imported, otherwise None.
+    """
+    results = run_import_checks(
+        package_import_checks(layout.package_submodule_name, layout.is_tool_package),
+        cwd=str(layout.root),
+        pythonpath=[str(layout.root / "src"), *sys.path],
+    )
+    errors = [
+        f"{result.check}: {result.error}"
+        for result in results.values()
+        if not result.passed
+    ]
+    return "\n".join(errors) if errors else None
+
+
+def scan_project(
+    root: pathlib.Path, checks: Sequence[str] = CHECK_NAMES
+) -> ProjectResult:
+    """Run the selected checks against a single project.
+
+    :param root: The root directory of the project.
+    :param checks: The names of the checks to run, see :data:`CHECK_NAMES`.
+    """
+    started = time.perf_counter()
+    result = ProjectResult(str(root))
+    try:
+        pyproject = PyProject.from_path(root / "pyproject.toml")
+    except PYPROJECT_ERRORS as error:
+        # No other check can run without the project's settings.
+        result.results.append(pyproject_parse_failure(error))
+        result.duration = time.perf_counter() - started
+        return result
+    layout = ProjectLayout.from_root(root, pyproject)
+
+    if STRUCTURE in checks:
+        result.results.extend(check_structure(layout))
+    if PYPROJECT in checks:
+        result.results.extend(check_pyproject(pyproject))
+    if IMPORT in checks:
+        result.results.append(CheckResult(IMPORT, "can-import", check_imports(layout)))
+    if STYLE in checks:
+        from geneweaver.testing.style.engine import run_style_checks
+
+        result.results.extend(
+            style_results(run_style_checks(root, workers=1, index=layout.index))
+        )
+
+    result.duration = time.perf_counter() - started
+    return result
+
+
+def scan(
+    projects: Sequence[pathlib.Path],
+    checks: Sequence[str] = CHECK_NAMES,
+    workers: Optional[int] = None,
+) -> List[ProjectResult]:
+    """Check many projects in parallel, one worker process per project at a time.
+
+    :param projects: The root directories of the projects to check.
+    :param checks: The names of the checks to run, see :data:`CHECK_NAMES`.
+    :param workers: The number of worker processes, defaults to the number of CPUs.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(projects))
+    if workers <= 1:
+        return [scan_project(project, checks) for project in projects]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(scan_project, projects, [tuple(checks)] * len(projects))
+        )
+
+
+def to_json(results: Sequence[ProjectResult]) -> str:
+    """Render the scan results as a JSON document."""
+    return json.dumps(
+        {
+            "passed": all(result.passed for result in results),
+            "projects": [
+                {**asdict(result), "passed": result.passed} for result in results
+            ],
+        },
+        indent=2,
+    )
+
+
+def _first_line(message: str) -> str:
+    """Get the first line of a message that is not blank."""
+    return next((line for line in message.splitlines() if line.strip()), "")
+
+
+def to_junit(results: Sequence[ProjectResult]) -> str:
+    """Render the scan results as a JUnit XML document, one suite per project."""
+    suites = ElementTree.Element("testsuites")
+    for result in results:
+        suite = ElementTree.SubElement(
+            suites,
+            "testsuite",
+            name=result.root,
+            tests=str(len(result.results)),
+            failures=str(len(result.failures)),
+            time=f"{result.duration:.3f}",
+        )
+        for check in result.results:
+            case = ElementTree.SubElement(
+                suite, "testcase", classname=check.check, name=check.id
+            )
+            if not check.passed:
+                failure = ElementTree.SubElement(
+                    case, "failure", message=_first_line(check.message or "")
+                )
+                failure.text = check.message
+    return ElementTree.tostring(suites, encoding="unicode")
@@ -0,0 +1,278 @@
+"""Split a test session across CI nodes by historical duration.
+
+Every session records how long each test took, and how long each session-scoped
+fixture took to set up, in the pytest cache. A sharded run (``--gw-shard=2/4``)
+assigns the collected tests to shards with the greedy longest-processing-time
+algorithm: tests are taken slowest first, and each is given to the shard that would
+finish earliest with it. A session-scoped fixture costs a shard its setup time only
+once, so tests that share an expensive fixture tend to land on the same shard.
+
+Tests without a recorded duration are estimated from the other tests in their file,
+or failing that from every recorded test. Every node must see the same history to
+agree on the assignment, so restore the same ``.pytest_cache`` on each of them.
+"""
+
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import pytest
+from geneweaver.testing.style.cache import exclusive_lock
+
+__all__ = [
+    "DURATIONS_CACHE_KEY",
+    "FIXTURE_DURATIONS_CACHE_KEY",
+    "ShardItem",
+    "Shard",
+    "parse_shard",
+    "estimate_durations",
+    "assign_shards",
+    "DurationRecorder",
+    "Sharder",
+]
+
+DURATIONS_CACHE_KEY = "geneweaver/durations"
+FIXTURE_DURATIONS_CACHE_KEY = "geneweaver/fixture-durations"
+
+# The estimate for a test when no test has a recorded duration.
+DEFAULT_DURATION = 0.1
+
+
+@dataclass(frozen=True)
+class ShardItem:
+    """A test to assign to a shard."""
+
+    nodeid: str
+    duration: float
+    fixtures: FrozenSet[str] = frozenset()
+
+
+@dataclass
+class Shard:
+    """The tests assigned to a shard, and how long they are expected to take."""
+
+    nodeids: List[str] = field(default_factory=list)
+    fixtures: Set[str] = field(default_factory=set)
+    duration: float = 0.0
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse a shard given as ``index/count``, where index counts from 1.
+
+    :raises ValueError: If the shard is not valid.
+    """
+    index, separator, count = value.partition("/")
+    if not (separator and index.isdigit() and count.isdigit()):
+        raise ValueError(f"Invalid shard {value!r}, expected e.g. 1/4")
+    if not 1 <= int(index) <= int(count):
+        raise ValueError(f"Invalid shard {value!r}, the index must be from 1 to count")
+    return int(index), int(count)
+
+
+def estimate_durations(
+    nodeids: Sequence[str], durations: Mapping[str, float]
+) -> Dict[str, float]:
+    """Get the duration of each test, estimating the ones without history.
+
+    A test without a recorded duration is estimated as the median recorded duration
+    of the tests in its file, then of all tests.
+    """
+    by_file: Dict[str, List[float]] = {}
+    for nodeid, duration in durations.items():
+        by_file.setdefault(nodeid.split("::")[0], []).append(duration)
+    overall = statistics.median(durations.values()) if durations else DEFAULT_DURATION
+    file_medians = {path: statistics.median(known) for path, known in by_file.items()}
+    estimates = {}
+    for nodeid in nodeids:
+        recorded = durations.get(nodeid)
+        estimates[nodeid] = (
+            file_medians.get(nodeid.split("::")[0], overall)
+            if recorded is None
+            else recorded
+        )
+    return estimates
+
+
+def assign_shards(
+    items: Sequence[ShardItem],
+    count: int,
+    fixture_durations: Optional[Mapping[str, float]] = None,
+) -> List[Shard]:
+    """Assign tests to shards with the greedy longest-processing-time algorithm.
+
+    :param items: The tests to assign.
+    :param count: The number of shards.
+    :param fixture_durations: The setup time of session-scoped fixtures, paid once by
+    every shard that uses the fixture.
+    :return: The shards, each test assigned to exactly one of them.
+    """
+    costs = fixture_durations or {}
+    groups: Dict[FrozenSet[str], List[ShardItem]] = {}
+    for item in items:
+        key = frozenset(fixture for fixture in item.fixtures if costs.get(fixture))
+        groups.setdefault(key, []).append(item)
+
+    # Tests sharing fixtures are placed as one unit, unless that would leave the
+    # unit's shard longer than an even split of the whole session.
+    target = (
+        sum(item.duration for item in items)
+        + sum(costs.get(fixture, 0.0) for fixture in set().union(*groups))
+    ) / count
+    units: List[List[ShardItem]] = []
+    for key, members in groups.items():
+        if key and _finish_time(Shard(), members, costs) <= target:
+            units.append(members)
+        else:
+            units.extend([member] for member in members)
+    units.sort(key=lambda unit: (-_finish_time(Shard(), unit, costs), unit[0].nodeid))
+
+    shards = [Shard() for _ in range(count)]
+    for unit in units:
+        duration, number = min(
+            (_finish_time(shard, unit, costs), number)
+            for number, shard in enumerate(shards)
+        )
+        shard = shards[number]
+        for item in unit:
+            shard.nodeids.append(item.nodeid)
+            shard.fixtures.update(item.fixtures)
+        shard.duration = duration
+    return shards
+
+
+def _finish_time(
+    shard: Shard, unit: Sequence[ShardItem], costs: Mapping[str, float]
+) -> float:
+    """Get when a shard would finish with some tests, and any fixtures it lacks."""
+    fixtures = set().union(*(item.fixtures for item in unit)) - shard.fixtures
+    return (
+        shard.duration
+        + sum(item.duration for item in unit)
+        + sum(costs.get(fixture, 0.0) for fixture in fixtures)
+    )
+
+
+def _session_fixtures(item: pytest.Item) -> FrozenSet[str]:
+    """Get the names of the session-scoped fixtures a test uses."""
+    info = getattr(item, "_fixtureinfo", None)
+    if info is None:
+        return frozenset()
+    return frozenset(
+        name
+        for name, fixturedefs in info.name2fixturedefs.items()
+        if fixturedefs and fixturedefs[-1].scope == "session"
+    )
+
+
+def _history(config: pytest.Config, key: str) -> Dict[str, float]:
+    """Read recorded durations from the pytest cache."""
+    store = getattr(config, "cache", None)
+    return (store.get(key, None) or {}) if store is not None else {}
+
+
+def _update(store: pytest.Cache, key: str, measured: Mapping[str, float]) -> None:
+    """Merge measured durations into the history, averaging with the last run."""
+    if not measured:
+        return
+    with exclusive_lock(store.mkdir("geneweaver") / "durations.lock"):
+        history = store.get(key, None) or {}
+        for name, duration in measured.items():
+            previous = history.get(name)
+            merged = duration if previous is None else (previous + duration) / 2
+            history[name] = round(merged, 6)
+        store.set(key, history)
+
+
+class DurationRecorder:
+    """Pytest plugin that records test and fixture durations in the pytest cache."""
+
+    def __init__(self, config: pytest.Config) -> None:
+        """Create the recorder for a session."""
+        self.config = config
+        self.durations: Dict[str, float] = {}
+        self.fixture_durations: Dict[str, float] = {}
+        # Under pytest-xdist the controller sees every test report, and the workers
+        # run the fixtures.
+        self.record_items = not hasattr(config, "workerinput")
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        """Add up the phases of each test."""
+        if self.record_items:
+            self.durations[report.nodeid] = (
+                self.durations.get(report.nodeid, 0.0) + report.duration
+            )
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef: pytest.FixtureDef) -> Iterator[None]:
+        """Time the setup of session-scoped fixtures."""
+        if fixturedef.scope != "session":
+            yield
+            return
+        started = time.perf_counter()
+        yield
+        self.fixture_durations[fixturedef.argname] = time.perf_counter() - started
+
+    def pytest_sessionfinish(self) -> None:
+        """Merge the durations into the history in the pytest cache."""
+        store = getattr(self.config, "cache", None)
+        if store is None:
+            return
+        _update(store, DURATIONS_CACHE_KEY, self.durations)
+        _update(store, FIXTURE_DURATIONS_CACHE_KEY, self.fixture_durations)
+
+
+class Sharder:
+    """Pytest plugin that only keeps the tests assigned to one shard."""
+
+    def __init__(self, index: int, count: int) -> None:
+        """Configure the shard to run.
+
+        :param index: The shard to run, counting from 1.
+        :param count: The number of shards.
+        """
+        self.index = index
+        self.count = count
+        self.shard: Optional[Shard] = None
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(
+        self, config: pytest.Config, items: List[pytest.Item]
+    ) -> None:
+        """Deselect the tests assigned to other shards."""
+        durations = estimate_durations(
+            [item.nodeid for item in items], _history(config, DURATIONS_CACHE_KEY)
+        )
+        shards = assign_shards(
+            [
+                ShardItem(item.nodeid, durations[item.nodeid], _session_fixtures(item))
+                for item in items
+            ],
+            self.count,
+            _history(config, FIXTURE_DURATIONS_CACHE_KEY),
+        )
+        self.shard = shards[self.index - 1]
+        selected = set(self.shard.nodeids)
+        deselected = [item for item in items if item.nodeid not in selected]
+        items[:] = [item for item in items if item.nodeid in selected]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+
+    def pytest_report_collectionfinish(self) -> Optional[str]:
+        """Report the shard and its expected duration."""
+        if self.shard is None:
+            return None
+        return (
+            f"geneweaver shard {self.index}/{self.count}: "
+            f"{len(self.shard.nodeids)} tests, expected {self.shard.duration:.1f}s"
+        )
@@ -1,31 +1,30 @@
 """Test that the src and tests directories had been formatted with black."""
 
-import subprocess
+from typing import TYPE_CHECKING
+
+from geneweaver.testing.changes import depends_on
+
+if TYPE_CHECKING:
+    from geneweaver.testing.style.engine import StyleReport
 
 __all__ = ["test_black_src_dir", "test_black_tests_dir"]
 
 
-def test_black_src_dir() -> None:
+@depends_on("src", "pyproject.toml")
+def test_black_src_dir(style_report: "StyleReport") -> None:
     """Test that the src directory has been formatted with black."""
-    completed = subprocess.run(
-        ["black", "--check", "src"], capture_output=True, text=True
-    )
-    assert completed.returncode == 0, (
+    assert style_report.passed("black", "src"), (
         "Black Formatting failed on src directory \n"
-        + completed.stdout
-        + completed.stderr
+        + style_report.output("black", "src")
         + "Run 'black src' to fix formatting."
     )
 
 
-def test_black_tests_dir() -> None:
+@depends_on("tests", "pyproject.toml")
+def test_black_tests_dir(style_report: "StyleReport") -> None:
     """Test that the tests directory has been formatted with black."""
-    completed = subprocess.run(
-        ["black", "--check", "tests"], capture_output=True, text=True
-    )
-    assert completed.returncode == 0, (
+    assert style_report.passed("black", "tests"), (
         "Black Formatting Failed on tests directory \n"
-        + completed.stdout
-        + completed.stderr
+        + style_report.output("black", "tests")
         + "Run 'black tests' to fix formatting."
     )
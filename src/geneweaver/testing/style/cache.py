@@ -0,0 +1,155 @@
+"""Persistent cache of per-file style results, shared across pytest sessions.
+
+Entries are keyed by the file's content hash, the tool version and the tool's
+pyproject.toml configuration, so only changed files are re-checked. The whole cache
+is dropped when pyproject.toml changes, and the least recently used entries are
+evicted once the cache grows beyond its size limit.
+"""
+
+import hashlib
+import json
+import pathlib
+from contextlib import contextmanager
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, Dict, Iterator, List, Optional, Type
+
+import pytest
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+__all__ = ["StyleCache", "exclusive_lock", "file_digest"]
+
+CACHE_KEY = "geneweaver/style"
+DEFAULT_MAX_ENTRIES = 4096
+
+
+def file_digest(path: pathlib.Path) -> str:
+    """Hash the contents of a file."""
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+@contextmanager
+def exclusive_lock(path: pathlib.Path) -> Iterator[None]:
+    """Hold an exclusive lock on a file while the block runs.
+
+    Used so that pytest-xdist workers take turns checking files: a worker that waits
+    for the lock then finds the other worker's results in the cache instead of
+    checking the same files again.
+    """
+    if fcntl is None:  # pragma: no cover
+        yield
+        return
+    with open(path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _tool_version(tool: str) -> str:
+    """Get the installed version of a style tool."""
+    try:
+        return version(tool)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+class StyleCache:
+    """A size bounded, least recently used cache of per-file style results."""
+
+    def __init__(
+        self,
+        store: pytest.Cache,
+        pyproject: Optional[dict],
+        pyproject_digest: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        """Load the cached entries from a pytest cache.
+
+        :param store: The pytest ``config.cache`` object to persist entries in.
+        :param pyproject: The parsed pyproject.toml, used to key tool configuration.
+        :param pyproject_digest: A hash of pyproject.toml, cached entries are dropped
+        when it changes.
+        :param max_entries: The number of entries to keep when saving.
+        """
+        self._store = store
+        self._max_entries = max_entries
+        self._stamp = pyproject_digest
+        tools = (pyproject or {}).get("tool", {})
+        self._tool_keys = {
+            tool: "{}:{}".format(
+                _tool_version(tool),
+                hashlib.sha256(
+                    json.dumps(tools.get(tool, {}), sort_keys=True).encode()
+                ).hexdigest(),
+            )
+            for tool in ("black", "ruff")
+        }
+
+        cached = store.get(CACHE_KEY, None) or {}
+        if cached.get("stamp") != self._stamp:
+            cached = {}
+        self._entries: Dict[str, List[Any]] = cached.get("entries", {})
+        self._tick: int = cached.get("tick", 0)
+        self._dirty = False
+
+    @classmethod
+    def from_pytest_config(
+        cls: Type["StyleCache"], config: pytest.Config, project_root: pathlib.Path
+    ) -> Optional["StyleCache"]:
+        """Create a cache backed by pytest's cache, if the cache plugin is active."""
+        store = getattr(config, "cache", None)
+        if store is None:
+            return None
+        pyproject_toml_path = project_root / "pyproject.toml"
+        if pyproject_toml_path.is_file():
+            from geneweaver.testing.fixtures.package import read_pyproject_toml
+
+            pyproject = read_pyproject_toml(pyproject_toml_path)
+            digest = file_digest(pyproject_toml_path)
+        else:
+            pyproject, digest = None, ""
+        return cls(store, pyproject, digest)
+
+    def __len__(self) -> int:
+        """Return the number of cached entries."""
+        return len(self._entries)
+
+    def _key(self, tool: str, path: str, digest: str) -> str:
+        """Build the cache key for a tool's result on a file."""
+        return f"{tool}:{self._tool_keys.get(tool, '')}:{path}:{digest}"
+
+    def get(self, tool: str, path: str, digest: str) -> Optional[List[str]]:
+        """Get the stored messages for a file, or None if it must be re-checked."""
+        entry = self._entries.get(self._key(tool, path, digest))
+        if entry is None:
+            return None
+        self._tick += 1
+        entry[1] = self._tick
+        self._dirty = True
+        return list(entry[0])
+
+    def put(self, tool: str, path: str, digest: str, messages: List[str]) -> None:
+        """Store the messages a tool reported for a file."""
+        self._tick += 1
+        self._entries[self._key(tool, path, digest)] = [list(messages), self._tick]
+        self._dirty = True
+
+    def save(self) -> None:
+        """Evict the least recently used entries and persist the cache."""
+        if not self._dirty:
+            return
+        if len(self._entries) > self._max_entries:
+            newest = sorted(
+                self._entries.items(), key=lambda item: item[1][1], reverse=True
+            )
+            self._entries = dict(newest[: self._max_entries])
+        self._store.set(
+            CACHE_KEY,
+            {"stamp": self._stamp, "tick": self._tick, "entries": self._entries},
+        )
+        self._dirty = False
@@ -0,0 +1,400 @@
+"""Shared engine that runs black and ruff once for all of the style tests.
+
+Black is run in-process through its Python API, and ruff is run in a single
+subprocess over every checked file with JSON output. Results can be kept in a
+:class:`~geneweaver.testing.style.cache.StyleCache` so unchanged files are not
+re-checked. The prebuilt style tests read their verdicts from the resulting
+:class:`StyleReport`.
+"""
+
+import json
+import os
+import pathlib
+import re
+import subprocess
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from itertools import chain, repeat
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Collection,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+)
+
+import black
+from black.const import DEFAULT_EXCLUDES
+from black.files import get_gitignore
+from geneweaver.testing.style.cache import StyleCache, file_digest
+
+if TYPE_CHECKING:
+    from geneweaver.testing.index import ProjectIndex
+
+__all__ = [
+    "STYLE_DIRECTORIES",
+    "StyleViolation",
+    "StyleReport",
+    "StyleToolError",
+    "black_mode",
+    "iter_python_files",
+    "style_workers",
+    "shard_files",
+    "check_black",
+    "check_ruff",
+    "run_style_checks",
+]
+
+STYLE_DIRECTORIES = ("src", "tests")
+
+WORKERS_ENV = "GENEWEAVER_TESTING_STYLE_WORKERS"
+MIN_FILES_PER_WORKER = 8
+
+BLACK = "black"
+RUFF = "ruff"
+
+
+@dataclass(frozen=True)
+class StyleViolation:
+    """A single problem reported by a style tool for a file."""
+
+    tool: str
+    path: str
+    message: str
+
+    def __str__(self) -> str:
+        """Format the violation the way the tools print it."""
+        return f"{self.path}: {self.message}"
+
+    def in_directory(self, directory: str) -> bool:
+        """Return True if the violation is for a path inside the directory."""
+        return self.path == directory or self.path.startswith(f"{directory}/")
+
+
+@dataclass
+class StyleReport:
+    """The combined black and ruff results for a project."""
+
+    violations: List[StyleViolation] = field(default_factory=list)
+
+    def failures(self, tool: str, directory: str) -> List[StyleViolation]:
+        """Get the violations reported by a tool for files in a directory."""
+        return [
+            violation
+            for violation in self.violations
+            if violation.tool == tool and violation.in_directory(directory)
+        ]
+
+    def passed(self, tool: str, directory: str) -> bool:
+        """Return True if a tool reported no problems for a directory."""
+        return not self.failures(tool, directory)
+
+    def output(self, tool: str, directory: str) -> str:
+        """Render the failures for a tool and directory as a message."""
+        return "".join(f"{failure}\n" for failure in self.failures(tool, directory))
+
+
+def _relative_path(path: pathlib.Path, project_root: pathlib.Path) -> str:
+    """Get a posix path relative to the project root, as the tools report it."""
+    if not path.is_absolute():
+        return path.as_posix()
+    for root in (project_root, project_root.resolve()):
+        try:
+            return path.relative_to(root).as_posix()
+        except ValueError:
+            continue
+    return path.as_posix()
+
+
+def black_mode(project_root: pathlib.Path) -> black.Mode:
+    """Build the black mode from the project's [tool.black] configuration."""
+    pyproject_toml_path = project_root / "pyproject.toml"
+    config = (
+        black.parse_pyproject_toml(str(pyproject_toml_path))
+        if pyproject_toml_path.is_file()
+        else {}
+    )
+    return black.Mode(
+        target_versions={
+            black.TargetVersion[version.upper()]
+            for version in config.get("target_version", [])
+        },
+        line_length=config.get("line_length", black.DEFAULT_LINE_LENGTH),
+        string_normalization=not config.get("skip_string_normalization", False),
+        magic_trailing_comma=not config.get("skip_magic_trailing_comma", False),
+        preview=config.get("preview", False),
+    )
+
+
+def iter_python_files(
+    project_root: pathlib.Path,
+    directory: str,
+    index: Optional["ProjectIndex"] = None,
+) -> Iterator[pathlib.Path]:
+    """Find the python files in a directory that black would check.
+
+    Paths matching black's default excludes or the project's .gitignore are skipped.
+
+    :param project_root: The root directory of the project.
+    :param directory: The directory, relative to the root, to search.
+    :param index: The project's files, which already skip the .gitignore, searched
+    instead of the file system if given.
+    """
+    exclude = re.compile(DEFAULT_EXCLUDES)
+    if index is not None:
+        for indexed in index.files(directory, suffixes=(".py", ".pyi")):
+            if not exclude.search(f"/{indexed.path}"):
+                yield indexed.absolute
+        return
+    with warnings.catch_warnings():
+        # Newer pathspec releases deprecate the pattern style black asks for.
+        warnings.simplefilter("ignore", DeprecationWarning)
+        gitignore = get_gitignore(project_root)
+    for path in sorted((project_root / directory).rglob("*.py*")):
+        if path.suffix not in (".py", ".pyi") or not path.is_file():
+            continue
+        relative = _relative_path(path, project_root)
+        if exclude.search(f"/{relative}") or gitignore.match_file(relative):
+            continue
+        yield path
+
+
+class StyleToolError(RuntimeError):
+    """Raised when a style tool could not be run to completion."""
+
+
+def style_workers() -> int:
+    """Get the number of worker processes to check files with.
+
+    Set with the ``GENEWEAVER_TESTING_STYLE_WORKERS`` environment variable, otherwise
+    the available CPUs are split between any pytest-xdist workers.
+    """
+    configured = os.environ.get(WORKERS_ENV)
+    if configured:
+        return max(1, int(configured))
+    xdist_workers = int(os.environ.get("PYTEST_XDIST_WORKER_COUNT") or 1)
+    return max(1, (os.cpu_count() or 1) // xdist_workers)
+
+
+def shard_files(paths: Sequence[pathlib.Path], shards: int) -> List[List[pathlib.Path]]:
+    """Split files into shards of roughly equal total size.
+
+    The largest files are placed first, each onto the currently smallest shard.
+    """
+    loads = [0] * shards
+    result: List[List[pathlib.Path]] = [[] for _ in range(shards)]
+    for size, path in sorted(
+        ((path.stat().st_size, path) for path in paths), reverse=True
+    ):
+        smallest = loads.index(min(loads))
+        loads[smallest] += size
+        result[smallest].append(path)
+    return [shard for shard in result if shard]
+
+
+def _black_check_file(path: pathlib.Path, mode: black.Mode) -> Optional[str]:
+    """Check a single file with black, returning a message if it fails."""
+    try:
+        contents, _, _ = black.decode_bytes(path.read_bytes())
+        black.format_file_contents(
+            contents, fast=False, mode=replace(mode, is_pyi=path.suffix == ".pyi")
+        )
+    except black.NothingChanged:
+        return None
+    except Exception as error:
+        return f"cannot format: {error}"
+    return "would reformat"
+
+
+def _black_check_shard(
+    paths: Sequence[pathlib.Path], mode: black.Mode
+) -> List[Optional[str]]:
+    """Check a shard of files with black, run inside a worker process."""
+    return [_black_check_file(path, mode) for path in paths]
+
+
+def check_black(
+    project_root: pathlib.Path, paths: Sequence[pathlib.Path], workers: int = 1
+) -> Dict[str, List[str]]:
+    """Check files with black, in-process or sharded across worker processes.
+
+    :param project_root: The root directory of the project being checked.
+    :param paths: The files to check.
+    :param workers: The maximum number of worker processes to use, small file sets
+    are checked in the current process.
+    :return: The messages black reported for each file, keyed by relative path.
+    """
+    mode = black_mode(project_root)
+    shard_count = min(workers, len(paths) // MIN_FILES_PER_WORKER)
+    if shard_count > 1:
+        shards = shard_files(paths, shard_count)
+        with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+            checked = zip(
+                (path for shard in shards for path in shard),
+                chain.from_iterable(
+                    executor.map(_black_check_shard, shards, repeat(mode))
+                ),
+            )
+            messages = dict(checked)
+    else:
+        messages = dict(zip(paths, _black_check_shard(paths, mode)))
+
+    return {
+        _relative_path(path, project_root): [message] if message else []
+        for path, message in messages.items()
+    }
+
+
+def check_ruff(
+    project_root: pathlib.Path, paths: Sequence[pathlib.Path], workers: int = 1
+) -> Dict[str, List[str]]:
+    """Check files with a single ruff invocation.
+
+    Ruff parallelises internally, so rather than sharding files the number of threads
+    it may use is limited to the number of workers.
+
+    :return: The messages ruff reported for each file, keyed by relative path.
+    """
+    results: Dict[str, List[str]] = {
+        _relative_path(path, project_root): [] for path in paths
+    }
+    if not paths:
+        return results
+
+    completed = subprocess.run(
+        [
+            "ruff",
+            "check",
+            "--output-format",
+            "json",
+            "--force-exclude",
+            *(str(path) for path in paths),
+        ],
+        capture_output=True,
+        text=True,
+        cwd=project_root,
+        env={**os.environ, "RAYON_NUM_THREADS": str(workers)},
+    )
+    try:
+        diagnostics = json.loads(completed.stdout or "[]")
+    except json.JSONDecodeError:
+        diagnostics = None
+    if completed.returncode not in (0, 1) or diagnostics is None:
+        raise StyleToolError(completed.stdout + completed.stderr)
+
+    for diagnostic in diagnostics:
+        path = _relative_path(pathlib.Path(diagnostic["filename"]), project_root)
+        location = diagnostic["location"]
+        results.setdefault(path, []).append(
+            f"{location['row']}:{location['column']}: "
+            f"{diagnostic['code'] or 'E999'} {diagnostic['message']}"
+        )
+    return results
+
+
+CHECKS: Dict[str, Callable[..., Dict[str, List[str]]]] = {
+    BLACK: check_black,
+    RUFF: check_ruff,
+}
+
+
+def _run_tool(
+    tool: str,
+    project_root: pathlib.Path,
+    files: Dict[str, pathlib.Path],
+    digests: Dict[str, str],
+    cache: Optional[StyleCache],
+    workers: int,
+) -> List[StyleViolation]:
+    """Run a tool on the files whose results are not already cached."""
+    results: Dict[str, List[str]] = {}
+    misses = []
+    for relative, path in files.items():
+        cached = (
+            cache.get(tool, relative, digests[relative]) if cache is not None else None
+        )
+        if cached is None:
+            misses.append(path)
+        else:
+            results[relative] = cached
+
+    if misses:
+        checked = CHECKS[tool](project_root, misses, workers)
+        for relative, messages in checked.items():
+            if cache is not None and relative in digests:
+                cache.put(tool, relative, digests[relative], messages)
+        results.update(checked)
+
+    return [
+        StyleViolation(tool, relative, message)
+        for relative in sorted(results)
+        for message in results[relative]
+    ]
+
+
+def _digest(relative: str, path: pathlib.Path, index: Optional["ProjectIndex"]) -> str:
+    """Hash a file, reusing the hash kept by the project index if there is one."""
+    indexed = index.get(relative) if index is not None else None
+    return indexed.digest if indexed is not None else file_digest(path)
+
+
+def run_style_checks(
+    project_root: pathlib.Path,
+    directories: Sequence[str] = STYLE_DIRECTORIES,
+    cache: Optional[StyleCache] = None,
+    only: Optional[Collection[str]] = None,
+    workers: Optional[int] = None,
+    index: Optional["ProjectIndex"] = None,
+) -> StyleReport:
+    """Run black and ruff over the directories and collect the results.
+
+    :param project_root: The root directory of the project to check.
+    :param directories: The directories, relative to the root, to check.
+    :param cache: An optional cache of results from previous runs, only files that
+    are not in the cache are checked.
+    :param only: If given, only check these paths (relative to the root), used to
+    check just the files that changed.
+    :param workers: The number of worker processes to use, see
+    :func:`style_workers` for the default.
+    :param index: The project's files, so the directories are not walked again and
+    each file is only hashed once.
+    """
+    workers = workers or style_workers()
+    violations: List[StyleViolation] = []
+    files: Dict[str, pathlib.Path] = {}
+    for directory in directories:
+        if not (
+            index.is_dir(directory)
+            if index is not None
+            else (project_root / directory).is_dir()
+        ):
+            violations.extend(
+                StyleViolation(tool, directory, "directory does not exist")
+                for tool in CHECKS
+            )
+            continue
+        for path in iter_python_files(project_root, directory, index):
+            relative = _relative_path(path, project_root)
+            if only is None or relative in only:
+                files[relative] = path
+
+    digests = {
+        relative: _digest(relative, path, index) for relative, path in files.items()
+    }
+    for tool in CHECKS:
+        try:
+            violations.extend(
+                _run_tool(tool, project_root, files, digests, cache, workers)
+            )
+        except StyleToolError as error:
+            violations.extend(
+                StyleViolation(tool, directory, str(error)) for directory in directories
+            )
+
+    if cache is not None:
+        cache.save()
+    return StyleReport(violations=violations)
@@ -1,23 +1,28 @@
 """Test that the src and tests directories pass ruff checks."""
 
-import subprocess
+from typing import TYPE_CHECKING
+
+from geneweaver.testing.changes import depends_on
+
+if TYPE_CHECKING:
+    from geneweaver.testing.style.engine import StyleReport
 
 __all__ = ["test_ruff_src_dir", "test_ruff_tests_dir"]
 
 
-def test_ruff_src_dir() -> None:
+@depends_on("src", "pyproject.toml")
+def test_ruff_src_dir(style_report: "StyleReport") -> None:
     """Test that the src directory passes ruff checks."""
-    completed = subprocess.run(["ruff", "check", "src"], capture_output=True, text=True)
-    assert completed.returncode == 0, (
-        "Ruff Linting failed on src directory \n" + completed.stdout
-    )
+    assert style_report.passed(
+        "ruff", "src"
+    ), "Ruff Linting failed on src directory \n" + style_report.output("ruff", "src")
 
 
-def test_ruff_tests_dir() -> None:
+@depends_on("tests", "pyproject.toml")
+def test_ruff_tests_dir(style_report: "StyleReport") -> None:
     """Test that the tests directory passes ruff checks."""
-    completed = subprocess.run(
-        ["ruff", "check", "tests"], capture_output=True, text=True
-    )
-    assert completed.returncode == 0, (
-        "Ruff Linting Failed on tests directory \n" + completed.stdout
+    assert style_report.passed(
+        "ruff", "tests"
+    ), "Ruff Linting Failed on tests directory \n" + style_report.output(
+        "ruff", "tests"
     )
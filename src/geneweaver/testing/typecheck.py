@@ -0,0 +1,236 @@
+"""Engine that type checks a project with mypy, incrementally.
+
+mypy is run once, in a python subprocess started in the project root, over both the
+src and tests directories, so they share one build, and its messages are split per
+file and directory. mypy's incremental cache is kept with the project, so only
+changed modules are re-analysed, and a run is skipped entirely when no checked file
+or installed distribution has changed since the last one.
+The prebuilt typing tests read their verdicts from the resulting
+:class:`TypeCheckReport`.
+"""
+
+import hashlib
+import os
+import pathlib
+import re
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from importlib.metadata import distributions
+from typing import Dict, List, Optional, Sequence, Type
+
+from geneweaver.testing.index import ProjectIndex
+
+__all__ = [
+    "TYPING_DIRECTORIES",
+    "MypyMessage",
+    "TypeCheckReport",
+    "mypy_arguments",
+    "tree_digest",
+    "run_mypy",
+]
+
+TYPING_DIRECTORIES = ("src", "tests")
+
+ERROR = "error"
+
+_MESSAGE_LINE = re.compile(
+    r"^(?P<path>.+?):(?P<line>\d+): (?P<severity>\w+): (?P<text>.*)$"
+)
+
+
+@dataclass(frozen=True)
+class MypyMessage:
+    """A single error or note reported by mypy for a file."""
+
+    path: str
+    line: int
+    severity: str
+    text: str
+
+    def __str__(self) -> str:
+        """Format the message the way mypy prints it."""
+        return f"{self.path}:{self.line}: {self.severity}: {self.text}"
+
+    def in_directory(self, directory: str) -> bool:
+        """Return True if the message is for a path inside the directory."""
+        return self.path == directory or self.path.startswith(f"{directory}/")
+
+
+@dataclass
+class TypeCheckReport:
+    """The mypy results for a project."""
+
+    messages: List[MypyMessage] = field(default_factory=list)
+
+    def failures(self, directory: str) -> List[MypyMessage]:
+        """Get the messages for files in a directory, if any of them are errors."""
+        messages = [
+            message for message in self.messages if message.in_directory(directory)
+        ]
+        if any(message.severity == ERROR for message in messages):
+            return messages
+        return []
+
+    def passed(self, directory: str) -> bool:
+        """Return True if mypy reported no errors for a directory."""
+        return not self.failures(directory)
+
+    def output(self, directory: str) -> str:
+        """Render the messages for a directory the way mypy prints them."""
+        return "".join(f"{message}\n" for message in self.failures(directory))
+
+    def to_json(self) -> List[Dict[str, object]]:
+        """Convert the report to JSON compatible data, to be cached."""
+        return [asdict(message) for message in self.messages]
+
+    @classmethod
+    def from_json(cls: Type["TypeCheckReport"], data: List[dict]) -> "TypeCheckReport":
+        """Rebuild a report from :meth:`to_json` data."""
+        return cls([MypyMessage(**message) for message in data])
+
+
+def _relative_path(path: str, project_root: pathlib.Path) -> str:
+    """Get a posix path relative to the project root, as the tests report it."""
+    try:
+        return (
+            pathlib.Path(path).resolve().relative_to(project_root.resolve()).as_posix()
+        )
+    except ValueError:
+        return pathlib.Path(path).as_posix()
+
+
+def mypy_arguments(
+    project_root: pathlib.Path, directories: Sequence[str], cache_dir: pathlib.Path
+) -> List[str]:
+    """Build the mypy command line for checking a project.
+
+    The project's own mypy configuration in pyproject.toml is used if there is one.
+    """
+    arguments = [
+        "--cache-dir",
+        str(cache_dir),
+        "--explicit-package-bases",
+        "--show-absolute-path",
+        "--show-error-codes",
+        "--no-error-summary",
+        "--no-color-output",
+        "--no-pretty",
+    ]
+    if (project_root / "pyproject.toml").is_file():
+        arguments.extend(["--config-file", str(project_root / "pyproject.toml")])
+    return [*arguments, *(str(project_root / directory) for directory in directories)]
+
+
+def _installed_distributions() -> List[str]:
+    """List the installed distributions and their versions, mypy and stubs included."""
+    return sorted(
+        {
+            f"{dist.metadata['Name']}=={dist.version}"
+            for dist in distributions()
+            if dist.metadata["Name"]
+        }
+    )
+
+
+def tree_digest(
+    project_root: pathlib.Path,
+    directories: Sequence[str],
+    index: Optional[ProjectIndex] = None,
+) -> str:
+    """Hash every file mypy would read, so an unchanged tree can be detected.
+
+    The python files in the directories, pyproject.toml and the version of every
+    installed distribution, so that upgrading mypy or a stub package is noticed, are
+    all part of the hash.
+
+    :param project_root: The root directory of the project.
+    :param directories: The directories mypy checks, relative to the root.
+    :param index: The project's file index, built if not given. Files already hashed
+    through the index are not read again.
+    """
+    if index is None:
+        index = ProjectIndex.build(project_root)
+    digest = hashlib.sha256("\n".join(_installed_distributions()).encode())
+    pyproject = index.get("pyproject.toml")
+    files = [pyproject] if pyproject is not None else []
+    for directory in directories:
+        files.extend(index.files(directory, suffixes=(".py", ".pyi")))
+    for indexed in files:
+        digest.update(indexed.path.encode())
+        digest.update(indexed.digest.encode())
+    return digest.hexdigest()
+
+
+def _search_path(project_root: pathlib.Path) -> str:
+    """Put the project's src directory ahead of any ``MYPYPATH`` already set."""
+    search_path = [str(project_root / "src")]
+    if os.environ.get("MYPYPATH"):
+        search_path.append(os.environ["MYPYPATH"])
+    return os.pathsep.join(search_path)
+
+
+def run_mypy(
+    project_root: pathlib.Path,
+    directories: Sequence[str] = TYPING_DIRECTORIES,
+    cache_dir: Optional[pathlib.Path] = None,
+) -> TypeCheckReport:
+    """Type check the directories of a project in a single mypy build.
+
+    :param project_root: The root directory of the project to check.
+    :param directories: The directories, relative to the root, to check.
+    :param cache_dir: Where mypy keeps its incremental cache, defaults to
+    ``.mypy_cache`` in the project root.
+    :return: The messages mypy reported, with paths relative to the project root.
+    """
+    # mypy runs in a subprocess, fail here rather than there if it is missing.
+    import mypy  # noqa: F401
+
+    messages = [
+        MypyMessage(directory, 0, ERROR, "directory does not exist")
+        for directory in directories
+        if not (project_root / directory).is_dir()
+    ]
+    existing = [
+        directory
+        for directory in directories
+        if directory not in {message.path for message in messages}
+    ]
+    if not existing:
+        return TypeCheckReport(messages)
+
+    # mypy works out module names from the working directory and MYPYPATH, so it
+    # is run from the project root rather than changing this process's environment.
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "mypy",
+            *mypy_arguments(
+                project_root, existing, cache_dir or project_root / ".mypy_cache"
+            ),
+        ],
+        cwd=project_root,
+        env={**os.environ, "MYPYPATH": _search_path(project_root)},
+        capture_output=True,
+        text=True,
+    )
+    stdout, stderr, status = completed.stdout, completed.stderr, completed.returncode
+
+    for line in stdout.splitlines():
+        match = _MESSAGE_LINE.match(line)
+        if match:
+            messages.append(
+                MypyMessage(
+                    _relative_path(match["path"], project_root),
+                    int(match["line"]),
+                    match["severity"],
+                    match["text"],
+                )
+            )
+    if status not in (0, 1):
+        messages.extend(
+            MypyMessage(directory, 0, ERROR, f"mypy failed: {stderr or stdout}")
+            for directory in existing
+        )
+    return TypeCheckReport(messages)
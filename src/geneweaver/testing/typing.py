@@ -0,0 +1,30 @@
+"""Test that the src and tests directories pass type checking with mypy."""
+
+from typing import TYPE_CHECKING
+
+from geneweaver.testing.changes import depends_on
+
+if TYPE_CHECKING:
+    from geneweaver.testing.typecheck import TypeCheckReport
+
+__all__ = ["test_mypy_src_dir", "test_mypy_tests_dir"]
+
+
+@depends_on("src", "pyproject.toml")
+def test_mypy_src_dir(mypy_report: "TypeCheckReport") -> None:
+    """Test that the src directory passes type checking."""
+    assert mypy_report.passed("src"), (
+        "Mypy Type Checking failed on src directory \n"
+        + mypy_report.output("src")
+        + "Run 'mypy src' to see the errors."
+    )
+
+
+@depends_on("src", "tests", "pyproject.toml")
+def test_mypy_tests_dir(mypy_report: "TypeCheckReport") -> None:
+    """Test that the tests directory passes type checking."""
+    assert mypy_report.passed("tests"), (
+        "Mypy Type Checking failed on tests directory \n"
+        + mypy_report.output("tests")
+        + "Run 'mypy tests' to see the errors."
+    )
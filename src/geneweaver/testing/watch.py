@@ -0,0 +1,538 @@
+"""Re-run the checks affected by each change to a project, in a warm interpreter.
+
+``geneweaver-testing watch`` runs the same checks as ``geneweaver-testing scan``
+once, then waits for files to change. Each change is mapped to the checks whose
+prebuilt tests declare it as an input with
+:func:`~geneweaver.testing.changes.depends_on`, and only those checks run again:
+
+* The pyproject model is only parsed again when pyproject.toml changes.
+* Black and ruff only check the files that changed, with black's modules already
+  imported.
+* The import checks, which need fresh interpreters, only run when ``src`` or
+  pyproject.toml changes.
+
+Changes are found with inotify on Linux, through ctypes, and by polling the
+modification times of the files elsewhere.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import pathlib
+import select
+import struct
+import sys
+import time
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+from geneweaver.testing.changes import declared_inputs, inputs_changed
+from geneweaver.testing.pyproject import PyProject
+from geneweaver.testing.rules import ProjectLayout
+from geneweaver.testing.scan import (
+    CHECK_NAMES,
+    IMPORT,
+    PYPROJECT,
+    PYPROJECT_ERRORS,
+    STRUCTURE,
+    STYLE,
+    CheckResult,
+    check_imports,
+    check_pyproject,
+    check_structure,
+    pyproject_parse_failure,
+    style_results,
+)
+
+if TYPE_CHECKING:
+    from geneweaver.testing.style.engine import StyleViolation
+
+__all__ = [
+    "EVERYTHING",
+    "WATCHED_DIRECTORIES",
+    "check_inputs",
+    "affected_checks",
+    "PollingWatcher",
+    "InotifyWatcher",
+    "open_watcher",
+    "WatchSession",
+    "watch",
+]
+
+# Reported when the changes are not known, such as when inotify's queue overflowed.
+EVERYTHING = "."
+
+WATCHED_DIRECTORIES = ("src", "tests")
+DEFAULT_INTERVAL = 0.25
+# Changes arriving this soon after the first are handled together, as one save.
+DEBOUNCE = 0.05
+
+# The plugin categories whose prebuilt tests each check runs, see plugin.CATEGORIES.
+_CHECK_CATEGORIES = {
+    STRUCTURE: "structure",
+    PYPROJECT: "pyproject",
+    IMPORT: "imports",
+    STYLE: "style",
+}
+
+_IGNORED_SUFFIXES = (".pyc", ".pyo", ".swp", ".swx", "~")
+
+
+def _ignored(relative: str) -> bool:
+    """Return True for paths no check reads, such as caches and editor files."""
+    parts = relative.split("/")
+    return (
+        "__pycache__" in parts
+        or any(part.startswith(".") for part in parts)
+        or relative.endswith(_IGNORED_SUFFIXES)
+    )
+
+
+def check_inputs(check: str) -> Optional[FrozenSet[str]]:
+    """Get the paths a check reads, from its prebuilt tests' declared inputs.
+
+    :return: The paths, relative to the project root, or None if the check has a
+    test that does not declare its inputs and so may read anything.
+    """
+    from geneweaver.testing.plugin import prebuilt_tests
+
+    inputs: Set[str] = set()
+    for function in prebuilt_tests(_CHECK_CATEGORIES[check]).values():
+        declared = declared_inputs(function)
+        if declared is None:
+            return None
+        inputs.update(declared)
+    return frozenset(inputs)
+
+
+def affected_checks(
+    changed: Iterable[str], checks: Sequence[str] = CHECK_NAMES
+) -> List[str]:
+    """Get the checks that read any of the changed paths.
+
+    :param changed: The changed paths, relative to the project root.
+    :param checks: The checks to choose from.
+    """
+    changed = set(changed)
+    if EVERYTHING in changed:
+        return list(checks)
+    affected = []
+    for check in checks:
+        inputs = check_inputs(check)
+        if inputs is None or inputs_changed(inputs, changed):
+            affected.append(check)
+    return affected
+
+
+class PollingWatcher:
+    """Finds changed files by comparing their modification times and sizes."""
+
+    def __init__(
+        self,
+        root: pathlib.Path,
+        directories: Sequence[str] = WATCHED_DIRECTORIES,
+        interval: float = DEFAULT_INTERVAL,
+    ) -> None:
+        """Take the first snapshot of the files.
+
+        :param root: The project root, whose files are watched but not its
+        subdirectories.
+        :param directories: The subdirectories to watch recursively.
+        :param interval: The time between snapshots, in seconds.
+        """
+        self.root = root
+        self.directories = directories
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot: Dict[str, Tuple[int, int]] = {}
+        pending = [(str(self.root), "", False)]
+        pending.extend((str(self.root / name), name, True) for name in self.directories)
+        while pending:
+            directory, prefix, recursive = pending.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                relative = f"{prefix}/{entry.name}" if prefix else entry.name
+                if _ignored(relative):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    snapshot[relative] = (0, 0)
+                    if recursive:
+                        pending.append((entry.path, relative, True))
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                snapshot[relative] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, timeout: Optional[float] = None) -> Set[str]:
+        """Wait for files to change.
+
+        :param timeout: The longest to wait, in seconds, or None to wait forever.
+        :return: The changed paths, relative to the project root, empty if none
+        changed before the timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            changed = {
+                path
+                for path in self._snapshot.keys() | current.keys()
+                if self._snapshot.get(path) != current.get(path)
+            }
+            self._snapshot = current
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+            time.sleep(self.interval)
+
+    def close(self) -> None:
+        """Stop watching."""
+
+
+# From <sys/inotify.h>.
+_IN_MODIFY = 0x2
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_Q_OVERFLOW = 0x4000
+_IN_ISDIR = 0x40000000
+_IN_MASK = (
+    _IN_MODIFY
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+)
+_EVENT = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """Finds changed files with Linux's inotify, which needs no polling."""
+
+    def __init__(
+        self, root: pathlib.Path, directories: Sequence[str] = WATCHED_DIRECTORIES
+    ) -> None:
+        """Start watching the files.
+
+        :param root: The project root, whose files are watched but not its
+        subdirectories.
+        :param directories: The subdirectories to watch recursively.
+        :raises OSError: If inotify is not available.
+        """
+        library = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(library, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self.root = root
+        self.directories = directories
+        self._watches: Dict[int, str] = {}
+        self._add(root, "", recursive=False)
+        for name in directories:
+            self._add(root / name, name, recursive=True)
+
+    @staticmethod
+    def available() -> bool:
+        """Return True if inotify can be used on this system."""
+        if not sys.platform.startswith("linux"):
+            return False
+        library = ctypes.util.find_library("c")
+        return library is not None and hasattr(ctypes.CDLL(library), "inotify_init1")
+
+    def _add(self, path: pathlib.Path, relative: str, recursive: bool) -> None:
+        if not path.is_dir():
+            return
+        descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _IN_MASK)
+        if descriptor < 0:
+            return
+        self._watches[descriptor] = relative
+        if recursive:
+            for child in sorted(path.iterdir()):
+                child_relative = f"{relative}/{child.name}"
+                if child.is_dir() and not _ignored(child_relative):
+                    self._add(child, child_relative, recursive=True)
+
+    def _read(self) -> Set[str]:
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed: Set[str] = set()
+        offset = 0
+        while offset < len(buffer):
+            descriptor, mask, _, length = _EVENT.unpack_from(buffer, offset)
+            name_bytes = buffer[offset + _EVENT.size : offset + _EVENT.size + length]
+            offset += _EVENT.size + length
+            if mask & _IN_Q_OVERFLOW:
+                changed.add(EVERYTHING)
+                continue
+            directory = self._watches.get(descriptor)
+            if directory is None:
+                continue
+            name = os.fsdecode(name_bytes.rstrip(b"\0"))
+            relative = (
+                f"{directory}/{name}" if directory and name else directory or name
+            )
+            if not relative or _ignored(relative):
+                continue
+            changed.add(relative)
+            created = mask & (_IN_CREATE | _IN_MOVED_TO)
+            if (
+                mask & _IN_ISDIR
+                and created
+                and relative.split("/")[0] in self.directories
+            ):
+                # Its files are checked by the full style run a new directory causes.
+                self._add(self.root / relative, relative, recursive=True)
+        return changed
+
+    def poll(self, timeout: Optional[float] = None) -> Set[str]:
+        """Wait for files to change.
+
+        :param timeout: The longest to wait, in seconds, or None to wait forever.
+        :return: The changed paths, relative to the project root, empty if none
+        changed before the timeout.
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed = self._read()
+        # An editor's save is often several events, wait for the rest of them.
+        while select.select([self._fd], [], [], DEBOUNCE)[0]:
+            changed |= self._read()
+        return changed
+
+    def close(self) -> None:
+        """Stop watching."""
+        os.close(self._fd)
+
+
+Watcher = Union[InotifyWatcher, PollingWatcher]
+
+
+def open_watcher(
+    root: pathlib.Path, polling: bool = False, interval: float = DEFAULT_INTERVAL
+) -> Watcher:
+    """Watch a project with inotify if possible, otherwise by polling.
+
+    :param root: The project root.
+    :param polling: Always poll, such as for network file systems.
+    :param interval: The time between polls, in seconds.
+    """
+    if not polling and InotifyWatcher.available():
+        try:
+            return InotifyWatcher(root)
+        except OSError:
+            pass
+    return PollingWatcher(root, interval=interval)
+
+
+class WatchSession:
+    """Runs the checks against a project, keeping their state between runs."""
+
+    def __init__(self, root: pathlib.Path, checks: Sequence[str] = CHECK_NAMES) -> None:
+        """Prepare to check a project, no check runs until :meth:`run`.
+
+        :param root: The root directory of the project.
+        :param checks: The names of the checks to run, see
+        :data:`~geneweaver.testing.scan.CHECK_NAMES`.
+        """
+        self.root = root
+        self.checks = list(checks)
+        self.pyproject = PyProject(None)
+        # Why pyproject.toml could not be read, the last good model is kept meanwhile.
+        self.pyproject_error: Optional[CheckResult] = None
+        self._read_pyproject()
+        self.results: Dict[str, List[CheckResult]] = {}
+        # The style violations of each file, so only changed files are re-checked.
+        self._violations: Dict[str, List["StyleViolation"]] = {}
+
+    def _read_pyproject(self) -> None:
+        """Read pyproject.toml, keeping the last good model if it does not parse.
+
+        A file saved part way through an edit is reported as a failure rather than
+        ending the watch.
+        """
+        try:
+            self.pyproject = PyProject.from_path(self.root / "pyproject.toml")
+        except PYPROJECT_ERRORS as error:
+            self.pyproject_error = pyproject_parse_failure(error)
+        else:
+            self.pyproject_error = None
+
+    def _check_style(
+        self, changed: Optional[Set[str]], layout: ProjectLayout
+    ) -> List[CheckResult]:
+        from geneweaver.testing.style.engine import (
+            STYLE_DIRECTORIES,
+            StyleReport,
+            run_style_checks,
+        )
+
+        if changed is not None and any(
+            layout.is_dir(path)
+            or path in STYLE_DIRECTORIES
+            or any(known.startswith(f"{path}/") for known in self._violations)
+            for path in changed
+        ):
+            # A directory was added, moved or removed, its files are not known.
+            changed = None
+        only = None
+        if changed is not None:
+            only = {path for path in changed if path.endswith((".py", ".pyi"))}
+            for path in only:
+                self._violations.pop(path, None)
+        else:
+            self._violations.clear()
+        if only is None or only:
+            report = run_style_checks(
+                self.root, only=only, workers=1, index=layout.index
+            )
+            for violation in report.violations:
+                self._violations.setdefault(violation.path, []).append(violation)
+        # Missing directories are reported against the directory itself.
+        for directory in STYLE_DIRECTORIES:
+            if layout.is_dir(directory):
+                self._violations.pop(directory, None)
+        return style_results(
+            StyleReport(
+                [
+                    violation
+                    for violations in self._violations.values()
+                    for violation in violations
+                ]
+            )
+        )
+
+    def run(self, changed: Optional[Iterable[str]] = None) -> List[str]:
+        """Run the checks affected by some changes.
+
+        :param changed: The changed paths, relative to the project root, or None to
+        run every check.
+        :return: The checks that were run.
+        """
+        paths = None if changed is None else set(changed)
+        if paths is not None and EVERYTHING in paths:
+            paths = None
+        checks = self.checks if paths is None else affected_checks(paths, self.checks)
+        if paths is None or "pyproject.toml" in paths:
+            self._read_pyproject()
+            # The style tools' configuration may have changed too.
+            style_changes = None
+        else:
+            style_changes = paths
+        layout = ProjectLayout.from_root(self.root, self.pyproject)
+
+        for check in checks:
+            if check == STRUCTURE:
+                self.results[check] = check_structure(layout)
+            elif check == PYPROJECT:
+                self.results[check] = check_pyproject(self.pyproject)
+            elif check == IMPORT:
+                self.results[check] = [
+                    CheckResult(IMPORT, "can-import", check_imports(layout))
+                ]
+            elif check == STYLE:
+                self.results[check] = self._check_style(style_changes, layout)
+        return checks
+
+    @property
+    def failures(self) -> List[CheckResult]:
+        """Get the checks that failed in their latest run."""
+        parse_failures = [self.pyproject_error] if self.pyproject_error else []
+        return parse_failures + [
+            result
+            for check in self.checks
+            for result in self.results.get(check, [])
+            if not result.passed
+        ]
+
+
+def _report(
+    session: WatchSession,
+    changed: Optional[Set[str]],
+    checks: Sequence[str],
+    seconds: float,
+    output: TextIO,
+) -> None:
+    """Print the outcome of a run of the checks."""
+    if changed is not None:
+        shown = ", ".join(sorted(changed)[:3]) + (", ..." if len(changed) > 3 else "")
+        output.write(f"\nchanged: {shown}\n")
+    output.write(f"ran {', '.join(checks) or 'no checks'} in {seconds * 1000:.0f} ms\n")
+    failures = session.failures
+    for failure in failures:
+        output.write(f"FAILED {failure.check}/{failure.id}: {failure.message}\n")
+    output.write(
+        f"{len(failures)} checks failing\n" if failures else "all checks passed\n"
+    )
+    output.flush()
+
+
+def _run(session: WatchSession, changed: Optional[Set[str]], output: TextIO) -> None:
+    """Run the checks affected by some changes, and print the outcome.
+
+    An error in a check is printed rather than raised, so it does not end the watch.
+    """
+    started = time.perf_counter()
+    try:
+        ran = session.run(changed)
+    except Exception as error:  # noqa: BLE001
+        output.write(f"\nERROR running the checks: {error!r}\n")
+        output.flush()
+        return
+    _report(session, changed, ran, time.perf_counter() - started, output)
+
+
+def watch(
+    root: pathlib.Path,
+    checks: Sequence[str] = CHECK_NAMES,
+    polling: bool = False,
+    interval: float = DEFAULT_INTERVAL,
+    output: TextIO = sys.stdout,
+) -> None:
+    """Run the checks, then re-run the affected ones on every change, until stopped.
+
+    :param root: The root directory of the project.
+    :param checks: The names of the checks to run.
+    :param polling: Poll for changes rather than using inotify.
+    :param interval: The time between polls, in seconds.
+    :param output: Where to print the results.
+    """
+    session = WatchSession(root, checks)
+    _run(session, None, output)
+    watcher = open_watcher(root, polling, interval)
+    output.write(f"watching {root} with {type(watcher).__name__}\n")
+    try:
+        while True:
+            changed = watcher.poll()
+            if not changed:
+                continue
+            _run(session, changed, output)
+    finally:
+        watcher.close()
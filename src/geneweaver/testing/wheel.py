@@ -0,0 +1,345 @@
+"""Build a project's wheel once, and inspect what it contains without extracting it.
+
+The structure and pyproject tests only look at the source tree, but what reaches the
+package index is the wheel. :func:`cached_wheel` builds it with the ``build-backend``
+from the project's ``[build-system]`` table, as described by PEP 517, and keeps it
+under a hash of the files that go into it and of the installed build requirements,
+so it is only built again when they change. The backend runs in its own python
+process, in the project directory, so neither its working directory nor anything it
+does to the interpreter, such as exiting, affects the test session.
+
+:func:`read_wheel` reads only the zip's central directory, the list of entries at
+the end of the file, so checking the names and sizes of the files in a wheel does
+not decompress any of them.
+"""
+
+import hashlib
+import importlib
+import json
+import os
+import pathlib
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+from dataclasses import dataclass, field
+from importlib.metadata import PackageNotFoundError, version
+from types import ModuleType
+from typing import Any, List, Mapping, Optional, Set
+
+from geneweaver.testing.index import IndexedFile, ProjectIndex
+
+__all__ = [
+    "DEFAULT_WHEEL_SIZE_BUDGET_KB",
+    "WheelBuildError",
+    "BackendUnavailableError",
+    "WheelEntry",
+    "WheelContents",
+    "source_digest",
+    "load_backend",
+    "build_wheel",
+    "cached_wheel",
+    "read_wheel",
+    "missing_source_files",
+    "unexpected_entries",
+]
+
+DEFAULT_WHEEL_SIZE_BUDGET_KB = 5 * 1024
+NAMESPACE = "geneweaver"
+NAMESPACE_INIT = f"{NAMESPACE}/__init__.py"
+
+_SKIPPED_SUFFIXES = (".pyc", ".pyo")
+_REQUIREMENT_NAME = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+_TEST_DIRECTORIES = frozenset({"tests", "test"})
+
+# The build process prints the wheel's name after this marker, as backends may print
+# anything else, and exits with this status if the backend is not installed.
+_MARKER = "geneweaver-testing-wheel:"
+_UNAVAILABLE_STATUS = 3
+_BUILD_SCRIPT = f"""\
+import json, pathlib, sys
+from geneweaver.testing.wheel import BackendUnavailableError, load_backend
+
+root, output_dir, build_system = sys.argv[1:]
+try:
+    backend = load_backend(pathlib.Path(root), json.loads(build_system))
+except BackendUnavailableError as error:
+    sys.stderr.write(str(error))
+    sys.exit({_UNAVAILABLE_STATUS})
+name = backend.build_wheel(output_dir)
+sys.stdout.write("\\n{_MARKER}" + name + "\\n")
+"""
+
+
+class WheelBuildError(RuntimeError):
+    """Raised when the project's wheel could not be built."""
+
+
+class BackendUnavailableError(WheelBuildError):
+    """Raised when the project's build backend is not installed."""
+
+
+@dataclass(frozen=True)
+class WheelEntry:
+    """A file in a wheel, with its sizes in bytes."""
+
+    name: str
+    size: int
+    compressed_size: int
+
+
+@dataclass
+class WheelContents:
+    """The files in a wheel, as listed by its central directory."""
+
+    path: pathlib.Path
+    size: int
+    entries: List[WheelEntry] = field(default_factory=list)
+
+    @property
+    def names(self) -> Set[str]:
+        """The paths of the files in the wheel."""
+        return {entry.name for entry in self.entries}
+
+    @property
+    def uncompressed_size(self) -> int:
+        """The size of the files once installed, in bytes."""
+        return sum(entry.size for entry in self.entries)
+
+    def largest(self, count: int = 5) -> List[WheelEntry]:
+        """Get the largest files in the wheel, by compressed size."""
+        return sorted(self.entries, key=lambda entry: -entry.compressed_size)[:count]
+
+
+def _source_files(index: ProjectIndex) -> List[IndexedFile]:
+    """Get the files a wheel is built from, skipping hidden and compiled files.
+
+    The files are those at the root of the project, such as pyproject.toml and the
+    readme, and every file under the src directory.
+    """
+    return [
+        indexed
+        for indexed in index.files()
+        if ("/" not in indexed.path or indexed.path.startswith("src/"))
+        and not indexed.path.rpartition("/")[2].startswith(".")
+        and not indexed.path.endswith(_SKIPPED_SUFFIXES)
+    ]
+
+
+def _installed_requirements(build_system: Mapping[str, Any]) -> List[str]:
+    """Get the installed version of each distribution the build system requires.
+
+    The ``requires`` list names the backend's distribution, such as poetry-core, so
+    upgrading the backend changes the versions.
+    """
+    installed = []
+    for requirement in build_system.get("requires", []):
+        match = _REQUIREMENT_NAME.match(str(requirement))
+        if match is None:
+            continue
+        try:
+            installed.append(f"{match[1]}=={version(match[1])}")
+        except PackageNotFoundError:
+            installed.append(f"{match[1]} not installed")
+    return installed
+
+
+def source_digest(
+    root: pathlib.Path,
+    build_system: Mapping[str, Any],
+    index: Optional[ProjectIndex] = None,
+) -> str:
+    """Hash the files a wheel is built from, and the backend that builds it.
+
+    :param root: The root directory of the project.
+    :param build_system: The ``[build-system]`` table of pyproject.toml.
+    :param index: The project's files, indexed from the root if not given.
+    """
+    index = index if index is not None else ProjectIndex.build(root)
+    digest = hashlib.sha256(repr(sorted(build_system.items())).encode())
+    digest.update(repr(_installed_requirements(build_system)).encode())
+    for indexed in _source_files(index):
+        digest.update(indexed.path.encode() + b"\0")
+        digest.update(bytes.fromhex(indexed.digest))
+    return digest.hexdigest()
+
+
+def _backend_name(build_system: Mapping[str, Any]) -> str:
+    """Get the build backend named in a ``[build-system]`` table.
+
+    :raises BackendUnavailableError: If the table does not name a backend.
+    """
+    name = build_system.get("build-backend")
+    if not name:
+        raise BackendUnavailableError(
+            "pyproject.toml has no build-backend in its [build-system] table, so the "
+            "wheel can not be built."
+        )
+    return str(name)
+
+
+def load_backend(root: pathlib.Path, build_system: Mapping[str, Any]) -> ModuleType:
+    """Import the build backend named in a project's ``[build-system]`` table.
+
+    :raises BackendUnavailableError: If no backend is named, or it is not installed.
+    """
+    name = _backend_name(build_system)
+    module_name, _, attribute = name.partition(":")
+    backend_path = [str(root / path) for path in build_system.get("backend-path", ())]
+    sys.path[:0] = backend_path
+    try:
+        backend = importlib.import_module(module_name)
+    except ImportError as error:
+        requires = ", ".join(build_system.get("requires", ())) or module_name
+        raise BackendUnavailableError(
+            f"The build backend {name} is not installed, install {requires} to "
+            "build the wheel."
+        ) from error
+    finally:
+        del sys.path[: len(backend_path)]
+    for part in attribute.split(".") if attribute else ():
+        backend = getattr(backend, part)
+    return backend
+
+
+def build_wheel(
+    root: pathlib.Path, output_dir: pathlib.Path, build_system: Mapping[str, Any]
+) -> pathlib.Path:
+    """Build a project's wheel with its PEP 517 build backend, in a new process.
+
+    The backend is run from the project directory, with the same import path as the
+    current process.
+
+    :param root: The root directory of the project.
+    :param output_dir: The directory to write the wheel to.
+    :param build_system: The ``[build-system]`` table of pyproject.toml.
+    :return: The path of the wheel.
+    :raises BackendUnavailableError: If no backend is named, or it is not installed.
+    :raises WheelBuildError: If the wheel could not be built.
+    """
+    _backend_name(build_system)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            _BUILD_SCRIPT,
+            str(root.resolve()),
+            str(output_dir.resolve()),
+            json.dumps(dict(build_system)),
+        ],
+        capture_output=True,
+        text=True,
+        cwd=root,
+        env={
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join(path for path in sys.path if path),
+        },
+    )
+    if completed.returncode == _UNAVAILABLE_STATUS:
+        raise BackendUnavailableError(completed.stderr.strip())
+    names = [
+        line[len(_MARKER) :]
+        for line in completed.stdout.splitlines()
+        if line.startswith(_MARKER)
+    ]
+    if completed.returncode != 0 or not names:
+        raise WheelBuildError(
+            "Building the wheel failed:\n"
+            + (completed.stderr.strip() or completed.stdout.strip())
+        )
+    return output_dir / names[-1]
+
+
+def cached_wheel(
+    root: pathlib.Path,
+    build_system: Mapping[str, Any],
+    cache_dir: pathlib.Path,
+    index: Optional[ProjectIndex] = None,
+) -> pathlib.Path:
+    """Get a project's wheel, only building it if its sources changed.
+
+    Wheels are kept in a directory named by :func:`source_digest`, and older wheels
+    are removed. The wheel is built in a temporary directory that is then renamed,
+    so concurrent sessions, such as pytest-xdist workers, never see part of a wheel.
+
+    :param root: The root directory of the project.
+    :param build_system: The ``[build-system]`` table of pyproject.toml.
+    :param cache_dir: The directory to keep wheels in.
+    :param index: The project's files, indexed from the root if not given.
+    :return: The path of the wheel.
+    :raises WheelBuildError: If the wheel could not be built.
+    """
+    digest = source_digest(root, build_system, index)
+    target = cache_dir / digest
+    wheels = sorted(target.glob("*.whl"))
+    if wheels:
+        return wheels[0]
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    building = pathlib.Path(tempfile.mkdtemp(prefix=".build-", dir=cache_dir))
+    try:
+        built = build_wheel(root, building, build_system)
+        try:
+            building.rename(target)
+        except OSError:
+            # Another session built the same wheel first.
+            shutil.rmtree(building, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(building, ignore_errors=True)
+        raise
+    for stale in cache_dir.iterdir():
+        if stale.name != digest and not stale.name.startswith("."):
+            shutil.rmtree(stale, ignore_errors=True)
+    return target / built.name
+
+
+def read_wheel(path: pathlib.Path) -> WheelContents:
+    """List the files in a wheel from its central directory, without extracting."""
+    with zipfile.ZipFile(path) as archive:
+        entries = [
+            WheelEntry(info.filename, info.file_size, info.compress_size)
+            for info in archive.infolist()
+            if not info.is_dir()
+        ]
+    return WheelContents(path, path.stat().st_size, entries)
+
+
+def missing_source_files(
+    contents: WheelContents, root: pathlib.Path, index: Optional[ProjectIndex] = None
+) -> List[str]:
+    """Get the python files in the geneweaver namespace that the wheel is missing.
+
+    :param contents: The files in the wheel.
+    :param root: The root directory of the project.
+    :param index: The project's files, indexed from the root if not given.
+    :return: The missing files, as paths in the wheel.
+    """
+    index = index if index is not None else ProjectIndex.build(root)
+    names = contents.names
+    return [
+        relative
+        for relative in (
+            indexed.path[len("src/") :]
+            for indexed in index.files(f"src/{NAMESPACE}", suffixes=(".py",))
+        )
+        if relative not in names
+    ]
+
+
+def unexpected_entries(contents: WheelContents) -> List[str]:
+    """Get the files in the wheel outside of the geneweaver namespace, or in tests.
+
+    The wheel's own ``.dist-info`` and ``.data`` directories are expected.
+    """
+    unexpected = []
+    for name in sorted(contents.names):
+        top, _, rest = name.partition("/")
+        if top.endswith((".dist-info", ".data")):
+            continue
+        parts = name.split("/")
+        if top != NAMESPACE or not rest or _TEST_DIRECTORIES.intersection(parts[:-1]):
+            unexpected.append(name)
+    return unexpected
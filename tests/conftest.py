@@ -1,5 +1,8 @@
-"""PyTest file for providing fixtures to all tests in the package."""
+"""PyTest file for providing fixtures to all tests in the package.
 
-# Import all fixtures from the geneweaver-testing pacakge so that we can run pre-made
-# tests. Additional fixtures can also be added here as needed.
-from geneweaver.testing.fixtures import *  # noqa: F403
+The pre-made tests and their fixtures are provided by the geneweaver-testing pytest
+plugin, which is registered when the package is installed. Additional fixtures can be
+added here as needed.
+"""
+
+pytest_plugins = ["pytester"]
@@ -1,18 +1,17 @@
 """Test the geneweaver.testing.package.generic.pyproject module."""
 
-from typing import Optional
-from unittest.mock import patch
-
 import pytest
 from geneweaver.testing.package.generic.pyproject import (
-    _check_controller_per_file_ignore,
+    test_poetry_build_system_definition as t_poetry_build_system_definition,
 )
 from geneweaver.testing.package.generic.pyproject import (
-    test_poetry_build_system_definition as t_poetry_build_system_definition,
+    test_pyproject_has_license as t_pyproject_has_license,
 )
 from geneweaver.testing.package.generic.pyproject import (
     test_ruff_per_files_ignores as t_ruff_per_files_ignores,
 )
+from geneweaver.testing.pyproject import PyProject
+from geneweaver.testing.rules import PER_FILES_IGNORES_MSG
 
 
 def test_test_poetry_build_system_definition():
@@ -23,58 +22,28 @@ def test_test_poetry_build_system_definition():
             "build-backend": "poetry.masonry.api",
         }
     }
-    t_poetry_build_system_definition(valid_pyproject_content)
+    t_poetry_build_system_definition(PyProject(valid_pyproject_content))
 
 
-def test_controller_per_file_ignore():
-    """Test the _check_controller_per_file_ignore function."""
-    valid_per_files_ignore = {
-        "tests/*": ["test_*.py", "tests/*"],
-        "src/geneweaver/api/controllers/*": ["B008"],
-        "src/*": ["ANN101", "ANN102", "ANN103", "ANN204", "ANN205", "ANN206"],
-    }
-    _check_controller_per_file_ignore(valid_per_files_ignore)
-
+def test_tests_report_the_failing_rule_message():
+    """Test that a prebuilt test fails with the message of its rule."""
+    t_pyproject_has_license({"poetry-readme": "not this rule"})
+    with pytest.raises(AssertionError, match="must be set to Apache-2.0"):
+        t_pyproject_has_license(
+            {"poetry-license": "license in pyproject.toml must be set to Apache-2.0"}
+        )
 
-PER_FILES_IGNORES_MSG = "custom error message for per-files-ignores"
-IGNORING_ALLOWED_WARN = "custom warning message for ignoring allowed"
 
+def test_test_ruff_per_files_ignores_fails_with_rule_message():
+    """Test that the per-file-ignores test fails when its rule failed."""
+    pyproject = PyProject({"tool": {"ruff": {"per-file-ignores": {"a/*": ["E"]}}}})
+    with pytest.raises(AssertionError, match="per-file-ignores"):
+        t_ruff_per_files_ignores(
+            {"ruff-per-file-ignores": PER_FILES_IGNORES_MSG}, pyproject
+        )
 
-@pytest.mark.parametrize(
-    "pyproject_toml_contents",
-    [
-        {"tool": {"ruff": {"per-file-ignores": ["src/*"]}}},
-        {"tool": {"ruff": {"per-file-ignores": ["tests/*"]}}},
-        {"tool": {"ruff": {"per-file-ignores": ["src/*", "tests/*"]}}},
-        {"tool": {"ruff": {"per-file-ignores": ["src/*", "tests/*", "controllers/*"]}}},
-    ],
-)
-def test_test_ruff_per_files_ignores(
-    pyproject_toml_contents: Optional[dict],
-):
-    """Test different scenarios of pyproject.toml contents for ruff configuration."""
-    with patch(
-        "geneweaver.testing.package.generic.pyproject._check_tests_per_file_ignore"
-    ) as mock_test_ignore, patch(
-        "geneweaver.testing.package.generic.pyproject._check_src_per_file_ignore"
-    ) as mock_src_ignore, patch(
-        "geneweaver.testing.package.generic.pyproject._check_controller_per_file_ignore"
-    ) as mock_controller_ignore:
-        # Call the function under test
-        t_ruff_per_files_ignores(pyproject_toml_contents)
 
-        # Assert that the mocks were called as expected
-        if (
-            pyproject_toml_contents
-            and "per-file-ignores"
-            in pyproject_toml_contents.get("tool", {}).get("ruff", {})
-        ):
-            per_files_ignores = pyproject_toml_contents["tool"]["ruff"][
-                "per-file-ignores"
-            ]
-            if "tests/*" in per_files_ignores:
-                mock_test_ignore.assert_called_with(per_files_ignores)
-            if "src/*" in per_files_ignores:
-                mock_src_ignore.assert_called_with(per_files_ignores)
-            if len(per_files_ignores) == 3:
-                mock_controller_ignore.assert_called_with(per_files_ignores)
+def test_test_ruff_per_files_ignores_warns_without_ignores():
+    """Test that a warning explains the allowed ignores when none are set."""
+    with pytest.warns(UserWarning, match="Geneweaver allows ignoring"):
+        t_ruff_per_files_ignores({}, PyProject({"tool": {"ruff": {}}}))
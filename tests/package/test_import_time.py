@@ -0,0 +1,99 @@
+"""Test the import-time budget test and its fixtures."""
+
+import pytest
+from geneweaver.testing.fixtures.imports import (
+    IMPORT_TIME_CACHE_KEY,
+    update_import_time_baseline,
+)
+from geneweaver.testing.imports import ImportTimeMeasurement, measure_import_time
+from geneweaver.testing.package.import_time import (
+    test_import_time_within_budget as t_import_time_within_budget,
+)
+from geneweaver.testing.pyproject import PyProject
+
+from tests.style.test_cache import MemoryStore
+
+MEASUREMENT = ImportTimeMeasurement("geneweaver.example", [1000, 9000, 2000])
+
+
+def _settings(**settings: object) -> PyProject:
+    return PyProject({"tool": {"geneweaver": {"testing": settings}}})
+
+
+def test_median_ignores_outliers():
+    """Test that one slow run does not change the median."""
+    assert MEASUREMENT.median_us == 2000
+
+
+def test_measure_import_time():
+    """Test timing an import over several interpreters."""
+    measurement = measure_import_time("json", runs=2)
+    assert len(measurement.runs_us) == 2
+    assert measurement.median_us > 0
+    assert measure_import_time("geneweaver.missing", runs=2).error
+
+
+def test_within_budget():
+    """Test that the median is compared against the budget."""
+    t_import_time_within_budget(
+        _settings(**{"import-time-budget-ms": 2}), MEASUREMENT, None
+    )
+    with pytest.raises(AssertionError, match="over the budget of 1.5 ms"):
+        t_import_time_within_budget(
+            _settings(**{"import-time-budget-ms": 1.5}), MEASUREMENT, None
+        )
+
+
+def test_regression_against_baseline():
+    """Test that a relative slowdown against the baseline fails."""
+    settings = {"import-time-regression-min-ms": 0}
+    t_import_time_within_budget(_settings(**settings), MEASUREMENT, 1700)
+    with pytest.raises(AssertionError, match="25% slower than the baseline of 1.6"):
+        t_import_time_within_budget(_settings(**settings), MEASUREMENT, 1600)
+    t_import_time_within_budget(
+        _settings(**{"import-time-regression": 0.3}, **settings), MEASUREMENT, 1600
+    )
+
+
+def test_small_slowdown_is_not_a_regression():
+    """Test that a jittery fast import must also slow down by the minimum delta."""
+    jittery = ImportTimeMeasurement("geneweaver.example", [40000, 34000, 36000])
+    t_import_time_within_budget(_settings(), jittery, 26000)
+    assert not jittery.regressed(26000, 0.2, 10)
+    assert jittery.regressed(26000, 0.2, 5)
+    with pytest.raises(AssertionError, match="38% slower than the baseline of 26.0"):
+        t_import_time_within_budget(
+            _settings(**{"import-time-regression-min-ms": 5}), jittery, 26000
+        )
+
+
+def test_failed_import_is_skipped():
+    """Test that a broken import is left to the can_import tests."""
+    with pytest.raises(pytest.skip.Exception):
+        t_import_time_within_budget(
+            _settings(), ImportTimeMeasurement("geneweaver.example", error="boom"), 1
+        )
+
+
+def test_baseline_history():
+    """Test that the baseline is the median of recent passing measurements."""
+    store = MemoryStore()
+    baselines = [
+        update_import_time_baseline(
+            store, ImportTimeMeasurement("geneweaver.example", [median]), 0.2, 0
+        )
+        for median in (1000, 3000, 1100, 1200, 900)
+    ]
+    # The 3000 run regressed against the 1000 baseline, so it is not recorded.
+    assert baselines == [None, 1000, 1000, 1050, 1100]
+    assert store.get(IMPORT_TIME_CACHE_KEY, None) == {
+        "geneweaver.example": [1000, 1100, 1200, 900]
+    }
+
+
+def test_failed_measurement_is_not_recorded():
+    """Test that a failed import does not change the history."""
+    store = MemoryStore()
+    measurement = ImportTimeMeasurement("geneweaver.example", error="boom")
+    assert update_import_time_baseline(store, measurement, 0.2) is None
+    assert store.get(IMPORT_TIME_CACHE_KEY, None) is None
@@ -0,0 +1 @@
+"""Test the geneweaver.testing.style module."""
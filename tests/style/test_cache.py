@@ -0,0 +1,124 @@
+"""Test the geneweaver.testing.style.cache module."""
+
+import pathlib
+import threading
+import time
+from unittest.mock import Mock, patch
+
+from geneweaver.testing.style.cache import StyleCache, exclusive_lock
+from geneweaver.testing.style.engine import check_black, run_style_checks
+
+from tests.style.test_engine import FORMATTED, UNFORMATTED
+
+
+class MemoryStore:
+    """A stand in for pytest's config.cache that keeps values in memory."""
+
+    def __init__(self) -> None:
+        """Start with an empty store."""
+        self.values: dict = {}
+
+    def get(self, key, default):
+        """Get a stored value."""
+        return self.values.get(key, default)
+
+    def set(self, key, value):  # noqa: A003
+        """Store a value."""
+        self.values[key] = value
+
+
+def _project(tmp_path, pyproject="") -> pathlib.Path:
+    (tmp_path / "src").mkdir()
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "src" / "good.py").write_text(FORMATTED)
+    (tmp_path / "src" / "bad.py").write_text(UNFORMATTED)
+    (tmp_path / "pyproject.toml").write_text(pyproject)
+    return tmp_path
+
+
+def test_unchanged_files_are_not_checked_again(tmp_path):
+    """Test that a second run reuses stored results, including failures."""
+    project = _project(tmp_path)
+    store = MemoryStore()
+    first = run_style_checks(project, cache=StyleCache(store, {}, "stamp"))
+
+    with patch.dict(
+        "geneweaver.testing.style.engine.CHECKS", {"black": None, "ruff": None}
+    ):
+        second = run_style_checks(project, cache=StyleCache(store, {}, "stamp"))
+
+    assert first.violations == second.violations
+    assert not second.passed("black", "src")
+
+
+def test_changed_files_are_checked_again(tmp_path):
+    """Test that only files whose contents changed are re-checked."""
+    project = _project(tmp_path)
+    store = MemoryStore()
+    run_style_checks(project, cache=StyleCache(store, {}, "stamp"))
+    (project / "src" / "bad.py").write_text(FORMATTED)
+
+    black = Mock(wraps=check_black)
+    with patch.dict("geneweaver.testing.style.engine.CHECKS", {"black": black}):
+        report = run_style_checks(project, cache=StyleCache(store, {}, "stamp"))
+
+    assert [path.name for path in black.call_args.args[1]] == ["bad.py"]
+    assert report.passed("black", "src")
+
+
+def test_pyproject_change_invalidates_cache():
+    """Test that cached entries are dropped when pyproject.toml changes."""
+    store = MemoryStore()
+    cache = StyleCache(store, {}, "old")
+    cache.put("black", "src/a.py", "digest", [])
+    cache.save()
+
+    assert StyleCache(store, {}, "old").get("black", "src/a.py", "digest") == []
+    assert StyleCache(store, {}, "new").get("black", "src/a.py", "digest") is None
+
+
+def test_tool_configuration_is_part_of_the_key():
+    """Test that changing a tool's configuration misses the cache."""
+    store = MemoryStore()
+    cache = StyleCache(store, {"tool": {"ruff": {"select": ["F"]}}}, "stamp")
+    cache.put("ruff", "src/a.py", "digest", [])
+    cache.save()
+
+    other = StyleCache(store, {"tool": {"ruff": {"select": ["E"]}}}, "stamp")
+    assert other.get("ruff", "src/a.py", "digest") is None
+
+
+def test_least_recently_used_entries_are_evicted():
+    """Test that the cache is bounded and keeps recently used entries."""
+    store = MemoryStore()
+    cache = StyleCache(store, {}, "stamp", max_entries=2)
+    for name in ("a", "b", "c"):
+        cache.put("black", name, "digest", [])
+    cache.get("black", "a", "digest")
+    cache.save()
+
+    reloaded = StyleCache(store, {}, "stamp")
+    assert len(reloaded) == 2
+    assert reloaded.get("black", "b", "digest") is None
+    assert reloaded.get("black", "a", "digest") == []
+
+
+def test_exclusive_lock_serialises_holders(tmp_path):
+    """Test that a second holder waits until the first releases the lock."""
+    lock_path = tmp_path / "style.lock"
+    events = []
+
+    def hold(name: str) -> None:
+        with exclusive_lock(lock_path):
+            events.append(f"{name} start")
+            time.sleep(0.05)
+            events.append(f"{name} end")
+
+    with exclusive_lock(lock_path):
+        waiting = threading.Thread(target=hold, args=("second",))
+        waiting.start()
+        time.sleep(0.05)
+        events.append("first end")
+    waiting.join()
+
+    assert events == ["first end", "second start", "second end"]
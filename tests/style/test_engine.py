@@ -0,0 +1,127 @@
+"""Test the geneweaver.testing.style.engine module."""
+
+import os
+import pathlib
+from unittest.mock import patch
+
+import pytest
+from geneweaver.testing.style.black import test_black_src_dir as t_black_src_dir
+from geneweaver.testing.style.engine import (
+    StyleReport,
+    StyleViolation,
+    check_black,
+    check_ruff,
+    iter_python_files,
+    run_style_checks,
+    shard_files,
+    style_workers,
+)
+from geneweaver.testing.style.ruff import test_ruff_tests_dir as t_ruff_tests_dir
+
+FORMATTED = '"""A formatted module."""\n\nVALUE = 1\n'
+UNFORMATTED = "VALUE=[1,\n2]\n"
+
+
+@pytest.fixture()
+def style_project(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Create a small project with one good and one bad file in each directory."""
+    for directory in ("src", "tests"):
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / "good.py").write_text(FORMATTED)
+        (tmp_path / directory / "bad.py").write_text(UNFORMATTED + "import os\n")
+    return tmp_path
+
+
+def test_iter_python_files_skips_excluded_directories(style_project):
+    """Test that black's default excludes are honoured."""
+    (style_project / "src" / "build").mkdir()
+    (style_project / "src" / "build" / "generated.py").write_text(UNFORMATTED)
+    files = list(iter_python_files(style_project, "src"))
+    assert [path.name for path in files] == ["bad.py", "good.py"]
+
+
+def test_check_black_reports_unformatted_files(style_project):
+    """Test that black only reports the unformatted files."""
+    results = check_black(style_project, list(iter_python_files(style_project, "src")))
+    assert results == {"src/bad.py": ["would reformat"], "src/good.py": []}
+
+
+def test_check_ruff_reports_relative_paths(style_project):
+    """Test that ruff diagnostics are reported relative to the project root."""
+    results = check_ruff(style_project, list(iter_python_files(style_project, "tests")))
+    assert results["tests/good.py"] == []
+    assert any("F401" in message for message in results["tests/bad.py"])
+
+
+def test_run_style_checks_splits_by_tool_and_directory(style_project):
+    """Test that the report separates results by tool and directory."""
+    report = run_style_checks(style_project)
+    assert [v.path for v in report.failures("black", "src")] == ["src/bad.py"]
+    assert not report.passed("ruff", "tests")
+    assert "tests/bad.py" in report.output("ruff", "tests")
+
+
+def test_run_style_checks_reports_missing_directory(tmp_path):
+    """Test that a missing directory is reported as a failure for each tool."""
+    report = run_style_checks(tmp_path, ["src"])
+    assert report.violations == [
+        StyleViolation("black", "src", "directory does not exist"),
+        StyleViolation("ruff", "src", "directory does not exist"),
+    ]
+
+
+def test_style_tests_read_verdicts_from_report():
+    """Test that the prebuilt style tests only consult the shared report."""
+    t_black_src_dir(StyleReport())
+    failing = StyleReport([StyleViolation("ruff", "tests/a.py", "1:1: F401 unused")])
+    with pytest.raises(AssertionError, match="tests/a.py: 1:1: F401 unused"):
+        t_ruff_tests_dir(failing)
+
+
+def test_shard_files_balances_by_size(tmp_path):
+    """Test that shards are balanced by total file size."""
+    sizes = {"a.py": 90, "b.py": 50, "c.py": 40, "d.py": 10}
+    for name, size in sizes.items():
+        (tmp_path / name).write_text("#" * size)
+    shards = shard_files(sorted(tmp_path.iterdir()), 2)
+    assert [[path.name for path in shard] for shard in shards] == [
+        ["a.py", "d.py"],
+        ["b.py", "c.py"],
+    ]
+
+
+def test_shard_files_drops_empty_shards(tmp_path):
+    """Test that asking for more shards than files gives one shard per file."""
+    (tmp_path / "a.py").write_text("")
+    assert len(shard_files([tmp_path / "a.py"], 4)) == 1
+
+
+def test_check_black_in_worker_processes_matches_serial(tmp_path):
+    """Test that sharding across processes gives the same per-file results."""
+    (tmp_path / "src").mkdir()
+    for index in range(20):
+        contents = UNFORMATTED if index % 3 == 0 else FORMATTED
+        (tmp_path / "src" / f"module_{index}.py").write_text(contents)
+    paths = list(iter_python_files(tmp_path, "src"))
+
+    parallel = check_black(tmp_path, paths, workers=2)
+    assert parallel == check_black(tmp_path, paths, workers=1)
+    assert sorted(path for path, messages in parallel.items() if messages) == [
+        f"src/module_{index}.py" for index in (0, 12, 15, 18, 3, 6, 9)
+    ]
+
+
+@pytest.mark.parametrize(
+    ("environ", "expected"),
+    [
+        ({"GENEWEAVER_TESTING_STYLE_WORKERS": "3"}, 3),
+        ({"GENEWEAVER_TESTING_STYLE_WORKERS": "0"}, 1),
+        ({"PYTEST_XDIST_WORKER_COUNT": "4"}, 2),
+    ],
+)
+def test_style_workers(environ, expected):
+    """Test that the worker count is configurable and shared with xdist workers."""
+    with patch.dict(os.environ, environ, clear=True), patch(
+        "os.cpu_count", return_value=8
+    ):
+        assert style_workers() == expected
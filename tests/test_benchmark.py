@@ -0,0 +1,194 @@
+"""Test the benchmark engine and fixture."""
+
+import gc
+import itertools
+import json
+import os
+import pathlib
+from typing import Any
+
+import pytest
+from geneweaver.testing import benchmark as benchmark_module
+from geneweaver.testing.benchmark import (
+    Baseline,
+    Benchmark,
+    BenchmarkStats,
+    is_slower,
+)
+
+FAST = BenchmarkStats((100.0, 101.0, 102.0, 103.0, 104.0), 10)
+SLOW = BenchmarkStats((150.0, 151.0, 152.0, 153.0, 154.0), 10)
+NOISY = BenchmarkStats((90.0, 100.0, 130.0, 140.0, 200.0), 10)
+
+BASELINES = pathlib.Path(".pytest_cache", "v", "geneweaver", "benchmark-history")
+
+
+def fast_benchmark(**options: Any):  # noqa: ANN401
+    """Create a benchmark that spends as little time as possible."""
+    return Benchmark(
+        "example",
+        **{
+            "min_time": 0,
+            "warmup_time": 0,
+            "round_time": 0,
+            "min_rounds": 3,
+            **options,
+        },
+    )
+
+
+def test_stats():
+    """Test the median, quartiles and minimum of a run."""
+    assert FAST.median == 102.0
+    assert FAST.quartiles == (100.5, 103.5)
+    assert FAST.iqr == 3.0
+    assert FAST.min == 100.0
+    assert FAST.summary() == "median 102 ns, IQR 3 ns, min 100 ns (5 rounds of 10)"
+
+
+def test_baseline_round_trips():
+    """Test that a baseline is stored compactly and read back."""
+    baseline = Baseline.from_stats(FAST)
+    assert baseline.to_json() == [102.0, 100.5, 103.5, 100.0]
+    assert Baseline.from_json(baseline.to_json()) == baseline
+
+
+def test_baseline_median_of_recent_runs():
+    """Test that recent baselines combine into their median, statistic by statistic."""
+    runs = [
+        Baseline(100, 90, 110, 80),
+        Baseline(300, 10, 310, 5),
+        Baseline(200, 50, 0, 1),
+    ]
+    assert Baseline.median_of(runs) == Baseline(200, 50, 110, 5)
+
+
+@pytest.mark.parametrize(
+    ("stats", "expected"),
+    [(FAST, False), (SLOW, True), (NOISY, False)],
+)
+def test_is_slower(stats, expected):
+    """Test that only a slowdown beyond the threshold and the noise is flagged."""
+    assert is_slower(stats, Baseline.from_stats(FAST), 0.2) is expected
+
+
+def test_benchmark_returns_the_result():
+    """Test that the function's result is returned and rounds are timed."""
+    bench = fast_benchmark()
+    assert bench(sum, [1, 2, 3]) == 6
+    assert bench.stats is not None
+    assert len(bench.stats.samples_ns) >= 3
+    assert bench.regression() is None
+
+
+def test_benchmark_disables_gc_while_timing():
+    """Test that the garbage collector is off during timed calls, and restored."""
+    states = []
+    fast_benchmark()(lambda: states.append(gc.isenabled()))
+    assert not any(states)
+    assert gc.isenabled()
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "sched_getaffinity"), reason="CPU affinity is not supported"
+)
+def test_benchmark_stays_on_the_current_cpu(monkeypatch):
+    """Test that rounds are pinned to the CPU the process is on, then released."""
+    cpus = os.sched_getaffinity(0)
+    current = max(cpus)
+    pinned = []
+    monkeypatch.setattr(benchmark_module, "_current_cpu", lambda: current)
+    fast_benchmark()(lambda: pinned.append(os.sched_getaffinity(0)))
+    assert pinned
+    assert all(affinity == {current} for affinity in pinned)
+    assert os.sched_getaffinity(0) == cpus
+
+
+def test_benchmark_stops_at_max_rounds():
+    """Test that the number of rounds is bounded."""
+    bench = fast_benchmark(min_time=60, max_rounds=4)
+    bench(int)
+    assert len(bench.stats.samples_ns) == 4
+
+
+def test_benchmark_fails_when_slower_than_baseline():
+    """Test that a run slower than its baseline fails."""
+    clock = itertools.count(step=1000)
+    bench = fast_benchmark(
+        baseline=Baseline(10.0, 9.0, 11.0, 8.0), timer=lambda: next(clock)
+    )
+    with pytest.raises(AssertionError, match="example is .* slower than its baseline"):
+        bench(int)
+    assert "--cache-clear" in bench.regression()
+
+
+@pytest.fixture()
+def project(pytester):
+    """Create a project with a benchmarked test."""
+    pytester.makepyprojecttoml(
+        "[tool.geneweaver.testing]\nbenchmark-min-time = 0\n"
+        "benchmark-warmup-time = 0\n"
+        "[tool.pytest.ini_options]\ngeneweaver_prebuilt = true\n"
+        "geneweaver_disable = ['all']\n"
+    )
+    pytester.makepyfile(
+        test_fast="""
+        import pytest
+
+        @pytest.mark.gw_benchmark(min_rounds=3)
+        def test_sum(gw_benchmark):
+            assert gw_benchmark(sum, range(10)) == 45
+        """
+    )
+    return pytester
+
+
+def test_fixture_stores_a_baseline(project):
+    """Test that the first run stores a baseline and reports the timing."""
+    result = project.runpytest()
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(
+        ["*geneweaver benchmarks*", "test_fast.py::test_sum: median *"]
+    )
+    history = json.loads((project.path / BASELINES).read_text())
+    assert list(history) == ["test_fast.py::test_sum"]
+    assert len(history["test_fast.py::test_sum"]) == 1
+
+
+def test_fixture_keeps_recent_runs(project):
+    """Test that the fixture keeps a rolling history of its recent runs."""
+    path = project.path / BASELINES
+    path.parent.mkdir(parents=True)
+    slow = [1e9, 1e9, 1e9, 1e9]
+    path.write_text(json.dumps({"test_fast.py::test_sum": [slow] * 5}))
+    project.runpytest().assert_outcomes(passed=1)
+    runs = json.loads(path.read_text())["test_fast.py::test_sum"]
+    assert len(runs) == 5
+    assert runs[:4] == [slow] * 4
+    assert runs[-1] != slow
+
+
+def test_fixture_fails_against_a_faster_baseline(project):
+    """Test that a test fails when its stored baseline is much faster."""
+    path = project.path / BASELINES
+    path.parent.mkdir(parents=True)
+    path.write_text(json.dumps({"test_fast.py::test_sum": [[0.1, 0.1, 0.1, 0.1]]}))
+    result = project.runpytest()
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines(["*test_fast.py::test_sum is * slower*"])
+
+
+def test_fixture_rejects_unknown_options(project):
+    """Test that options meant for another benchmark plugin fail clearly."""
+    project.makepyfile(
+        test_fast="""
+        import pytest
+
+        @pytest.mark.gw_benchmark(group="parsing")
+        def test_sum(gw_benchmark):
+            gw_benchmark(sum, range(10))
+        """
+    )
+    result = project.runpytest()
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(["*Unknown benchmark options group, the options*"])
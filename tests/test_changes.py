@@ -0,0 +1,88 @@
+"""Test the geneweaver.testing.changes module."""
+
+import pathlib
+import subprocess
+
+import pytest
+from geneweaver.testing.changes import (
+    ChangeDetectionError,
+    declared_inputs,
+    depends_on,
+    find_changed_files,
+    inputs_changed,
+)
+from geneweaver.testing.package.pyproject import (
+    test_poetry_packages_in_geneweaver_namespace,
+)
+from geneweaver.testing.style.black import test_black_tests_dir
+
+
+def _git(repo: pathlib.Path, *args: str) -> None:
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture()
+def repo(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Create a git repository with a base branch and one commit on top of it."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.py").write_text("A = 1\n")
+    (tmp_path / "pyproject.toml").write_text("")
+    (tmp_path / ".gitignore").write_text("ignored.py\n")
+    _git(tmp_path, "init", "-q", "-b", "main")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "base")
+    _git(tmp_path, "checkout", "-q", "-b", "feature")
+    (tmp_path / "src" / "b.py").write_text("B = 1\n")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "feature")
+    return tmp_path
+
+
+def test_find_changed_files_includes_committed_and_working_tree(repo):
+    """Test that committed, modified and untracked files are all found."""
+    (repo / "src" / "a.py").write_text("A = 2\n")
+    (repo / "src" / "c.py").write_text("C = 1\n")
+    (repo / "ignored.py").write_text("")
+    changed = find_changed_files(repo, repo / ".git", "main")
+    assert changed == {"src/a.py", "src/b.py", "src/c.py"}
+
+
+def test_find_changed_files_unknown_ref(repo):
+    """Test that an unknown base ref raises a ChangeDetectionError."""
+    with pytest.raises(ChangeDetectionError):
+        find_changed_files(repo, repo / ".git", "does-not-exist")
+
+
+@pytest.mark.parametrize(
+    ("inputs", "changed", "expected"),
+    [
+        (("pyproject.toml",), {"pyproject.toml"}, True),
+        (("pyproject.toml",), {"src/a.py"}, False),
+        (("src",), {"src/a.py"}, True),
+        (("src",), {"srcs/a.py"}, False),
+        (("tests", "pyproject.toml"), set(), False),
+    ],
+)
+def test_inputs_changed(inputs, changed, expected):
+    """Test matching declared inputs against changed paths."""
+    assert inputs_changed(inputs, changed) is expected
+
+
+def test_prebuilt_tests_declare_inputs():
+    """Test that prebuilt tests declare the project paths they read."""
+    assert declared_inputs(test_poetry_packages_in_geneweaver_namespace) == (
+        "pyproject.toml",
+    )
+    assert declared_inputs(test_black_tests_dir) == ("tests", "pyproject.toml")
+
+    @depends_on("docs")
+    def undecorated() -> None:
+        """Stand in test function."""
+
+    assert declared_inputs(undecorated) == ("docs",)
+    assert declared_inputs(test_inputs_changed) is None
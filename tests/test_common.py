@@ -1,6 +0,0 @@
-"""Test common Geneweaver package functionality."""
-
-# Import all pre-defined tests from the geneweaver-testing pacakge so that PyTest
-# automatically runs them. Additional tests can also be added here as needed, but
-# should be kept to a minimum.
-from geneweaver.testing import *  # noqa: F403
@@ -0,0 +1,124 @@
+"""Test the synthetic GeneWeaver data generators."""
+
+import itertools
+
+import pytest
+from geneweaver.testing.data import (
+    COLUMN_GENERATORS,
+    COLUMNS_SCHEMA,
+    EVIDENCE_CODES,
+    SPECIES,
+    annotations,
+    cached_columns,
+    genes,
+    genesets,
+    homology,
+    make_gene,
+    species_of,
+)
+
+
+def test_genes():
+    """Test that genes cycle through the species with identifiers unique to each."""
+    streamed = list(genes(100))
+    assert [gene.gene_id for gene in streamed] == list(range(1, 101))
+    assert {gene.species_id for gene in streamed} == {species.id for species in SPECIES}
+    assert len({(gene.species_id, gene.symbol) for gene in streamed}) == 100
+    assert len({gene.ensembl_id for gene in streamed}) == 100
+    assert make_gene(1).ensembl_id == "ENSMUSG00000000001"
+    assert make_gene(2).ensembl_id == "ENSG00000000001"
+
+
+def test_generators_stream_lazily():
+    """Test that records are generated as they are read."""
+    assert next(iter(genes(10**12))).gene_id == 1
+    assert next(genesets(0, 10**12)).geneset_id == 1
+
+
+@pytest.mark.parametrize("generator", [genesets, homology, annotations])
+def test_generators_are_deterministic(generator):
+    """Test that a seed always generates the same data, and seeds differ."""
+    assert list(generator(1, 20)) == list(generator(1, 20))
+    assert list(generator(1, 20)) != list(generator(2, 20))
+
+
+def test_genesets():
+    """Test that geneset genes exist, are of the geneset's species, and are unique."""
+    for geneset in genesets(0, 50, genes_per_species=1000, min_size=5, max_size=200):
+        gene_ids = [gene_id for gene_id, _ in geneset.genes]
+        assert 5 <= len(gene_ids) <= 200
+        assert len(set(gene_ids)) == len(gene_ids)
+        assert all(species_of(gene_id).id == geneset.species_id for gene_id in gene_ids)
+        assert all(0 <= score < 1 for _, score in geneset.genes)
+
+
+def test_homology():
+    """Test that a cluster spans several species, one gene of each."""
+    members = list(homology(0, 50))
+    for _, cluster in itertools.groupby(members, lambda member: member.homology_id):
+        species = [member.species_id for member in cluster]
+        assert len(species) >= 2
+        assert len(set(species)) == len(species)
+    assert all(species_of(member.gene_id).id == member.species_id for member in members)
+
+
+def test_annotations():
+    """Test that annotations use GO terms and known evidence codes."""
+    for annotation in annotations(0, 200, terms=100):
+        assert annotation.term.startswith("GO:")
+        assert 1 <= int(annotation.term[3:]) <= 100
+        assert annotation.evidence in EVIDENCE_CODES
+
+
+@pytest.mark.parametrize("kind", sorted(COLUMN_GENERATORS))
+def test_column_batches(kind):
+    """Test that columns come in batches of the requested size, deterministically."""
+    np = pytest.importorskip("numpy")
+    batches = list(COLUMN_GENERATORS[kind](3, 250, batch_size=100))
+    assert [len(next(iter(batch.values()))) for batch in batches] == [100, 100, 50]
+    again = list(COLUMN_GENERATORS[kind](3, 250, batch_size=100))
+    for batch, other in zip(batches, again):
+        assert batch.keys() == other.keys()
+        assert all(np.array_equal(batch[name], other[name]) for name in batch)
+    gene_ids = np.concatenate([batch["gene_id"] for batch in batches])
+    assert gene_ids.min() >= 1
+
+
+def test_cached_columns(tmp_path):
+    """Test that a dataset is written once and memory-mapped afterwards."""
+    np = pytest.importorskip("numpy")
+    columns = cached_columns(tmp_path, "genesets", 1, 1000, batch_size=300)
+    assert sorted(columns) == ["gene_id", "geneset_id", "score"]
+    assert all(isinstance(array, np.memmap) for array in columns.values())
+    assert columns["geneset_id"].shape == (1000,)
+    assert not columns["score"].flags.writeable
+    (directory,) = tmp_path.iterdir()
+    assert directory.name == (
+        f"genesets-seed1-1000-schema{COLUMNS_SCHEMA}-numpy{np.__version__}-batch300"
+    )
+
+    expected = np.concatenate(
+        [batch["score"] for batch in COLUMN_GENERATORS["genesets"](1, 1000, 300)]
+    )
+    assert np.array_equal(columns["score"], expected)
+    again = cached_columns(tmp_path, "genesets", 1, 1000, batch_size=300)
+    assert np.array_equal(again["gene_id"], columns["gene_id"])
+
+
+def test_fixture(pytester):
+    """Test that the fixture generates data from the configured seed."""
+    pytester.makepyprojecttoml(
+        "[tool.geneweaver.testing]\ndata-seed = 7\n"
+        "[tool.pytest.ini_options]\ngeneweaver_prebuilt = true\n"
+        "geneweaver_disable = ['all']\n"
+    )
+    pytester.makepyfile(
+        """
+        from geneweaver.testing.data import genesets
+
+        def test_seed(synthetic_data, data_seed):
+            assert data_seed == 7
+            assert list(synthetic_data.genesets(3)) == list(genesets(7, 3))
+        """
+    )
+    pytester.runpytest().assert_outcomes(passed=1)
@@ -0,0 +1,212 @@
+"""Test the template-cloned PostgreSQL databases."""
+
+import os
+import pathlib
+import stat
+
+import pytest
+from geneweaver.testing.database import (
+    ConnectionPool,
+    DatabaseError,
+    LocalPostgres,
+    PostgresServer,
+    SharedServer,
+    find_postgres_binary,
+    rollback_after,
+)
+
+
+def test_find_postgres_binary_on_path(tmp_path, monkeypatch):
+    """Test that a program on the PATH is found first."""
+    program = tmp_path / "initdb"
+    program.write_text("#!/bin/sh\n")
+    program.chmod(program.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", str(tmp_path))
+    assert find_postgres_binary("initdb") == str(program)
+
+
+def test_find_postgres_binary_missing(tmp_path, monkeypatch):
+    """Test that a missing program is None, rather than an error."""
+    monkeypatch.setenv("PATH", str(tmp_path))
+    monkeypatch.setattr(
+        "geneweaver.testing.database._SEARCH_DIRECTORIES", (str(tmp_path / "*"),)
+    )
+    assert find_postgres_binary("initdb") is None
+
+
+def test_local_socket_directory_is_short(tmp_path):
+    """Test that the socket is kept in a short path, wherever the data is."""
+    server = LocalPostgres(tmp_path / ("deep" * 40) / "postgres")
+    assert len(str(server.socket_dir)) < 60
+    assert server.socket_dir == LocalPostgres(server.directory).socket_dir
+    assert f"host={server.socket_dir}" in server.base_conninfo
+
+
+class FakeServer(LocalPostgres):
+    """A local server that only records whether it is running."""
+
+    running = False
+
+    def start(self) -> None:
+        """Pretend to start the server."""
+        assert not self.running
+        self.running = True
+
+    def stop(self) -> None:
+        """Pretend to stop the server."""
+        assert self.running
+        self.running = False
+
+
+def test_shared_server_is_started_once(tmp_path: pathlib.Path, monkeypatch):
+    """Test that the first worker starts the server, and the last one stops it."""
+    fake = FakeServer(tmp_path / "postgres")
+    built = []
+    monkeypatch.setattr(
+        "geneweaver.testing.database.create_template",
+        lambda server, name, setup: built.append(name),
+    )
+    workers = [SharedServer(tmp_path, fake), SharedServer(tmp_path, fake)]
+    for worker in workers:
+        worker.acquire()
+        worker.template("template", lambda connection: None)
+    assert fake.running
+    assert built == ["template"]
+
+    workers[0].release()
+    assert fake.running
+    workers[1].release()
+    assert not fake.running
+
+
+def test_shared_external_server_is_not_started(tmp_path, monkeypatch):
+    """Test that a running server is shared without being started or stopped."""
+    shared = SharedServer(tmp_path, PostgresServer("host=db"))
+    shared.acquire()
+    shared.release()
+    assert not (tmp_path / "postgres").exists()
+
+
+def test_database_names_are_unique_to_the_session(tmp_path, monkeypatch):
+    """Test that workers share names, other sessions do not, and only ours drop."""
+    monkeypatch.setattr(
+        "geneweaver.testing.database.create_template", lambda server, name, setup: None
+    )
+    dropped = []
+    monkeypatch.setattr(
+        "geneweaver.testing.database.drop_database",
+        lambda server, name: dropped.append(name),
+    )
+    server = PostgresServer("host=db")
+    workers = [
+        SharedServer(tmp_path / "a", server),
+        SharedServer(tmp_path / "a", server),
+    ]
+    other = SharedServer(tmp_path / "b", server)
+    for shared in [*workers, other]:
+        shared.acquire()
+    names = {shared.unique_name("geneweaver_template") for shared in workers}
+    assert len(names) == 1
+    template = names.pop()
+    assert template.startswith("geneweaver_template_")
+    assert template != other.unique_name("geneweaver_template")
+
+    for shared in workers:
+        shared.template(template, lambda connection: None)
+        shared.release()
+    assert dropped == [template]
+    other.release()
+    assert dropped == [template]
+
+
+@pytest.mark.skipif(
+    hasattr(os, "geteuid") and os.geteuid() == 0, reason="runs as a normal user"
+)
+def test_local_server_needs_postgres(tmp_path, monkeypatch):
+    """Test that a missing PostgreSQL installation is reported clearly."""
+    monkeypatch.setattr(
+        "geneweaver.testing.database.find_postgres_binary", lambda name: None
+    )
+    with pytest.raises(DatabaseError, match="initdb was not found"):
+        LocalPostgres(tmp_path).start()
+
+
+class FakeConnection:
+    """Records the statements run on it, and can fail to roll back."""
+
+    def __init__(self, rollback_error: bool = False) -> None:
+        """Create an open connection."""
+        self.statements: list = []
+        self.closed = False
+        self.rollback_error = rollback_error
+
+    def execute(self, statement: str) -> None:
+        """Record a statement."""
+        if self.closed:
+            raise RuntimeError("the connection is closed")
+        self.statements.append(statement)
+        if statement == "ROLLBACK" and self.rollback_error:
+            raise RuntimeError("server closed the connection unexpectedly")
+
+    def close(self) -> None:
+        """Close the connection."""
+        self.closed = True
+
+
+def test_rollback_after_returns_the_connection_to_the_pool():
+    """Test that the block is rolled back and the connection is reused."""
+    pool = ConnectionPool("dbname=example")
+    connection = FakeConnection()
+    with rollback_after(connection):  # type: ignore[arg-type]
+        connection.execute("INSERT")
+    assert connection.statements == [
+        "BEGIN",
+        "SAVEPOINT geneweaver_test",
+        "INSERT",
+        "ROLLBACK",
+    ]
+    pool.putconn(connection)  # type: ignore[arg-type]
+    assert pool._idle == [connection]
+
+
+def test_failed_rollback_closes_the_connection():
+    """Test that a failed rollback keeps the test's error and drops the connection."""
+    pool = ConnectionPool("dbname=example")
+    connection = FakeConnection(rollback_error=True)
+    with pytest.raises(AssertionError, match="the test failed"):
+        with rollback_after(connection):  # type: ignore[arg-type]
+            raise AssertionError("the test failed")
+    assert connection.closed
+
+    pool.putconn(connection)  # type: ignore[arg-type]
+    assert pool._idle == []
+
+
+def test_database_connection(pytester):
+    """Test that each test sees the template, and none of the other tests' changes."""
+    pytest.importorskip("psycopg")
+    pytester.makepyprojecttoml(
+        "[tool.pytest.ini_options]\ngeneweaver_prebuilt = true\n"
+        "geneweaver_disable = ['all']\n"
+        "[tool.geneweaver.testing]\ndatabase-schema = ['schema.sql']\n"
+    )
+    pytester.makefile(
+        ".sql",
+        schema="CREATE TABLE geneset (id int); INSERT INTO geneset VALUES (1);",
+    )
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.parametrize("run", [1, 2])
+        def test_insert(database_connection, run):
+            database_connection.execute("INSERT INTO geneset VALUES (2)")
+            count = database_connection.execute("SELECT count(*) FROM geneset")
+            assert count.fetchone()[0] == 2
+        """
+    )
+    result = pytester.runpytest()
+    outcomes = result.parseoutcomes()
+    if outcomes.get("skipped"):
+        pytest.skip("no PostgreSQL server is available")
+    result.assert_outcomes(passed=2)
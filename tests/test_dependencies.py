@@ -10,7 +10,7 @@ def test_can_import_mypy() -> None:
 
 def test_can_import_ruff() -> None:
     """Test that ruff is installed and importable."""
-    import ruff
+    import ruff  # type: ignore
 
     assert ruff is not None
 
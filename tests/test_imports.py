@@ -0,0 +1,76 @@
+"""Test the geneweaver.testing.imports module."""
+
+import sys
+
+from geneweaver.testing.imports import (
+    ABSOLUTE,
+    GENEWEAVER,
+    NAMESPACE,
+    RELATIVE,
+    ImportCheck,
+    ImportResult,
+    ImportTiming,
+    package_import_checks,
+    parse_importtime,
+    run_import_check,
+    run_import_checks,
+)
+
+IMPORTTIME_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 | site
+geneweaver-testing: imports start
+import time:       344 |        344 |     _json
+import time:       827 |       1171 |   json.scanner
+import time:       699 |       1870 | json
+"""
+
+
+def test_parse_importtime_skips_startup_imports():
+    """Test that only the imports after the marker are parsed."""
+    assert parse_importtime(IMPORTTIME_OUTPUT) == [
+        ImportTiming("_json", 344, 344, 2),
+        ImportTiming("json.scanner", 827, 1171, 1),
+        ImportTiming("json", 699, 1870, 0),
+    ]
+
+
+def test_result_summary():
+    """Test the total and slowest modules of a result."""
+    result = ImportResult("absolute", timings=parse_importtime(IMPORTTIME_OUTPUT))
+    assert result.total_us == 1870
+    assert [timing.module for timing in result.slowest(2)] == ["json", "json.scanner"]
+    assert result.summary(1).splitlines() == [
+        "absolute: imported in 1.9 ms",
+        "       1.9 ms  json",
+    ]
+
+
+def test_checks_run_in_a_fresh_interpreter():
+    """Test that modules imported by this process are not reused."""
+    assert "json" in sys.modules
+    result = run_import_check(ImportCheck("json", "import json"))
+    assert result.passed
+    assert "json" in {timing.module for timing in result.timings}
+
+
+def test_failed_check_reports_traceback():
+    """Test that the traceback of a failed import is the error, without timings."""
+    result = run_import_check(ImportCheck("missing", "import geneweaver.missing"))
+    assert not result.passed
+    assert "ModuleNotFoundError" in result.error
+    assert "import time:" not in result.error
+
+
+def test_this_package_imports():
+    """Test the package checks for this repository, run in parallel."""
+    results = run_import_checks(package_import_checks("testing", False))
+    assert set(results) == {ABSOLUTE, RELATIVE, NAMESPACE, GENEWEAVER}
+    assert all(result.passed for result in results.values()), results
+    assert results[ABSOLUTE].total_us > 0
+
+
+def test_missing_tool_package_fails():
+    """Test that tool packages are imported from the geneweaver.tools namespace."""
+    results = run_import_checks(package_import_checks("testing", True))
+    assert not results[ABSOLUTE].passed
+    assert not results[NAMESPACE].passed
@@ -0,0 +1,174 @@
+"""Test the project index, and that the structure rules only read from it."""
+
+import hashlib
+import os
+import pathlib
+from typing import List
+
+import pytest
+from geneweaver.testing.index import ProjectIndex
+from geneweaver.testing.pyproject import PyProject
+from geneweaver.testing.rules import STRUCTURE_RULES, ProjectLayout, evaluate
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent
+
+
+@pytest.fixture()
+def project(tmp_path):
+    """Create a project with ignored, hidden and cache files."""
+    package = tmp_path / "src" / "geneweaver" / "example"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text('"""An example package."""\n')
+    (package / "core.py").write_text("VALUE = 1\n")
+    (package / "notes.txt").write_text("notes")
+    (package / "__pycache__").mkdir()
+    (package / "__pycache__" / "core.cpython-311.pyc").write_bytes(b"")
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_core.py").write_text("")
+    (tmp_path / "build" / "lib").mkdir(parents=True)
+    (tmp_path / "build" / "lib" / "core.py").write_text("")
+    (tmp_path / "debug.log").write_text("")
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "HEAD").write_text("")
+    (tmp_path / ".gitignore").write_text("build/\n*.log\n")
+    (tmp_path / "README.md").write_text("# Example\n")
+    return tmp_path
+
+
+def test_build_honours_gitignore(project):
+    """Test that ignored, hidden and cache paths are not indexed."""
+    index = ProjectIndex.build(project)
+    assert [indexed.path for indexed in index.files()] == [
+        ".gitignore",
+        "README.md",
+        "src/geneweaver/example/__init__.py",
+        "src/geneweaver/example/core.py",
+        "src/geneweaver/example/notes.txt",
+        "tests/test_core.py",
+    ]
+    assert index.is_dir("src/geneweaver")
+    assert not index.is_dir("build")
+    assert not index.is_dir(".git")
+    assert not index.is_file("debug.log")
+    assert ProjectIndex.build(project, gitignore=False).is_file("debug.log")
+
+
+def test_build_honours_nested_gitignore(project):
+    """Test that a .gitignore applies to the paths under its own directory."""
+    (project / "tests" / ".gitignore").write_text("*.csv\n/output/\n")
+    (project / "tests" / "data.csv").write_text("")
+    (project / "tests" / "output").mkdir()
+    (project / "tests" / "output" / "result.txt").write_text("")
+    (project / "data.csv").write_text("")
+    index = ProjectIndex.build(project)
+    assert not index.is_file("tests/data.csv")
+    assert not index.is_dir("tests/output")
+    assert index.is_file("data.csv")
+    assert ProjectIndex.build(project, gitignore=False).is_file("tests/data.csv")
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="needs symbolic links")
+def test_build_does_not_follow_directory_links(project):
+    """Test that a symbolic link loop does not trap the walk."""
+    (project / "src" / "loop").symlink_to(project / "src", target_is_directory=True)
+    index = ProjectIndex.build(project)
+    assert not index.is_dir("src/loop")
+    assert not index.files("src/loop")
+    assert index.is_file("src/geneweaver/example/core.py")
+
+
+class VanishingEntry:
+    """A directory entry for a file removed before it could be stat'ed."""
+
+    def __init__(self, entry: os.DirEntry) -> None:
+        """Wrap a real entry."""
+        self.name = entry.name
+        self.path = entry.path
+        self.is_dir = entry.is_dir
+        self.is_file = entry.is_file
+
+    def stat(self) -> os.stat_result:
+        """Fail as if the file was removed."""
+        raise FileNotFoundError(self.path)
+
+
+def test_build_skips_files_that_cannot_be_stated(project, monkeypatch):
+    """Test that a file removed while the tree is walked is left out."""
+    scandir = os.scandir
+
+    def vanishing_notes(path: pathlib.Path) -> List[object]:
+        return [
+            VanishingEntry(entry) if entry.name == "notes.txt" else entry
+            for entry in scandir(path)
+        ]
+
+    monkeypatch.setattr("geneweaver.testing.index.os.scandir", vanishing_notes)
+    index = ProjectIndex.build(project)
+    assert not index.is_file("src/geneweaver/example/notes.txt")
+    assert index.is_file("src/geneweaver/example/core.py")
+
+
+def test_files_under_directory(project):
+    """Test that files are found by directory and suffix."""
+    index = ProjectIndex.build(project)
+    assert [indexed.path for indexed in index.files("src/", suffixes=(".py",))] == [
+        "src/geneweaver/example/__init__.py",
+        "src/geneweaver/example/core.py",
+    ]
+    assert index.files("missing") == []
+
+
+def test_indexed_file(project, monkeypatch):
+    """Test that a file's size and time are recorded, and its hash read once."""
+    path = project / "src" / "geneweaver" / "example" / "core.py"
+    indexed = ProjectIndex.build(project).get("src/geneweaver/example/core.py")
+    assert indexed is not None
+    assert indexed.absolute == path
+    assert indexed.size == path.stat().st_size
+    assert indexed.mtime_ns == path.stat().st_mtime_ns
+
+    reads: List[pathlib.Path] = []
+    read_bytes = pathlib.Path.read_bytes
+
+    def counting_read_bytes(self: pathlib.Path) -> bytes:
+        reads.append(self)
+        return read_bytes(self)
+
+    monkeypatch.setattr(pathlib.Path, "read_bytes", counting_read_bytes)
+    assert indexed.digest == hashlib.sha256(b"VALUE = 1\n").hexdigest()
+    assert indexed.digest == hashlib.sha256(b"VALUE = 1\n").hexdigest()
+    assert reads == [path]
+
+
+def test_structure_rules_only_read_the_index(monkeypatch):
+    """Test that the structure rules make no file system calls of their own."""
+    pyproject = PyProject.from_path(PROJECT_ROOT / "pyproject.toml")
+    scans: List[object] = []
+    scandir = os.scandir
+
+    def counting_scandir(path: object) -> object:
+        scans.append(path)
+        return scandir(path)  # type: ignore[call-overload]
+
+    monkeypatch.setattr(os, "scandir", counting_scandir)
+    layout = ProjectLayout.from_root(PROJECT_ROOT, pyproject)
+    # Each directory is read once, and ignored directories are not read at all.
+    scanned = [pathlib.Path(str(path)) for path in scans]
+    assert len(set(scanned)) == len(scanned)
+    assert not [path for path in scanned if {".git", "__pycache__"} & set(path.parts)]
+
+    def no_stat(self: pathlib.Path) -> bool:
+        raise AssertionError(f"{self} was checked on the file system")
+
+    monkeypatch.setattr(pathlib.Path, "is_dir", no_stat)
+    monkeypatch.setattr(pathlib.Path, "is_file", no_stat)
+    assert evaluate(layout, STRUCTURE_RULES) == {}
+
+
+def test_layout_without_index(project):
+    """Test that a layout without an index matches one with an index."""
+    pyproject = PyProject({"tool": {"poetry": {"name": "geneweaver-example"}}})
+    indexed = ProjectLayout.from_root(project, pyproject)
+    plain = ProjectLayout(project, "example", indexed.is_tool_package)
+    assert plain.index is None
+    assert evaluate(indexed, STRUCTURE_RULES) == evaluate(plain, STRUCTURE_RULES)
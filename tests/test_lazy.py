@@ -0,0 +1,139 @@
+"""Test the lazily loaded geneweaver.testing and geneweaver.testing.fixtures."""
+
+import importlib
+from typing import List, Sequence
+
+import geneweaver.testing
+import geneweaver.testing.fixtures
+import pytest
+from geneweaver.testing.imports import ImportCheck, run_import_check
+from geneweaver.testing.lazy import attach
+
+HEAVY_MODULES = ("black", "tomli", "geneweaver.testing.style.engine")
+
+
+HEAVY_TEST_MODULES = ("complexity", "coverage", "package.wheel", "typing")
+
+
+@pytest.mark.parametrize(
+    ("package", "submodules", "unexported"),
+    [
+        (
+            geneweaver.testing,
+            [
+                "package.can_import",
+                "package.generic.pyproject",
+                "package.generic.structure",
+                "package.import_time",
+                "package.pyproject",
+                "package.structure",
+                "style.black",
+                "style.ruff",
+            ],
+            HEAVY_TEST_MODULES,
+        ),
+        (
+            geneweaver.testing.fixtures,
+            [
+                "benchmark",
+                "changes",
+                "complexity",
+                "coverage",
+                "data",
+                "database",
+                "imports",
+                "load",
+                "memory",
+                "package",
+                "queries",
+                "style",
+                "typing",
+                "wheel",
+            ],
+            (),
+        ),
+    ],
+)
+def test_manifest_matches_submodules(package, submodules, unexported):
+    """Test that the static manifest lists exactly the names the submodules export."""
+
+    def names(modules: Sequence[str]) -> List[str]:
+        return [
+            name
+            for module in modules
+            for name in importlib.import_module(f"{package.__name__}.{module}").__all__
+        ]
+
+    assert sorted(package.__all__) == sorted(names(submodules))
+    assert sorted(dir(package)) == sorted(names([*submodules, *unexported]))
+    assert all(getattr(package, name) is not None for name in dir(package))
+
+
+def test_import_does_not_load_submodules():
+    """Test that importing the packages does not import any tests or fixtures."""
+    result = run_import_check(
+        ImportCheck(
+            "lazy",
+            "import sys\nimport geneweaver.testing.fixtures\n"
+            "loaded = [m for m in sys.modules if m.startswith('geneweaver.testing.')]\n"
+            "assert sorted(loaded) == ['geneweaver.testing.fixtures', "
+            "'geneweaver.testing.lazy'], loaded",
+        )
+    )
+    assert result.passed, result.error
+
+
+def test_star_imports_defer_heavy_dependencies():
+    """Test that black and tomli are only imported once a test needs them."""
+    result = run_import_check(
+        ImportCheck(
+            "star",
+            "import sys\nimport pytest\n"
+            "from geneweaver.testing import *\n"
+            "from geneweaver.testing.fixtures import *\n"
+            f"loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+            "assert not loaded, loaded",
+        )
+    )
+    assert result.passed, result.error
+
+
+def test_star_import_leaves_out_slow_tests():
+    """Test that a star import does not import the typing, wheel and other slow tests.
+
+    It does import every module of tests in ``__all__``, which is the cost of a star
+    import.
+    """
+    heavy = [f"geneweaver.testing.{module}" for module in HEAVY_TEST_MODULES]
+    result = run_import_check(
+        ImportCheck(
+            "star-tests",
+            "import sys\n"
+            "from geneweaver.testing import *\n"
+            f"loaded = [m for m in {heavy!r} if m in sys.modules]\n"
+            "assert not loaded, loaded\n"
+            "assert 'geneweaver.testing.style.black' in sys.modules\n"
+            "assert 'test_mypy_src_dir' not in globals()\n"
+            "from geneweaver.testing import test_mypy_src_dir",
+        )
+    )
+    assert result.passed, result.error
+
+
+def test_attach():
+    """Test the lazy attributes of a package built from a manifest."""
+    names, getattr_, dir_ = attach(
+        "json", {".decoder": ["JSONDecodeError"]}, {".scanner": ["make_scanner"]}
+    )
+    assert names == ["JSONDecodeError"]
+    assert dir_() == ["JSONDecodeError", "make_scanner"]
+    assert (
+        getattr_("make_scanner") is importlib.import_module("json.scanner").make_scanner
+    )
+    assert (
+        getattr_("JSONDecodeError")
+        is importlib.import_module("json").decoder.JSONDecodeError
+    )
+    assert getattr_("scanner") is importlib.import_module("json.scanner")
+    with pytest.raises(AttributeError, match="no attribute 'missing'"):
+        getattr_("missing")
@@ -0,0 +1,213 @@
+"""Test measuring line coverage, and the coverage threshold test."""
+
+import importlib.util
+import os
+import pathlib
+import sys
+
+import coverage
+import pytest
+from geneweaver.testing.linecoverage import (
+    SYS_MONITORING,
+    CoverageSession,
+    MonitoringCollector,
+    TracerCollector,
+    coverage_sources,
+    source_files,
+)
+
+MODULE = """\
+def covered(value):
+    if value:
+        return 1
+    return 2
+
+
+def uncovered():
+    return 3
+"""
+
+COLLECTORS = [
+    TracerCollector,
+    pytest.param(
+        MonitoringCollector,
+        marks=pytest.mark.skipif(not SYS_MONITORING, reason="needs Python 3.12"),
+    ),
+]
+
+
+def run_module(path: pathlib.Path) -> None:
+    """Import a module from a file, and call it."""
+    spec = importlib.util.spec_from_file_location("measured_module", path)
+    assert spec is not None
+    assert spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    for _ in range(3):
+        module.covered(True)
+
+
+@pytest.fixture()
+def source(tmp_path):
+    """Create a source directory with a measured module, and one never run."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "measured.py").write_text(MODULE)
+    (tmp_path / "src" / "unused.py").write_text("VALUE = 1\n")
+    (tmp_path / "src" / ".hidden").mkdir()
+    (tmp_path / "src" / ".hidden" / "skipped.py").write_text("")
+    return tmp_path / "src"
+
+
+def test_source_files(source):
+    """Test that python files are found, except in hidden directories."""
+    assert [path.name for path in source_files([source])] == [
+        "measured.py",
+        "unused.py",
+    ]
+
+
+def test_coverage_sources(tmp_path):
+    """Test that src is measured by default, and the setting overrides it."""
+    assert coverage_sources(tmp_path, {}) == [tmp_path]
+    (tmp_path / "src").mkdir()
+    assert coverage_sources(tmp_path, {}) == [tmp_path / "src"]
+    assert coverage_sources(tmp_path, {"coverage-source": "lib"}) == [tmp_path / "lib"]
+
+
+@pytest.mark.parametrize("collector_type", COLLECTORS)
+def test_collector(source, collector_type):
+    """Test that only the lines run in the measured files are recorded."""
+    if sys.gettrace() is not None:
+        pytest.skip("another tracer, such as a debugger, is running")
+    collector = collector_type([source])
+    collector.start()
+    try:
+        run_module(source / "measured.py")
+    finally:
+        collector.stop()
+    lines = collector.lines()
+    assert list(lines) == [str(source / "measured.py")]
+    assert lines[str(source / "measured.py")] == {1, 2, 3, 7}
+
+
+def test_session_writes_coverage_data(source, tmp_path):
+    """Test that coverage.py reads the data, with unused files as uncovered."""
+    if sys.gettrace() is not None:
+        pytest.skip("another tracer, such as a debugger, is running")
+    session = CoverageSession([source], tmp_path / ".coverage")
+    session.start()
+    try:
+        run_module(source / "measured.py")
+    finally:
+        session.stop()
+    path = session.save()
+
+    data = coverage.CoverageData(basename=str(path))
+    data.read()
+    assert sorted(data.measured_files()) == [
+        str(source / "measured.py"),
+        str(source / "unused.py"),
+    ]
+    assert data.lines(str(source / "unused.py")) == []
+    # 4 of the 6 statements in measured.py, and none of unused.py.
+    assert session.total(path) == pytest.approx(4 / 7 * 100)
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="needs symbolic links")
+def test_session_counts_linked_files_once(source, tmp_path):
+    """Test that a file reached through a symbolic link is recorded once."""
+    if sys.gettrace() is not None:
+        pytest.skip("another tracer, such as a debugger, is running")
+    link = tmp_path / "link"
+    link.symlink_to(source, target_is_directory=True)
+    session = CoverageSession([link], tmp_path / ".coverage")
+    session.start()
+    try:
+        run_module(link / "measured.py")
+    finally:
+        session.stop()
+    data = coverage.CoverageData(basename=str(session.save()))
+    data.read()
+    measured = str((source / "measured.py").resolve())
+    assert sorted(data.measured_files()) == [
+        measured,
+        str((source / "unused.py").resolve()),
+    ]
+    assert data.lines(measured) == [1, 2, 3, 7]
+
+
+def test_coverage_starts_before_conftest(pytester):
+    """Test that modules imported by conftest.py are measured from their first line."""
+    pytester.makepyprojecttoml("")
+    pytester.mkdir("src")
+    pytester.mkpydir("src/example")
+    (pytester.path / "src" / "example" / "genes.py").write_text(MODULE)
+    pytester.makeconftest(
+        """
+        import sys
+        sys.path.insert(0, "src")
+        import example.genes
+        """
+    )
+    pytester.makepyfile("def test_nothing():\n    pass\n")
+    result = pytester.runpytest("--gw-coverage", "-p", "no:cov", ".")
+    result.assert_outcomes(passed=1)
+    data = coverage.CoverageData(basename=str(pytester.path / ".coverage"))
+    data.read()
+    genes = str((pytester.path / "src" / "example" / "genes.py").resolve())
+    # The definitions run on import, the function bodies never do.
+    assert data.lines(genes) == [1, 7]
+
+
+def test_coverage_threshold(pytester):
+    """Test that the prebuilt test checks the coverage of the whole session."""
+    pytester.makepyprojecttoml(
+        "[tool.pytest.ini_options]\ngeneweaver_prebuilt = true\n"
+        "geneweaver_disable = ['all']\n"
+        "[tool.geneweaver.testing]\ncoverage-fail-under = 50\n"
+    )
+    pytester.mkdir("src")
+    pytester.mkpydir("src/example")
+    (pytester.path / "src" / "example" / "genes.py").write_text(MODULE)
+    pytester.makepyfile(
+        test_genes="""
+        import sys
+        sys.path.insert(0, "src")
+
+        def test_covered():
+            from example.genes import covered
+            assert covered(True) == 1
+        """
+    )
+    result = pytester.runpytest(
+        "--gw-enable=coverage", "--gw-coverage", "-p", "no:cov", "-v", "."
+    )
+    result.stdout.fnmatch_lines(
+        [
+            "*test_genes.py::test_covered PASSED*",
+            "*geneweaver-testing/coverage::test_coverage_threshold PASSED*",
+            "*66.7% of statements covered*",
+        ]
+    )
+    assert (pytester.path / ".coverage").exists()
+
+    pytester.makepyprojecttoml(
+        "[tool.pytest.ini_options]\ngeneweaver_prebuilt = true\n"
+        "geneweaver_disable = ['all']\n"
+        "[tool.geneweaver.testing]\ncoverage-fail-under = 90\n"
+    )
+    result = pytester.runpytest("--gw-enable=coverage", "--gw-coverage", ".")
+    result.assert_outcomes(passed=1, failed=1)
+    result.stdout.fnmatch_lines(["*covered 66.7% of statements, under*90%*"])
+
+
+def test_coverage_threshold_skipped_without_coverage(pytester):
+    """Test that the threshold is not checked unless coverage is measured."""
+    pytester.makepyprojecttoml(
+        "[tool.pytest.ini_options]\ngeneweaver_prebuilt = true\n"
+        "geneweaver_disable = ['all']\n"
+    )
+    pytester.makepyfile("def test_nothing():\n    pass\n")
+    result = pytester.runpytest("--gw-enable=coverage", "-rs", ".")
+    result.assert_outcomes(passed=1, skipped=1)
+    result.stdout.fnmatch_lines(["*run pytest with --gw-coverage*"])
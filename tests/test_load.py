@@ -0,0 +1,134 @@
+"""Test load testing ASGI applications in process."""
+
+import asyncio
+
+import pytest
+from geneweaver.testing.load import (
+    LoadReport,
+    Request,
+    call_asgi,
+    load_failures,
+    load_test,
+)
+
+
+async def app(scope, receive, send):
+    """Echo the request, and take longer for slow requests."""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            app.events.append(message["type"])  # type: ignore[attr-defined]
+            await send({"type": message["type"] + ".complete"})
+            if message["type"] == "lifespan.shutdown":
+                return
+    request = await receive()
+    if scope["path"] == "/error":
+        raise ValueError("broken")
+    if scope["path"] == "/slow":
+        await asyncio.sleep(0.01)
+    body = f"{scope['method']} {scope['path']}?{scope['query_string'].decode()}"
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": body.encode() + request["body"]})
+
+
+app.events = []  # type: ignore[attr-defined]
+
+
+def test_call_asgi():
+    """Test that a request is sent as ASGI events, and its response collected."""
+    response = asyncio.run(
+        call_asgi(app, Request.json("POST", "/genes?species=2", {"id": 1}))
+    )
+    assert response.status == 200
+    assert response.body == b'POST /genes?species=2{"id": 1}'
+
+
+def test_percentiles():
+    """Test that percentiles are taken by the nearest rank."""
+    report = LoadReport(
+        duration=2.0, latencies={"a": [float(n) for n in range(1, 101)]}
+    )
+    assert (report.p50, report.p95, report.p99) == (50.0, 95.0, 99.0)
+    assert report.percentile(50, "missing") == 0.0
+    assert report.requests_per_second == 50.0
+
+
+def test_load_test():
+    """Test that the request mix is followed, with slow requests reported."""
+    app.events.clear()  # type: ignore[attr-defined]
+    report = load_test(
+        app,
+        [Request("GET", "/fast", weight=3), Request("GET", "/slow", name="slow")],
+        concurrency=8,
+        total=200,
+        warmup=10,
+    )
+    assert app.events == [  # type: ignore[attr-defined]
+        "lifespan.startup",
+        "lifespan.shutdown",
+    ]
+    assert report.count() == 200
+    assert 100 < report.count("GET /fast") < 190
+    assert report.percentile(50, "slow") >= 0.01 > report.percentile(50, "GET /fast")
+    assert report.statuses["slow"][200] == report.count("slow")
+    assert report.error_rate() == 0.0
+    assert "GET /fast" in report.summary()
+
+
+def test_load_test_duration():
+    """Test that requests are sent until the duration has passed."""
+    report = load_test(app, [Request("GET", "/slow")], duration=0.1, lifespan=False)
+    assert report.duration >= 0.1
+    assert report.requests_per_second > 0
+
+
+def test_load_failures():
+    """Test that errors and latencies over budget fail."""
+    report = load_test(
+        app, [Request("GET", "/error"), Request("GET", "/slow")], total=20
+    )
+    assert report.errors["GET /error"][0] == "ValueError: broken"
+    failures = load_failures(report, p99=0.001, min_rps=1e9)
+    assert failures[0].startswith("p99 latency of")
+    assert "requests per second is under the minimum" in failures[1]
+    assert failures[2].startswith("error rate of")
+    assert load_failures(report, max_error_rate=None) == []
+
+
+def test_no_requests():
+    """Test that a request mix is required."""
+    with pytest.raises(ValueError, match="No requests"):
+        load_test(app, [])
+
+
+def test_load_tester(pytester):
+    """Test the fixture, with budgets from its arguments and the marker."""
+    pytester.makepyprojecttoml(
+        "[tool.pytest.ini_options]\ngeneweaver_prebuilt = true\n"
+        "geneweaver_disable = ['all']\n"
+    )
+    pytester.makepyfile(
+        """
+        import asyncio
+        import pytest
+        from geneweaver.testing.load import Request
+
+        async def app(scope, receive, send):
+            assert scope["type"] == "http"
+            await asyncio.sleep(0.005)
+            await send({"type": "http.response.start", "status": 200})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        @pytest.mark.load(total=50, concurrency=5)
+        def test_fast_enough(load_tester):
+            report = load_tester(app, [Request("GET", "/")], p99=1.0)
+            assert report.count() == 50
+
+        @pytest.mark.load(total=50, p50=0.001)
+        def test_too_slow(load_tester):
+            load_tester(app, [Request("GET", "/")])
+        """
+    )
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=1, failed=1)
+    result.stdout.fnmatch_lines(["*p50 latency of * is over the budget of 1.00ms*"])
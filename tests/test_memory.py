@@ -0,0 +1,141 @@
+"""Test the memory engine and the memory_budget fixture."""
+
+import tracemalloc
+
+import pytest
+from geneweaver.testing.memory import (
+    LeakReport,
+    MemoryReport,
+    MemoryTracker,
+    budget_failures,
+    find_leak,
+    format_size,
+    parse_size,
+)
+
+MIB = 1024**2
+
+
+@pytest.mark.parametrize(
+    ("size", "expected"),
+    [
+        (10, 10),
+        ("512", 512),
+        ("1.5k", 1536),
+        ("50 MB", 50 * MIB),
+        ("2GiB", 2 * 1024**3),
+    ],
+)
+def test_parse_size(size, expected):
+    """Test that sizes are parsed in powers of 1024."""
+    assert parse_size(size) == expected
+
+
+def test_parse_size_rejects_invalid_sizes():
+    """Test that an unknown unit is an error."""
+    with pytest.raises(ValueError, match="Invalid size"):
+        parse_size("50 furlongs")
+
+
+def test_format_size():
+    """Test that sizes are formatted in the most readable unit."""
+    assert format_size(512) == "512 B"
+    assert format_size(1536) == "1.5 KiB"
+    assert format_size(50 * MIB) == "50.0 MiB"
+
+
+def test_tracker_reports_peak_net_and_sites():
+    """Test that temporary and retained allocations are told apart."""
+    tracker = MemoryTracker()
+    with tracker as report:
+        temporary = bytearray(4 * MIB)
+        del temporary
+        retained = bytearray(MIB)
+    assert report is tracker.report
+    assert report.peak >= 4 * MIB
+    assert MIB <= report.net < 2 * MIB
+    assert report.top[0].size >= MIB
+    assert "test_memory.py" in report.top[0].location
+    assert len(retained) == MIB
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracker_samples_rss():
+    """Test that the resident set size is sampled when asked."""
+    with MemoryTracker(rss=True) as report:
+        pass
+    assert report.rss_peak is not None
+    assert report.rss_net is not None
+    assert "RSS peak" in report.summary()
+
+
+def test_budget_failures():
+    """Test that each exceeded budget is described."""
+    report = MemoryReport(peak=10 * MIB, net=MIB)
+    assert budget_failures(report, peak="10 MB", net="1 MB") == []
+    assert budget_failures(report, peak="5 MB", rss_peak="1 MB") == [
+        "peak allocation of 10.0 MiB is over the budget of 5.0 MiB",
+        "peak RSS growth was not measured",
+    ]
+
+
+def test_find_leak():
+    """Test that growing retained memory is a leak, and a filled cache is not."""
+    retained = []
+    cache = {}
+    leak = find_leak(lambda: retained.append(bytearray(10_000)))
+    assert leak.leaking
+    assert len(leak.growth) == 9
+    assert "retained memory grew by" in leak.summary()
+    assert not find_leak(lambda: cache.setdefault("key", bytearray(10_000))).leaking
+
+
+def test_leak_with_jitter():
+    """Test that retained memory trending upwards is a leak, even if it drops."""
+    report = LeakReport([1000, 3000, 2500, 5000, 4000, 7000], tolerance=1024)
+    assert report.slope > 0
+    assert report.leaking
+    assert not LeakReport([1000, 3000, 2500, 5000, 4000, 7000], 10_000).leaking
+    assert not LeakReport([1000, 1200, 900, 1100, 1000, 950]).leaking
+
+
+def test_find_leak_tolerance():
+    """Test that growth within the tolerance is not a leak."""
+    retained = []
+    report = find_leak(lambda: retained.append(bytearray(100)), tolerance="1 MB")
+    assert not report.leaking
+
+
+def test_fixture(pytester):
+    """Test the fixture's budgets, marker defaults and leak check."""
+    pytester.makepyprojecttoml(
+        "[tool.pytest.ini_options]\ngeneweaver_prebuilt = true\n"
+        "geneweaver_disable = ['all']\n"
+    )
+    pytester.makepyfile(
+        """
+        import pytest
+
+        def test_within_budget(memory_budget):
+            with memory_budget(peak="10 MB") as report:
+                bytearray(1024 * 1024)
+            assert report.peak >= 1024 * 1024
+
+        @pytest.mark.memory(peak="1 MB")
+        def test_over_marker_budget(memory_budget):
+            with memory_budget():
+                bytearray(2 * 1024 * 1024)
+
+        def test_leak(memory_budget):
+            retained = []
+            memory_budget.assert_no_leak(lambda: retained.append(bytearray(1000)))
+        """
+    )
+    result = pytester.runpytest("-p", "no:cacheprovider")
+    result.assert_outcomes(passed=1, failed=2)
+    result.stdout.fnmatch_lines(
+        [
+            "*peak allocation of 2.0 MiB is over the budget of 1.0 MiB*",
+            "*leaks memory, retained memory grew by*",
+        ]
+    )
@@ -0,0 +1,105 @@
+"""Test the geneweaver.testing.metrics module."""
+
+import pathlib
+
+from geneweaver.testing.metrics import (
+    FileMetrics,
+    FunctionComplexity,
+    measure_files,
+    measure_source,
+)
+from radon.metrics import mi_visit
+
+SOURCE = '''"""A module."""
+
+
+def simple():
+    return 1
+
+
+class Thing:
+    def branchy(self, x):
+        if x > 1 and x < 5:
+            return 1
+        for item in range(x):
+            if item:
+                return item
+        return 0
+'''
+
+
+def test_measure_source_matches_radon():
+    """Test that one parse gives the same metrics as radon's own functions."""
+    metrics = measure_source(SOURCE, "src/example.py")
+    assert metrics.functions == [
+        FunctionComplexity("src/example.py", "simple", 4, 1),
+        FunctionComplexity("src/example.py", "Thing.branchy", 9, 5),
+    ]
+    assert metrics.maintainability == round(mi_visit(SOURCE, True), 2)
+    assert metrics.sloc == 10
+
+
+def test_syntax_error_is_reported():
+    """Test that a file that cannot be parsed is reported, not raised."""
+    metrics = measure_source("def broken(:\n", "src/broken.py")
+    assert metrics.error
+
+
+def test_undecodable_file_is_reported(tmp_path):
+    """Test that a file that is not valid UTF-8 is reported, not raised."""
+    path = tmp_path / "latin.py"
+    path.write_bytes(b"NAME = '\xe9'\n")
+    report = measure_files({"latin.py": path})
+    assert [metrics.path for metrics in report.errors] == ["latin.py"]
+    assert "utf-8" in report.errors[0].error
+
+
+def test_report_thresholds(tmp_path):
+    """Test the functions and files that fail the thresholds."""
+    (tmp_path / "example.py").write_text(SOURCE)
+    (tmp_path / "broken.py").write_text("def broken(:\n")
+    report = measure_files(
+        {"example.py": tmp_path / "example.py", "broken.py": tmp_path / "broken.py"}
+    )
+    assert [function.name for function in report.hottest(1)] == ["Thing.branchy"]
+    assert [function.name for function in report.too_complex(4)] == ["Thing.branchy"]
+    assert report.too_complex(5) == []
+    assert [metrics.path for metrics in report.unmaintainable(101)] == ["example.py"]
+    assert [metrics.path for metrics in report.errors] == ["broken.py"]
+
+
+def test_cached_files_are_not_measured_again(tmp_path):
+    """Test that only files whose content changed are measured."""
+    path = tmp_path / "example.py"
+    path.write_text(SOURCE)
+    cache: dict = {}
+    measure_files({"example.py": path}, {"example.py": "one"}, cache)
+    assert list(cache) == ["example.py:one"]
+
+    cache["example.py:one"] = FileMetrics("example.py", maintainability=1).to_json()
+    report = measure_files({"example.py": path}, {"example.py": "one"}, cache)
+    assert report.files[0].maintainability == 1
+    report = measure_files({"example.py": path}, {"example.py": "two"}, cache)
+    assert report.files[0].maintainability > 1
+
+
+def test_files_are_measured_in_parallel(tmp_path):
+    """Test that worker processes give the same results as the current process."""
+    paths = {}
+    for index in range(20):
+        paths[f"module_{index}.py"] = tmp_path / f"module_{index}.py"
+        paths[f"module_{index}.py"].write_text(SOURCE * (index % 3 + 1))
+    serial = measure_files(paths, workers=1)
+    parallel = measure_files(paths, workers=2)
+    assert parallel == serial
+    assert [metrics.path for metrics in parallel.files] == sorted(paths)
+
+
+def test_this_project_passes_the_defaults():
+    """Test that this repository's own code passes the default thresholds."""
+    root = pathlib.Path(__file__).parent.parent
+    report = measure_files(
+        {str(path): path for path in (root / "src").rglob("*.py")}, workers=1
+    )
+    assert report.too_complex(20) == []
+    assert report.unmaintainable(10) == []
@@ -0,0 +1,141 @@
+"""Test the geneweaver-testing pytest plugin."""
+
+import pytest
+from geneweaver.testing.plugin import (
+    CATEGORIES,
+    OPT_IN_CATEGORIES,
+    enabled_categories,
+    prebuilt_tests,
+)
+
+STRUCTURE_TESTS = len(prebuilt_tests("structure"))
+
+
+@pytest.fixture()
+def project(pytester):
+    """Create a project with the expected structure, and a test of its own."""
+    pytester.mkdir("src")
+    pytester.mkdir("tests")
+    for name in ("README.md", "CONTRIBUTING.md", "LICENSE"):
+        (pytester.path / name).write_text("")
+    pytester.makepyprojecttoml(
+        '[tool.poetry]\nname = "geneweaver-example"\n'
+        "[tool.pytest.ini_options]\ngeneweaver_prebuilt = true\n"
+        "geneweaver_disable = ['all']\n"
+    )
+    pytester.makepyfile(**{"tests/test_own": "def test_own():\n    pass\n"})
+    return pytester
+
+
+def test_categories_cover_every_prebuilt_test():
+    """Test that every test provided by geneweaver.testing is in a category."""
+    import geneweaver.testing
+
+    names = [name for category in CATEGORIES for name in prebuilt_tests(category)]
+    assert sorted(names) == sorted(dir(geneweaver.testing))
+
+
+def test_prebuilt_tests_are_collected(project):
+    """Test that enabled categories are added without any star-imports."""
+    result = project.runpytest("--gw-enable=structure", "-v")
+    result.stdout.fnmatch_lines(
+        ["*geneweaver-testing/structure::test_has_src_directory*"]
+    )
+    # The package directory is missing from the example project.
+    result.assert_outcomes(passed=STRUCTURE_TESTS - 2 + 1, failed=2)
+
+
+def test_categories_are_disabled_by_ini(project):
+    """Test that the ini setting disables the prebuilt tests."""
+    project.runpytest().assert_outcomes(passed=1)
+
+
+def test_star_imports_run_once(project):
+    """Test that star-imported copies of the prebuilt tests are de-duplicated."""
+    for name in ("test_common", "test_common_again"):
+        project.makepyfile(
+            **{f"tests/{name}": "from geneweaver.testing import *  # noqa: F403\n"}
+        )
+    result = project.runpytest("--gw-enable=structure")
+    result.assert_outcomes(passed=STRUCTURE_TESTS - 2 + 1, failed=2)
+
+
+def test_star_imports_run_once_without_the_prebuilt_tests(project):
+    """Test that star-imports are de-duplicated when only some files are run."""
+    for name in ("test_common", "test_common_again"):
+        project.makepyfile(
+            **{f"tests/{name}": "from geneweaver.testing import *  # noqa: F403\n"}
+        )
+    result = project.runpytest(
+        "--gw-enable=structure",
+        "tests/test_common.py",
+        "tests/test_common_again.py",
+    )
+    result.assert_outcomes(passed=STRUCTURE_TESTS - 2, failed=2)
+
+
+def test_other_projects_do_not_get_the_prebuilt_tests(pytester):
+    """Test that a project without src/geneweaver only runs its own tests.
+
+    Neither the prebuilt tests nor their fixtures are imported.
+    """
+    pytester.makepyfile(
+        test_own="""
+        import sys
+
+        def test_own():
+            modules = (
+                "typing",
+                "package.wheel",
+                "fixtures.style",
+                "fixtures.wheel",
+                "fixtures.benchmark",
+                "fixtures.package",
+            )
+            loaded = [
+                name
+                for name in ["black", *(f"geneweaver.testing.{m}" for m in modules)]
+                if name in sys.modules
+            ]
+            assert not loaded, loaded
+
+        def test_no_fixtures(request):
+            assert "pyproject" not in request.fixturenames
+            assert request.config.pluginmanager.get_plugin(
+                "geneweaver.testing.fixtures.package"
+            ) is None
+        """
+    )
+    pytester.runpytest_subprocess(".").assert_outcomes(passed=2)
+
+
+def test_geneweaver_projects_get_the_prebuilt_tests(project):
+    """Test that a src/geneweaver directory turns the prebuilt tests on."""
+    project.makepyprojecttoml(
+        "[tool.pytest.ini_options]\ngeneweaver_disable = ['all']\n"
+    )
+    project.runpytest("--gw-enable=structure").assert_outcomes(passed=1)
+    project.mkdir("src/geneweaver")
+    result = project.runpytest("--gw-enable=structure", "-v")
+    result.stdout.fnmatch_lines(["*geneweaver-testing/structure::*"])
+
+    project.makepyprojecttoml(
+        "[tool.pytest.ini_options]\ngeneweaver_prebuilt = false\n"
+        "geneweaver_disable = ['all']\n"
+    )
+    project.runpytest("--gw-enable=structure").assert_outcomes(passed=1)
+
+
+def test_slow_categories_are_opt_in(pytester):
+    """Test that typing, complexity and wheel only run when enabled."""
+    pytester.makepyprojecttoml("[tool.pytest.ini_options]\n")
+    config = pytester.parseconfig()
+    assert not set(OPT_IN_CATEGORIES) & set(enabled_categories(config))
+    assert "structure" in enabled_categories(config)
+    assert "typing" in enabled_categories(pytester.parseconfig("--gw-enable=typing"))
+
+    pytester.makepyprojecttoml(
+        "[tool.pytest.ini_options]\ngeneweaver_enable = ['wheel', 'typing']\n"
+    )
+    config = pytester.parseconfig("--gw-disable=typing")
+    assert set(OPT_IN_CATEGORIES) & set(enabled_categories(config)) == {"wheel"}
@@ -0,0 +1,159 @@
+"""Test the session profiler."""
+
+import cProfile
+import json
+import pstats
+from types import SimpleNamespace
+
+from geneweaver.testing.profiling import (
+    FixtureTiming,
+    ItemTiming,
+    Profiler,
+    ProfileReport,
+    collapse_stats,
+    slowest_nodeids,
+)
+
+
+def inner():
+    """Spend some time in a nested call."""
+    return sum(range(20_000))
+
+
+def outer():
+    """Call the nested function a few times."""
+    return [inner() for _ in range(5)]
+
+
+def test_collapse_stats():
+    """Test that a profile is rebuilt into stacks through the nested calls."""
+    profile = cProfile.Profile()
+    profile.runcall(outer)
+    stats = pstats.Stats(profile)
+    stacks = dict(collapse_stats(stats))
+    nested = [
+        frames
+        for frames in stacks
+        if any(frame.startswith("outer (test_profiling.py") for frame in frames)
+        and frames[-1].startswith("inner (test_profiling.py")
+    ]
+    assert nested
+    total = sum(entry[2] for entry in stats.stats.values())  # type: ignore[attr-defined]
+    assert abs(sum(stacks.values()) - total) < total * 0.05
+
+
+def test_report():
+    """Test the slowest tests and fixtures, and their collapsed stacks."""
+    report = ProfileReport(
+        items={
+            "test_a": ItemTiming("test_a", setup=0.5, call=1.0, teardown=0.25),
+            "test_b": ItemTiming("test_b", call=0.1),
+        },
+        fixtures={"database": FixtureTiming("database", "session", 1, 0.4)},
+        fixture_stacks=[(("test_a", "database"), 0.4)],
+    )
+    assert [item.nodeid for item in report.slowest_items(1)] == ["test_a"]
+    assert report.to_json()["items"][0]["total"] == 1.75
+    assert list(report.collapsed_stacks()) == [
+        "test_a;setup;database 400000",
+        "test_a;setup 100000",
+        "test_a;call 1000000",
+        "test_a;teardown 250000",
+        "test_b;setup 0",
+        "test_b;call 100000",
+        "test_b;teardown 0",
+    ]
+
+
+def test_profile_option(pytester):
+    """Test that profiling a session writes every report."""
+    pytester.makepyprojecttoml(
+        "[tool.pytest.ini_options]\ngeneweaver_disable = ['all']\n"
+    )
+    pytester.makepyfile(
+        """
+        import time
+        import pytest
+
+        @pytest.fixture(scope="session")
+        def slow_setup():
+            time.sleep(0.05)
+
+        @pytest.fixture()
+        def nested(request):
+            return request.getfixturevalue("slow_setup")
+
+        def test_slow(nested):
+            time.sleep(0.02)
+
+        def test_fast():
+            pass
+        """
+    )
+    result = pytester.runpytest("--gw-profile=profile", "--gw-profile-top=1")
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines(["*geneweaver profile*", "*run again to profile*"])
+    output = pytester.path / "profile"
+    assert json.loads((output / "profile.json").read_text())["profiled"] == []
+
+    # The durations recorded by the first session choose the test to profile.
+    result = pytester.runpytest("--gw-profile=profile", "--gw-profile-top=1")
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines(
+        ["*geneweaver profile*", "*test_slow * [[]profiled]", "*slow_setup [session*"]
+    )
+    report = json.loads((output / "profile.json").read_text())
+    assert report["items"][0]["nodeid"] == "test_profile_option.py::test_slow"
+    assert report["profiled"] == ["test_profile_option.py::test_slow"]
+    slow_setup = next(
+        fixture for fixture in report["fixtures"] if fixture["name"] == "slow_setup"
+    )
+    assert slow_setup["total"] >= 0.05
+    nested = next(
+        fixture for fixture in report["fixtures"] if fixture["name"] == "nested"
+    )
+    assert nested["total"] < 0.05
+
+    stacks = (output / "profile.collapsed").read_text()
+    assert "test_profile_option.py::test_slow;setup;nested;slow_setup " in stacks
+    assert "test_profile_option.py::test_slow;call;" in stacks
+    assert (output / "test_profile_option.py_test_slow.prof").exists()
+
+
+def test_slowest_nodeids():
+    """Test that only tests with a recorded duration are chosen to profile."""
+    durations = {"test_a": 1.0, "test_b": 3.0, "test_c": 2.0, "test_gone": 9.0}
+    nodeids = ["test_a", "test_b", "test_c", "test_new"]
+    assert slowest_nodeids(nodeids, durations, 2) == {"test_b", "test_c"}
+    assert slowest_nodeids(nodeids, {}, 2) == set()
+
+
+def _run_call(profiler: Profiler, nodeid: str) -> None:
+    hook = profiler.pytest_runtest_call(SimpleNamespace(nodeid=nodeid))  # type: ignore[arg-type]
+    next(hook)
+    outer()
+    next(hook, None)
+
+
+def test_rerun_keeps_the_last_profile(tmp_path):
+    """Test that profiling a test twice, as reruns do, keeps one profile."""
+    profiler = Profiler(tmp_path, 1)
+    profiler._profiled = {"test_a"}
+    _run_call(profiler, "test_a")
+    _run_call(profiler, "test_a")
+    _run_call(profiler, "test_b")
+    assert list(profiler.report.profiles) == ["test_a"]
+
+
+def test_active_profiler_is_not_an_error(tmp_path, monkeypatch):
+    """Test that a test runs unprofiled if another profiler is already active."""
+
+    def enable(self: cProfile.Profile) -> None:
+        raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(cProfile.Profile, "enable", enable)
+    profiler = Profiler(tmp_path, 1)
+    profiler._profiled = {"test_a"}
+    _run_call(profiler, "test_a")
+    assert profiler.report.profiles == {}
+    assert profiler.profile_error == "Another profiling tool is already active"
@@ -0,0 +1,79 @@
+"""Test the geneweaver.testing.pyproject module."""
+
+import pytest
+from geneweaver.testing.pyproject import PyProject
+
+CONTENTS = {
+    "tool": {
+        "poetry": {"name": "geneweaver-example", "packages": [{"include": "a"}]},
+        "ruff": {"select": ["F", "E"], "per-file-ignores": {"src/*": ["ANN101"]}},
+    },
+    "build-system": {"requires": ["poetry-core"]},
+}
+
+
+def test_sections_are_precomputed():
+    """Test that the commonly used sections are resolved up front."""
+    pyproject = PyProject(CONTENTS)
+    assert pyproject.exists
+    assert pyproject.has_poetry
+    assert pyproject.has_ruff
+    assert pyproject.has_build_system
+    assert pyproject.poetry["name"] == "geneweaver-example"
+    assert pyproject.ruff_select == ("F", "E")
+    assert pyproject.ruff_per_file_ignores["src/*"] == ("ANN101",)
+    assert pyproject.missing_poetry_keys == {
+        "version",
+        "description",
+        "authors",
+        "license",
+        "readme",
+        "homepage",
+        "repository",
+    }
+
+
+def test_missing_file_and_sections():
+    """Test that missing sections are empty rather than raising."""
+    pyproject = PyProject(None)
+    assert not pyproject.exists
+    assert not pyproject.has_poetry
+    assert not pyproject.has_ruff_select
+    assert pyproject.poetry.get("packages", ()) == ()
+    assert pyproject.ruff_select == ()
+    assert pyproject.ruff_per_file_ignores is None
+    assert pyproject.testing_settings == {}
+
+
+def test_model_is_read_only():
+    """Test that neither the model nor its contents can be changed."""
+    pyproject = PyProject(CONTENTS)
+    with pytest.raises(AttributeError):
+        pyproject.poetry = {}
+    with pytest.raises(TypeError):
+        pyproject.poetry["name"] = "other"
+    with pytest.raises(AttributeError):
+        pyproject.ruff_per_file_ignores["src/*"].remove("ANN101")
+    assert not hasattr(pyproject, "__dict__")
+
+
+def test_model_does_not_share_state_with_source():
+    """Test that changing the parsed dictionary does not change the model."""
+    contents = {"tool": {"ruff": {"select": ["F"]}}}
+    pyproject = PyProject(contents)
+    contents["tool"]["ruff"]["select"].append("E")
+    assert pyproject.ruff_select == ("F",)
+
+
+def test_from_path(tmp_path):
+    """Test reading the model from a file that may not exist."""
+    assert not PyProject.from_path(tmp_path / "pyproject.toml").exists
+    (tmp_path / "pyproject.toml").write_text('[tool.poetry]\nname = "x"\n')
+    assert PyProject.from_path(tmp_path / "pyproject.toml").poetry["name"] == "x"
+
+
+def test_testing_settings():
+    """Test that the prebuilt test settings are read from tool.geneweaver.testing."""
+    settings = {"import-time-budget-ms": 250}
+    pyproject = PyProject({"tool": {"geneweaver": {"testing": settings}}})
+    assert pyproject.testing_settings == settings
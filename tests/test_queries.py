@@ -0,0 +1,156 @@
+"""Test counting queries and finding N+1 query patterns."""
+
+import sqlite3
+from typing import List
+
+import pytest
+from geneweaver.testing.queries import (
+    QueryRecorder,
+    normalize_statement,
+    query_failures,
+)
+
+
+@pytest.mark.parametrize(
+    ("statement", "normalized"),
+    [
+        ("SELECT * FROM gene WHERE id = 42;", "SELECT * FROM gene WHERE id = ?"),
+        (
+            "SELECT * FROM gene WHERE symbol = 'Pax''6'",
+            "SELECT * FROM gene WHERE symbol = ?",
+        ),
+        (
+            "SELECT *\n  FROM gene -- all\n WHERE id = %s",
+            "SELECT * FROM gene WHERE id = ?",
+        ),
+        (
+            "SELECT * FROM gene WHERE id IN ($1, $2, $3)",
+            "SELECT * FROM gene WHERE id IN (?)",
+        ),
+        ("INSERT INTO t1 VALUES (:a), (:b)", "INSERT INTO t1 VALUES (?)"),
+        ("SELECT x::int FROM t", "SELECT x::int FROM t"),
+    ],
+)
+def test_normalize_statement(statement, normalized):
+    """Test that literals and parameters are replaced, but not identifiers."""
+    assert normalize_statement(statement) == normalized
+
+
+@pytest.fixture()
+def genes():
+    """Get a sqlite3 database of genes, each in a geneset."""
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE gene (id INTEGER, geneset INTEGER)")
+    connection.executemany(
+        "INSERT INTO gene VALUES (?, ?)", [(gene, gene % 3) for gene in range(10)]
+    )
+    yield connection
+    connection.close()
+
+
+def test_recorder(genes):
+    """Test that wrapped connections and their cursors record every statement."""
+    recorder = QueryRecorder(cursor_classes=[])
+    connection = recorder.wrap(genes)
+    connection.execute("SELECT 1")
+    with recorder as report:
+        for geneset in range(3):
+            cursor = connection.cursor()
+            rows = cursor.execute("SELECT id FROM gene WHERE geneset = ?", (geneset,))
+            assert rows.fetchall()
+        connection.executemany("INSERT INTO gene VALUES (?, 0)", [(10,), (11,)])
+    assert report.count == 4
+    assert report.total_time > 0
+    assert report.repeated() == {"SELECT id FROM gene WHERE geneset = ?": 3}
+    assert report.queries[-1].many
+    assert "3 x SELECT id FROM gene WHERE geneset = ?" in report.summary()
+
+
+def test_query_failures(genes):
+    """Test that too many queries, and statements repeated in a loop, fail."""
+    recorder = QueryRecorder(cursor_classes=[])
+    connection = recorder.wrap(genes)
+    with recorder as report:
+        for gene in range(6):
+            connection.execute(f"SELECT geneset FROM gene WHERE id = {gene}")
+    assert query_failures(report) == [
+        "'SELECT geneset FROM gene WHERE id = ?' ran 6 times, a likely N+1 query"
+    ]
+    assert query_failures(report, max_queries=5, max_repeats=None) == [
+        "6 queries is over the budget of 5"
+    ]
+
+
+class Cursor:
+    """A cursor class written in python, like psycopg's."""
+
+    def __init__(self) -> None:
+        """Start with no statements executed."""
+        self.executed: List[str] = []
+
+    def execute(self, statement):
+        """Pretend to execute a statement."""
+        self.executed.append(statement)
+        return self
+
+
+def test_patched_cursor_classes():
+    """Test that cursor classes are only patched while recording."""
+    original = Cursor.execute
+    cursor = Cursor()
+    with QueryRecorder(cursor_classes=[Cursor]) as report:
+        assert cursor.execute("SELECT 1") is cursor
+    cursor.execute("SELECT 2")
+    assert Cursor.execute is original
+    assert [query.statement for query in report.queries] == ["SELECT 1"]
+    assert cursor.executed == ["SELECT 1", "SELECT 2"]
+
+
+def test_query_counter(pytester):
+    """Test the fixture, with budgets from its arguments and the marker."""
+    pytester.makepyprojecttoml(
+        "[tool.pytest.ini_options]\ngeneweaver_prebuilt = true\n"
+        "geneweaver_disable = ['all']\n"
+    )
+    pytester.makepyfile(
+        """
+        import sqlite3
+        import pytest
+
+        @pytest.fixture()
+        def connection(query_counter):
+            connection = query_counter.wrap(sqlite3.connect(":memory:"))
+            connection.execute("CREATE TABLE gene (id INTEGER)")
+            return connection
+
+        def load(connection, count):
+            for gene in range(count):
+                connection.execute("INSERT INTO gene VALUES (?)", (gene,))
+
+        def test_within_budget(connection, query_counter):
+            with query_counter(max_queries=3) as report:
+                load(connection, 3)
+            assert report.count == 3
+
+        def test_over_budget(connection, query_counter):
+            with query_counter(max_queries=2):
+                load(connection, 3)
+
+        def test_loop(connection, query_counter):
+            with query_counter():
+                load(connection, 6)
+
+        @pytest.mark.queries(max_repeats=None)
+        def test_loop_allowed(connection, query_counter):
+            with query_counter():
+                load(connection, 6)
+        """
+    )
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=2, failed=2)
+    result.stdout.fnmatch_lines(
+        [
+            "*3 queries is over the budget of 2*",
+            "*'INSERT INTO gene VALUES (?)' ran 6 times, a likely N+1 query*",
+        ]
+    )
@@ -0,0 +1,164 @@
+"""Test the geneweaver.testing.rules module."""
+
+import pathlib
+import re
+
+import pytest
+from geneweaver.testing.pyproject import PyProject
+from geneweaver.testing.rules import (
+    PER_FILES_IGNORES_MSG,
+    PYPROJECT_RULES,
+    REQUIRED_RUFF_RULES,
+    STRUCTURE_RULES,
+    ProjectLayout,
+    assert_rule_passes,
+    evaluate,
+    evaluate_path,
+)
+
+VALID: dict = {
+    "tool": {
+        "poetry": {
+            "name": "geneweaver-example",
+            "version": "0.1.0",
+            "description": "An example package.",
+            "authors": ["Jane Doe <jane.doe@jax.org>"],
+            "license": "Apache-2.0",
+            "readme": "README.md",
+            "homepage": "https://example.org",
+            "repository": "https://example.org/repo",
+            "packages": [{"include": "geneweaver/example", "from": "src"}],
+        },
+        "ruff": {
+            "select": list(REQUIRED_RUFF_RULES),
+            "per-file-ignores": {"tests/*": ["ANN201"], "src/*": ["ANN101"]},
+        },
+    }
+}
+
+
+def _with_per_file_ignores(per_file_ignores: dict) -> PyProject:
+    contents = {"tool": {**VALID["tool"], "ruff": {**VALID["tool"]["ruff"]}}}
+    contents["tool"]["ruff"]["per-file-ignores"] = per_file_ignores
+    return PyProject(contents)
+
+
+def test_rule_ids_are_unique():
+    """Test that every rule can be looked up by its id."""
+    ids = [rule.id for rule in PYPROJECT_RULES]
+    assert len(ids) == len(set(ids))
+
+
+def test_valid_project_has_no_failures():
+    """Test that a compliant pyproject.toml passes every rule."""
+    assert evaluate(PyProject(VALID)) == {}
+
+
+def test_this_project_has_no_failures():
+    """Test that this repository's own pyproject.toml passes every rule."""
+    root = pathlib.Path(__file__).parent.parent
+    assert evaluate_path(root / "pyproject.toml") == {}
+
+
+def test_missing_pyproject_reports_every_section(tmp_path):
+    """Test that a missing pyproject.toml fails without raising."""
+    failures = evaluate_path(tmp_path / "pyproject.toml")
+    assert "pyproject-toml" in failures
+    assert "tool-poetry" in failures
+    assert "ruff-section" in failures
+    assert all(f"ruff-select-{code}" in failures for code in REQUIRED_RUFF_RULES)
+
+
+def test_failures_carry_the_rule_messages():
+    """Test that each failing rule reports its own message."""
+    contents = {"tool": {"poetry": {**VALID["tool"]["poetry"], "license": "MIT"}}}
+    contents["tool"]["ruff"] = {"select": ["F", "E"]}
+    failures = evaluate(PyProject(contents))
+    assert failures["poetry-license"] == (
+        "license in pyproject.toml file must be set to Apache-2.0"
+    )
+    assert "missing rule `W`" in failures["ruff-select-W"]
+    assert "ruff-select-F" not in failures
+    assert "other specifications" in failures["ruff-no-other-specifications"]
+
+
+@pytest.mark.parametrize(
+    "per_file_ignores",
+    [
+        {"src/*": ["ANN101"]},
+        {"tests/*": ["ANN001", "ANN201", "ANN101"]},
+        {
+            "tests/*": ["ANN201"],
+            "src/*": ["ANN101"],
+            "src/geneweaver/api/controller/*": ["B008", "ANN201"],
+        },
+    ],
+)
+def test_allowed_per_file_ignores(per_file_ignores):
+    """Test the per-file-ignores that are allowed."""
+    failures = evaluate(_with_per_file_ignores(per_file_ignores))
+    assert "ruff-per-file-ignores" not in failures
+
+
+@pytest.mark.parametrize(
+    "per_file_ignores",
+    [
+        {"docs/*": ["ANN101"]},
+        {"src/*": ["ANN101", "E501"]},
+        {"tests/*": ["E501"], "src/*": ["ANN101"]},
+        {
+            "tests/*": ["ANN201"],
+            "src/*": ["ANN101"],
+            "src/geneweaver/api/controller/*": ["B008", "E501"],
+        },
+        {"a/*": [], "b/*": [], "c/*": [], "d/*": []},
+    ],
+)
+def test_disallowed_per_file_ignores(per_file_ignores):
+    """Test the per-file-ignores that are not allowed."""
+    failures = evaluate(_with_per_file_ignores(per_file_ignores))
+    assert failures["ruff-per-file-ignores"] == PER_FILES_IGNORES_MSG
+
+
+def test_assert_rule_passes():
+    """Test that a failed rule fails with its own message."""
+    failures = evaluate(PyProject({}))
+    assert_rule_passes(failures, "not-a-rule")
+    with pytest.raises(AssertionError, match=re.escape(failures["tool-poetry"])):
+        assert_rule_passes(failures, "tool-poetry")
+
+
+def test_evaluate_subset_of_rules():
+    """Test that a subset of rules can be evaluated on its own."""
+    rules = [rule for rule in PYPROJECT_RULES if rule.id.startswith("poetry-")]
+    failures = evaluate(PyProject(None), rules)
+    assert failures
+    assert all(rule_id.startswith("poetry-") for rule_id in failures)
+
+
+def test_this_project_has_no_structure_failures():
+    """Test that this repository passes every structure rule."""
+    root = pathlib.Path(__file__).parent.parent
+    layout = ProjectLayout.from_root(root, PyProject.from_path(root / "pyproject.toml"))
+    assert evaluate(layout, STRUCTURE_RULES) == {}
+
+
+def test_empty_directory_fails_every_structure_rule(tmp_path):
+    """Test that each structure rule reports its own message."""
+    failures = evaluate(ProjectLayout(tmp_path, "example", False), STRUCTURE_RULES)
+    assert set(failures) == {rule.id for rule in STRUCTURE_RULES} - {
+        "geneweaver-namespace-package"
+    }
+    assert failures["src-directory"] == (
+        '"src" directory expected at root of git repository'
+    )
+
+
+def test_tool_package_directory(tmp_path):
+    """Test that tool packages are looked for in the geneweaver.tools namespace."""
+    (tmp_path / "src" / "geneweaver" / "tools" / "example").mkdir(parents=True)
+    layout = ProjectLayout.from_root(
+        tmp_path, PyProject({"tool": {"poetry": {"name": "geneweaver-example"}}})
+    )
+    assert layout.is_tool_package
+    assert "package-directory" not in evaluate(layout, STRUCTURE_RULES)
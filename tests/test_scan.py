@@ -0,0 +1,138 @@
+"""Test the geneweaver.testing.scan module and the scan command."""
+
+import json
+import pathlib
+from xml.etree import ElementTree
+
+import pytest
+from geneweaver.testing.cli import main
+from geneweaver.testing.scan import (
+    CHECK_NAMES,
+    CheckResult,
+    ProjectResult,
+    find_projects,
+    scan,
+    scan_project,
+    to_json,
+    to_junit,
+)
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent
+
+
+@pytest.fixture()
+def workspace(tmp_path):
+    """Create a directory with a compliant and a broken project."""
+    good = tmp_path / "good"
+    package = good / "src" / "geneweaver" / "example"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text('"""An example package."""\n')
+    (good / "tests").mkdir()
+    for name in ("README.md", "CONTRIBUTING.md", "LICENSE"):
+        (good / name).write_text("")
+    (good / "pyproject.toml").write_text(
+        (PROJECT_ROOT / "pyproject.toml")
+        .read_text()
+        .replace('name = "geneweaver-testing"', 'name = "geneweaver-example"')
+        .replace('include = "geneweaver/testing"', 'include = "geneweaver/example"')
+    )
+
+    broken = tmp_path / "group" / "broken"
+    broken.mkdir(parents=True)
+    (broken / "pyproject.toml").write_text('[tool.poetry]\nname = "geneweaver-x"\n')
+    # Projects nested inside a found project are not scanned separately.
+    (broken / "vendor" / "inner").mkdir(parents=True)
+    (broken / "vendor" / "inner" / "pyproject.toml").write_text("")
+    return tmp_path
+
+
+def test_find_projects(workspace):
+    """Test that projects are found without descending into other projects."""
+    assert find_projects([workspace]) == [
+        workspace / "good",
+        workspace / "group" / "broken",
+    ]
+
+
+def test_scan_project_matches_rules(workspace):
+    """Test that a compliant project passes and a broken one fails."""
+    checks = ("structure", "pyproject", "import")
+    good = scan_project(workspace / "good", checks)
+    broken = scan_project(workspace / "group" / "broken", checks)
+
+    assert good.passed, good.failures
+    failed = {result.id for result in broken.failures}
+    assert {"src-directory", "poetry-version", "can-import"} <= failed
+
+
+def test_scan_this_project():
+    """Test that this repository passes every check."""
+    (result,) = scan([PROJECT_ROOT], CHECK_NAMES, workers=1)
+    assert result.passed, result.failures
+
+
+def test_scan_in_parallel(workspace):
+    """Test that worker processes return the same results as a serial scan."""
+    projects = find_projects([workspace])
+    serial = scan(projects, ("structure", "pyproject"), workers=1)
+    parallel = scan(projects, ("structure", "pyproject"), workers=2)
+    assert [result.results for result in parallel] == [
+        result.results for result in serial
+    ]
+
+
+def test_reports(workspace):
+    """Test the JSON and JUnit renderings of the results."""
+    results = scan(find_projects([workspace]), ("structure",), workers=1)
+
+    document = json.loads(to_json(results))
+    assert document["passed"] is False
+    assert [project["passed"] for project in document["projects"]] == [True, False]
+
+    suites = ElementTree.fromstring(to_junit(results))
+    assert len(suites.findall("testsuite")) == 2
+    assert suites.findall("testsuite")[0].get("failures") == "0"
+    assert suites.findall(".//failure")
+
+
+def test_scan_continues_past_a_broken_pyproject(workspace):
+    """Test that a pyproject.toml that does not parse fails only its project."""
+    (workspace / "group" / "broken" / "pyproject.toml").write_text("[tool.poetry\n")
+    good, broken = scan(find_projects([workspace]), ("structure",), workers=1)
+    assert good.passed
+    assert [(result.check, result.id) for result in broken.results] == [
+        ("pyproject", "parse")
+    ]
+    assert "could not be read" in broken.results[0].message
+
+
+def test_junit_message_is_the_first_line(workspace):
+    """Test that a failure's message skips leading blank lines."""
+    result = ProjectResult(
+        "project",
+        [
+            CheckResult("style", "ruff-src", "\n\nRuff found errors\nmore"),
+            CheckResult("style", "black-src", ""),
+        ],
+    )
+    failures = ElementTree.fromstring(to_junit([result])).findall(".//failure")
+    assert [failure.get("message") for failure in failures] == [
+        "Ruff found errors",
+        "",
+    ]
+
+
+def test_main(workspace, tmp_path, capsys):
+    """Test the scan command's exit codes and report output."""
+    output = tmp_path / "report.xml"
+    exit_code = main(
+        ["scan", str(workspace), "--check", "structure", "--format", "junit"]
+        + ["--output", str(output)]
+    )
+    assert exit_code == 1
+    assert ElementTree.parse(output).getroot().tag == "testsuites"
+
+    assert main(["scan", str(workspace / "good"), "--check", "pyproject"]) == 0
+    assert json.loads(capsys.readouterr().out)["passed"] is True
+
+    assert main(["scan", str(tmp_path / "missing")]) == 2
@@ -0,0 +1,115 @@
+"""Test splitting a session into shards by duration."""
+
+import random
+import shutil
+
+import pytest
+from geneweaver.testing.sharding import (
+    ShardItem,
+    assign_shards,
+    estimate_durations,
+    parse_shard,
+)
+
+
+def test_parse_shard():
+    """Test that shards are given as index/count, counting from 1."""
+    assert parse_shard("2/4") == (2, 4)
+
+
+@pytest.mark.parametrize("value", ["0/4", "5/4", "1", "a/b", "1/"])
+def test_parse_shard_rejects_invalid_shards(value):
+    """Test that a shard outside the count, or not a fraction, is an error."""
+    with pytest.raises(ValueError, match="Invalid shard"):
+        parse_shard(value)
+
+
+def test_estimate_durations():
+    """Test that tests without history are estimated from their file, then all."""
+    history = {"a.py::one": 1.0, "a.py::two": 3.0, "b.py::one": 10.0}
+    assert estimate_durations(["a.py::one", "a.py::new", "c.py::new"], history) == {
+        "a.py::one": 1.0,
+        "a.py::new": 2.0,
+        "c.py::new": 3.0,
+    }
+    assert estimate_durations(["a.py::one"], {}) == {"a.py::one": 0.1}
+    # A test recorded as instant is not estimated as a typical one.
+    assert estimate_durations(["a.py::zero"], {"a.py::zero": 0.0, **history}) == {
+        "a.py::zero": 0.0
+    }
+
+
+def test_shards_are_balanced():
+    """Test that shards are expected to finish within a few percent of each other."""
+    rng = random.Random(0)
+    items = [
+        ShardItem(f"test_{number}", rng.lognormvariate(0, 1.5)) for number in range(500)
+    ]
+    shards = assign_shards(items, 4)
+    assert sorted(nodeid for shard in shards for nodeid in shard.nodeids) == sorted(
+        item.nodeid for item in items
+    )
+    durations = [shard.duration for shard in shards]
+    assert max(durations) / min(durations) < 1.03
+
+
+def test_shared_fixtures_stay_together():
+    """Test that tests sharing an expensive session fixture share a shard."""
+    items = [
+        *(
+            ShardItem(f"db_{number}", 1.0, frozenset({"database"}))
+            for number in range(4)
+        ),
+        *(ShardItem(f"unit_{number}", 1.0) for number in range(14)),
+    ]
+    shards = assign_shards(items, 2, {"database": 10.0})
+    (database_shard,) = [
+        shard for shard in shards if any(n.startswith("db_") for n in shard.nodeids)
+    ]
+    assert len([n for n in database_shard.nodeids if n.startswith("db_")]) == 4
+    assert [shard.duration for shard in shards] == [14.0, 14.0]
+
+
+def test_shard_option(pytester):
+    """Test that every test runs on exactly one shard, once durations are known."""
+    pytester.makepyprojecttoml(
+        "[tool.pytest.ini_options]\ngeneweaver_disable = ['all']\n"
+    )
+    pytester.makepyfile(
+        test_example="""
+        import time
+        import pytest
+
+        @pytest.mark.parametrize("duration", [0.05, 0.04, 0.03, 0.02, 0.01, 0.0])
+        def test_sleep(duration):
+            time.sleep(duration)
+        """
+    )
+    pytester.runpytest().assert_outcomes(passed=6)
+    # Durations are only recorded when asked for.
+    assert not list(pytester.path.glob(".pytest_cache/v/geneweaver/*durations*"))
+    pytester.runpytest("--gw-record-durations").assert_outcomes(passed=6)
+    # Every CI node starts from the same cache, a shard's run does not affect another.
+    cache = pytester.path / ".pytest_cache"
+    shutil.copytree(cache, pytester.path / "restored")
+
+    passed = []
+    for index in (1, 2):
+        shutil.rmtree(cache)
+        shutil.copytree(pytester.path / "restored", cache)
+        result = pytester.runpytest(f"--gw-shard={index}/2", "-v")
+        result.stdout.fnmatch_lines([f"geneweaver shard {index}/2: 3 tests*"])
+        passed.extend(
+            line.split()[0] for line in result.outlines if line.endswith("%]")
+        )
+    assert sorted(passed) == sorted(
+        f"test_example.py::test_sleep[{duration}]"
+        for duration in ("0.05", "0.04", "0.03", "0.02", "0.01", "0.0")
+    )
+
+
+def test_invalid_shard_option(pytester):
+    """Test that an invalid shard is a usage error."""
+    result = pytester.runpytest("--gw-shard=3/2")
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["*Invalid shard '3/2'*"])
@@ -0,0 +1,108 @@
+"""Test the geneweaver.testing.typecheck module."""
+
+import os
+
+import pytest
+from geneweaver.testing import typecheck
+from geneweaver.testing.index import ProjectIndex
+from geneweaver.testing.typecheck import (
+    MypyMessage,
+    TypeCheckReport,
+    run_mypy,
+    tree_digest,
+)
+
+
+@pytest.fixture()
+def mypy_cache(tmp_path_factory):
+    """Keep mypy's cache out of the project, as the mypy_report fixture does."""
+    return tmp_path_factory.mktemp("mypy_cache")
+
+
+@pytest.fixture()
+def project(tmp_path):
+    """Create a project with a type error in src and a clean tests directory."""
+    package = tmp_path / "src" / "geneweaver" / "example"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "core.py").write_text("def double(x: int) -> int:\n    return 'x'\n")
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "__init__.py").write_text("")
+    (tmp_path / "tests" / "test_core.py").write_text(
+        "from geneweaver.example.core import double\n\n"
+        "def test_double() -> None:\n    assert double(1) == 2\n"
+    )
+    return tmp_path
+
+
+def test_errors_are_reported_per_directory(project, mypy_cache):
+    """Test that one build reports errors against the file they are in."""
+    cwd = os.getcwd()
+    report = run_mypy(project, cache_dir=mypy_cache)
+
+    assert os.getcwd() == cwd
+    assert "MYPYPATH" not in os.environ
+    assert not report.passed("src")
+    assert report.passed("tests")
+    assert report.failures("src") == [
+        MypyMessage(
+            "src/geneweaver/example/core.py",
+            2,
+            "error",
+            'Incompatible return value type (got "str", expected "int")  '
+            "[return-value]",
+        )
+    ]
+
+
+def test_imports_between_targets_are_checked(project, mypy_cache):
+    """Test that the tests directory is checked against the src package."""
+    (project / "tests" / "test_core.py").write_text(
+        "from geneweaver.example.core import double\n\n"
+        "def test_double() -> None:\n    assert double('1') == 2\n"
+    )
+    report = run_mypy(project, cache_dir=mypy_cache)
+    assert "tests/test_core.py:4: error: Argument 1" in report.output("tests")
+
+
+def test_missing_directory(project, mypy_cache):
+    """Test that a missing directory fails without stopping the others."""
+    report = run_mypy(project, ("src", "missing"), cache_dir=mypy_cache)
+    assert report.output("missing") == "missing:0: error: directory does not exist\n"
+    assert not report.passed("src")
+
+
+def test_report_round_trip():
+    """Test that a report can be cached as JSON."""
+    report = TypeCheckReport([MypyMessage("src/a.py", 1, "error", "bad")])
+    assert TypeCheckReport.from_json(report.to_json()) == report
+
+
+def test_tree_digest_tracks_checked_files(project):
+    """Test that only changes to checked files change the digest."""
+    digest = tree_digest(project, ("src", "tests"))
+    (project / "README.md").write_text("")
+    assert tree_digest(project, ("src", "tests")) == digest
+    (project / "tests" / "test_core.py").write_text("")
+    assert tree_digest(project, ("src", "tests")) != digest
+
+
+def test_tree_digest_tracks_installed_distributions(project, monkeypatch):
+    """Test that upgrading mypy or a stub package changes the digest."""
+    monkeypatch.setattr(
+        typecheck, "_installed_distributions", lambda: ["types-requests==1.0"]
+    )
+    digest = tree_digest(project, ("src", "tests"))
+    monkeypatch.setattr(
+        typecheck, "_installed_distributions", lambda: ["types-requests==1.1"]
+    )
+    assert tree_digest(project, ("src", "tests")) != digest
+
+
+def test_tree_digest_uses_the_index(project):
+    """Test that the digest hashes the files of a given index."""
+    index = ProjectIndex.build(project)
+    assert tree_digest(project, ("src", "tests"), index) == tree_digest(
+        project, ("src", "tests")
+    )
+    assert all(indexed._digest is not None for indexed in index.files("src", (".py",)))
@@ -0,0 +1,240 @@
+"""Test the geneweaver.testing.watch module and the watch command."""
+
+import io
+import pathlib
+import threading
+import time
+from typing import List, Optional, Set, Union
+
+import pytest
+from geneweaver.testing import watch as watch_module
+from geneweaver.testing.cli import main
+from geneweaver.testing.watch import (
+    EVERYTHING,
+    InotifyWatcher,
+    PollingWatcher,
+    WatchSession,
+    affected_checks,
+)
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent
+
+
+@pytest.fixture()
+def project(tmp_path):
+    """Create a compliant project to watch."""
+    package = tmp_path / "src" / "geneweaver" / "example"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text('"""An example package."""\n')
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "__init__.py").write_text('"""Tests."""\n')
+    for name in ("README.md", "CONTRIBUTING.md", "LICENSE"):
+        (tmp_path / name).write_text("")
+    (tmp_path / "pyproject.toml").write_text(
+        (PROJECT_ROOT / "pyproject.toml")
+        .read_text()
+        .replace('name = "geneweaver-testing"', 'name = "geneweaver-example"')
+        .replace('include = "geneweaver/testing"', 'include = "geneweaver/example"')
+    )
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    ("changed", "expected"),
+    [
+        (["src/geneweaver/example/core.py"], ["structure", "import", "style"]),
+        (["tests/test_core.py"], ["structure", "style"]),
+        (["pyproject.toml"], ["structure", "pyproject", "import", "style"]),
+        (["README.md"], ["structure"]),
+        ([EVERYTHING], ["structure", "pyproject", "import", "style"]),
+    ],
+)
+def test_affected_checks(changed, expected):
+    """Test that changes map to the checks whose tests declare them as inputs."""
+    assert affected_checks(changed) == expected
+
+
+def test_affected_checks_keeps_only_chosen_checks():
+    """Test that checks that were not chosen are never affected."""
+    assert affected_checks(["pyproject.toml"], ["pyproject", "style"]) == [
+        "pyproject",
+        "style",
+    ]
+
+
+def _change_files(root: pathlib.Path) -> None:
+    """Create, modify and delete files after the watcher's first snapshot."""
+    time.sleep(0.05)
+    (root / "src" / "geneweaver" / "example" / "core.py").write_text("x = 1\n")
+    (root / "tests" / "__init__.py").unlink()
+    (root / "pyproject.toml").write_text("[tool.poetry]\n")
+    (root / "src" / "geneweaver" / "example" / "core.pyc").write_bytes(b"")
+
+
+def _collect(
+    watcher: Union[InotifyWatcher, PollingWatcher],
+    expected: Set[str],
+    timeout: float = 5.0,
+) -> Set[str]:
+    """Poll a watcher until all the expected paths are reported."""
+    changed: Set[str] = set()
+    deadline = time.monotonic() + timeout
+    while not expected <= changed and time.monotonic() < deadline:
+        changed |= watcher.poll(timeout=0.5)
+    return changed
+
+
+EXPECTED_CHANGES = {
+    "src/geneweaver/example/core.py",
+    "tests/__init__.py",
+    "pyproject.toml",
+}
+
+
+def test_polling_watcher(project):
+    """Test that polling finds created, modified and deleted files."""
+    watcher = PollingWatcher(project, interval=0.01)
+    assert watcher.poll(timeout=0) == set()
+    _change_files(project)
+    assert _collect(watcher, EXPECTED_CHANGES) == EXPECTED_CHANGES
+
+
+@pytest.mark.skipif(not InotifyWatcher.available(), reason="inotify not available")
+def test_inotify_watcher(project):
+    """Test that inotify finds changes, including in new directories."""
+    watcher = InotifyWatcher(project)
+    try:
+        assert watcher.poll(timeout=0) == set()
+        thread = threading.Thread(target=_change_files, args=(project,))
+        thread.start()
+        changed = _collect(watcher, EXPECTED_CHANGES)
+        thread.join()
+        assert changed == EXPECTED_CHANGES
+
+        (project / "src" / "geneweaver" / "example" / "sub").mkdir()
+        assert watcher.poll(timeout=1) == {"src/geneweaver/example/sub"}
+        (project / "src" / "geneweaver" / "example" / "sub" / "a.py").write_text("")
+        assert watcher.poll(timeout=1) == {"src/geneweaver/example/sub/a.py"}
+    finally:
+        watcher.close()
+
+
+def test_session_runs_only_affected_checks(project, monkeypatch):
+    """Test that a session re-runs only the checks affected by a change."""
+    imports: List[object] = []
+    monkeypatch.setattr(
+        watch_module, "check_imports", lambda layout: imports.append(layout)
+    )
+    session = WatchSession(project)
+    assert session.run() == ["structure", "pyproject", "import", "style"]
+    assert session.failures == []
+    assert len(imports) == 1
+
+    pyproject = session.pyproject
+    assert session.run(["tests/__init__.py"]) == ["structure", "style"]
+    assert session.pyproject is pyproject
+    assert len(imports) == 1
+
+    (project / "tests" / "__init__.py").write_text("import os\n")
+    session.run(["tests/__init__.py"])
+    assert {failure.id for failure in session.failures} == {"ruff-tests"}
+
+    (project / "tests" / "__init__.py").write_text('"""Tests."""\n')
+    session.run(["tests/__init__.py"])
+    assert session.failures == []
+
+    assert "import" in session.run(["pyproject.toml"])
+    assert session.pyproject is not pyproject
+    assert len(imports) == 2
+
+
+def test_watch_command(project, monkeypatch):
+    """Test the watch command passes its options to the watch loop."""
+    calls: List[tuple] = []
+
+    def fake_watch(
+        root: pathlib.Path, checks: List[str], polling: bool, interval: float
+    ) -> None:
+        calls.append((root, list(checks), polling, interval))
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(watch_module, "watch", fake_watch)
+    arguments = ["watch", str(project), "--check", "style", "--poll"]
+    assert main(arguments) == 0
+    assert calls == [(project.resolve(), ["style"], True, 0.25)]
+    assert main(["watch", str(project / "missing")]) == 2
+
+
+def test_watch_reports_changes(project, monkeypatch):
+    """Test that the watch loop reports the first run and each change."""
+    changes = iter([{"README.md"}])
+
+    class FakeWatcher:
+        def poll(self, timeout: Optional[float] = None) -> Set[str]:
+            try:
+                return next(changes)
+            except StopIteration:
+                raise KeyboardInterrupt from None
+
+        def close(self) -> None:
+            pass
+
+    monkeypatch.setattr(watch_module, "open_watcher", lambda *args: FakeWatcher())
+    output = io.StringIO()
+    with pytest.raises(KeyboardInterrupt):
+        watch_module.watch(project, ["structure"], output=output)
+    assert output.getvalue().count("all checks passed") == 2
+    assert "changed: README.md\nran structure in" in output.getvalue()
+
+
+def test_session_survives_a_broken_pyproject(project):
+    """Test that a bad save of pyproject.toml is reported, keeping the last model."""
+    session = WatchSession(project, ["pyproject"])
+    session.run()
+    pyproject = session.pyproject
+    contents = (project / "pyproject.toml").read_text()
+
+    (project / "pyproject.toml").write_text(contents + "\n[tool.poetry\n")
+    session.run({"pyproject.toml"})
+    assert session.pyproject is pyproject
+    assert [(failure.check, failure.id) for failure in session.failures] == [
+        ("pyproject", "parse")
+    ]
+
+    (project / "pyproject.toml").write_text(contents)
+    session.run({"pyproject.toml"})
+    assert session.failures == []
+
+
+def test_watch_survives_a_failing_check(project, monkeypatch):
+    """Test that an error in a check is reported without ending the watch."""
+    changes = iter([{"README.md"}, {"README.md"}])
+    runs = iter([None, RuntimeError("disk went away"), None])
+
+    class FakeWatcher:
+        def poll(self, timeout: Optional[float] = None) -> Set[str]:
+            try:
+                return next(changes)
+            except StopIteration:
+                raise KeyboardInterrupt from None
+
+        def close(self) -> None:
+            pass
+
+    run = WatchSession.run
+
+    def flaky_run(self: WatchSession, changed: Optional[Set[str]] = None) -> List[str]:
+        error = next(runs)
+        if error is not None:
+            raise error
+        return run(self, changed)
+
+    monkeypatch.setattr(watch_module, "open_watcher", lambda *args: FakeWatcher())
+    monkeypatch.setattr(WatchSession, "run", flaky_run)
+    output = io.StringIO()
+    with pytest.raises(KeyboardInterrupt):
+        watch_module.watch(project, ["structure"], output=output)
+    assert "ERROR running the checks: RuntimeError('disk went away')" in (
+        output.getvalue()
+    )
+    assert output.getvalue().count("all checks passed") == 2
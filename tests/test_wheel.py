@@ -0,0 +1,213 @@
+"""Test building and inspecting wheels, and the wheel tests."""
+
+import pathlib
+import zipfile
+
+import pytest
+from geneweaver.testing.wheel import (
+    BackendUnavailableError,
+    WheelBuildError,
+    cached_wheel,
+    missing_source_files,
+    read_wheel,
+    source_digest,
+    unexpected_entries,
+)
+
+# A PEP 517 backend that packages everything under src, and logs each build.
+BACKEND = '''\
+"""A minimal build backend for tests."""
+
+import os
+import pathlib
+import zipfile
+
+
+def build_wheel(wheel_directory, config_settings=None, metadata_directory=None):
+    log = os.environ.get("WHEEL_BUILD_LOG")
+    if log:
+        with open(log, "a") as log_file:
+            log_file.write("built\\n")
+    name = "geneweaver_example-1.0-py3-none-any.whl"
+    with zipfile.ZipFile(pathlib.Path(wheel_directory, name), "w") as wheel:
+        for path in sorted(pathlib.Path("src").rglob("*")):
+            if path.is_file() and "__pycache__" not in path.parts:
+                wheel.write(path, path.relative_to("src").as_posix())
+        wheel.writestr("geneweaver_example-1.0.dist-info/METADATA", "Name: example")
+    return name
+'''
+
+BUILD_SYSTEM = {
+    "requires": [],
+    "build-backend": "example_backend",
+    "backend-path": ["backend"],
+}
+
+PYPROJECT = """\
+[tool.poetry]
+name = "geneweaver-example"
+
+[build-system]
+requires = []
+build-backend = "example_backend"
+backend-path = ["backend"]
+"""
+
+
+def make_project(root: pathlib.Path) -> pathlib.Path:
+    """Create a project built by the minimal backend."""
+    package = root / "src" / "geneweaver" / "example"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text('"""An example package."""\n')
+    (package / "core.py").write_text("VALUE = 1\n")
+    (root / "backend").mkdir()
+    (root / "backend" / "example_backend.py").write_text(BACKEND)
+    (root / "pyproject.toml").write_text(PYPROJECT)
+    return root
+
+
+@pytest.fixture()
+def project(tmp_path, monkeypatch):
+    """Create a project, logging its builds."""
+    monkeypatch.setenv("WHEEL_BUILD_LOG", str(tmp_path / "builds.log"))
+    return make_project(tmp_path / "project")
+
+
+def builds(project: pathlib.Path) -> int:
+    """Count the times the project's wheel was built."""
+    log = project.parent / "builds.log"
+    return len(log.read_text().splitlines()) if log.exists() else 0
+
+
+def test_cached_wheel_builds_once_per_source_tree(project, tmp_path):
+    """Test that the wheel is only built again when its sources change."""
+    cache = tmp_path / "cache"
+    first = cached_wheel(project, BUILD_SYSTEM, cache)
+    assert first.name == "geneweaver_example-1.0-py3-none-any.whl"
+    assert cached_wheel(project, BUILD_SYSTEM, cache) == first
+    assert builds(project) == 1
+
+    (project / "src" / "geneweaver" / "example" / "__pycache__").mkdir()
+    (project / "src" / "geneweaver" / "example" / "__pycache__" / "x.pyc").touch()
+    assert cached_wheel(project, BUILD_SYSTEM, cache) == first
+    assert builds(project) == 1
+
+    (project / "src" / "geneweaver" / "example" / "new.py").write_text("")
+    second = cached_wheel(project, BUILD_SYSTEM, cache)
+    assert second != first
+    assert builds(project) == 2
+    # The outdated wheel is removed.
+    assert [path.name for path in cache.iterdir()] == [second.parent.name]
+
+
+def test_source_digest_tracks_the_backend_version(project, monkeypatch):
+    """Test that upgrading the build backend's distribution changes the digest."""
+    build_system = {**BUILD_SYSTEM, "requires": ["example-backend>=1.0"]}
+    versions = {"example-backend": "1.0"}
+    monkeypatch.setattr("geneweaver.testing.wheel.version", versions.__getitem__)
+    digest = source_digest(project, build_system)
+    assert source_digest(project, build_system) == digest
+    versions["example-backend"] = "1.1"
+    assert source_digest(project, build_system) != digest
+
+
+def test_cached_wheel_errors(project, tmp_path):
+    """Test the errors for a missing backend, and a failing build."""
+    missing = {"requires": ["not-a-backend"], "build-backend": "not_a_backend"}
+    with pytest.raises(BackendUnavailableError, match="install not-a-backend"):
+        cached_wheel(project, missing, tmp_path / "cache")
+
+    (project / "backend" / "failing_backend.py").write_text(
+        "def build_wheel(wheel_directory, config_settings=None):\n"
+        "    raise ValueError('no version')\n"
+    )
+    failing = {**BUILD_SYSTEM, "build-backend": "failing_backend"}
+    with pytest.raises(WheelBuildError, match="no version"):
+        cached_wheel(project, failing, tmp_path / "cache")
+    assert list((tmp_path / "cache").iterdir()) == []
+
+
+def test_build_without_a_backend(project, tmp_path):
+    """Test that a project without a build-backend is not built with setuptools."""
+    with pytest.raises(BackendUnavailableError, match="no build-backend"):
+        cached_wheel(project, {"requires": ["setuptools"]}, tmp_path / "cache")
+
+
+def test_build_is_isolated_from_the_session(project, tmp_path):
+    """Test that a backend exiting, or changing directory, does not affect pytest."""
+    (project / "backend" / "exiting_backend.py").write_text(
+        "import os, sys\n\n"
+        "def build_wheel(wheel_directory, config_settings=None):\n"
+        "    os.chdir('/')\n"
+        "    sys.exit(\"error: invalid command 'bdist_wheel'\")\n"
+    )
+    exiting = {**BUILD_SYSTEM, "build-backend": "exiting_backend"}
+    cwd = pathlib.Path.cwd()
+    with pytest.raises(WheelBuildError, match="invalid command 'bdist_wheel'"):
+        cached_wheel(project, exiting, tmp_path / "cache")
+    assert pathlib.Path.cwd() == cwd
+
+
+def test_read_wheel(tmp_path):
+    """Test that a wheel's files are listed with their sizes."""
+    path = tmp_path / "example.whl"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as wheel:
+        wheel.writestr("geneweaver/example/__init__.py", "")
+        wheel.writestr("geneweaver/example/data.txt", "x" * 10_000)
+    contents = read_wheel(path)
+    assert contents.names == {
+        "geneweaver/example/__init__.py",
+        "geneweaver/example/data.txt",
+    }
+    assert contents.size == path.stat().st_size
+    assert contents.uncompressed_size == 10_000
+    assert contents.largest(1)[0].name == "geneweaver/example/data.txt"
+    assert contents.largest(1)[0].compressed_size < 10_000
+
+
+def test_wheel_content_checks(project, tmp_path):
+    """Test that missing modules and unexpected files are found."""
+    path = tmp_path / "broken.whl"
+    with zipfile.ZipFile(path, "w") as wheel:
+        for name in (
+            "geneweaver/__init__.py",
+            "geneweaver/example/__init__.py",
+            "geneweaver/example/tests/data.csv",
+            "tests/test_core.py",
+            "example-1.0.dist-info/METADATA",
+        ):
+            wheel.writestr(name, "")
+    contents = read_wheel(path)
+    assert missing_source_files(contents, project) == ["geneweaver/example/core.py"]
+    assert unexpected_entries(contents) == [
+        "geneweaver/example/tests/data.csv",
+        "tests/test_core.py",
+    ]
+
+
+def test_wheel_tests(pytester, monkeypatch):
+    """Test the prebuilt wheel tests against a good, then a broken, wheel."""
+    monkeypatch.delenv("WHEEL_BUILD_LOG", raising=False)
+    make_project(pytester.path)
+    pytester.makepyprojecttoml(
+        PYPROJECT
+        + "\n[tool.geneweaver.testing]\nwheel-size-budget-kb = 1\n"
+        + "\n[tool.pytest.ini_options]\ngeneweaver_disable = ['all']\n"
+    )
+    pytester.mkdir("tests")
+    result = pytester.runpytest("tests", "--gw-enable=wheel")
+    result.assert_outcomes(passed=4)
+
+    (pytester.path / "src" / "geneweaver" / "__init__.py").write_text("")
+    (pytester.path / "src" / "geneweaver" / "example" / "big.bin").write_bytes(
+        bytes(range(256)) * 64
+    )
+    result = pytester.runpytest("tests", "--gw-enable=wheel")
+    result.assert_outcomes(passed=2, failed=2)
+    result.stdout.fnmatch_lines(
+        [
+            "*contains geneweaver/__init__.py*",
+            "*over the budget of 1.0 KB*",
+            "*geneweaver/example/big.bin: *",
+        ]
+    )